@@ -1,12 +1,12 @@
+import asyncio
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 import json
 import re
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity # Added for semantic similarity
 from backend.agents.blog_draft_generator.state import BlogDraftState, DraftSection, ContentReference, CodeExample, SectionVersion, SectionFeedback, ImagePlaceholder
-from backend.utils.blog_context import extract_blog_narrative_context, calculate_content_length, calculate_section_length_targets, get_length_priority
+from backend.utils.blog_context import extract_blog_narrative_context, summarize_outline_section, calculate_content_length, calculate_section_length_targets, get_length_priority
 from backend.services.persona_service import PersonaService
 from backend.agents.blog_draft_generator.prompts import PROMPT_CONFIGS, EXPERT_WRITING_PRINCIPLES
 from backend.agents.blog_draft_generator.utils import (
@@ -19,15 +19,20 @@ from backend.agents.blog_draft_generator.utils import (
     build_hierarchical_structure,
     build_contextual_query,
     process_search_results,
-    determine_content_category
+    determine_content_category,
+    header_similarity_matrix,
+    select_relevant_headers
 )
-from backend.services.vector_store_service import VectorStoreService
+from backend.services.vector_store_registry import get_vector_store
 from backend.agents.cost_tracking_decorator import track_node_costs, track_iteration_costs
 from backend.services.supabase_project_manager import MilestoneType, SectionStatus
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Minimum cosine similarity for a markdown header to count as relevant to an outline section
+HEADER_SIMILARITY_THRESHOLD = 0.6
+
 def validate_and_enforce_constraints(content: str, include_code: bool, section_title: str) -> str:
     """
     Validates content against section constraints and enforces them.
@@ -84,8 +89,8 @@ async def semantic_content_mapper(state: BlogDraftState) -> BlogDraftState:
     """Maps content to sections using vector search for semantic matching with section headers."""
     logging.info("Executing node: semantic_content_mapper")
     
-    # Initialize vector store service
-    vector_store = VectorStoreService()
+    # Use the shared vector store service
+    vector_store = state.vector_store or get_vector_store()
     # Get the embedding function instance from the service
     embedding_fn = getattr(vector_store, 'embedding_fn', None)
     if not embedding_fn:
@@ -117,8 +122,45 @@ async def semantic_content_mapper(state: BlogDraftState) -> BlogDraftState:
     document_structure = build_hierarchical_structure(section_headers)
     logging.info(f"Built hierarchical document structure with {len(document_structure)} nodes")
     
-    # For each section in the outline, use vector search with contextual awareness
-    for section in state.outline.sections:
+    # --- Semantic Header Matching using Embeddings ---
+    # All headers and all section targets are embedded in a single batch and scored
+    # with one similarity matrix, instead of two embedding calls per outline section.
+    header_matches = None
+    if section_headers and embedding_fn:
+        try:
+            header_texts = [h.get('text', '') for h in section_headers]
+            target_texts = [
+                f"{section.title} - {' '.join(section.learning_goals)}"
+                for section in state.outline.sections
+            ]
+            # The embedding function is synchronous (model inference or HTTP); keep it off the event loop
+            embeddings = await asyncio.to_thread(embedding_fn, header_texts + target_texts)
+            if len(embeddings) != len(header_texts) + len(target_texts):
+                raise ValueError(
+                    f"Embedding function returned {len(embeddings)} embeddings for "
+                    f"{len(header_texts) + len(target_texts)} texts."
+                )
+
+            similarities = header_similarity_matrix(embeddings[len(header_texts):], embeddings[:len(header_texts)])
+            header_matches = [
+                [
+                    {
+                        'text': section_headers[idx].get('text', ''),
+                        'level': section_headers[idx].get('level', 1),
+                        'similarity': float(similarities[row, idx])
+                    }
+                    for idx in indices
+                ]
+                for row, indices in enumerate(select_relevant_headers(similarities, HEADER_SIMILARITY_THRESHOLD))
+            ]
+        except Exception as e:
+            logging.error(f"Error during semantic header matching: {e}. Falling back to basic text overlap.")
+    elif section_headers:
+        logging.warning("No embedding function available for semantic header matching. Using basic text overlap.")
+
+    # Build one contextual query per outline section
+    section_queries = []
+    for position, section in enumerate(state.outline.sections):
         section_title = section.title
         learning_goals = section.learning_goals
         
@@ -126,65 +168,16 @@ async def semantic_content_mapper(state: BlogDraftState) -> BlogDraftState:
         
         # Find semantically relevant headers
         relevant_headers = []
-        # The following 'if section_headers:' was causing indentation errors.
-        # The conditions are handled within the enhanced matching block below.
-        # Removing the outer if statement.
-        # --- Enhanced Semantic Header Matching using Embeddings ---
-        if section_headers and embedding_fn: # Check if we have headers and the function
-            try:
-                # Prepare texts for embedding
-                target_text = f"{section_title} - {' '.join(learning_goals)}"
-                header_texts = [h.get('text', '') for h in section_headers]
-
-                # Generate embeddings using the embedding function directly
-                # Call with a list for single item, then extract the first embedding
-                # Assuming embedding_fn is async, add await
-                target_embedding_list = await embedding_fn([target_text])
-                if not target_embedding_list:
-                     raise ValueError("Embedding function returned empty list for target text.")
-                target_embedding = target_embedding_list[0]
-
-                # Call with the list of header texts
-                # Assuming embedding_fn is async, add await
-                header_embeddings = await embedding_fn(header_texts)
-                if len(header_embeddings) != len(header_texts):
-                    raise ValueError(f"Embedding function returned {len(header_embeddings)} embeddings for {len(header_texts)} header texts.")
-
-                # Calculate cosine similarity (needs embeddings in correct shape)
-                # Ensure target_embedding is 2D for cosine_similarity
-                similarities = cosine_similarity([target_embedding], header_embeddings)[0]
-
-                # Create relevant_headers list with similarity scores
-                similarity_threshold = 0.6 # Adjust this threshold as needed
-                for header, sim in zip(section_headers, similarities):
-                    if sim >= similarity_threshold:
-                        relevant_headers.append({
-                            'text': header.get('text', ''),
-                            'level': header.get('level', 1),
-                            'similarity': float(sim) # Ensure it's a float
-                        })
-
-                # Sort by similarity
-                relevant_headers.sort(key=lambda x: x.get('similarity', 0), reverse=True)
-                logging.info(f"Found {len(relevant_headers)} semantically relevant headers (threshold > {similarity_threshold}) for section '{section_title}' using embeddings.")
-
-            except Exception as e:
-                logging.error(f"Error during semantic header matching for section '{section_title}': {e}. Falling back to basic text overlap.")
-                # Fallback to basic text overlap if embedding fails
-                relevant_headers = [] # Reset before fallback
-                for header in section_headers:
-                    header_text = header.get('text', '').lower()
-                    section_text = section_title.lower()
-                    if (header_text in section_text or section_text in header_text or any(goal.lower() in header_text for goal in learning_goals)):
-                        relevant_headers.append({ 'text': header.get('text', ''), 'level': header.get('level', 1), 'similarity': 0.5 }) # Assign lower default similarity
-                relevant_headers.sort(key=lambda x: x.get('similarity', 0), reverse=True)
-        elif section_headers: # Fallback if embedding function is missing but headers exist
-            logging.warning(f"No embedding function available for semantic matching for section '{section_title}'. Using basic text overlap.")
+        if header_matches is not None:
+            relevant_headers = header_matches[position]
+            logging.info(f"Found {len(relevant_headers)} semantically relevant headers (threshold > {HEADER_SIMILARITY_THRESHOLD}) for section '{section_title}' using embeddings.")
+        elif section_headers:
+            # Fallback to basic text overlap when embeddings are unavailable or failed
             for header in section_headers:
                 header_text = header.get('text', '').lower()
                 section_text = section_title.lower()
                 if (header_text in section_text or section_text in header_text or any(goal.lower() in header_text for goal in learning_goals)):
-                    relevant_headers.append({ 'text': header.get('text', ''), 'level': header.get('level', 1), 'similarity': 0.5 })
+                    relevant_headers.append({ 'text': header.get('text', ''), 'level': header.get('level', 1), 'similarity': 0.5 }) # Assign lower default similarity
             relevant_headers.sort(key=lambda x: x.get('similarity', 0), reverse=True)
         # --- End of Enhanced Matching ---
         
@@ -201,20 +194,41 @@ async def semantic_content_mapper(state: BlogDraftState) -> BlogDraftState:
             # Fallback to basic query if no relevant headers found
             contextual_query = f"{section_title}: {', '.join(learning_goals)}"
             logging.info(f"Using basic query (no relevant headers): {contextual_query}")
-        
-        # Perform vector search with enhanced query
-        markdown_results = vector_store.search_content(
-            query=contextual_query,
-            metadata_filter={"source_type": "markdown"},
-            n_results=15
-        )
-        
-        # Search for code examples
-        code_results = vector_store.search_content(
-            query=contextual_query,
-            metadata_filter={"source_type": "code"},
-            n_results=10
+        section_queries.append((relevant_headers, contextual_query))
+
+    # Scope searches to the project so they run against its own collection
+    project_name = getattr(state, 'project_name', None)
+    project_filter = {"project_name": project_name} if project_name else {}
+
+    # Retrieval round 1: markdown and code searches for every section in one batch
+    section_results = await asyncio.to_thread(vector_store.search_content_batch, [
+        search
+        for _, contextual_query in section_queries
+        for search in (
+            {"query": contextual_query, "metadata_filter": {"source_type": "markdown", **project_filter}, "n_results": 15},
+            {"query": contextual_query, "metadata_filter": {"source_type": "code", **project_filter}, "n_results": 10},
         )
+    ])
+
+    # Retrieval round 2: explanatory context for every relevant code hit in one batch
+    relevant_code = [
+        [result for result in section_results[2 * position + 1] if result["relevance"] > 0.6]
+        for position in range(len(section_queries))
+    ]
+    context_searches = [
+        {"query": result["content"][:100], "metadata_filter": {"source_type": "markdown", **project_filter}, "n_results": 2}  # Use start of code as query
+        for code_results in relevant_code
+        for result in code_results
+    ]
+    context_results = iter(
+        await asyncio.to_thread(vector_store.search_content_batch, context_searches) if context_searches else []
+    )
+
+    for position, section in enumerate(state.outline.sections):
+        section_title = section.title
+        learning_goals = section.learning_goals
+        relevant_headers = section_queries[position][0]
+        markdown_results = section_results[2 * position]
         
         # Process search results with structural awareness
         references = []
@@ -228,36 +242,28 @@ async def semantic_content_mapper(state: BlogDraftState) -> BlogDraftState:
             )
             references.extend(markdown_references)
         
-        # Process code results
-        for result in code_results:
-            # Only include code with sufficient relevance
-            if result["relevance"] > 0.6:
-                reference = ContentReference(
-                    content=result["content"],
-                    source_type="code",
-                    relevance_score=result["relevance"],
-                    category="code_example",
-                    source_location=result["metadata"].get("source_location", "")
-                )
-                references.append(reference)
-                
-                # Try to find context for this code
-                code_context = vector_store.search_content(
-                    query=result["content"][:100],  # Use start of code as query
-                    metadata_filter={"source_type": "markdown"},
-                    n_results=2
+        # Process code results with sufficient relevance
+        for result in relevant_code[position]:
+            reference = ContentReference(
+                content=result["content"],
+                source_type="code",
+                relevance_score=result["relevance"],
+                category="code_example",
+                source_location=result["metadata"].get("source_location", "")
+            )
+            references.append(reference)
+            
+            # Add context as separate reference if found
+            code_context = next(context_results)
+            if code_context:
+                context_reference = ContentReference(
+                    content=code_context[0]["content"],
+                    source_type="code_context",
+                    relevance_score=result["relevance"] - 0.1,  # Slightly lower relevance
+                    category="code_explanation",
+                    source_location=code_context[0]["metadata"].get("source_location", "")
                 )
-                
-                # Add context as separate reference if found
-                if code_context:
-                    context_reference = ContentReference(
-                        content=code_context[0]["content"],
-                        source_type="code_context",
-                        relevance_score=result["relevance"] - 0.1,  # Slightly lower relevance
-                        category="code_explanation",
-                        source_location=code_context[0]["metadata"].get("source_location", "")
-                    )
-                    references.append(context_reference)
+                references.append(context_reference)
         
         # Sort references by relevance
         references.sort(key=lambda x: x.relevance_score, reverse=True)
@@ -403,8 +409,8 @@ async def retrieve_context_with_hyde(state: BlogDraftState) -> BlogDraftState:
         return state
 
     try:
-        # Initialize vector store service (consider passing it via state if needed frequently)
-        vector_store = VectorStoreService()
+        # Use the shared vector store service
+        vector_store = state.vector_store or get_vector_store()
         project_name = state.project_name # Get project name directly from state
 
         logging.info(f"Retrieving context using HyDE query (length: {len(state.hypothetical_document)}): {state.hypothetical_document[:150]}...")
@@ -412,7 +418,9 @@ async def retrieve_context_with_hyde(state: BlogDraftState) -> BlogDraftState:
         # Perform vector search using the hypothetical document as the query
         # Combine markdown and code results? Or keep separate? Let's combine for now.
         # Adjust n_results as needed
-        retrieved_docs = vector_store.search_content(
+        # Off the event loop: the query embedding may wait on the shared batching worker
+        retrieved_docs = await asyncio.to_thread(
+            vector_store.search_content,
             query=state.hypothetical_document,
             metadata_filter={"project_name": project_name}, # Filter by project
             n_results=15 # Retrieve a decent number of chunks
@@ -548,6 +556,22 @@ Previous Section Ending: {prev_ending}
 Upcoming Sections: {upcoming_sections}
 Current Position: Section {state.current_section_index + 1} of {len(getattr(state.outline, 'sections', []))}
         """
+    elif state.current_section_index > 0:
+        # No finished prior section available (sections generated independently or concurrently):
+        # describe the preceding section from the outline instead
+        outline_sections = getattr(state.outline, 'sections', [])
+        prev_outline_section = outline_sections[state.current_section_index - 1]
+        upcoming_sections = [
+            s.title for s in outline_sections[state.current_section_index:state.current_section_index + 2]
+        ]
+        previous_context = f"""
+BLOG PROGRESSION CONTEXT:
+Blog Title: {getattr(state.outline, 'title', 'Untitled Blog')}
+Earlier Sections (from outline): {[summarize_outline_section(s) for s in outline_sections[:state.current_section_index]]}
+Previous Section: {summarize_outline_section(prev_outline_section)}
+Upcoming Sections: {upcoming_sections}
+Current Position: Section {state.current_section_index + 1} of {len(outline_sections)}
+        """
     else:
         previous_context = "BLOG PROGRESSION CONTEXT:\nThis is the first section of the blog."
     
@@ -618,8 +642,16 @@ Current Position: Section {state.current_section_index + 1} of {len(getattr(stat
     prompt = PROMPT_CONFIGS["section_generation"]["prompt"].format(**input_variables)
     
     try:
-        llm_output_str = await state.model.ainvoke(prompt)
-        llm_output_str = llm_output_str if isinstance(llm_output_str, str) else llm_output_str.content
+        if state.event_callback and hasattr(state.model, 'astream'):
+            # Stream tokens to the listener as the model produces them
+            chunks = []
+            async for chunk in state.model.astream(prompt):
+                chunks.append(chunk)
+                state.event_callback("token", {"section_index": state.current_section_index, "text": chunk})
+            llm_output_str = "".join(chunks)
+        else:
+            llm_output_str = await state.model.ainvoke(prompt)
+            llm_output_str = llm_output_str if isinstance(llm_output_str, str) else llm_output_str.content
         
         logging.info(f"\n\nRaw LLM output for section {section_title}:\n{llm_output_str}\n\n")
 
@@ -146,6 +146,12 @@ class BlogDraftState(CostTrackingMixin, BaseModel):
     # SQL persistence (optional)
     sql_project_manager: Optional[Any] = Field(default=None, description="SQL project manager for milestone and section persistence")
 
+    # Shared vector store (injected by the agent; nodes fall back to the process-wide instance)
+    vector_store: Optional[Any] = Field(default=None, exclude=True, description="Shared VectorStoreService instance")
+
+    # Optional progress/token event callback: callable(event_type: str, data: dict)
+    event_callback: Optional[Any] = Field(default=None, exclude=True, description="Receives streaming progress and token events")
+
     def __init__(self, **data):
         super().__init__(**data)
         self.current_agent_name = "BlogDraftGeneratorAgent"
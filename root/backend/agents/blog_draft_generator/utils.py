@@ -4,10 +4,10 @@ Utility functions for the Blog Draft Generator.
 import logging
 import re
 import json
-import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from backend.services.vector_store_service import VectorStoreService
+import numpy as np
+from backend.services.vector_store_registry import get_vector_store
 from backend.agents.blog_draft_generator.state import ContentReference, CodeExample
 
 logging.basicConfig(level=logging.INFO)
@@ -53,6 +53,49 @@ def build_hierarchical_structure(section_headers: List[Dict[str, Any]]) -> List[
     
     return hierarchy
 
+def header_similarity_matrix(target_embeddings: Any, header_embeddings: Any) -> np.ndarray:
+    """
+    Cosine similarity between every target and every header in one matmul.
+
+    Args:
+        target_embeddings: (n_targets, dim) embeddings of the outline sections
+        header_embeddings: (n_headers, dim) embeddings of the markdown headers
+
+    Returns:
+        (n_targets, n_headers) similarity matrix
+    """
+    targets = np.asarray(target_embeddings, dtype=np.float32)
+    headers = np.asarray(header_embeddings, dtype=np.float32)
+    # Zero vectors would divide by zero; they end up with similarity 0
+    targets = targets / np.maximum(np.linalg.norm(targets, axis=1, keepdims=True), 1e-12)
+    headers = headers / np.maximum(np.linalg.norm(headers, axis=1, keepdims=True), 1e-12)
+    return targets @ headers.T
+
+
+def select_relevant_headers(similarities: np.ndarray, threshold: float,
+                            top_k: Optional[int] = None) -> List[List[int]]:
+    """
+    Header indices per target with similarity >= threshold, most similar first.
+
+    Args:
+        similarities: (n_targets, n_headers) matrix from header_similarity_matrix
+        threshold: Minimum similarity for a header to count as relevant
+        top_k: Optional cap on headers kept per target
+
+    Returns:
+        One list of header indices per target
+    """
+    if similarities.size == 0:
+        return [[] for _ in range(similarities.shape[0])]
+
+    # Stable descending sort so equal scores keep document order
+    order = np.argsort(-similarities, axis=1, kind="stable")
+    if top_k is not None:
+        order = order[:, :top_k]
+    passes = np.take_along_axis(similarities, order, axis=1) >= threshold
+    return [row[mask].tolist() for row, mask in zip(order, passes)]
+
+
 def build_contextual_query(section_title: str, learning_goals: List[str], 
                          relevant_headers: List[Dict[str, Any]], 
                          document_structure: List[Dict[str, Any]]) -> str:
@@ -265,7 +308,7 @@ def store_blog_in_vector_store(
         Content hash if successful, None otherwise
     """
     try:
-        vector_store = VectorStoreService()
+        vector_store = get_vector_store()
         
         # Create chunks from sections
         chunks = []
@@ -5,12 +5,15 @@ from backend.agents.outline_generator.state import FinalOutline
 from backend.parsers import ContentStructure
 from backend.agents.base_agent import BaseGraphAgent
 from datetime import datetime
+import os
+import asyncio
 import logging
 import hashlib # Added for cache key generation
+from contextvars import ContextVar
 import json # Added for serializing/deserializing cache data
 from backend.services.vector_store_service import VectorStoreService # Added
 from backend.services.persona_service import PersonaService # Added for persona integration
-from typing import Tuple, Optional, Dict, Any # Added Dict, Any for type hinting
+from typing import Tuple, Optional, Dict, Any, List, Callable, Awaitable # Added Dict, Any for type hinting
 
 # Import necessary nodes at the top level
 from backend.agents.blog_draft_generator.nodes import (
@@ -22,12 +25,19 @@ from backend.agents.blog_draft_generator.nodes import (
     auto_feedback_generator,
     feedback_incorporator,
     section_finalizer,
+    transition_generator,
     generate_hypothetical_document, # New HyDE node (will be used later)
     retrieve_context_with_hyde      # New HyDE node (will be used later)
 )
 
 logging.basicConfig(level=logging.INFO)
 
+# Default cap on sections generated at once by generate_all_sections
+DEFAULT_SECTION_CONCURRENCY = int(os.getenv("DRAFT_MAX_CONCURRENCY", "3"))
+
+# Set inside generate_all_sections tasks so concurrent sections keep their state task-local
+_in_section_batch: ContextVar[bool] = ContextVar("in_section_batch", default=False)
+
 class BlogDraftGeneratorAgent(BaseGraphAgent):
     """Agent responsible for generating blog drafts section by section."""
 
@@ -111,7 +121,8 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
             cost_aggregator=cost_aggregator,
             project_id=project_id,
             current_stage="draft_generation",
-            sql_project_manager=self.sql_project_manager  # Pass SQL manager for persistence
+            sql_project_manager=self.sql_project_manager,  # Pass SQL manager for persistence
+            vector_store=self.vector_store
         )
 
         self.current_state = initial_state
@@ -212,6 +223,13 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
         outline_string = json.dumps(outline, sort_keys=True)
         return hashlib.sha256(outline_string.encode()).hexdigest()
 
+    def clear_section_cache(self, project_name: str, outline: Dict[str, Any]) -> None:
+        """Drops cached sections for this project and outline so they are generated fresh."""
+        self.vector_store.clear_section_cache(
+            project_name=project_name,
+            outline_hash=self._hash_outline_for_cache(outline)
+        )
+
     def _create_section_cache_key(self, project_name: str, outline_hash: str, section_index: int) -> str:
         """Creates a deterministic cache key for a section based on outline hash."""
         key_string = f"section_cache:{project_name}:{outline_hash}:{section_index}"
@@ -251,10 +269,21 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
         use_cache: bool = True,
         cost_aggregator=None,
         project_id: Optional[str] = None,
-        persona: str = "neuraforge"  # Add persona parameter with default
+        persona: str = "neuraforge",  # Add persona parameter with default
+        event_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> Tuple[Optional[Dict[str, Any]], bool]:
-        """Generates a single section of the blog draft, using persistent cache based on outline content."""
+        """
+        Generates a single section of the blog draft, using persistent cache based on outline content.
+
+        If ``event_callback`` is given it receives ("node", {...}) progress events after each
+        step (validator scores, feedback iterations) and ("token", {...}) events while the
+        section generator streams the draft.
+        """
         section_title = section.get('title', f'Section {current_section_index + 1}')
+
+        def emit_node(node: str, **data):
+            if event_callback:
+                event_callback("node", {"node": node, "section_index": current_section_index, **data})
         
         outline_hash = self._hash_outline_for_cache(outline)
         logging.info(f"Generating section {current_section_index}: {section_title} (Project: {project_name}, OutlineHash: {outline_hash})")
@@ -273,6 +302,7 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
                 try:
                     cached_data = json.loads(cached_section_json)
                     logging.info(f"Cache hit for section {current_section_index} (OutlineHash: {outline_hash})")
+                    emit_node("cache", status="hit")
                     # Return the full cached data including image placeholders
                     return {
                         "content": cached_data.get("content"),
@@ -283,8 +313,12 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
         # --- End Cache Check ---
 
         logging.info(f"Cache miss for section {current_section_index} (Outline Hash: {outline_hash}). Proceeding with generation.")
-        # Reset the current state to ensure fresh generation
-        self.current_state = None
+        # Concurrent sections (generate_all_sections) keep their state local to the task;
+        # only single-section calls expose it through current_state
+        track_state = not _in_section_batch.get()
+        if track_state:
+            # Reset the current state to ensure fresh generation
+            self.current_state = None
         # logging.info("Reset agent state to ensure fresh generation") # Can be verbose
 
         # Initialize state for this section
@@ -314,11 +348,14 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
             current_stage="draft_generation",
             persona=persona,  # Pass the persona to the state
             sql_project_manager=self.sql_project_manager,  # Pass SQL manager for persistence
+            vector_store=self.vector_store,
+            event_callback=event_callback,
             outline_hash=outline_hash  # Pass outline hash for version tracking
             # job_id is not part of BlogDraftState, but available via project_name/index
         )
 
-        self.current_state = section_state
+        if track_state:
+            self.current_state = section_state
 
         # Execute nodes directly in sequence
         try:
@@ -326,13 +363,22 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
 
             # --- HyDE RAG Steps ---
             state = await generate_hypothetical_document(section_state)
+            emit_node("hyde")
             state = await retrieve_context_with_hyde(state)
+            emit_node("retrieval", context_chunks=len(state.hyde_retrieved_context or []))
             # --- End HyDE RAG Steps ---
 
+            emit_node("generator", status="started")
             state = await section_generator(state)
+            emit_node("generator", status="completed",
+                      content_length=len(state.current_section.content) if state.current_section else 0)
             state = await content_enhancer(state)
+            emit_node("enhancer")
             state = await code_example_extractor(state)
+            emit_node("code_extractor")
             state = await quality_validator(state)
+            emit_node("validator", iteration=1,
+                      scores=state.current_section.quality_metrics if state.current_section else None)
 
             # Controlled iteration loop
             iteration = 1
@@ -343,12 +389,16 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
                         logging.info(f"Quality threshold met ({overall_score} >= {quality_threshold}), stopping iterations")
                         break
                 logging.info(f"Quality not yet met, starting iteration {iteration+1}/{max_iterations}")
+                emit_node("feedback", iteration=iteration + 1, max_iterations=max_iterations)
                 state = await auto_feedback_generator(state)
                 state = await feedback_incorporator(state)
                 state = await quality_validator(state)
                 iteration += 1
+                emit_node("validator", iteration=iteration,
+                          scores=state.current_section.quality_metrics if state.current_section else None)
 
             state = await section_finalizer(state)
+            emit_node("finalizer")
             logging.info(f"Section generation completed for: {section_title}")
 
             if hasattr(state, 'update_cost_summary'):
@@ -398,6 +448,123 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
             logging.exception(msg)
             return None, False # Return None and False for was_cached
 
+    async def generate_all_sections(
+        self,
+        project_name: str,
+        outline: dict,
+        notebook_content: Optional[ContentStructure],
+        markdown_content: Optional[ContentStructure],
+        section_indices: Optional[List[int]] = None,
+        max_concurrency: Optional[int] = None,
+        max_iterations=3,
+        quality_threshold=0.8,
+        use_cache: bool = True,
+        cost_aggregator=None,
+        project_id: Optional[str] = None,
+        persona: str = "neuraforge",
+        on_section_complete: Optional[Callable[[int, Optional[Dict[str, Any]], bool], Awaitable[None]]] = None
+    ) -> Dict[int, Tuple[Optional[Dict[str, Any]], bool]]:
+        """
+        Generate several outline sections concurrently.
+
+        Sections don't depend on each other's drafts: narrative context comes from the
+        outline, and transitions are produced afterwards by generate_transitions. Sections
+        are started in outline order, at most ``max_concurrency`` at a time, and
+        ``on_section_complete`` is awaited as each one finishes (fresh sections are
+        already persisted by section_finalizer).
+
+        Returns:
+            Mapping of section index to the (result, was_cached) tuple from generate_section
+        """
+        outline_sections = outline.get('sections', [])
+        if section_indices is None:
+            section_indices = list(range(len(outline_sections)))
+        semaphore = asyncio.Semaphore(max_concurrency or DEFAULT_SECTION_CONCURRENCY)
+
+        async def run_section(index: int) -> Tuple[int, Tuple[Optional[Dict[str, Any]], bool]]:
+            # Each gathered task runs in its own context copy, so this stays task-local
+            _in_section_batch.set(True)
+            async with semaphore:
+                result = await self.generate_section(
+                    project_name=project_name,
+                    section=outline_sections[index],
+                    outline=outline,
+                    notebook_content=notebook_content,
+                    markdown_content=markdown_content,
+                    current_section_index=index,
+                    max_iterations=max_iterations,
+                    quality_threshold=quality_threshold,
+                    use_cache=use_cache,
+                    cost_aggregator=cost_aggregator,
+                    project_id=project_id,
+                    persona=persona
+                )
+            if on_section_complete:
+                try:
+                    await on_section_complete(index, *result)
+                except Exception as e:
+                    logging.error(f"Section completion callback failed for section {index}: {e}")
+            return index, result
+
+        logging.info(f"Generating {len(section_indices)} sections concurrently "
+                     f"(max_concurrency={max_concurrency or DEFAULT_SECTION_CONCURRENCY})")
+        completed = await asyncio.gather(*[run_section(i) for i in section_indices])
+        return dict(completed)
+
+    async def generate_transitions(
+        self,
+        project_name: str,
+        outline: dict,
+        sections: Dict[int, Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        cost_aggregator=None,
+        project_id: Optional[str] = None,
+        persona: str = "neuraforge"
+    ) -> Dict[str, str]:
+        """
+        Generate transitions between consecutive finished sections (final pass).
+
+        Args:
+            sections: Mapping of section index to {"title": ..., "content": ...}
+
+        Returns:
+            Mapping of "<previous title>_to_<next title>" to transition text
+        """
+        default_cs = ContentStructure(main_content="", code_segments=[], content_type="none")
+        semaphore = asyncio.Semaphore(max_concurrency or DEFAULT_SECTION_CONCURRENCY)
+
+        async def run_transition(index: int) -> Dict[str, str]:
+            previous = sections[index - 1]
+            previous_section = DraftSection(
+                title=previous.get("title", f"Section {index}"),
+                content=previous.get("content") or "",
+                status="approved"
+            )
+            state = BlogDraftState(
+                project_name=project_name,
+                outline=outline,
+                notebook_content=default_cs,
+                markdown_content=default_cs,
+                model=self.llm,
+                current_section=previous_section,
+                sections=[previous_section],
+                current_section_index=index,
+                cost_aggregator=cost_aggregator,
+                project_id=project_id,
+                current_stage="draft_generation",
+                persona=persona
+            )
+            async with semaphore:
+                state = await transition_generator(state)
+            return state.transitions
+
+        indices = [i for i in sorted(sections) if i > 0 and (i - 1) in sections]
+        transitions: Dict[str, str] = {}
+        for result in await asyncio.gather(*[run_transition(i) for i in indices]):
+            transitions.update(result)
+        logging.info(f"Generated {len(transitions)} transitions for project {project_name}")
+        return transitions
+
     # Updated method signature to use outline_hash implicitly via outline dict
     async def regenerate_section_with_feedback(
         self,
@@ -471,7 +638,8 @@ class BlogDraftGeneratorAgent(BaseGraphAgent):
             cost_aggregator=cost_aggregator,
             project_id=project_id,
             current_stage="draft_generation",
-            sql_project_manager=self.sql_project_manager  # Pass SQL manager for persistence
+            sql_project_manager=self.sql_project_manager,  # Pass SQL manager for persistence
+            vector_store=self.vector_store
         )
         initial_state.user_feedback_provided = True
 
@@ -4,7 +4,7 @@ LangGraph definition for the Blog Refinement Agent.
 Imports node functions from nodes.py and defines the graph structure.
 """
 import logging
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 
 from backend.agents.blog_refinement.state import BlogRefinementState
 from backend.agents.blog_refinement.nodes import (
@@ -14,6 +14,7 @@ from backend.agents.blog_refinement.nodes import (
     generate_titles_node,
     suggest_clarity_flow_node,
     reduce_redundancy_node,
+    merge_refinement_branches_node,
     assemble_refined_draft_node
 )
 
@@ -31,6 +32,7 @@ async def create_refinement_graph() -> StateGraph:
     graph.add_node("generate_titles", generate_titles_node)
     graph.add_node("suggest_clarity_flow", suggest_clarity_flow_node)
     graph.add_node("reduce_redundancy", reduce_redundancy_node)
+    graph.add_node("merge_branches", merge_refinement_branches_node)
     graph.add_node("assemble_draft", assemble_refined_draft_node)
 
     # --- Define Conditional Logic ---
@@ -43,11 +45,14 @@ async def create_refinement_graph() -> StateGraph:
             return "continue"
 
     # --- Define Edges with Conditionals ---
-    graph.set_entry_point("generate_introduction")
-    graph.add_edge("generate_introduction", "generate_conclusion")
-    graph.add_edge("generate_conclusion", "generate_summary")
-    graph.add_edge("generate_summary", "generate_titles")
-    graph.add_edge("generate_titles", "assemble_draft") # Titles goes to assemble
+    # Introduction, conclusion, summary and titles only read original_draft,
+    # so they fan out from START and run concurrently (LLM concurrency is bounded
+    # per provider in CostTrackingModel). The merge node waits for all four.
+    parallel_nodes = ["generate_introduction", "generate_conclusion", "generate_summary", "generate_titles"]
+    for node in parallel_nodes:
+        graph.add_edge(START, node)
+    graph.add_edge(parallel_nodes, "merge_branches")
+    graph.add_edge("merge_branches", "assemble_draft") # Merged branches go to assemble
     graph.add_edge("assemble_draft", "reduce_redundancy") # Assemble goes to redundancy reduction
     graph.add_edge("reduce_redundancy", "suggest_clarity_flow") # Redundancy reduction goes to clarity/flow
     graph.add_edge("suggest_clarity_flow", END) # Clarity/flow is the last step before END
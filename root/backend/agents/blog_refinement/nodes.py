@@ -27,6 +27,14 @@ from backend.services.supabase_project_manager import MilestoneType
 
 logger = logging.getLogger(__name__)
 
+# Independent nodes that only read original_draft; the graph runs them concurrently
+PARALLEL_BRANCHES = ("introduction", "conclusion", "summary", "titles")
+
+
+def _branch_error(branch: str, message: str) -> Dict[str, Any]:
+    """Report a failure from a parallel branch without clobbering sibling branches."""
+    return {"branch_errors": {branch: message}}
+
 # --- Node Functions ---
 
 # Corrected: Expect BlogRefinementState, use attribute access
@@ -35,7 +43,7 @@ async def generate_introduction_node(state: BlogRefinementState) -> Dict[str, An
     """Node to generate the blog introduction."""
     logger.info("Node: generate_introduction_node")
     # Access Pydantic model fields directly
-    if state.error: return {"error": state.error}
+    if state.error: return _branch_error("introduction", state.error)
 
     try:
         if not state.model:
@@ -49,12 +57,12 @@ async def generate_introduction_node(state: BlogRefinementState) -> Dict[str, An
         else:
             logger.warning(f"Introduction generation returned empty/invalid response: {response}")
             # Ensure error key is returned
-            return {"error": "Failed to generate valid introduction."}
+            return _branch_error("introduction", "Failed to generate valid introduction.")
     except Exception as e:
         error_message = f"Introduction generation failed: {type(e).__name__} - {str(e)}"
         logger.exception("Error in generate_introduction_node")
         # Ensure error key is returned
-        return {"error": error_message}
+        return _branch_error("introduction", error_message)
 
 # Corrected: Expect BlogRefinementState, use attribute access
 @track_node_costs("generate_conclusion", agent_name="BlogRefinementAgent", stage="refinement")
@@ -62,7 +70,7 @@ async def generate_conclusion_node(state: BlogRefinementState) -> Dict[str, Any]
     """Node to generate the blog conclusion."""
     logger.info("Node: generate_conclusion_node")
     # Access Pydantic model fields directly
-    if state.error: return {"error": state.error}
+    if state.error: return _branch_error("conclusion", state.error)
 
     try:
         if not state.model:
@@ -75,10 +83,10 @@ async def generate_conclusion_node(state: BlogRefinementState) -> Dict[str, Any]
             return {"conclusion": response.strip()}
         else:
             logger.warning(f"Conclusion generation returned empty/invalid response: {response}")
-            return {"error": "Failed to generate valid conclusion."}
+            return _branch_error("conclusion", "Failed to generate valid conclusion.")
     except Exception as e:
         logger.exception("Error in generate_conclusion_node")
-        return {"error": f"Conclusion generation failed: {str(e)}"}
+        return _branch_error("conclusion", f"Conclusion generation failed: {str(e)}")
 
 # Corrected: Expect BlogRefinementState, use attribute access
 @track_node_costs("generate_summary", agent_name="BlogRefinementAgent", stage="refinement")
@@ -86,7 +94,7 @@ async def generate_summary_node(state: BlogRefinementState) -> Dict[str, Any]:
     """Node to generate the blog summary."""
     logger.info("Node: generate_summary_node")
     # Access Pydantic model fields directly
-    if state.error: return {"error": state.error}
+    if state.error: return _branch_error("summary", state.error)
 
     try:
         if not state.model:
@@ -99,10 +107,10 @@ async def generate_summary_node(state: BlogRefinementState) -> Dict[str, Any]:
             return {"summary": response.strip()}
         else:
             logger.warning(f"Summary generation returned empty/invalid response: {response}")
-            return {"error": "Failed to generate valid summary."}
+            return _branch_error("summary", "Failed to generate valid summary.")
     except Exception as e:
         logger.exception("Error in generate_summary_node")
-        return {"error": f"Summary generation failed: {str(e)}"}
+        return _branch_error("summary", f"Summary generation failed: {str(e)}")
 
 # Corrected: Expect BlogRefinementState, use attribute access
 @track_node_costs("generate_titles", agent_name="BlogRefinementAgent", stage="refinement")
@@ -110,7 +118,7 @@ async def generate_titles_node(state: BlogRefinementState) -> Dict[str, Any]:
     """Node to generate title and subtitle options with configuration support."""
     logger.info("Node: generate_titles_node")
     # Access Pydantic model fields directly
-    if state.error: return {"error": state.error}
+    if state.error: return _branch_error("titles", state.error)
 
     try:
         if not state.model:
@@ -317,7 +325,7 @@ async def generate_titles_node(state: BlogRefinementState) -> Dict[str, Any]:
 
     except Exception as e:
         logger.exception("Error in generate_titles_node")
-        return {"error": f"Title generation failed: {str(e)}"}
+        return _branch_error("titles", f"Title generation failed: {str(e)}")
 
 
 @track_node_costs("suggest_clarity_flow", agent_name="BlogRefinementAgent", stage="refinement")
@@ -414,6 +422,24 @@ async def reduce_redundancy_node(state: BlogRefinementState) -> Dict[str, Any]:
         return {"error": f"Redundancy reduction failed: {str(e)}"}
 
 
+def merge_refinement_branches_node(state: BlogRefinementState) -> Dict[str, Any]:
+    """Join point for the parallel branches; surfaces every branch error together."""
+    logger.info("Node: merge_refinement_branches_node")
+    if state.error:
+        return {"error": state.error}
+
+    if state.branch_errors:
+        combined = "; ".join(
+            f"{branch}: {state.branch_errors[branch]}"
+            for branch in PARALLEL_BRANCHES if branch in state.branch_errors
+        )
+        logger.error(f"Refinement branches failed: {combined}")
+        return {"error": combined}
+
+    logger.info("All refinement branches completed successfully.")
+    return {}
+
+
 def assemble_refined_draft_node(state: BlogRefinementState) -> Dict[str, Any]:
     """Node to assemble the final refined draft."""
     logger.info("Node: assemble_refined_draft_node")
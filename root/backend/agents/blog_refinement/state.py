@@ -2,6 +2,7 @@
 # ABOUTME: It includes state classes for title generation, SEO optimization, and social media content creation.
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
+from typing_extensions import Annotated
 from backend.agents.cost_tracking_state import CostTrackingMixin
 from backend.models.generation_config import TitleGenerationConfig, SocialMediaConfig
 
@@ -17,6 +18,10 @@ class RefinementResult(BaseModel):
     summary: str = Field(..., description="A concise summary of the entire blog post.")
     title_options: List[TitleOption] = Field(..., description="A list of suggested title and subtitle options.")
 
+def merge_branch_errors(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    """Reducer so concurrent refinement branches can each record an error."""
+    return {**(left or {}), **(right or {})}
+
 class BlogRefinementState(CostTrackingMixin, BaseModel):
     """Represents the state managed by the BlogRefinementAgent's graph (if using LangGraph)."""
     original_draft: str
@@ -27,6 +32,10 @@ class BlogRefinementState(CostTrackingMixin, BaseModel):
     refined_draft: Optional[str] = None # Added to resolve AttributeError
     clarity_flow_suggestions: Optional[str] = Field(default=None, description="Suggestions for improving clarity and flow of the blog draft.")
     error: Optional[str] = None
+    branch_errors: Annotated[Dict[str, str], merge_branch_errors] = Field(
+        default_factory=dict,
+        description="Errors reported by the parallel generation branches, keyed by branch name"
+    )
     model: Optional[Any] = Field(default=None, repr=False)
     persona_service: Optional[Any] = Field(default=None, repr=False)
     project_id: Optional[str] = Field(default=None)
@@ -0,0 +1,380 @@
+# ABOUTME: Shared chunking engine for the parsing graph, the ingestion pipeline and ContentParsingAgent
+# ABOUTME: Cached per-type splitters, single-pass markdown sectioning and token-budgeted packing
+
+"""
+Chunking engine shared by the content parsing graph, the concurrent ingestion
+pipeline and the legacy ContentParsingAgent.process_file path.
+
+Splitter instances are cached per content type and configuration; markdown is
+sectioned at headings in a single regex pass, so chunking is linear in the
+input size.
+
+With CHUNKING_MODE=tokens, chunks are packed by the embedding model's own
+tokenizer up to its maximum sequence length instead of by character count, so
+nothing is silently truncated at embedding time and the window is fully used.
+
+Everything here is synchronous and free of service dependencies so it can run
+inside worker processes.
+"""
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# LangChain imports for text splitting
+from langchain_text_splitters import (
+    RecursiveCharacterTextSplitter,
+    PythonCodeTextSplitter,
+    TextSplitter
+)
+from langchain_core.documents import Document
+
+from backend.parsers import ContentStructure
+from backend.models.embeddings.embedding_tokenizer import EmbeddingTokenizer, get_embedding_tokenizer
+
+# Default chunking parameters; override per content type with CHUNK_SIZE_<TYPE> / CHUNK_OVERLAP_<TYPE>
+# (e.g. CHUNK_SIZE_MARKDOWN, CHUNK_OVERLAP_JUPYTER_NOTEBOOK, CHUNK_SIZE_CODE)
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+
+# "characters" (default) sizes chunks with the settings above; "tokens" packs them to the embedding model's window
+CHUNKING_MODE = os.getenv("CHUNKING_MODE", "characters").lower()
+# Token budget per chunk (0 = the embedding model's max sequence length) and overlap in tokens
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "0"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+# Measure chunk token counts for ingestion metrics even in character mode
+CHUNK_TOKEN_METRICS = os.getenv("CHUNK_TOKEN_METRICS", "false").lower() == "true"
+# Texts per tokenizer call
+TOKEN_COUNT_BATCH_SIZE = 256
+
+# Markdown headings (# to ###) and code fence lines, matched in one pass over the text
+_MARKDOWN_LINE = re.compile(r"^(?:(#{1,3})[ \t]+(.+?)[ \t#]*|[ \t]{0,3}(```|~~~).*)$", re.MULTILINE)
+
+
+class ChunkSettings(NamedTuple):
+    chunk_size: int
+    chunk_overlap: int
+
+
+@lru_cache(maxsize=None)
+def chunk_settings(content_type: str) -> ChunkSettings:
+    """Chunk size and overlap for a content type (markdown, python, jupyter_notebook, code, ...)."""
+    key = content_type.upper()
+    return ChunkSettings(
+        int(os.getenv(f"CHUNK_SIZE_{key}", CHUNK_SIZE)),
+        int(os.getenv(f"CHUNK_OVERLAP_{key}", CHUNK_OVERLAP))
+    )
+
+
+@lru_cache(maxsize=None)
+def get_splitter(kind: str, chunk_size: int, chunk_overlap: int) -> TextSplitter:
+    """
+    Shared splitter instance per (kind, size, overlap).
+
+    LangChain splitters keep no per-call state, so one instance (with its
+    separators and compiled patterns) is reused across calls and threads.
+    """
+    if kind == "python":
+        return PythonCodeTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+class TokenBudgetSplitter(TextSplitter):
+    """
+    Packs text into chunks of at most ``chunk_size`` tokens of the embedding model.
+
+    Text is cut into paragraphs, paragraphs that are over budget into lines and
+    lines that are still over budget into token windows. The units are counted
+    in batched tokenizer calls and packed greedily, carrying whole trailing units
+    of up to ``chunk_overlap`` tokens into the next chunk. Packed chunks are
+    recounted and any that exceed the budget are cut at token boundaries.
+    """
+
+    def __init__(self, tokenizer: EmbeddingTokenizer, chunk_size: int, chunk_overlap: int, **kwargs: Any):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=min(chunk_overlap, chunk_size // 2), **kwargs)
+        self.tokenizer = tokenizer
+        self._join_tokens = {sep: self.count([sep])[0] for sep in ("\n\n", "\n")}
+
+    def count(self, texts: List[str]) -> List[int]:
+        """Token counts for ``texts`` in batched tokenizer calls."""
+        counts: List[int] = []
+        for start in range(0, len(texts), TOKEN_COUNT_BATCH_SIZE):
+            counts.extend(self.tokenizer.count(texts[start:start + TOKEN_COUNT_BATCH_SIZE]))
+        return counts
+
+    def _units(self, text: str) -> List[Tuple[str, str, int]]:
+        """(separator before the unit, unit text, token count) for each paragraph, line or window."""
+        paragraphs = [p.strip("\n") for p in re.split(r"\n\s*\n", text) if p.strip()]
+        units = []
+        for paragraph, tokens in zip(paragraphs, self.count(paragraphs)):
+            if tokens <= self._chunk_size:
+                units.append(("\n\n", paragraph, tokens))
+                continue
+            lines = [line for line in paragraph.split("\n") if line.strip()]
+            separator = "\n\n"
+            for line, line_tokens in zip(lines, self.count(lines)):
+                pieces = [(line, line_tokens)] if line_tokens <= self._chunk_size else [
+                    (piece, self._chunk_size) for piece in self.tokenizer.split(line, self._chunk_size)
+                ]
+                for piece, piece_tokens in pieces:
+                    units.append((separator, piece, piece_tokens))
+                    separator = "\n"
+        return units
+
+    def split_text(self, text: str) -> List[str]:
+        chunks: List[str] = []
+        current: List[Tuple[str, str, int]] = []
+        total = 0
+        for unit in self._units(text):
+            cost = unit[2] + (self._join_tokens[unit[0]] if current else 0)
+            if current and total + cost > self._chunk_size:
+                chunks.append(self._join(current))
+                # Keep whole trailing units that fit the overlap and still leave room for this one
+                while current and (total > self._chunk_overlap or total + cost > self._chunk_size):
+                    total -= current[0][2] + (self._join_tokens[current[1][0]] if len(current) > 1 else 0)
+                    current.pop(0)
+                cost = unit[2] + (self._join_tokens[unit[0]] if current else 0)
+            current.append(unit)
+            total += cost
+        if current:
+            chunks.append(self._join(current))
+
+        # Sums of unit counts are estimates at unit boundaries; enforce the budget on the real counts
+        fitted: List[str] = []
+        for chunk, tokens in zip(chunks, self.count(chunks)):
+            fitted.extend([chunk] if tokens <= self._chunk_size else self.tokenizer.split(chunk, self._chunk_size))
+        return fitted
+
+    @staticmethod
+    def _join(units: List[Tuple[str, str, int]]) -> str:
+        return units[0][1] + "".join(separator + text for separator, text, _ in units[1:])
+
+
+@lru_cache(maxsize=1)
+def get_token_splitter() -> Optional[TokenBudgetSplitter]:
+    """Shared token-budget splitter for the active embedding model, or None if its tokenizer is unavailable."""
+    tokenizer = get_embedding_tokenizer()
+    if tokenizer is None:
+        logging.warning("Embedding tokenizer unavailable; falling back to character-based chunking")
+        return None
+    max_tokens = min(CHUNK_TOKENS or tokenizer.max_tokens, tokenizer.max_tokens)
+    logging.info(f"Token-based chunking with {tokenizer.name}: {max_tokens} tokens per chunk")
+    return TokenBudgetSplitter(tokenizer, max_tokens, CHUNK_OVERLAP_TOKENS)
+
+
+def splitter_for(content_type: str, kind: str = "text") -> TextSplitter:
+    """Cached splitter configured for a content type (the token-budget splitter in token mode)."""
+    if CHUNKING_MODE == "tokens":
+        token_splitter = get_token_splitter()
+        if token_splitter is not None:
+            return token_splitter
+    return get_splitter(kind, *chunk_settings(content_type))
+
+
+def chunk_token_stats(chunks: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Token statistics of a file's chunks under the embedding model's tokenizer.
+
+    Only computed in token mode or with CHUNK_TOKEN_METRICS enabled (loading
+    the tokenizer has a cost); returns None otherwise or if it is unavailable.
+    """
+    if CHUNKING_MODE != "tokens" and not CHUNK_TOKEN_METRICS:
+        return None
+    tokenizer = get_embedding_tokenizer()
+    if tokenizer is None or not chunks:
+        return None
+    counts: List[int] = []
+    for start in range(0, len(chunks), TOKEN_COUNT_BATCH_SIZE):
+        counts.extend(tokenizer.count(chunks[start:start + TOKEN_COUNT_BATCH_SIZE]))
+    chars, tokens = sum(len(chunk) for chunk in chunks), sum(counts)
+    return {
+        "chunks": len(chunks),
+        "chars": chars,
+        "tokens": tokens,
+        "chars_per_token": round(chars / tokens, 3) if tokens else None,
+        "max_chunk_tokens": max(counts),
+        "token_limit": tokenizer.max_tokens,
+        "over_limit": sum(1 for count in counts if count > tokenizer.max_tokens),
+    }
+
+
+def split_to_fit(splitter: TextSplitter, text: str, chunk_size: int) -> List[str]:
+    """Split text that exceeds the chunk size; shorter text is returned as is (what the splitter would produce)."""
+    if len(text) <= chunk_size and not isinstance(splitter, TokenBudgetSplitter):
+        text = text.strip()
+        return [text] if text else []
+    return splitter.split_text(text)
+
+
+def split_markdown_sections(text: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Split markdown at #, ## and ### headings that are outside code fences.
+
+    Yields:
+        (section text including its heading, {"Header 1": ..., "Header 2": ...})
+    """
+    headers: Dict[int, str] = {}
+    metadata: Dict[str, str] = {}
+    fence: Optional[str] = None
+    start = 0
+    for match in _MARKDOWN_LINE.finditer(text):
+        marker = match.group(3)
+        if marker:
+            if fence is None:
+                fence = marker
+            elif marker == fence:
+                fence = None
+            continue
+        if fence is not None:
+            continue
+
+        section = text[start:match.start()].strip()
+        if section:
+            yield section, metadata
+        level = len(match.group(1))
+        headers = {lvl: title for lvl, title in headers.items() if lvl < level}
+        headers[level] = match.group(2)
+        metadata = {f"Header {lvl}": headers[lvl] for lvl in sorted(headers)}
+        start = match.start()
+
+    section = text[start:].strip()
+    if section:
+        yield section, metadata
+
+
+def split_markdown(text: str, content_type: str = "markdown") -> List[Document]:
+    """Header-aware markdown chunks; sections longer than the chunk size are split further."""
+    settings = chunk_settings(content_type)
+    splitter = splitter_for(content_type)
+    docs = []
+    for section, metadata in split_markdown_sections(text):
+        pieces = split_to_fit(splitter, section, settings.chunk_size)
+        docs.extend(Document(page_content=piece, metadata=dict(metadata)) for piece in pieces)
+    return docs
+
+
+def split_parsed_content(parsed_content: ContentStructure) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Split parsed content into chunks with the shared, per-content-type splitters.
+
+    Returns:
+        Tuple of (chunk texts, per-chunk metadata from the splitters)
+    """
+    content_type = parsed_content.content_type
+    all_docs = [] # Will store LangChain Document objects
+
+    # Streamed sections (e.g. notebook cells) go straight into the splitter
+    if parsed_content.sections is not None:
+        all_docs.extend(
+            Document(page_content=chunk)
+            for chunk in split_section_stream(
+                parsed_content.iter_sections(), splitter_for(content_type), chunk_settings(content_type).chunk_size
+            )
+        )
+    # Process main content (likely markdown or text)
+    elif parsed_content.main_content:
+        if content_type == 'markdown':
+            all_docs.extend(split_markdown(parsed_content.main_content, content_type))
+        else: # Treat as plain text or other types
+            all_docs.extend(splitter_for(content_type).create_documents([parsed_content.main_content]))
+
+    # Process code segments
+    if hasattr(parsed_content, 'code_segments') and parsed_content.code_segments:
+        logging.info(f"Processing {len(parsed_content.code_segments)} code segments.")
+        # Assume Python for now, could be enhanced based on file type
+        python_splitter = splitter_for("code", "python")
+        code_chunk_size = chunk_settings("code").chunk_size
+        for code_segment in parsed_content.code_segments:
+             # Check if segment is not empty or just whitespace
+            if code_segment and not code_segment.isspace():
+                try:
+                    # Add metadata indicating this is a code chunk
+                    all_docs.extend(
+                        Document(page_content=piece, metadata={"content_part": "code"})
+                        for piece in split_to_fit(python_splitter, code_segment, code_chunk_size)
+                    )
+                except Exception as py_err:
+                    logging.warning(f"PythonCodeTextSplitter failed ({py_err}), falling back to RecursiveCharacterTextSplitter for code segment.")
+                    # Fallback for code that might not parse perfectly
+                    all_docs.extend(
+                        Document(page_content=piece, metadata={"content_part": "code_fallback"})
+                        for piece in splitter_for("code").split_text(code_segment)
+                    )
+            else:
+                logging.debug("Skipping empty or whitespace-only code segment.")
+
+    # Extract page content and metadata from LangChain Documents
+    return [doc.page_content for doc in all_docs], [doc.metadata for doc in all_docs]
+
+
+def split_section_stream(sections: Iterable[str], splitter: TextSplitter,
+                         chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Pack consecutive sections into chunks as they arrive.
+
+    Only the unfinished tail chunk and the current section are held at once, so
+    memory is bounded by the largest section rather than the whole content.
+    A token-budget splitter sizes the buffer in tokens (its own budget replaces
+    ``chunk_size``); each section is counted once as it arrives and only the
+    carried-over tail is recounted, so the buffer is never re-tokenized whole.
+    """
+    if isinstance(splitter, TokenBudgetSplitter):
+        chunk_size = splitter._chunk_size
+        separator_size = splitter._join_tokens["\n\n"]
+        measure = lambda text: splitter.count([text])[0]
+    else:
+        separator_size = 2
+        measure = len
+
+    buffer, size = "", 0
+    for section in sections:
+        size += measure(section) + (separator_size if buffer else 0)
+        buffer = f"{buffer}\n\n{section}" if buffer else section
+        if size <= chunk_size:
+            continue
+        pieces = splitter.split_text(buffer)
+        # The last piece may still grow with the next section
+        yield from pieces[:-1]
+        buffer = pieces[-1] if pieces else ""
+        size = measure(buffer) if buffer else 0
+    if buffer.strip():
+        yield from splitter.split_text(buffer)
+
+
+def build_file_metadata(file_path: str, project_name: Optional[str],
+                        parsed_content: ContentStructure) -> Dict[str, Any]:
+    """Base metadata for every chunk of a file, merged with the parser's metadata."""
+    path = Path(file_path)
+    base_metadata = {
+        "file_name": path.name,
+        "file_path": str(path),
+        "project_name": project_name,
+        "content_type": parsed_content.content_type,
+        "processed_at": datetime.now().isoformat(),
+        "file_type": path.suffix.lower()
+    }
+
+    # Merge with content-specific metadata from the parser
+    if hasattr(parsed_content, 'metadata') and parsed_content.metadata:
+        base_metadata.update(parsed_content.metadata)
+    return base_metadata
+
+
+def combine_chunk_metadata(base_metadata: Dict[str, Any], chunk_metadata: Optional[List[Optional[Dict]]],
+                           num_chunks: int, content_hash: str) -> List[Dict[str, Any]]:
+    """Per-chunk metadata: file metadata, splitter metadata and the content hash."""
+    combined_metadata = []
+    for i in range(num_chunks):
+        metadata = base_metadata.copy()
+
+        # Add chunk-specific metadata if available
+        if chunk_metadata and i < len(chunk_metadata) and chunk_metadata[i] is not None:
+            metadata.update(chunk_metadata[i])
+
+        # Add content hash to metadata
+        metadata["content_hash"] = content_hash
+        combined_metadata.append(metadata)
+    return combined_metadata
@@ -0,0 +1,266 @@
+# ABOUTME: Concurrent multi-file ingestion pipeline behind /process_files
+# ABOUTME: Parses files in a worker pool, skips unchanged ones and coalesces chunk writes with per-file status events
+
+"""
+Concurrent multi-file ingestion.
+
+Parsing and splitting are CPU-bound, so they run in a process pool (one file per
+task). Files whose bytes match their ingestion manifest are skipped without
+parsing. Parsed files are buffered and synced together: only new chunks are
+embedded (one pass per batch) and written in coalesced collection calls.
+Callers can follow progress through per-file status events, and chunk token
+statistics (when measured) are aggregated into process-wide ingestion metrics.
+"""
+import asyncio
+import hashlib
+import inspect
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from backend.parsers import ParserFactory
+from backend.services.ingestion_manifest import file_source_hash
+from .chunking import (
+    CHUNK_SIZE,
+    CHUNKING_MODE,
+    split_parsed_content,
+    build_file_metadata,
+    combine_chunk_metadata,
+    chunk_token_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+# Pending chunks that trigger an embedding + write flush
+DEFAULT_WRITE_BATCH_SIZE = int(os.getenv("INGEST_WRITE_BATCH_SIZE", "512"))
+
+StatusCallback = Callable[[str, Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+def parse_file_for_ingestion(file_path: str, project_name: Optional[str]) -> Dict[str, Any]:
+    """
+    Validate, parse and split one file. Runs in a worker process.
+
+    Returns:
+        Dict with chunks, per-chunk metadata, content_hash, token_stats and errors (plain data only)
+    """
+    result: Dict[str, Any] = {
+        "file_path": file_path, "chunks": [], "metadata": [], "content_hash": None, "token_stats": None, "errors": []
+    }
+    try:
+        path = Path(file_path)
+        if not path.exists() or path.suffix.lower() not in ParserFactory.supported_extensions() or path.stat().st_size == 0:
+            result["errors"].append(f"Validation failed for {file_path}")
+            return result
+
+        parsed_content = ParserFactory.get_parser(file_path).parse()
+        if not parsed_content or not parsed_content.has_content():
+            parse_error = parsed_content.metadata.get("error") if parsed_content else "parser returned None"
+            result["errors"].append(f"Parsing failed or returned empty content: {parse_error}")
+            return result
+
+        chunks, chunk_metadata = split_parsed_content(parsed_content)
+        if not chunks:
+            result["errors"].append("Missing content chunks or metadata for storage")
+            return result
+
+        content_hash = hashlib.sha256("".join(chunks).encode()).hexdigest()
+        base_metadata = build_file_metadata(file_path, project_name, parsed_content)
+        result.update(
+            chunks=chunks,
+            metadata=combine_chunk_metadata(base_metadata, chunk_metadata, len(chunks), content_hash),
+            content_hash=content_hash,
+            token_stats=chunk_token_stats(chunks),
+        )
+    except Exception as e:
+        result["errors"].append(f"Ingestion error: {e}")
+    return result
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_ingestion_pool() -> ProcessPoolExecutor:
+    """Shared process pool for parsing; 'spawn' so workers don't inherit model/thread state."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=DEFAULT_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_ingestion_pool(wait: bool = True) -> None:
+    """Stop the worker processes; call from the application shutdown hook."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=True)
+            _pool = None
+
+
+_metrics: Dict[str, int] = {"files": 0, "chunks": 0, "chars": 0, "tokens": 0, "over_limit": 0, "max_chunk_tokens": 0}
+_token_limit: Optional[int] = None
+_metrics_lock = threading.Lock()
+
+
+def record_chunk_token_stats(stats: Dict[str, Any]) -> None:
+    """Add one file's chunk token statistics to the ingestion metrics."""
+    global _token_limit
+    with _metrics_lock:
+        _metrics["files"] += 1
+        for key in ("chunks", "chars", "tokens", "over_limit"):
+            _metrics[key] += stats[key]
+        _metrics["max_chunk_tokens"] = max(_metrics["max_chunk_tokens"], stats["max_chunk_tokens"])
+        _token_limit = stats["token_limit"]
+
+
+def get_ingestion_metrics() -> Dict[str, Any]:
+    """Chunking mode and aggregate chunk token statistics since process start."""
+    with _metrics_lock:
+        metrics: Dict[str, Any] = dict(_metrics)
+        token_limit = _token_limit
+    chars_per_token = metrics["chars"] / metrics["tokens"] if metrics["tokens"] else None
+    metrics.update(
+        chunking_mode=CHUNKING_MODE,
+        token_limit=token_limit,
+        chars_per_token=round(chars_per_token, 3) if chars_per_token else None,
+        avg_chunk_tokens=round(metrics["tokens"] / metrics["chunks"], 1) if metrics["chunks"] else None,
+        # What the character chunk size amounts to in model tokens
+        chunk_size_chars=CHUNK_SIZE,
+        chunk_size_tokens=round(CHUNK_SIZE / chars_per_token) if chars_per_token else None,
+    )
+    return metrics
+
+
+class IngestionPipeline:
+    """Parses files concurrently and stores their chunks in coalesced batches."""
+
+    def __init__(self, vector_store: Any, executor: Optional[Any] = None,
+                 write_batch_size: Optional[int] = None):
+        """
+        Args:
+            vector_store: VectorStoreService used for duplicate checks and storage
+            executor: Executor for parsing (defaults to the shared process pool)
+            write_batch_size: Pending chunk count that triggers a flush
+        """
+        self.vector_store = vector_store
+        self.executor = executor
+        self.write_batch_size = write_batch_size or DEFAULT_WRITE_BATCH_SIZE
+
+    async def run(self, file_paths: List[str], project_name: Optional[str] = None,
+                  on_status: Optional[StatusCallback] = None) -> Dict[str, Optional[str]]:
+        """
+        Ingest files concurrently.
+
+        Args:
+            file_paths: Files to ingest
+            project_name: Project the content belongs to
+            on_status: Optional callback receiving (file_path, {"status": ...}) for
+                       "skipped", "parsed" (with token_stats when measured), "stored"
+                       (with added/unchanged/deleted chunk counts) and "error" transitions
+
+        Returns:
+            Mapping of file path to content hash (None for files that failed)
+        """
+        async def emit(file_path: str, status: str, **data) -> None:
+            if on_status is None:
+                return
+            try:
+                outcome = on_status(file_path, {"status": status, **data})
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as e:
+                logger.warning(f"Ingestion status callback failed: {e}")
+
+        loop = asyncio.get_running_loop()
+        results: Dict[str, Optional[str]] = {}
+        source_hashes: Dict[str, str] = {}
+        pending: List[Dict[str, Any]] = []
+
+        async def flush() -> None:
+            if not pending:
+                return
+            batch = list(pending)
+            pending.clear()
+            try:
+                stats = await asyncio.to_thread(self.vector_store.sync_file_chunks, batch)
+            except Exception as e:
+                logger.error(f"Coalesced write of {len(batch)} files failed: {e}")
+                for item in batch:
+                    results[item["source_path"]] = None
+                    await emit(item["source_path"], "error", error=f"Storage error: {e}")
+                return
+            for item in batch:
+                await emit(item["source_path"], "stored", content_hash=item["content_hash"],
+                           **stats.get(item["file_path"], {}))
+
+        executor = self.executor or get_ingestion_pool()
+        # Worker future -> the file it parses, so a crashed worker is reported against its file
+        futures: Dict[asyncio.Future, str] = {}
+        for file_path in file_paths:
+            try:
+                source_hash = await asyncio.to_thread(file_source_hash, file_path)
+            except OSError as e:
+                results[file_path] = None
+                await emit(file_path, "error", error=f"Could not read file: {e}")
+                continue
+            unchanged = await asyncio.to_thread(
+                self.vector_store.find_unchanged_content_hash, project_name, str(Path(file_path)), source_hash
+            )
+            if unchanged:
+                logger.info(f"File unchanged since last ingestion: {file_path}")
+                results[file_path] = unchanged
+                await emit(file_path, "skipped", content_hash=unchanged)
+                continue
+            source_hashes[file_path] = source_hash
+            futures[loop.run_in_executor(executor, parse_file_for_ingestion, file_path, project_name)] = file_path
+
+        waiting = set(futures)
+        while waiting:
+            done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                file_path = futures[future]
+                try:
+                    item = future.result()
+                except Exception as e:
+                    logger.error(f"Ingestion worker failed for {file_path}: {e}")
+                    results[file_path] = None
+                    await emit(file_path, "error", error=f"Ingestion worker failed: {e}")
+                    continue
+
+                if item["errors"]:
+                    results[file_path] = None
+                    await emit(file_path, "error", error="; ".join(item["errors"]))
+                    continue
+
+                content_hash = item["content_hash"]
+                results[file_path] = content_hash
+                token_stats = item.get("token_stats")
+                if token_stats:
+                    record_chunk_token_stats(token_stats)
+                await emit(file_path, "parsed", chunks=len(item["chunks"]), content_hash=content_hash,
+                           token_stats=token_stats)
+                pending.append({
+                    "source_path": file_path,
+                    "file_path": str(Path(file_path)),
+                    "project_name": project_name,
+                    "chunks": item["chunks"],
+                    "metadata": item["metadata"],
+                    "content_hash": content_hash,
+                    "source_hash": source_hashes.get(file_path),
+                })
+
+                if sum(len(p["chunks"]) for p in pending) >= self.write_batch_size:
+                    await flush()
+
+        await flush()
+        return results
@@ -6,17 +6,11 @@ from pathlib import Path
 import logging
 from typing import List, Dict
 
-# LangChain imports for text splitting
-from langchain_text_splitters import (
-    RecursiveCharacterTextSplitter,
-    MarkdownHeaderTextSplitter,
-    PythonCodeTextSplitter,
-    TextSplitter
-)
-
 from backend.parsers import ParserFactory, ContentStructure
-from backend.services.vector_store_service import VectorStoreService
+from backend.services.vector_store_registry import get_vector_store
+from backend.services.ingestion_manifest import file_source_hash
 from backend.agents.cost_tracking_decorator import track_node_costs
+from .chunking import split_parsed_content, build_file_metadata, combine_chunk_metadata
 from .state import ContentParsingState
 
 logging.basicConfig(level=logging.INFO)
@@ -58,7 +52,7 @@ async def parse_content(state: ContentParsingState) -> ContentParsingState:
         state.parsed_content = ContentStructure(main_content="", code_segments=[], content_type="unknown", metadata={"error": error_msg})
     
     # Check for empty content *after* the try-except block
-    if not state.parsed_content or not state.parsed_content.main_content:
+    if not state.parsed_content or not state.parsed_content.has_content():
          # Check if there was an error stored in metadata by the parser itself
          parse_error = state.parsed_content.metadata.get("error") if state.parsed_content else "Unknown parsing issue (parser returned None or empty content)"
          # Avoid adding duplicate errors if already caught by exception
@@ -81,87 +75,7 @@ async def chunk_content(state: ContentParsingState) -> ContentParsingState:
         return state
 
     try:
-        # Default chunking parameters (can be made configurable later)
-        chunk_size = 1000
-        chunk_overlap = 200
-
-        # Initialize splitters
-        recursive_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
-        python_splitter = PythonCodeTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
-        # Markdown splitter requires headers - adjust if parser provides them
-        headers_to_split_on = [
-            ("#", "Header 1"),
-            ("##", "Header 2"),
-            ("###", "Header 3"),
-        ]
-        markdown_splitter = MarkdownHeaderTextSplitter(
-            headers_to_split_on=headers_to_split_on,
-            strip_headers=False # Keep headers in the content
-        )
-
-        all_docs = [] # Will store LangChain Document objects
-
-        # Process main content (likely markdown or text)
-        if state.parsed_content.main_content:
-            content_type = state.parsed_content.content_type
-            main_content = state.parsed_content.main_content
-
-            splitter: TextSplitter # Type hint for clarity
-
-            if content_type == 'markdown':
-                # Try Markdown splitter first, fallback to recursive
-                try:
-                    # MarkdownHeaderTextSplitter expects metadata to be merged later
-                    md_docs = markdown_splitter.split_text(main_content)
-                    # Add file-level metadata to each doc later
-                    all_docs.extend(md_docs)
-                    logging.info(f"Used MarkdownHeaderTextSplitter for main content.")
-                except Exception as md_err:
-                    logging.warning(f"MarkdownHeaderTextSplitter failed ({md_err}), falling back to RecursiveCharacterTextSplitter.")
-                    docs = recursive_splitter.create_documents([main_content])
-                    all_docs.extend(docs)
-            else: # Treat as plain text or other types
-                logging.info(f"Using RecursiveCharacterTextSplitter for main content (type: {content_type}).")
-                docs = recursive_splitter.create_documents([main_content])
-                all_docs.extend(docs)
-
-        # Process code segments
-        if hasattr(state.parsed_content, 'code_segments') and state.parsed_content.code_segments:
-            logging.info(f"Processing {len(state.parsed_content.code_segments)} code segments.")
-            # Assume Python for now, could be enhanced based on file type
-            # Combine segments before splitting to maintain context if possible,
-            # or split individually if they represent distinct blocks.
-            # For simplicity, splitting individually here.
-            for code_segment in state.parsed_content.code_segments:
-                 # Check if segment is not empty or just whitespace
-                if code_segment and not code_segment.isspace():
-                    try:
-                        code_docs = python_splitter.create_documents([code_segment])
-                        # Add metadata indicating this is a code chunk
-                        for doc in code_docs:
-                            doc.metadata["content_part"] = "code"
-                        all_docs.extend(code_docs)
-                    except Exception as py_err:
-                        logging.warning(f"PythonCodeTextSplitter failed ({py_err}), falling back to RecursiveCharacterTextSplitter for code segment.")
-                        # Fallback for code that might not parse perfectly
-                        fallback_docs = recursive_splitter.create_documents([code_segment])
-                        for doc in fallback_docs:
-                            doc.metadata["content_part"] = "code_fallback"
-                        all_docs.extend(fallback_docs)
-                else:
-                    logging.debug("Skipping empty or whitespace-only code segment.")
-
-
-        # Extract page content and metadata from LangChain Documents
-        state.content_chunks = [doc.page_content for doc in all_docs]
-        # Start with metadata from the LangChain documents themselves
-        state.chunk_metadata = [doc.metadata for doc in all_docs]
+        state.content_chunks, state.chunk_metadata = split_parsed_content(state.parsed_content)
 
         logging.info(f"Chunking complete: {len(state.content_chunks)} chunks created using LangChain splitters.")
 
@@ -179,22 +93,7 @@ async def prepare_metadata(state: ContentParsingState) -> ContentParsingState:
         return state
         
     try:
-        path = Path(state.file_path)
-        # Base metadata
-        base_metadata = {
-            "file_name": path.name,
-            "file_path": str(path),
-            "project_name": state.project_name,
-            "content_type": state.parsed_content.content_type,
-            "processed_at": datetime.now().isoformat(),
-            "file_type": path.suffix.lower()
-        }
-        
-        # Merge with content-specific metadata from the parser
-        if hasattr(state.parsed_content, 'metadata') and state.parsed_content.metadata:
-            base_metadata.update(state.parsed_content.metadata)
-            
-        state.metadata = base_metadata
+        state.metadata = build_file_metadata(state.file_path, state.project_name, state.parsed_content)
     except Exception as e:
         state.errors.append(f"Metadata error: {str(e)}")
     return state
@@ -211,7 +110,7 @@ async def store_content(state: ContentParsingState) -> ContentParsingState:
         return state
         
     try:
-        vector_store = VectorStoreService()
+        vector_store = state.vector_store or get_vector_store()
         
         # Log the content chunks for debugging
         logging.info(f"Number of content chunks: {len(state.content_chunks)}")
@@ -224,26 +123,21 @@ async def store_content(state: ContentParsingState) -> ContentParsingState:
         logging.info(f"Generated content hash: {content_hash}")
         
         # Create combined metadata for each chunk by merging base metadata with chunk-specific metadata
-        combined_metadata = []
-        for i, chunk in enumerate(state.content_chunks):
-            chunk_metadata = state.metadata.copy()
-            
-            # Add chunk-specific metadata if available
-            if hasattr(state, 'chunk_metadata') and state.chunk_metadata and i < len(state.chunk_metadata) and state.chunk_metadata[i] is not None:
-                chunk_metadata.update(state.chunk_metadata[i])
-                
-            # Add content hash to metadata
-            chunk_metadata["content_hash"] = content_hash
-                
-            combined_metadata.append(chunk_metadata)
-        
-        # Store content in vector store
-        vector_store.store_content_chunks(
-            chunks=state.content_chunks,
-            metadata=combined_metadata,
-            content_hash=content_hash
+        combined_metadata = combine_chunk_metadata(
+            state.metadata, state.chunk_metadata, len(state.content_chunks), content_hash
         )
         
+        # Store content in vector store, embedding only chunks not already stored for this file
+        stats = vector_store.sync_file_chunks([{
+            "file_path": str(Path(state.file_path)),
+            "project_name": state.project_name,
+            "chunks": state.content_chunks,
+            "metadata": combined_metadata,
+            "content_hash": content_hash,
+            "source_hash": file_source_hash(state.file_path),
+        }])
+        logging.info(f"Chunk sync for {state.file_path}: {stats.get(str(Path(state.file_path)))}")
+        
         # Set content hash in state
         state.content_hash = content_hash
         logging.info(f"Successfully stored content with hash: {content_hash}")
@@ -22,4 +22,7 @@ class ContentParsingState(CostTrackingMixin):
     # Error handling
     errors: List[str] = []
 
+    # Shared vector store (injected by the agent; nodes fall back to the process-wide instance)
+    vector_store: Optional[Any] = Field(default=None, exclude=True)
+
     model_config = {"arbitrary_types_allowed": True}
@@ -2,30 +2,35 @@
 Simplified content parsing agent that processes files and stores them in ChromaDB.
 Handles markdown, python files, and Jupyter notebooks for blog content generation.
 """
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 import logging
 from pathlib import Path
 from datetime import datetime
 
 from ..parsers import ParserFactory, ContentStructure
 from ..services.vector_store_service import VectorStoreService
+from ..services.vector_store_registry import get_vector_store
+from ..services.ingestion_manifest import file_source_hash
 from backend.agents.base_agent import BaseGraphAgent
 from backend.agents.content_parsing.state import ContentParsingState
 from backend.agents.content_parsing.graph import create_parsing_graph
+from backend.agents.content_parsing.ingestion import IngestionPipeline, StatusCallback
+from backend.agents.content_parsing.chunking import chunk_settings, split_section_stream, splitter_for
 
 logging.basicConfig(level=logging.INFO)
 
 class ContentParsingAgent(BaseGraphAgent):
     """Agent responsible for parsing content and storing it in vector store."""
     
-    def __init__(self, llm=None):  # llm optional since this agent doesn't use it directly
+    def __init__(self, llm=None, vector_store: Optional[VectorStoreService] = None):  # llm optional since this agent doesn't use it directly
         super().__init__(
             llm=llm,
             tools=[],
             state_class=ContentParsingState,
             verbose=True
         )
-        self.vector_store = VectorStoreService()
+        # Share the process-wide vector store (and its embedding model) unless one is injected
+        self.vector_store = vector_store or get_vector_store()
         self._initialized = False
         
     async def initialize(self):
@@ -59,26 +64,19 @@ class ContentParsingAgent(BaseGraphAgent):
     async def process_file_with_graph(self, file_path: str, project_name: Optional[str] = None) -> Optional[str]:
         """Process a single file using the graph-based approach."""
         try:
-            # Check if file already exists in project
-            path = Path(file_path)
-            file_metadata = {
-                "file_name": path.name,
-                "file_path": str(path),
-                "project_name": project_name,
-                "file_type": path.suffix.lower()
-            }
-            
-            existing = self.search_content(
-                metadata_filter=file_metadata
+            # Skip files whose bytes haven't changed since they were last ingested
+            unchanged = self.vector_store.find_unchanged_content_hash(
+                project_name, str(Path(file_path)), file_source_hash(file_path)
             )
-            if existing:
-                logging.info(f"File already exists in project: {file_path}")
-                return existing[0]["metadata"]["content_hash"]
-                
+            if unchanged:
+                logging.info(f"File unchanged since last ingestion: {file_path}")
+                return unchanged
+
             # Initialize state
             initial_state = self.state_class(
                 file_path=file_path,
-                project_name=project_name
+                project_name=project_name,
+                vector_store=self.vector_store
             )
             
             # print(initial_state.model_dump().keys())
@@ -133,10 +131,10 @@ class ContentParsingAgent(BaseGraphAgent):
             # Create sections from main_content and code_segments
             sections = []
             
-            # Add main content as a section
-            if content.main_content:
+            # Add main content (or streamed sections, e.g. notebook cells) as sections
+            for section in content.iter_sections():
                 sections.append({
-                    "content": content.main_content,
+                    "content": section,
                     "type": "markdown"
                 })
                 
@@ -187,56 +185,12 @@ class ContentParsingAgent(BaseGraphAgent):
         }
 
     def _chunk_content(self, sections: List[Dict]) -> List[str]:
-        """Simple content chunking strategy."""
-        chunks = []
-        current_chunk = []
-        current_size = 0
-        max_chunk_size = 1000  # characters
-        
-        for section in sections:
-            content = section.get("content", "")
-            if not content:
-                continue
-                
-            # If content is too large, split it
-            if len(content) > max_chunk_size:
-                # Add any existing content as a chunk
-                if current_chunk:
-                    chunks.append("\n".join(current_chunk))
-                    current_chunk = []
-                    current_size = 0
-                
-                # Split large content into smaller chunks
-                words = content.split()
-                temp_chunk = []
-                temp_size = 0
-                
-                for word in words:
-                    if temp_size + len(word) + 1 > max_chunk_size:
-                        chunks.append(" ".join(temp_chunk))
-                        temp_chunk = [word]
-                        temp_size = len(word)
-                    else:
-                        temp_chunk.append(word)
-                        temp_size += len(word) + 1
-                
-                if temp_chunk:
-                    chunks.append(" ".join(temp_chunk))
-            else:
-                # If adding this section would exceed chunk size, create new chunk
-                if current_size + len(content) > max_chunk_size:
-                    chunks.append("\n".join(current_chunk))
-                    current_chunk = [content]
-                    current_size = len(content)
-                else:
-                    current_chunk.append(content)
-                    current_size += len(content)
-        
-        # Add any remaining content
-        if current_chunk:
-            chunks.append("\n".join(current_chunk))
-        
-        return chunks
+        """Pack sections into chunks with the shared chunking engine."""
+        return list(split_section_stream(
+            (section["content"] for section in sections if section.get("content")),
+            splitter_for("text"),
+            chunk_settings("text").chunk_size
+        ))
         
     def search_content(self, metadata_filter: Dict, query: Optional[str] = None) -> List[Dict]:
         """Simple content search with optional project filter."""
@@ -261,35 +215,58 @@ class ContentParsingAgent(BaseGraphAgent):
             logging.error(f"Error processing directory {directory_path}: {e}")
             return content_hashes
             
+    async def process_files_concurrently(
+        self,
+        file_paths: List[str],
+        project_name: Optional[str] = None,
+        on_status: Optional[StatusCallback] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Ingest several files at once: parsing/splitting in a process pool, one
+        embedding pass and coalesced writes for the parsed files.
+
+        Returns:
+            Mapping of file path to content hash (None for files that failed)
+        """
+        pipeline = IngestionPipeline(self.vector_store)
+        return await pipeline.run(file_paths, project_name, on_status=on_status)
+
     async def process_directory_with_graph(self, directory_path: str, project_name: Optional[str] = None) -> List[str]:
-        """Process all supported files in a directory using the graph-based approach."""
-        content_hashes = []
+        """Process all supported files in a directory concurrently."""
         directory = Path(directory_path)
         
         try:
-            for file_path in directory.rglob("*"):
-                if file_path.suffix.lower() in ParserFactory.supported_extensions():
-                    if content_hash := await self.process_file_with_graph(str(file_path), project_name):
-                        content_hashes.append(content_hash)
-            return content_hashes
+            file_paths = [
+                str(file_path) for file_path in directory.rglob("*")
+                if file_path.suffix.lower() in ParserFactory.supported_extensions()
+            ]
+            results = await self.process_files_concurrently(file_paths, project_name)
+            return [content_hash for content_hash in results.values() if content_hash]
         except Exception as e:
             logging.error(f"Error processing directory {directory_path}: {e}")
-            return content_hashes
+            return []
     
-    def get_project_content(self, project_name: str) -> List[Dict]:
-        """Get all content for a specific project."""
-        return self.vector_store.search_content(
-            metadata_filter={"project_name": project_name},
-            n_results=1000
-        )
+    def iter_content(self, metadata_filter: Dict, fields: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, Dict]]:
+        """Stream stored chunks as (text, metadata) in chunk order, keeping only the given metadata fields.
+
+        Raises if the vector store read fails partway (see VectorStoreService.iter_chunks).
+        """
+        return self.vector_store.iter_chunks(metadata_filter=metadata_filter, fields=fields)
+
+    def get_project_content(self, project_name: str,
+                            fields: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, Dict]]:
+        """Stream all content of a specific project as (text, metadata) in chunk order.
+
+        Breaking change: this used to return a list of search_content result dicts
+        ({"content", "metadata", ...}) and an empty list on errors. It now returns
+        an iterator of (text, metadata) tuples that raises if the read fails.
+        """
+        return self.iter_content({"project_name": project_name}, fields=fields)
 
     def clear_project_content(self, project_name: str):
         """Remove all content for a specific project."""
         try:
-            results = self.get_project_content(project_name)
-            content_hashes = {result["metadata"]["content_hash"] for result in results}
-            for content_hash in content_hashes:
-                self.vector_store.clear_content(content_hash=content_hash)
+            self.vector_store.delete_project(project_name)
             logging.info(f"Cleared content for project: {project_name}")
         except Exception as e:
             logging.error(f"Error clearing project content: {e}")
@@ -56,13 +56,15 @@ class OutlineGeneratorAgent(BaseGraphAgent):
         self._initialized = True
         logging.info("OutlineGeneratorAgent fully initialized")
 
-    def _get_processed_content(self, content_hash: str, file_type: str, query: Optional[str] = None) -> Optional[ContentStructure]:
+    def _get_processed_content(self, content_hash: str, file_type: str, query: Optional[str] = None,
+                               project_name: Optional[str] = None) -> Optional[ContentStructure]:
         """Get processed content from the content parsing agent.
         
         Args:
             content_hash: Hash of the content to retrieve
             file_type: Type of file (.ipynb, .md, etc.)
             query: Optional query to filter content
+            project_name: Project the content belongs to (limits the lookup to its collection)
             
         Returns:
             ContentStructure object or None if not found
@@ -71,35 +73,52 @@ class OutlineGeneratorAgent(BaseGraphAgent):
             "content_hash": content_hash,
             "file_type": file_type
         }
+        if project_name:
+            metadata_filter["project_name"] = project_name
         
-        results = self.content_parser.search_content(
-            metadata_filter=metadata_filter,
-            query=query
-        )
-        
-        if not results:
-            logging.warning(f"No content found for hash {content_hash}")
-            return None
+        if query:
+            results = self.content_parser.search_content(
+                metadata_filter=metadata_filter,
+                query=query
+            )
+            metadata = results[0].get("metadata", {}) if results else {}
+            chunks = ((result.get("content", ""), result.get("metadata", {})) for result in results)
+        else:
+            # File-level metadata comes from the first chunk; the rest only need their content type
+            try:
+                first = next(self.content_parser.iter_content({**metadata_filter, "chunk_order": 0}), None)
+            except Exception as e:
+                logging.error(f"Failed to read content for hash {content_hash}: {e}")
+                return None
+            metadata = first[1] if first else {}
+            chunks = self.content_parser.iter_content(metadata_filter, fields=("content_type",))
         
         # Process and organize the content
         main_content = []
         code_segments = []
-        metadata = results[0].get("metadata", {})
+        found = False
         
-        for result in results:
-            content_type = result.get("metadata", {}).get("content_type")
-            content = result.get("content", "").strip()
-            
-            # print(f"Content type: {content_type}")
-            # print(f"Content: {content}")
-            
-            if not content:
-                continue
-            
-            if content_type == "code":
-                code_segments.append(content)
-            else:
-                main_content.append(content)
+        try:
+            for content, chunk_metadata in chunks:
+                found = True
+                content_type = chunk_metadata.get("content_type")
+                content = (content or "").strip()
+                
+                if not content:
+                    continue
+                
+                if content_type == "code":
+                    code_segments.append(content)
+                else:
+                    main_content.append(content)
+        except Exception as e:
+            # A stream cut short would give an outline of truncated content
+            logging.error(f"Failed to read content for hash {content_hash}: {e}")
+            return None
+        
+        if not found:
+            logging.warning(f"No content found for hash {content_hash}")
+            return None
         
         return ContentStructure(
             main_content="\n".join(main_content),
@@ -260,19 +279,19 @@ class OutlineGeneratorAgent(BaseGraphAgent):
         # Process notebook content
         if notebook_hash:
             logging.info(f"Using provided notebook hash: {notebook_hash}")
-            notebook_content = self._get_processed_content(notebook_hash, ".ipynb")
+            notebook_content = self._get_processed_content(notebook_hash, ".ipynb", project_name=project_name)
         elif notebook_path:
             logging.info(f"Processing notebook: {notebook_path}")
             try:
                 # Use async method if available
                 notebook_hash = await self.content_parser.process_file_with_graph(notebook_path, project_name)
                 if notebook_hash:
-                    notebook_content = self._get_processed_content(notebook_hash, ".ipynb")
+                    notebook_content = self._get_processed_content(notebook_hash, ".ipynb", project_name=project_name)
                 else:
                     # Fall back to synchronous method
                     notebook_hash = self.content_parser.process_file(notebook_path, project_name)
                     if notebook_hash:
-                        notebook_content = self._get_processed_content(notebook_hash, ".ipynb")
+                        notebook_content = self._get_processed_content(notebook_hash, ".ipynb", project_name=project_name)
                     else:
                         logging.error(f"Failed to process notebook: {notebook_path}")
             except Exception as e:
@@ -282,19 +301,19 @@ class OutlineGeneratorAgent(BaseGraphAgent):
         # Process markdown content
         if markdown_hash:
             logging.info(f"Using provided markdown hash: {markdown_hash}")
-            markdown_content = self._get_processed_content(markdown_hash, ".md")
+            markdown_content = self._get_processed_content(markdown_hash, ".md", project_name=project_name)
         elif markdown_path:
             logging.info(f"Processing markdown: {markdown_path}")
             try:
                 # Use async method if available
                 markdown_hash = await self.content_parser.process_file_with_graph(markdown_path, project_name)
                 if markdown_hash:
-                    markdown_content = self._get_processed_content(markdown_hash, ".md")
+                    markdown_content = self._get_processed_content(markdown_hash, ".md", project_name=project_name)
                 else:
                     # Fall back to synchronous method
                     markdown_hash = self.content_parser.process_file(markdown_path, project_name)
                     if markdown_hash:
-                        markdown_content = self._get_processed_content(markdown_hash, ".md")
+                        markdown_content = self._get_processed_content(markdown_hash, ".md", project_name=project_name)
                     else:
                         logging.error(f"Failed to process markdown: {markdown_path}")
             except Exception as e:
@@ -17,6 +17,7 @@ import os
 
 from backend.services.supabase_project_manager import SupabaseProjectManager, MilestoneType, ProjectStatus, SectionStatus
 from backend.services.cost_aggregator import CostAggregator
+from backend.services.generation_cache import get_generation_cache
 from backend.agents.outline_generator.state import FinalOutline
 from backend.utils.serialization import serialize_object
 
@@ -213,10 +214,15 @@ async def delete_project(project_id: str, permanent: bool = False) -> JSONRespon
         Success status
     """
     try:
+        project = await sql_manager.get_project(project_id) if permanent else None
         success = await sql_manager.delete_project(project_id, permanent=permanent)
         if not success:
             raise HTTPException(status_code=404, detail="Project not found")
 
+        if project and project.get("name"):
+            # Cached outlines/sections are keyed by project name
+            get_generation_cache().invalidate(project_name=project["name"])
+
         action = "permanently deleted" if permanent else "archived"
         return JSONResponse(content={
             "status": "success",
@@ -0,0 +1,94 @@
+# ABOUTME: Peak Python memory and time of reading one file's chunks back in order, full fetch vs paged stream
+# ABOUTME: Compares search_content without a query (previous path) with VectorStoreService.iter_chunks
+
+"""
+Stores one large file (``--chunks`` chunks of ``--chunk-chars`` characters,
+each carrying the file-level parser metadata such as ``section_headers``) in a
+temporary persistent project store, then rebuilds the file's text the way
+OutlineGeneratorAgent does:
+
+``full fetch``  ``search_content`` with a metadata filter only: one unpaged
+               ``collection.get`` of every document and metadata, then result dicts
+``stream``      ``iter_chunks`` with ``fields=("content_type",)``: ids and metadata
+               read a page at a time, texts fetched by id one page at a time
+
+Peak memory is measured with ``tracemalloc`` (Python allocations only, which
+covers the lists and dicts built from ChromaDB's results) in a separate run
+from the timing. Both include the rebuilt text itself.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.chunk_stream_benchmark --chunks 20000 --chunk-chars 1000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+
+from backend.services.vector_store_service import CHUNK_PAGE_SIZE, VectorStoreService
+
+
+class ConstantEmbedding:
+    """Embeddings are irrelevant here; skip the model."""
+
+    def __call__(self, input):
+        return [[1.0, 0.0, 0.0, 0.0] for _ in input]
+
+
+def full_fetch(service: VectorStoreService, metadata_filter: dict) -> int:
+    results = service.search_content(metadata_filter=metadata_filter)
+    return len("\n".join(r["content"].strip() for r in results if r["metadata"].get("content_type") != "code"))
+
+
+def stream(service: VectorStoreService, metadata_filter: dict, page_size: int) -> int:
+    chunks = service.iter_chunks(metadata_filter, fields=("content_type",), page_size=page_size)
+    return len("\n".join(text.strip() for text, meta in chunks if meta.get("content_type") != "code"))
+
+
+def measure(function, *args):
+    """(result, seconds, peak traced bytes); timed in a separate run since tracing slows allocation-heavy code."""
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    size = function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--chunk-chars", type=int, default=1000)
+    parser.add_argument("--headers", type=int, default=40, help="Section headers in the file-level metadata")
+    parser.add_argument("--page-sizes", default=str(CHUNK_PAGE_SIZE), help="Comma-separated iter_chunks page sizes")
+    args = parser.parse_args()
+
+    headers = json.dumps([f"Section {i}: some descriptive heading" for i in range(args.headers)])
+    with tempfile.TemporaryDirectory() as tmp:
+        service = VectorStoreService(ConstantEmbedding(), persist_dir=tmp, routing="project")
+        max_batch = service.client.get_max_batch_size()
+        for start in range(0, args.chunks, max_batch):
+            end = min(start + max_batch, args.chunks)
+            service.collection_for("bench").add(
+                ids=[f"chunk_{i:06d}" for i in range(start, end)],
+                documents=[(f"chunk {i} " * args.chunk_chars)[:args.chunk_chars] for i in range(start, end)],
+                metadatas=[{"project_name": "bench", "content_hash": "file", "file_type": ".md", "chunk_order": i,
+                            "content_type": "markdown", "section_headers": headers} for i in range(start, end)],
+                embeddings=[[1.0, 0.0, 0.0, 0.0]] * (end - start),
+            )
+
+        metadata_filter = {"project_name": "bench", "content_hash": "file", "file_type": ".md"}
+        print(f"{args.chunks} chunks of {args.chunk_chars} chars, {len(headers)}-char section_headers per chunk\n")
+        print(f"{'path':<13} {'seconds':>8} {'peak MiB':>9} {'text chars':>11}")
+        runs = [("full fetch", full_fetch, ())]
+        runs += [(f"stream {size}", stream, (int(size),)) for size in args.page_sizes.split(",")]
+        for label, function, extra in runs:
+            size, elapsed, peak = measure(function, service, metadata_filter, *extra)
+            print(f"{label:<13} {elapsed:>8.2f} {peak / 2 ** 20:>9.1f} {size:>11}")
+
+
+if __name__ == "__main__":
+    main()
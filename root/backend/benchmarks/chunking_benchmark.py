@@ -0,0 +1,175 @@
+# ABOUTME: Benchmark for the chunking engine on synthetic markdown, notebook and Python corpora
+# ABOUTME: Reports chunks/sec, MB/s and peak traced memory against the previous per-call LangChain setup
+
+"""
+Chunks synthetic corpora of the requested sizes the way ingestion does: the
+file is parsed with the project's parser and split with ``split_parsed_content``.
+
+``engine`` is the current chunking engine (cached splitters, single-pass
+markdown sectioning, streamed notebook cells). ``legacy`` reproduces the
+previous behaviour: splitters built on every call, LangChain's
+``MarkdownHeaderTextSplitter`` for markdown and ``NotebookLoader`` + one joined
+string for notebooks.
+
+Timings are the best of ``--repeat`` runs without tracing; peak memory comes
+from a separate run under ``tracemalloc``.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.chunking_benchmark --sizes 1,10,50
+"""
+
+import argparse
+import base64
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from langchain_text_splitters import (
+    MarkdownHeaderTextSplitter,
+    PythonCodeTextSplitter,
+    RecursiveCharacterTextSplitter,
+)
+
+from backend.agents.content_parsing.chunking import split_parsed_content
+from backend.parsers import ParserFactory
+
+WORDS = ["alpha", "beta", "gamma", "delta", "vector", "embedding", "model", "train", "data", "loss",
+         "gradient", "batch", "token", "layer", "attention", "optimizer"]
+
+
+def paragraph(rng: random.Random, words: int = 120) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def write_markdown(path: Path, size: int, rng: random.Random) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        written, i = 0, 0
+        while written < size:
+            block = f"## Section {i}\n\n{paragraph(rng)}\n\n{paragraph(rng, 60)}\n\n```python\nresult_{i} = train(data, epochs={i % 10})\n```\n\n"
+            if i % 25 == 0:
+                block = f"# Part {i // 25}\n\n" + block
+            f.write(block)
+            written += len(block)
+            i += 1
+
+
+def write_notebook(path: Path, size: int, rng: random.Random) -> None:
+    # Roughly half of the bytes are base64 plot outputs, as in real notebooks
+    image = base64.b64encode(rng.randbytes(30_000)).decode()
+    cells, written, i = [], 0, 0
+    while written < size:
+        cells.append({"cell_type": "markdown", "metadata": {}, "source": [f"## Step {i}\n", paragraph(rng)]})
+        cells.append({
+            "cell_type": "code", "metadata": {}, "execution_count": i,
+            "source": [f"loss_{i} = model.fit(batch_{i})\n", f"plot(loss_{i})"],
+            "outputs": [
+                {"output_type": "stream", "name": "stdout", "text": [f"epoch {i}: loss={rng.random():.4f}\n"]},
+                {"output_type": "display_data", "metadata": {}, "data": {"image/png": image, "text/plain": ["<Figure>"]}},
+            ],
+        })
+        written += len(image) + 900
+        i += 1
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}), encoding="utf-8")
+
+
+def write_python(path: Path, size: int, rng: random.Random) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        written, i = 0, 0
+        while written < size:
+            block = (
+                f"def step_{i}(batch, lr=0.{i % 9 + 1}):\n"
+                f"    \"\"\"{paragraph(rng, 20)}\"\"\"\n"
+                f"    total = 0\n"
+                f"    for item in batch:\n"
+                f"        total += item * lr  # {rng.choice(WORDS)}\n"
+                f"    return total\n\n\n"
+                f"class Layer{i}:\n"
+                f"    def forward(self, x):\n"
+                f"        return step_{i}(x)\n\n\n"
+            )
+            f.write(block)
+            written += len(block)
+            i += 1
+
+
+CORPORA = {
+    "markdown": (".md", write_markdown),
+    "notebook": (".ipynb", write_notebook),
+    "python": (".py", write_python),
+}
+
+
+def engine(path: Path):
+    chunks, _ = split_parsed_content(ParserFactory.get_parser(str(path)).parse())
+    return chunks
+
+
+def legacy(path: Path):
+    recursive = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    python = PythonCodeTextSplitter(chunk_size=1000, chunk_overlap=200)
+    markdown = MarkdownHeaderTextSplitter(
+        headers_to_split_on=[("#", "Header 1"), ("##", "Header 2"), ("###", "Header 3")], strip_headers=False
+    )
+    if path.suffix == ".ipynb":
+        from langchain_community.document_loaders import NotebookLoader
+        docs = NotebookLoader(str(path), include_outputs=True, max_output_length=1000, remove_newline=True).load()
+        combined = "\n\n---\n\n".join(doc.page_content for doc in docs if doc.page_content.strip())
+        return recursive.split_text(combined)
+
+    parsed = ParserFactory.get_parser(str(path)).parse()
+    if path.suffix == ".md":
+        chunks = [doc.page_content for doc in markdown.split_text(parsed.main_content)]
+    else:
+        chunks = recursive.split_text(parsed.main_content) if parsed.main_content else []
+    for segment in parsed.code_segments:
+        chunks.extend(python.split_text(segment))
+    return chunks
+
+
+def measure(strategy, path: Path, repeat: int) -> dict:
+    best, chunks = None, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = strategy(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    strategy(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "chunks": len(chunks), "peak_mb": peak / 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,10,50", help="Comma-separated corpus sizes in MB")
+    parser.add_argument("--corpora", default=",".join(CORPORA), help="Subset of: " + ", ".join(CORPORA))
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--no-legacy", action="store_true", help="Only run the current engine")
+    args = parser.parse_args()
+
+    strategies = [("engine", engine)] + ([] if args.no_legacy else [("legacy", legacy)])
+    rng = random.Random(0)
+    print(f"{'corpus':<9} {'MB':>5} {'strategy':<8} {'chunks':>8} {'seconds':>8} {'chunks/s':>10} {'MB/s':>7} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.corpora.split(","):
+            suffix, writer = CORPORA[name]
+            for size_mb in (float(s) for s in args.sizes.split(",")):
+                path = Path(tmp) / f"{name}_{size_mb:g}{suffix}"
+                writer(path, int(size_mb * 1_000_000), rng)
+                file_mb = path.stat().st_size / 1e6
+                for label, strategy in strategies:
+                    r = measure(strategy, path, args.repeat)
+                    print(
+                        f"{name:<9} {file_mb:>5.1f} {label:<8} {r['chunks']:>8} {r['seconds']:>8.2f} "
+                        f"{r['chunks'] / r['seconds']:>10.0f} {file_mb / r['seconds']:>7.1f} {r['peak_mb']:>8.1f}"
+                    )
+                path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# ABOUTME: Accuracy/throughput comparison of the PyTorch and int8 ONNX Runtime sentence-transformer backends
+# ABOUTME: Embeds the ingestion corpus with both and reports texts/s, vector agreement and top-k retrieval overlap
+
+"""
+Chunks an ingestion corpus the way ``/process_files`` does (project parsers +
+``split_parsed_content``) and embeds every chunk with:
+
+``torch``  SentenceTransformerEmbeddingFunction (full-precision PyTorch)
+``onnx``   OnnxSentenceTransformerEmbeddingFunction for each ``--onnx-files``
+           entry and ``--threads`` setting
+
+Throughput is the best of ``--repeat`` passes over all chunks. Accuracy is
+measured against the PyTorch vectors: per-chunk cosine similarity, and the
+overlap of the top-``k`` neighbours retrieved for ``--queries`` sample queries
+(the opening sentence of randomly chosen chunks) in each vector space.
+
+The corpus defaults to ``data/uploads`` (every supported file, recursively);
+when it holds no ingestible files a synthetic markdown corpus is generated.
+Models are downloaded from the Hugging Face Hub on first use.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.embedding_backend_benchmark --corpus data/uploads --threads 1,4
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.agents.content_parsing.chunking import split_parsed_content
+from backend.benchmarks.chunking_benchmark import write_markdown
+from backend.models.embeddings.onnx_embedding import OnnxSentenceTransformerEmbeddingFunction
+from backend.models.embeddings.sentence_transformer_embedding import SentenceTransformerEmbeddingFunction
+from backend.parsers import ParserFactory
+
+
+def load_chunks(corpus: Path, limit: int) -> list:
+    supported = set(ParserFactory.supported_extensions())
+    files = sorted(p for p in corpus.rglob("*") if p.is_file() and p.suffix.lower() in supported) if corpus.exists() else []
+    chunks = []
+    for path in files:
+        parsed = ParserFactory.get_parser(str(path)).parse()
+        if parsed and parsed.has_content():
+            chunks.extend(split_parsed_content(parsed)[0])
+    if not chunks:
+        print(f"No ingestible files under {corpus}; using a synthetic 1 MB markdown corpus")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "corpus.md"
+            write_markdown(path, 1_000_000, random.Random(0))
+            chunks = split_parsed_content(ParserFactory.get_parser(str(path)).parse())[0]
+    return chunks[:limit] if limit else chunks
+
+
+def normalized(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def throughput(embedding_fn, chunks: list, repeat: int):
+    best, vectors = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vectors = embedding_fn(chunks)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(chunks) / best, normalized(vectors)
+
+
+def top_k(query_vectors: np.ndarray, corpus_vectors: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(query_vectors @ corpus_vectors.T), axis=1)[:, :k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="data/uploads", help="Directory of files to ingest")
+    parser.add_argument("--model", default=None, help="Sentence Transformer model (defaults to settings)")
+    parser.add_argument("--onnx-files", default="onnx/model_quint8_avx2.onnx",
+                        help="Comma-separated ONNX files in the model repo (e.g. onnx/model.onnx,onnx/model_qint8_avx512.onnx)")
+    parser.add_argument("--threads", default="0", help="Comma-separated ONNX Runtime thread counts (0 = default)")
+    parser.add_argument("--limit", type=int, default=2000, help="Max chunks to embed (0 = all)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    chunks = load_chunks(Path(args.corpus), args.limit)
+    rng = random.Random(0)
+    queries = [chunks[i].split(".")[0][:200] for i in rng.sample(range(len(chunks)), min(args.queries, len(chunks)))]
+    print(f"{len(chunks)} chunks, {len(queries)} queries, top-{args.k}\n")
+
+    def evaluate(label: str, embedding_fn, reference=None):
+        embedding_fn(chunks[:8])  # warm-up
+        rate, vectors = throughput(embedding_fn, chunks, args.repeat)
+        query_vectors = normalized(embedding_fn(queries))
+        row = f"{label:<42} {rate:>9.1f}"
+        if reference is not None:
+            ref_vectors, ref_neighbours = reference
+            cosine = (vectors * ref_vectors).sum(axis=1)
+            neighbours = top_k(query_vectors, vectors, args.k)
+            overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(neighbours, ref_neighbours)])
+            row += f" {cosine.mean():>9.4f} {cosine.min():>9.4f} {overlap:>9.3f}"
+        print(row)
+        return vectors, top_k(query_vectors, vectors, args.k)
+
+    print(f"{'backend':<42} {'texts/s':>9} {'cos mean':>9} {'cos min':>9} {'overlap':>9}")
+    reference = evaluate("torch", SentenceTransformerEmbeddingFunction(model_name=args.model))
+    for onnx_file in args.onnx_files.split(","):
+        for threads in (int(t) for t in args.threads.split(",")):
+            embedding_fn = OnnxSentenceTransformerEmbeddingFunction(
+                model_name=args.model, onnx_file=onnx_file, num_threads=threads
+            )
+            evaluate(f"onnx {onnx_file} threads={threads or 'default'}", embedding_fn, reference)
+
+
+if __name__ == "__main__":
+    main()
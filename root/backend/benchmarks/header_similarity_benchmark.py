@@ -0,0 +1,135 @@
+# ABOUTME: Benchmark for semantic header matching in the blog draft semantic_content_mapper
+# ABOUTME: Compares per-section embedding + sklearn cosine calls with one batch and one NumPy matmul
+
+"""
+Matches every outline section against every markdown header, as the
+semantic_content_mapper does, and reports wall time and embedding work.
+
+``per_section`` is the previous loop: for each section embed the target, embed all
+headers again and call sklearn ``cosine_similarity``. ``batched`` embeds headers
+and targets in a single call and scores them with ``header_similarity_matrix`` /
+``select_relevant_headers``.
+
+The default embedding function is synthetic (deterministic vectors plus a
+simulated per-call and per-text cost) so the benchmark runs offline; pass
+``--sentence-transformer all-MiniLM-L6-v2`` to use a real model.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.header_similarity_benchmark --sections 15 --headers 200
+"""
+
+import argparse
+import hashlib
+import re
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.agents.blog_draft_generator.utils import header_similarity_matrix, select_relevant_headers
+
+THRESHOLD = 0.6
+
+
+class SyntheticEmbedding:
+    """Deterministic vectors; sleeps to emulate model call overhead and per-text cost."""
+
+    def __init__(self, dim: int = 384, call_overhead: float = 0.002, per_text: float = 0.0002):
+        self.dim = dim
+        self.call_overhead = call_overhead
+        self.per_text = per_text
+        self.calls = 0
+        self.texts = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep(self.call_overhead + self.per_text * len(texts))
+        vectors = []
+        for text in texts:
+            # Texts about the same topic share a base direction, so some pairs clear the threshold
+            topic = re.search(r"topic (\d+)", text)
+            base = np.random.default_rng(int(topic.group(1)) if topic else 0).standard_normal(self.dim)
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+            noise = np.random.default_rng(seed).standard_normal(self.dim)
+            vectors.append((base + 0.6 * noise).astype(np.float32))
+        return vectors
+
+
+class CountingEmbedding:
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+        self.texts = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return self.inner(texts)
+
+
+def per_section(embedding_fn, targets, headers):
+    matches = []
+    for target in targets:
+        target_embedding = embedding_fn([target])[0]
+        header_embeddings = embedding_fn(headers)
+        similarities = cosine_similarity([target_embedding], header_embeddings)[0]
+        relevant = [(i, float(sim)) for i, sim in enumerate(similarities) if sim >= THRESHOLD]
+        relevant.sort(key=lambda x: x[1], reverse=True)
+        matches.append([i for i, _ in relevant])
+    return matches
+
+
+def batched(embedding_fn, targets, headers):
+    embeddings = embedding_fn(headers + targets)
+    similarities = header_similarity_matrix(embeddings[len(headers):], embeddings[:len(headers)])
+    return select_relevant_headers(similarities, THRESHOLD)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=15)
+    parser.add_argument("--headers", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sentence-transformer", default=None,
+                        help="Use a real SentenceTransformer model instead of the synthetic embedding")
+    args = parser.parse_args()
+
+    headers = [f"Header {i}: topic {i % 17} details" for i in range(args.headers)]
+    targets = [f"Section {i} - understand topic {i % 17} and apply it" for i in range(args.sections)]
+
+    if args.sentence_transformer:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(args.sentence_transformer)
+
+        def make_fn():
+            return CountingEmbedding(lambda texts: model.encode(texts, convert_to_numpy=True))
+    else:
+        def make_fn():
+            return SyntheticEmbedding()
+
+    results = {}
+    for name, strategy in (("per_section", per_section), ("batched", batched)):
+        best = None
+        for _ in range(args.repeat):
+            fn = make_fn()
+            start = time.perf_counter()
+            matches = strategy(fn, targets, headers)
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best["seconds"]:
+                best = {"seconds": elapsed, "calls": fn.calls, "texts": fn.texts, "matches": matches}
+        results[name] = best
+
+    # Both strategies must select the same headers (up to float rounding at the threshold)
+    selected = sum(len(m) for m in results["batched"]["matches"])
+    agree = sum(a == b for a, b in zip(results["per_section"]["matches"], results["batched"]["matches"]))
+
+    print(f"{args.sections} sections x {args.headers} headers (best of {args.repeat})")
+    for name, r in results.items():
+        print(f"  {name:<12} {r['seconds'] * 1000:9.1f} ms  embedding calls={r['calls']:<4} texts embedded={r['texts']}")
+    print(f"  speedup      {results['per_section']['seconds'] / results['batched']['seconds']:.1f}x")
+    print(f"  identical selections for {agree}/{args.sections} sections ({selected} header matches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# ABOUTME: Warm-call latency of provider HTTP calls against a local TLS mock server, before and after pooling
+# ABOUTME: Compares per-call aiohttp sessions / bare requests.post with OpenRouterModel on the shared client pool
+
+"""
+Starts a local HTTPS server that answers like the OpenRouter chat completions
+endpoint (self-signed certificate, HTTP/1.1 keep-alive) and times sequential
+calls after a few warm-up calls:
+
+``before async``  a new ``aiohttp.ClientSession`` per call (previous ``ainvoke``)
+``before sync``   bare ``requests.post`` per call (previous ``invoke``)
+``pooled async``  ``OpenRouterModel.ainvoke`` on the shared HTTP client pool
+``pooled sync``   ``OpenRouterModel.invoke`` on the shared HTTP client pool
+
+Loopback has no network latency, so by default only the TLS handshake and
+connection setup cost is visible. ``--connect-delay-ms`` delays every new
+connection on the server side to model the extra round trips a fresh TCP+TLS
+connection needs to a remote provider.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.http_pool_benchmark --calls 200 --connect-delay-ms 30
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import ssl
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import aiohttp
+import requests
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from backend.config.settings import OpenRouterSettings
+from backend.models.openrouter_model import OpenRouterModel
+from backend.services.http_client_pool import close_http_pool, init_http_pool
+
+RESPONSE = json.dumps({"choices": [{"message": {"content": "pong"}}]}).encode()
+
+
+def write_self_signed_cert(directory: Path):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1)).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost"),
+                                                    x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class MockChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this Nagle + delayed ACK add ~40 ms per response
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # Runs once per new connection
+        time.sleep(self.server.connect_delay)
+        self.server.connections += 1
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(cert_path: Path, key_path: Path, connect_delay: float) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), MockChatHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+    httpd.connect_delay = connect_delay
+    httpd.connections = 0
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def summarize(label: str, timings: list, connections: int) -> None:
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(f"{label:<14} {statistics.mean(timings_ms):>8.2f} {statistics.median(timings_ms):>8.2f} "
+          f"{p95:>8.2f} {connections:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--connect-delay-ms", type=float, default=0.0,
+                        help="Server-side delay per new connection (models network round trips)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = write_self_signed_cert(Path(tmp))
+        server = start_server(cert_path, key_path, args.connect_delay_ms / 1000)
+        url = f"https://localhost:{server.server_port}/api/v1/chat/completions"
+        client_ssl = ssl.create_default_context(cafile=str(cert_path))
+        payload = {"model": "mock", "messages": [{"role": "user", "content": "ping"}]}
+
+        async def before_async_call():
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, json=payload, ssl=client_ssl) as response:
+                    return await response.json()
+
+        init_http_pool(verify=client_ssl)
+        model = OpenRouterModel(OpenRouterSettings(api_key="key", model_name="mock", base_url=url))
+
+        async def run_async(call):
+            for _ in range(args.warmup):
+                await call()
+            before = server.connections
+            timings = []
+            for _ in range(args.calls):
+                start = time.perf_counter()
+                await call()
+                timings.append(time.perf_counter() - start)
+            return timings, server.connections - before
+
+        def run_sync(call):
+            for _ in range(args.warmup):
+                call()
+            before = server.connections
+            timings = []
+            for _ in range(args.calls):
+                start = time.perf_counter()
+                call()
+                timings.append(time.perf_counter() - start)
+            return timings, server.connections - before
+
+        async def run_all():
+            return {
+                "before async": await run_async(before_async_call),
+                "pooled async": await run_async(lambda: model.ainvoke(payload["messages"])),
+                "before sync": await asyncio.to_thread(
+                    run_sync, lambda: requests.post(url, json=payload, verify=str(cert_path))),
+                "pooled sync": await asyncio.to_thread(run_sync, lambda: model.invoke(payload["messages"])),
+            }
+
+        results = asyncio.run(run_all())
+        print(f"{args.calls} warm calls, connect delay {args.connect_delay_ms:g} ms\n")
+        print(f"{'client':<14} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'connections':>12}")
+        for label in ("before async", "pooled async", "before sync", "pooled sync"):
+            summarize(label, *results[label])
+        asyncio.run(close_http_pool())
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# ABOUTME: Retrieval quality and latency of dense-only vs hybrid (BM25 + dense, RRF) search_content
+# ABOUTME: Corpus is this repository's own code (one chunk per function/class) plus its markdown docs
+
+"""
+Indexes a code-and-docs corpus into a temporary project collection through
+``VectorStoreService.store_content_chunks`` and runs two query sets, each with
+one known relevant chunk:
+
+``identifier``   "Where is <function name> implemented ..." (exact identifiers)
+``description``  the first docstring line of a function (natural language)
+
+Each query set is searched with ``RETRIEVAL_MODE`` ``dense`` and ``hybrid``;
+the benchmark reports recall@k, MRR@10 and p50/p95 search latency.
+
+By default the configured embedding model is used (``EmbeddingFactory``).
+``--embedding hashed`` uses character-trigram hashing vectors instead, so the
+benchmark runs without model downloads; that stand-in is a weak dense model
+and its numbers say less about the real one.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.hybrid_retrieval_benchmark --queries 100 --k 5
+    python -m backend.benchmarks.hybrid_retrieval_benchmark --embedding hashed
+"""
+
+import argparse
+import ast
+import hashlib
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.services.vector_store_service import VectorStoreService
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+REPO_DIR = BACKEND_DIR.parents[1]
+
+
+class HashedTrigramEmbedding:
+    """Offline stand-in for a dense model: hashed character trigrams, L2-normalized."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def __call__(self, input):
+        vectors = np.zeros((len(input), self.dim), dtype=np.float32)
+        for row, text in enumerate(input):
+            text = f"  {text.lower()}  "
+            for i in range(len(text) - 2):
+                vectors[row, int(hashlib.md5(text[i:i + 3].encode()).hexdigest()[:8], 16) % self.dim] += 1
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.tolist()
+
+
+def load_corpus():
+    """(chunks, source types, function records) from backend Python files and repo markdown."""
+    chunks, source_types, functions = [], [], []
+    for path in sorted(BACKEND_DIR.rglob("*.py")):
+        if "tests" in path.parts or "benchmarks" in path.parts:
+            continue
+        source = path.read_text(encoding="utf-8", errors="ignore")
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            continue
+        for node in tree.body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            segment = ast.get_source_segment(source, node)
+            if not segment or len(segment) < 80:
+                continue
+            docstring = ast.get_docstring(node) or ""
+            functions.append({"name": node.name, "chunk": len(chunks), "doc": docstring.strip().split("\n")[0]})
+            chunks.append(segment[:4000])
+            source_types.append("code")
+    for path in sorted(REPO_DIR.rglob("*.md")):
+        if "node_modules" in path.parts:
+            continue
+        for paragraph in path.read_text(encoding="utf-8", errors="ignore").split("\n\n"):
+            if len(paragraph.strip()) > 80:
+                chunks.append(paragraph.strip()[:4000])
+                source_types.append("markdown")
+    return chunks, source_types, functions
+
+
+def build_queries(functions, count: int, rng: random.Random):
+    unique = {}
+    for function in functions:
+        unique.setdefault(function["name"], function)  # names defined twice are ambiguous
+    named = [f for f in unique.values() if len(f["name"]) > 6 and sum(g["name"] == f["name"] for g in functions) == 1]
+    described = [f for f in named if len(f["doc"].split()) >= 5]
+    identifier = [(f"Where is {f['name']} implemented and what does it return?", f["chunk"])
+                  for f in rng.sample(named, min(count, len(named)))]
+    description = [(f["doc"], f["chunk"]) for f in rng.sample(described, min(count, len(described)))]
+    return {"identifier": identifier, "description": description}
+
+
+def evaluate(service: VectorStoreService, queries, chunks, k: int):
+    chunk_index = {chunk: i for i, chunk in enumerate(chunks)}
+    hits_at_k, reciprocal_ranks, timings = 0, [], []
+    for query, relevant in queries:
+        start = time.perf_counter()
+        results = service.search_content(query=query, metadata_filter={"project_name": "bench"}, n_results=10)
+        timings.append(time.perf_counter() - start)
+        ranked = [chunk_index.get(r["content"]) for r in results]
+        rank = ranked.index(relevant) + 1 if relevant in ranked else None
+        hits_at_k += bool(rank and rank <= k)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+    timings_ms = sorted(t * 1000 for t in timings)
+    return {
+        "recall": hits_at_k / len(queries),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "p50": statistics.median(timings_ms),
+        "p95": timings_ms[max(int(len(timings_ms) * 0.95) - 1, 0)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embedding", choices=["configured", "hashed"], default="configured")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per query set")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.embedding == "hashed":
+        embedding_fn = HashedTrigramEmbedding()
+    else:
+        from backend.models.embeddings.embedding_factory import EmbeddingFactory
+        embedding_fn = EmbeddingFactory.get_embedding_function()
+
+    chunks, source_types, functions = load_corpus()
+    queries = build_queries(functions, args.queries, random.Random(args.seed))
+    print(f"Corpus: {len(chunks)} chunks ({source_types.count('code')} code, "
+          f"{source_types.count('markdown')} markdown); embedding: {type(embedding_fn).__name__}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = VectorStoreService(embedding_fn, persist_dir=tmp, routing="project")
+        start = time.perf_counter()
+        max_batch = service.client.get_max_batch_size()
+        for offset in range(0, len(chunks), max_batch):
+            batch = chunks[offset:offset + max_batch]
+            service.store_content_chunks(
+                chunks=batch,
+                metadata=[{"project_name": "bench", "source_type": source_types[offset + i]} for i in range(len(batch))],
+                content_hash=f"bench{offset}"
+            )
+        print(f"Indexed in {time.perf_counter() - start:.1f}s\n")
+
+        print(f"{'queries':<12} {'mode':<7} {f'recall@{args.k}':>9} {'MRR@10':>7} {'p50 ms':>7} {'p95 ms':>7}")
+        for name, query_set in queries.items():
+            for mode in ("dense", "hybrid"):
+                service.retrieval_mode = mode
+                evaluate(service, query_set[:5], chunks, args.k)  # warm up
+                result = evaluate(service, query_set, chunks, args.k)
+                print(f"{name:<12} {mode:<7} {result['recall']:>9.2f} {result['mrr']:>7.3f} "
+                      f"{result['p50']:>7.2f} {result['p95']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
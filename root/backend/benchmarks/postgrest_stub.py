@@ -0,0 +1,85 @@
+# ABOUTME: Minimal local PostgREST stand-in used by persistence benchmarks
+# ABOUTME: Serves canned JSON rows with configurable latency on a background thread
+
+"""
+Local PostgREST stand-in.
+
+Only implements what SupabaseProjectManager needs for benchmarking: GET returns a
+single project-like row, POST/PATCH echo the submitted rows back, DELETE returns
+an empty list. Each request sleeps for ``latency`` seconds to emulate a network
+round-trip.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like PostgREST
+
+    def log_message(self, format, *args):  # silence request logging
+        pass
+
+    def _respond(self, payload) -> None:
+        time.sleep(self.server.latency)
+        self.server.request_count += 1
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return []
+        data = json.loads(self.rfile.read(length))
+        return data if isinstance(data, list) else [data]
+
+    def do_GET(self):
+        self._read_body()  # drain any request body so keep-alive stays in sync
+        self._respond([{"id": str(uuid.uuid4()), "name": "bench", "status": "active", "metadata": {}}])
+
+    def do_POST(self):
+        self._respond(self._read_body())
+
+    def do_PATCH(self):
+        self._respond(self._read_body())
+
+    def do_DELETE(self):
+        self._read_body()
+        self._respond([])
+
+
+class PostgrestStub:
+    """Threaded HTTP server emulating PostgREST; use as a context manager."""
+
+    def __init__(self, latency: float = 0.02, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.request_count = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        return self.server.request_count
+
+    def __enter__(self) -> "PostgrestStub":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
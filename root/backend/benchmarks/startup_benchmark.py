@@ -0,0 +1,91 @@
+# ABOUTME: Cold-start benchmark: profiles `import backend.main` with `python -X importtime` in fresh interpreters
+# ABOUTME: Reports wall/import time and the heaviest packages; saves JSON profiles and diffs them against a baseline
+
+"""
+Runs ``python -X importtime -c "import <module>"`` in ``--runs`` fresh
+subprocesses and reports the best wall time, the module's cumulative import
+time and the packages with the largest self time (summed per top-level
+package) from the fastest run.
+
+``--output`` writes the profile as JSON so it can be tracked over time;
+``--baseline`` compares against a previously saved profile.
+
+Importing ``backend.main`` needs the usual environment (e.g. SUPABASE_URL and
+SUPABASE_KEY); it is passed through to the subprocesses unchanged.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.startup_benchmark --runs 3 --output startup.json
+    python -m backend.benchmarks.startup_benchmark --baseline startup.json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_once(module: str) -> Dict:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative_us, packages = None, defaultdict(int)
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, name = int(match.group(1)), int(match.group(2)), match.group(4)
+        packages[name.split(".")[0] if not name.startswith("backend.") else ".".join(name.split(".")[:2])] += self_us
+        if name == module:
+            cumulative_us = cumulative
+    return {
+        "wall_seconds": round(wall, 3),
+        "import_seconds": round((cumulative_us or 0) / 1e6, 3),
+        "packages": {name: round(us / 1e6, 4) for name, us in sorted(packages.items(), key=lambda p: -p[1])},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Packages to list")
+    parser.add_argument("--output", help="Write the profile as JSON")
+    parser.add_argument("--baseline", help="Compare against a saved JSON profile")
+    args = parser.parse_args()
+
+    profile = min((profile_once(args.module) for _ in range(args.runs)), key=lambda p: p["wall_seconds"])
+    profile["module"] = args.module
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    def delta(current: float, before) -> str:
+        return f" ({current - before:+.3f})" if before is not None else ""
+
+    print(f"import {args.module}: best of {args.runs}")
+    print(f"  wall   {profile['wall_seconds']:.3f}s{delta(profile['wall_seconds'], baseline and baseline['wall_seconds'])}")
+    print(f"  import {profile['import_seconds']:.3f}s{delta(profile['import_seconds'], baseline and baseline['import_seconds'])}")
+    print(f"\n{'package':<40} {'self s':>8}")
+    for name, seconds in list(profile["packages"].items())[:args.top]:
+        before = baseline["packages"].get(name, 0.0) if baseline else None
+        print(f"{name:<40} {seconds:>8.3f}{delta(seconds, before)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(profile, f, indent=2)
+        print(f"\nProfile written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
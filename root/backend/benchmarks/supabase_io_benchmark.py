@@ -0,0 +1,82 @@
+# ABOUTME: Benchmark for SupabaseProjectManager I/O against a local PostgREST stand-in
+# ABOUTME: Compares inline (blocking) execution with the bounded thread-pool backend
+
+"""
+Measures wall time for N concurrent ``track_cost`` calls and the worst event-loop
+stall observed by a heartbeat task while they run.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.supabase_io_benchmark --ops 200 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import time
+
+from postgrest import SyncPostgrestClient
+
+from backend.benchmarks.postgrest_stub import PostgrestStub
+from backend.services.supabase_project_manager import SupabaseProjectManager
+
+
+class BlockingProjectManager(SupabaseProjectManager):
+    """Previous behaviour: execute queries inline on the event loop."""
+
+    async def _execute(self, query):
+        return query.execute()
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, lags: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def _run(manager: SupabaseProjectManager, ops: int) -> dict:
+    stop = asyncio.Event()
+    lags: list = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, 0.005, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        manager.track_cost(
+            project_id="bench", agent_name="Bench", operation=f"op_{i}",
+            input_tokens=100, output_tokens=50, cost=0.001, model_used="bench"
+        )
+        for i in range(ops)
+    ])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+    return {
+        "wall_seconds": elapsed,
+        "ops_per_second": ops / elapsed,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stand-in latency per request (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with PostgrestStub(latency=args.latency) as stub:
+        for label, cls in (("blocking", BlockingProjectManager), ("threadpool", SupabaseProjectManager)):
+            client = SyncPostgrestClient(stub.url)
+            manager = cls(supabase_client=client, max_workers=args.workers)
+            result = asyncio.run(_run(manager, args.ops))
+            manager.close()
+            client.session.close()
+            print(
+                f"{label:>10}: {result['wall_seconds']:.2f}s "
+                f"({result['ops_per_second']:.0f} ops/s), "
+                f"max event-loop stall {result['max_loop_lag_ms']:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
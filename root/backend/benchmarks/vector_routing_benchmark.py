@@ -0,0 +1,103 @@
+# ABOUTME: Project-scoped search latency as the number of projects grows, shared collection vs per-project collections
+# ABOUTME: Builds both layouts in temporary persistent Chroma stores with synthetic embeddings
+
+"""
+Adds projects of ``--chunks-per-project`` chunks step by step and, at every
+checkpoint in ``--projects``, times ``VectorStoreService.search_content`` for
+one project (query plus a ``source_type`` filter, like the semantic mapper):
+
+``shared``   every chunk in the ``content`` collection, filtered by ``project_name``
+``project``  one collection per project, each in its own store (the default routing)
+
+Embeddings are deterministic pseudo-random vectors derived from each text, so
+no model is loaded and only Chroma's search cost is measured.
+
+Usage (from the ``root`` directory):
+    python -m backend.benchmarks.vector_routing_benchmark --projects 1,10,50,100 --chunks-per-project 300
+"""
+
+import argparse
+import hashlib
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from backend.services.vector_store_service import VectorStoreService
+
+
+class HashEmbedding:
+    """Unit vectors seeded by the text's hash."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def __call__(self, input):
+        vectors = []
+        for text in input:
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+def add_project(service: VectorStoreService, index: int, chunks_per_project: int) -> None:
+    project_name = f"project-{index:04d}"
+    max_batch = service.client.get_max_batch_size()
+    for start in range(0, chunks_per_project, max_batch):
+        end = min(start + max_batch, chunks_per_project)
+        service.store_content_chunks(
+            chunks=[f"{project_name} chunk {i}" for i in range(start, end)],
+            metadata=[{"project_name": project_name, "source_type": "markdown" if i % 3 else "code"}
+                      for i in range(start, end)],
+            content_hash=f"{project_name}-{start}"
+        )
+
+
+def time_queries(service: VectorStoreService, queries: int) -> list:
+    timings = []
+    for i in range(queries):
+        start = time.perf_counter()
+        results = service.search_content(
+            query=f"question {i}",
+            metadata_filter={"project_name": "project-0000", "source_type": "markdown"},
+            n_results=10
+        )
+        timings.append(time.perf_counter() - start)
+        assert len(results) == 10
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", default="1,10,50,100", help="Comma-separated project counts to measure at")
+    parser.add_argument("--chunks-per-project", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    checkpoints = sorted(int(p) for p in args.projects.split(","))
+
+    with tempfile.TemporaryDirectory() as shared_dir, tempfile.TemporaryDirectory() as project_dir:
+        services = {
+            "shared": VectorStoreService(HashEmbedding(args.dim), persist_dir=shared_dir, routing="shared"),
+            "project": VectorStoreService(HashEmbedding(args.dim), persist_dir=project_dir, routing="project"),
+        }
+        print(f"{args.chunks_per_project} chunks per project, {args.dim}-d embeddings, {args.queries} queries\n")
+        print(f"{'projects':>8} {'chunks':>8} {'routing':<8} {'p50 ms':>8} {'p95 ms':>8}")
+        added = 0
+        for checkpoint in checkpoints:
+            for service in services.values():
+                for index in range(added, checkpoint):
+                    add_project(service, index, args.chunks_per_project)
+            added = checkpoint
+            for routing, service in services.items():
+                time_queries(service, 5)  # warm caches and the HNSW index
+                timings_ms = sorted(t * 1000 for t in time_queries(service, args.queries))
+                p95 = timings_ms[max(int(len(timings_ms) * 0.95) - 1, 0)]
+                print(f"{checkpoint:>8} {checkpoint * args.chunks_per_project:>8} {routing:<8} "
+                      f"{statistics.median(timings_ms):>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,9 @@ class OpenAISettings(ModelSettings):
 class SentenceTransformerSettings:
     """Settings specific to Sentence Transformer models."""
     model_name: str = "all-MiniLM-L6-v2" # Default to a popular lightweight model
+    # ONNX provider: model file in the repo (or a local path) and ONNX Runtime threads (0 = runtime default)
+    onnx_file: str = "onnx/model_quint8_avx2.onnx"
+    onnx_threads: int = 0
 
 @dataclass
 class AzureSettings(ModelSettings):
@@ -121,9 +124,11 @@ class Settings:
         )
 
         # --- Embedding Provider Settings ---
-        # Sentence Transformer settings (only model name needed for now)
+        # Sentence Transformer settings (shared by the PyTorch and ONNX providers)
         self.sentence_transformer = SentenceTransformerSettings(
-            model_name=os.getenv('SENTENCE_TRANSFORMER_MODEL_NAME', 'all-MiniLM-L6-v2')
+            model_name=os.getenv('SENTENCE_TRANSFORMER_MODEL_NAME', 'all-MiniLM-L6-v2'),
+            onnx_file=os.getenv('SENTENCE_TRANSFORMER_ONNX_FILE', 'onnx/model_quint8_avx2.onnx'),
+            onnx_threads=int(os.getenv('SENTENCE_TRANSFORMER_ONNX_THREADS', '0'))
         )
         # Note: Azure embedding settings are already loaded under self.azure
 
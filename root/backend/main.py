@@ -6,6 +6,8 @@ import json
 import sys
 import logging
 import uuid
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Configure Python path for absolute imports from root
@@ -16,15 +18,16 @@ if str(root_dir) not in sys.path:
     print(f"Added to Python path: {root_dir}")
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Awaitable, Callable
 from datetime import datetime
 from pydantic import ValidationError
 
 from backend.agents.outline_generator_agent import OutlineGeneratorAgent
 from backend.agents.content_parsing_agent import ContentParsingAgent
-from backend.agents.blog_draft_generator_agent import BlogDraftGeneratorAgent
+from backend.agents.content_parsing.ingestion import shutdown_ingestion_pool, get_ingestion_metrics
+from backend.agents.blog_draft_generator_agent import BlogDraftGeneratorAgent, DEFAULT_SECTION_CONCURRENCY
 from backend.agents.social_media_agent import SocialMediaAgent
 from backend.agents.blog_refinement_agent import BlogRefinementAgent # Updated import path
 from backend.agents.outline_generator.state import FinalOutline
@@ -32,10 +35,19 @@ from backend.agents.blog_refinement.state import RefinementResult, TitleOption #
 from backend.utils.serialization import serialize_object
 from backend.models.model_factory import ModelFactory
 from backend.models.generation_config import TitleGenerationConfig, SocialMediaConfig # Added
-from backend.services.vector_store_service import VectorStoreService # Added
+from backend.models.embeddings.embedding_factory import EmbeddingFactory
+from backend.services.vector_store_registry import vector_store_registry, get_vector_store
 from backend.services.persona_service import PersonaService # Added
 from backend.services.supabase_project_manager import SupabaseProjectManager, MilestoneType # Supabase-based project manager
 from backend.services.cost_aggregator import CostAggregator
+from backend.services.cost_sink import shutdown_cost_sinks
+from backend.services.llm_response_cache import get_llm_response_cache
+from backend.services.generation_cache import get_generation_cache
+from backend.services.retrieval_cache import get_retrieval_cache
+from backend.services.ingestion_manifest import get_ingestion_manifest
+from backend.services.upload_storage import save_upload, UploadTooLargeError
+from backend.services.startup_warmup import preload_modules
+from backend.services.http_client_pool import init_http_pool, close_http_pool, get_http_pool
 
 # Configure logging
 logging.basicConfig(
@@ -72,7 +84,53 @@ class APIKeyAuthMiddleware(BaseHTTPMiddleware):
         return await call_next(request)
 
 
-app = FastAPI(title="Agentic Blogging Assistant API")
+# Timings of the background warmup, reported by /startup_metrics
+startup_preload_timings: Dict[str, float] = {}
+
+
+async def _init_vector_store(warmup: bool) -> None:
+    try:
+        # Model loading is blocking; keep it off the event loop
+        await asyncio.to_thread(vector_store_registry.startup, warmup)
+        logger.info(f"Startup timings: {vector_store_registry.get_stats()}")
+    except Exception as e:
+        # Fall back to lazy initialization on first use
+        logger.error(f"Shared vector store initialization failed at startup: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create process-wide shared resources once at startup and release them on shutdown."""
+    warmup = os.getenv("VECTOR_STORE_WARMUP", "true").lower() == "true"
+    # In background mode the server accepts requests before the embedding model is loaded;
+    # requests that need the vector store wait for it (the registry initializes once under a lock)
+    background_init = os.getenv("STARTUP_BACKGROUND_INIT", "false").lower() == "true"
+    preload = os.getenv("STARTUP_PRELOAD_MODULES", "true").lower() == "true"
+    # Keep-alive connections shared by every model provider client for the life of the app
+    init_http_pool()
+
+    if not background_init:
+        await _init_vector_store(warmup)
+
+    async def background_warmup() -> None:
+        if background_init:
+            await _init_vector_store(warmup)
+        if preload:
+            startup_preload_timings.update(await asyncio.to_thread(preload_modules))
+
+    warmup_task = asyncio.create_task(background_warmup())
+    yield
+    if not warmup_task.done():
+        warmup_task.cancel()
+    await close_http_pool()
+    # Persist buffered cost records before the executor goes away
+    await shutdown_cost_sinks()
+    shutdown_ingestion_pool(wait=False)
+    vector_store_registry.shutdown()
+    sql_project_manager.close(wait=False)
+
+
+app = FastAPI(title="Agentic Blogging Assistant API", lifespan=lifespan)
 
 # Add API key authentication middleware
 app.add_middleware(APIKeyAuthMiddleware)
@@ -90,6 +148,9 @@ os.makedirs(CACHE_DIRECTORY, exist_ok=True)
 # Agent cache to avoid recreating agents for each request
 agent_cache = {}
 
+# Strong references to fire-and-forget tasks (e.g. streaming generations) until they finish
+background_tasks = set()
+
 # Initialize SupabaseProjectManager for Supabase-based project tracking
 sql_project_manager = SupabaseProjectManager()  # Keep variable name for compatibility
 
@@ -166,6 +227,11 @@ async def load_workflow_state(project_id: str) -> Optional[Dict[str, Any]]:
         for s in project_data["sections"]
     }
 
+    # Transitions from the concurrent generation final pass (only valid for the same outline)
+    stored_transitions = project_data["project"]["metadata"].get("section_transitions") or {}
+    if stored_transitions.get("outline_hash") == state.get("outline_hash"):
+        state["section_transitions"] = stored_transitions.get("transitions", {})
+
     # Load cost tracking
     state["cost_summary"] = project_data["cost_summary"]
 
@@ -212,7 +278,6 @@ async def upload_files(
             )
         
         for file in valid_files:
-
             file_extension = Path(file.filename).suffix.lower()
             if file_extension not in SUPPORTED_EXTENSIONS:
                 return JSONResponse(
@@ -223,18 +288,27 @@ async def upload_files(
                     status_code=400
                 )
 
+        file_hashes = {}
+        unchanged_files = []
+        manifest = get_ingestion_manifest()
+        for file in valid_files:
             # Clean filename to prevent path traversal
             safe_filename = os.path.basename(file.filename)
             file_path = project_dir / safe_filename
 
-            # Read file content
-            content = await file.read()
-
-            # Write content to file
-            with open(file_path, "wb") as f:
-                f.write(content)
+            # Stream to disk in chunks, hashing as we go; identical re-uploads of an ingested file are not rewritten
+            ingested = await asyncio.to_thread(manifest.get, safe_project_name, str(file_path))
+            try:
+                stored = await save_upload(
+                    file, file_path, known_sha256=ingested["source_hash"] if ingested else None
+                )
+            except UploadTooLargeError as e:
+                return JSONResponse(content={"error": str(e)}, status_code=413)
 
-            uploaded_files.append(str(file_path))
+            uploaded_files.append(stored.path)
+            file_hashes[stored.path] = stored.sha256
+            if stored.unchanged:
+                unchanged_files.append(stored.path)
 
         if not uploaded_files:
             return JSONResponse(
@@ -262,6 +336,7 @@ async def upload_files(
             milestone_data = {
                 "files": uploaded_files,
                 "file_count": len(uploaded_files),
+                "file_sha256": file_hashes,
                 "upload_time": datetime.now().isoformat()
             }
             await sql_project_manager.save_milestone(
@@ -289,7 +364,10 @@ async def upload_files(
                 "project_name": safe_project_name,
                 "project_id": sql_project_id,
                 "job_id": sql_project_id,  # Alias for backward compatibility
-                "files": uploaded_files
+                "files": uploaded_files,
+                "file_sha256": file_hashes,
+                # Byte-identical to what was already ingested; /process_files skips them
+                "unchanged_files": unchanged_files
             }
         )
     except Exception as e:
@@ -312,13 +390,14 @@ async def get_or_create_agents(model_name: str, specific_model: Optional[str] =
         model_factory = ModelFactory()
         model = model_factory.create_model(model_name.lower(), specific_model)
 
+        # Process-wide shared vector store (embedding model is loaded once per process)
+        vector_store = get_vector_store()
+
         # Create and initialize agents
-        content_parser = ContentParsingAgent(model)
+        content_parser = ContentParsingAgent(model, vector_store=vector_store)
         await content_parser.initialize()
 
-        # Instantiate VectorStoreService (it might become a singleton later if needed)
-        vector_store = VectorStoreService() # Instantiate VectorStoreService here
-        
+
         # Instantiate PersonaService for consistent writer voice
         persona_service = PersonaService()
 
@@ -352,23 +431,50 @@ async def get_or_create_agents(model_name: str, specific_model: Optional[str] =
         raise HTTPException(status_code=500, detail=f"Failed to create agents: {str(e)}")
     
 
+async def _persist_file_hashes(project_name: str, file_hashes: Dict[str, Optional[str]], duration: float) -> None:
+    """Persist file hashes to Supabase for resume functionality."""
+    project = await sql_project_manager.get_project_by_name(project_name)
+    if not project:
+        return
+    project_id = project["id"]
+    # Update the files_uploaded milestone with file hashes
+    existing_milestone = await sql_project_manager.load_milestone(
+        project_id, MilestoneType.FILES_UPLOADED
+    )
+    if existing_milestone:
+        # Update existing milestone data with file hashes
+        milestone_data = existing_milestone.get("data", {})
+        milestone_data["file_hashes"] = file_hashes
+        milestone_data["processed_at"] = datetime.now().isoformat()
+
+        await sql_project_manager.save_milestone(
+            project_id=project_id,
+            milestone_type=MilestoneType.FILES_UPLOADED,
+            data=milestone_data,
+            metadata={"duration_seconds": duration}
+        )
+        logger.info(f"Persisted {len(file_hashes)} file hashes for project {project_id}")
+
+
 @app.post("/process_files/{project_name}")
 async def process_files(
     project_name: str,
     model_name: str = Form(...),
     file_paths: List[str] = Form(...),
-) -> JSONResponse:
-    """Process files and store in vector database."""
+    stream: bool = Form(False),
+):
+    """
+    Process files and store in vector database.
+
+    Files are parsed concurrently in a process pool and their chunks are embedded
+    and written in coalesced batches. With ``stream=true`` the response is a
+    Server-Sent Events stream of per-file ``file`` events (skipped, parsed,
+    stored, error), followed by ``result`` (the regular JSON payload) and ``done``.
+    """
     try:
         logger.info(f"Processing files for project {project_name} with model {model_name}")
         logger.info(f"File paths: {file_paths}")
 
-        # Get or create agents
-        start_time = datetime.now()
-        agents = await get_or_create_agents(model_name)
-        content_parser = agents["content_parser"]
-
-        result = {}
         for file_path in file_paths:
             if not os.path.exists(file_path):
                 logger.error(f"File not found: {file_path}")
@@ -377,45 +483,10 @@ async def process_files(
                     status_code=404
                 )
 
-            # Process the file
-            logger.info(f"Processing file: {file_path}")
-            content_hash = await content_parser.process_file_with_graph(file_path, project_name)
-            logger.info(f"File processed with hash: {content_hash}")
-            result[file_path] = content_hash
-
-        # Persist file hashes to Supabase for resume functionality
-        project = await sql_project_manager.get_project_by_name(project_name)
-        if project:
-            project_id = project["id"]
-            # Update the files_uploaded milestone with file hashes
-            existing_milestone = await sql_project_manager.load_milestone(
-                project_id, MilestoneType.FILES_UPLOADED
-            )
-            if existing_milestone:
-                # Update existing milestone data with file hashes
-                milestone_data = existing_milestone.get("data", {})
-                milestone_data["file_hashes"] = result
-                milestone_data["processed_at"] = datetime.now().isoformat()
-                
-                # Calculate processing duration
-                duration = (datetime.now() - start_time).total_seconds()
-                
-                await sql_project_manager.save_milestone(
-                    project_id=project_id,
-                    milestone_type=MilestoneType.FILES_UPLOADED,
-                    data=milestone_data,
-                    metadata={"duration_seconds": duration}
-                )
-                logger.info(f"Persisted {len(result)} file hashes for project {project_id}")
-
-        return JSONResponse(
-            content={
-                "message": "Files processed successfully",
-                "project": project_name,
-                "file_hashes": result,
-                "duration_seconds": duration
-            }
-        )
+        # Get or create agents
+        start_time = datetime.now()
+        agents = await get_or_create_agents(model_name)
+        content_parser = agents["content_parser"]
     except Exception as e:
         logger.exception(f"File processing failed: {str(e)}")
         return JSONResponse(
@@ -423,6 +494,45 @@ async def process_files(
             status_code=500
         )
 
+    async def ingest(on_status=None) -> Dict[str, Any]:
+        result = await content_parser.process_files_concurrently(file_paths, project_name, on_status=on_status)
+        duration = (datetime.now() - start_time).total_seconds()
+        await _persist_file_hashes(project_name, result, duration)
+        return {
+            "message": "Files processed successfully",
+            "project": project_name,
+            "file_hashes": result,
+            "failed_files": [path for path, content_hash in result.items() if not content_hash],
+            "duration_seconds": duration
+        }
+
+    if not stream:
+        try:
+            return JSONResponse(content=await ingest())
+        except Exception as e:
+            logger.exception(f"File processing failed: {str(e)}")
+            return JSONResponse(
+                content={"error": f"File processing failed: {str(e)}"},
+                status_code=500
+            )
+
+    async def run(emit: Callable[[str, Dict[str, Any]], None]) -> None:
+        def on_status(file_path: str, status: Dict[str, Any]) -> None:
+            emit("file", {"file_path": file_path, **status})
+
+        try:
+            emit("result", await ingest(on_status))
+        except Exception as e:
+            logger.exception(f"File processing failed: {str(e)}")
+            emit("error", {"error": f"File processing failed: {str(e)}"})
+
+    # Ingestion keeps running (and persists) if the client disconnects
+    return StreamingResponse(
+        _sse_pump(run),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/generate_outline/{project_name}")
 async def generate_outline(
     project_name: str,
@@ -661,6 +771,149 @@ async def resume_project_endpoint(project_id: str) -> JSONResponse:
 
 
 
+async def _prepare_section_request(project_name: str, section_index: int):
+    """
+    Load project state and rehydrated cost tracking for a single-section request.
+
+    Returns:
+        (context dict, None) on success, or (None, JSONResponse) describing the error
+    """
+    # Find project_id from project_name
+    project_data = await sql_project_manager.get_project_by_name(project_name)
+    if not project_data:
+        logger.error(f"Project not found: {project_name}")
+        return None, JSONResponse(
+            content={"error": f"Project not found: {project_name}. Please generate outline first."},
+            status_code=404
+        )
+
+    project_id = project_data["id"]
+
+    # Load workflow state from SQL
+    state = await load_workflow_state(project_id)
+    if not state:
+        logger.error(f"Workflow state not found for project: {project_name}")
+        return None, JSONResponse(
+            content={"error": f"Workflow state not found for project: {project_name}"},
+            status_code=404
+        )
+
+    # Ensure cost tracking is available and rehydrate if needed
+    cost_aggregator = CostAggregator()
+    cost_aggregator.start_workflow(project_id=project_id)
+
+    # Load existing cost history
+    existing_history = state.get("cost_summary", {}).get("call_history", [])
+    if existing_history:
+        for call in existing_history:
+            try:
+                cost_aggregator.record_cost(call)
+            except Exception as err:
+                logger.warning(f"Failed to replay cost record during section resume: {err}")
+
+    previous_summary = state.get("cost_summary", {})
+
+    # Extract data from state
+    outline_data = state["outline"]
+
+    # Validate section index
+    if section_index < 0 or section_index >= len(outline_data.get("sections", [])):
+        return None, JSONResponse(
+            content={"error": f"Invalid section index: {section_index}"},
+            status_code=400
+        )
+
+    # Get current section
+    section = outline_data["sections"][section_index]
+
+    return {
+        "project_id": project_id,
+        "state": state,
+        "cost_aggregator": cost_aggregator,
+        "previous_total_cost": previous_summary.get("total_cost", 0.0),
+        "previous_total_tokens": previous_summary.get("total_tokens", 0),
+        "outline": outline_data,
+        "section": section,
+        "section_title": section.get("title", f"Section {section_index + 1}"),
+        # Sections already stored in SQL are returned as-is
+        "stored_section": state.get('generated_sections', {}).get(section_index)
+    }, None
+
+
+def _stored_section_payload(ctx: Dict[str, Any], section_index: int) -> Dict[str, Any]:
+    """Response payload for a section that already exists in SQL."""
+    cached_section = ctx["stored_section"]
+    return {
+        "project_id": ctx["project_id"],
+        "section_title": cached_section.get("title", ctx["section_title"]),
+        "section_content": cached_section.get("content"),
+        "section_index": section_index,
+        "was_cached": True
+    }
+
+
+async def _complete_section_request(ctx: Dict[str, Any], section_index: int,
+                                    section_result: Dict[str, Any], was_cached: bool) -> Dict[str, Any]:
+    """Persist updated cost tracking for a generated section and build the response payload."""
+    # Extract content and image placeholders from result
+    if isinstance(section_result, dict):
+        section_content = section_result.get("content")
+        image_placeholders = section_result.get("image_placeholders", [])
+    else:
+        # Backward compatibility for old cache format
+        section_content = section_result
+        image_placeholders = []
+
+    # Section saving to SQL is already handled by the agent
+    # Update cost tracking in SQL
+    cost_aggregator = ctx["cost_aggregator"]
+    updated_summary = cost_aggregator.get_workflow_summary()
+    section_cost_delta = updated_summary.get("total_cost", 0.0) - ctx["previous_total_cost"]
+    section_tokens_delta = updated_summary.get("total_tokens", 0) - ctx["previous_total_tokens"]
+
+    await sql_project_manager.update_metadata(ctx["project_id"], {
+        "cost_summary": updated_summary,
+        "cost_call_history": list(cost_aggregator.call_history)
+    })
+
+    return {
+        "project_id": ctx["project_id"],
+        "section_title": ctx["section_title"],
+        "section_content": section_content,
+        "image_placeholders": image_placeholders,
+        "section_index": section_index,
+        "was_cached": was_cached,
+        "cost_summary": updated_summary,
+        "section_cost": section_cost_delta,
+        "section_tokens": section_tokens_delta
+    }
+
+
+async def _run_section_generation(ctx: Dict[str, Any], project_name: str, section_index: int,
+                                  max_iterations: int, quality_threshold: float,
+                                  event_callback=None):
+    """Run the draft agent for one section using a prepared request context."""
+    state = ctx["state"]
+    agents = await get_or_create_agents(state["model_name"], state.get("specific_model"))
+    draft_agent = agents["draft_agent"]
+
+    return await draft_agent.generate_section(
+        project_name=project_name,
+        section=ctx["section"],
+        outline=ctx["outline"],
+        notebook_content=state.get("notebook_content"),
+        markdown_content=state.get("markdown_content"),
+        current_section_index=section_index,
+        max_iterations=max_iterations,
+        quality_threshold=quality_threshold,
+        use_cache=True,
+        cost_aggregator=ctx["cost_aggregator"],
+        project_id=ctx["project_id"],
+        persona=state.get("persona", "neuraforge"),
+        event_callback=event_callback
+    )
+
+
 @app.post("/generate_section/{project_name}")
 async def generate_section(
     project_name: str,
@@ -670,7 +923,156 @@ async def generate_section(
 ) -> JSONResponse:
     """Generate a single section and store it in SQL database immediately."""
     try:
-        # Find project_id from project_name
+        ctx, error_response = await _prepare_section_request(project_name, section_index)
+        if error_response:
+            return error_response
+
+        # Check if section already exists in SQL
+        if ctx["stored_section"]:
+            logger.info(f"Section {section_index} already exists in SQL, returning cached version")
+            return JSONResponse(content=_stored_section_payload(ctx, section_index))
+
+        # Generate section content
+        section_result, was_cached = await _run_section_generation(
+            ctx, project_name, section_index, max_iterations, quality_threshold
+        )
+
+        if section_result is None:
+            return JSONResponse(
+                content={"error": f"Failed to generate section: {ctx['section_title']}"},
+                status_code=500
+            )
+
+        payload = await _complete_section_request(ctx, section_index, section_result, was_cached)
+        logger.info(f"Stored section {section_index} in SQL for project: {project_name}")
+        return JSONResponse(content=payload)
+
+    except Exception as e:
+        logger.exception(f"Section generation failed: {str(e)}")
+        return JSONResponse(
+            content={
+                "error": f"Section generation failed: {str(e)}",
+                "type": str(type(e).__name__),
+                "details": str(e)
+            },
+            status_code=500
+        )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _sse_pump(produce: Callable[[Callable[[str, Dict[str, Any]], None]], Awaitable[None]]) -> AsyncIterator[str]:
+    """
+    Run ``produce(emit)`` as a background task and stream what it emits as SSE messages.
+
+    The task is tracked in background_tasks rather than tied to the response, so
+    work such as generation or ingestion still completes (and is persisted) if the
+    client disconnects. The stream ends with a "done" event once the task finishes;
+    ``produce`` reports its own failures as "error" events.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(event: str, data: Dict[str, Any]) -> None:
+        queue.put_nowait((event, data))
+
+    async def run() -> None:
+        try:
+            await produce(emit)
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        yield _sse(*item)
+    yield _sse("done", {})
+
+
+@app.post("/generate_section_stream/{project_name}")
+async def generate_section_stream(
+    project_name: str,
+    section_index: int = Form(...),
+    max_iterations: int = Form(3),
+    quality_threshold: float = Form(0.8)
+):
+    """
+    Generate a single section, streaming progress over Server-Sent Events.
+
+    Events:
+        node   - step progress (hyde, retrieval, generator, enhancer, code_extractor,
+                 validator scores, feedback iterations, finalizer)
+        token  - draft text chunks from the section generator as the model produces them
+        result - final payload, identical to /generate_section
+        error  - generation failure
+        done   - end of stream
+    """
+    try:
+        ctx, error_response = await _prepare_section_request(project_name, section_index)
+    except Exception as e:
+        logger.exception(f"Section generation failed: {str(e)}")
+        return JSONResponse(
+            content={
+                "error": f"Section generation failed: {str(e)}",
+                "type": str(type(e).__name__),
+                "details": str(e)
+            },
+            status_code=500
+        )
+    if error_response:
+        return error_response
+
+    async def run(emit: Callable[[str, Dict[str, Any]], None]) -> None:
+        if ctx["stored_section"]:
+            emit("result", _stored_section_payload(ctx, section_index))
+            return
+        try:
+            section_result, was_cached = await _run_section_generation(
+                ctx, project_name, section_index, max_iterations, quality_threshold,
+                event_callback=emit
+            )
+            if section_result is None:
+                emit("error", {"error": f"Failed to generate section: {ctx['section_title']}"})
+            else:
+                payload = await _complete_section_request(ctx, section_index, section_result, was_cached)
+                emit("result", payload)
+        except Exception as e:
+            logger.exception(f"Streaming section generation failed: {str(e)}")
+            emit("error", {
+                "error": f"Section generation failed: {str(e)}",
+                "type": str(type(e).__name__)
+            })
+
+    # Generation runs as its own task so a disconnected client doesn't lose the
+    # section: it still completes and is persisted
+    return StreamingResponse(
+        _sse_pump(run),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/generate_all_sections/{project_name}")
+async def generate_all_sections(
+    project_name: str,
+    max_concurrency: int = Form(DEFAULT_SECTION_CONCURRENCY),
+    max_iterations: int = Form(3),
+    quality_threshold: float = Form(0.8),
+    regenerate_existing: bool = Form(False)
+) -> JSONResponse:
+    """
+    Generate all outline sections concurrently, then compute transitions in a final pass.
+
+    Sections already stored in SQL are reused unless regenerate_existing is set, in which
+    case the section cache for this outline is cleared and every section is generated
+    fresh. Each section is persisted as soon as it completes.
+    """
+    try:
         project_data = await sql_project_manager.get_project_by_name(project_name)
         if not project_data:
             logger.error(f"Project not found: {project_name}")
@@ -681,134 +1083,129 @@ async def generate_section(
 
         project_id = project_data["id"]
 
-        # Load workflow state from SQL
         state = await load_workflow_state(project_id)
-        if not state:
+        if not state or not state.get("outline"):
             logger.error(f"Workflow state not found for project: {project_name}")
             return JSONResponse(
                 content={"error": f"Workflow state not found for project: {project_name}"},
                 status_code=404
             )
 
-        # Ensure cost tracking is available and rehydrate if needed
-        cost_aggregator = CostAggregator()
-        cost_aggregator.start_workflow(project_id=project_id)
-
-        # Load existing cost history
-        existing_history = state.get("cost_summary", {}).get("call_history", [])
-        if existing_history:
-            for call in existing_history:
-                try:
-                    cost_aggregator.record_cost(call)
-                except Exception as err:
-                    logger.warning(f"Failed to replay cost record during section resume: {err}")
-
-        previous_summary = state.get("cost_summary", {})
-        previous_total_cost = previous_summary.get("total_cost", 0.0)
-        previous_total_tokens = previous_summary.get("total_tokens", 0)
-
-        # Extract data from state
-        outline_data = state["outline"]
-        notebook_data = state.get("notebook_content")
-        markdown_data = state.get("markdown_content")
-        model_name = state["model_name"]
-        specific_model = state.get("specific_model")
-
-        # Validate section index
-        if section_index < 0 or section_index >= len(outline_data.get("sections", [])):
+        if max_concurrency < 1:
             return JSONResponse(
-                content={"error": f"Invalid section index: {section_index}"},
+                content={"error": "max_concurrency must be at least 1"},
                 status_code=400
             )
 
-        # Get current section
-        section = outline_data["sections"][section_index]
-        section_title = section.get("title", f"Section {section_index + 1}")
+        # Rehydrate cost tracking
+        cost_aggregator = CostAggregator()
+        cost_aggregator.start_workflow(project_id=project_id)
+        for call in state.get("cost_summary", {}).get("call_history", []):
+            try:
+                cost_aggregator.record_cost(call)
+            except Exception as err:
+                logger.warning(f"Failed to replay cost record during section generation: {err}")
+        previous_total_cost = state.get("cost_summary", {}).get("total_cost", 0.0)
 
-        # Get generated sections from state
-        generated_sections = state.get('generated_sections', {})
+        outline_data = state["outline"]
+        outline_hash = state.get("outline_hash")
+        outline_sections = outline_data.get("sections", [])
+        generated_sections = state.get("generated_sections", {})
 
-        # Check if section already exists in SQL
-        if section_index in generated_sections:
-            logger.info(f"Section {section_index} already exists in SQL, returning cached version")
-            cached_section = generated_sections[section_index]
-            return JSONResponse(
-                content={
-                    "project_id": project_id,
-                    "section_title": cached_section.get("title", section_title),
-                    "section_content": cached_section.get("content"),
-                    "section_index": section_index,
-                    "was_cached": True
-                }
-            )
+        pending_indices = [
+            i for i in range(len(outline_sections))
+            if regenerate_existing or i not in generated_sections
+        ]
+        sections: Dict[int, Dict[str, Any]] = {
+            i: {"title": data.get("title"), "content": data.get("content"), "was_cached": True}
+            for i, data in generated_sections.items()
+            if i not in pending_indices
+        }
 
-        # Generate new section
-        agents = await get_or_create_agents(model_name, specific_model)
+        agents = await get_or_create_agents(state["model_name"], state.get("specific_model"))
         draft_agent = agents["draft_agent"]
 
-        # Generate section content
-        section_result, was_cached = await draft_agent.generate_section(
+        if regenerate_existing:
+            draft_agent.clear_section_cache(project_name, outline_data)
+
+        async def persist_section(index: int, result: Optional[Dict[str, Any]], was_cached: bool) -> None:
+            if not result:
+                return
+            title = outline_sections[index].get("title", f"Section {index + 1}")
+            sections[index] = {"title": title, "content": result.get("content"), "was_cached": was_cached}
+            if was_cached:
+                # Fresh sections are saved by the section finalizer; cache hits are saved here
+                await sql_project_manager.save_sections(project_id, [{
+                    "section_index": index,
+                    "title": title,
+                    "content": result.get("content"),
+                    "status": "completed",
+                    "outline_hash": outline_hash,
+                    "image_placeholders": result.get("image_placeholders", [])
+                }])
+            logger.info(f"Section {index} ready for project {project_name} (cached={was_cached})")
+
+        results = await draft_agent.generate_all_sections(
             project_name=project_name,
-            section=section,
             outline=outline_data,
-            notebook_content=notebook_data,
-            markdown_content=markdown_data,
-            current_section_index=section_index,
+            notebook_content=state.get("notebook_content"),
+            markdown_content=state.get("markdown_content"),
+            section_indices=pending_indices,
+            max_concurrency=max_concurrency,
             max_iterations=max_iterations,
             quality_threshold=quality_threshold,
-            use_cache=True,
+            use_cache=not regenerate_existing,
             cost_aggregator=cost_aggregator,
             project_id=project_id,
-            persona=state.get("persona", "neuraforge")
+            persona=state.get("persona") or "neuraforge",
+            on_section_complete=persist_section
         )
+        failed_indices = sorted(i for i, (result, _) in results.items() if not result)
 
-        if section_result is None:
-            return JSONResponse(
-                content={"error": f"Failed to generate section: {section_title}"},
-                status_code=500
-            )
-
-        # Extract content and image placeholders from result
-        if isinstance(section_result, dict):
-            section_content = section_result.get("content")
-            image_placeholders = section_result.get("image_placeholders", [])
-        else:
-            # Backward compatibility for old cache format
-            section_content = section_result
-            image_placeholders = []
+        # Final pass: transitions need every neighbouring section to be finished
+        transitions = await draft_agent.generate_transitions(
+            project_name=project_name,
+            outline=outline_data,
+            sections=sections,
+            max_concurrency=max_concurrency,
+            cost_aggregator=cost_aggregator,
+            project_id=project_id,
+            persona=state.get("persona") or "neuraforge"
+        )
 
-        # Section saving to SQL is already handled by the agent
-        # Update cost tracking in SQL
         updated_summary = cost_aggregator.get_workflow_summary()
-        section_cost_delta = updated_summary.get("total_cost", 0.0) - previous_total_cost
-        section_tokens_delta = updated_summary.get("total_tokens", 0) - previous_total_tokens
-
         await sql_project_manager.update_metadata(project_id, {
             "cost_summary": updated_summary,
-            "cost_call_history": list(cost_aggregator.call_history)
+            "cost_call_history": list(cost_aggregator.call_history),
+            "section_transitions": {"outline_hash": outline_hash, "transitions": transitions}
         })
 
-        logger.info(f"Stored section {section_index} in SQL for project: {project_name}")
-
         return JSONResponse(
             content={
                 "project_id": project_id,
-                "section_title": section_title,
-                "section_content": section_content,
-                "image_placeholders": image_placeholders,
-                "section_index": section_index,
-                "was_cached": was_cached,
+                "sections": [
+                    {
+                        "section_index": i,
+                        "section_title": sections[i]["title"],
+                        "section_content": sections[i]["content"],
+                        "was_cached": sections[i]["was_cached"]
+                    }
+                    for i in sorted(sections)
+                ],
+                "generated_count": len(pending_indices) - len(failed_indices),
+                "failed_sections": failed_indices,
+                "transitions": transitions,
                 "cost_summary": updated_summary,
-                "section_cost": section_cost_delta,
-                "section_tokens": section_tokens_delta
-            }
+                "generation_cost": updated_summary.get("total_cost", 0.0) - previous_total_cost
+            },
+            status_code=207 if failed_indices else 200
         )
 
     except Exception as e:
-        logger.exception(f"Section generation failed: {str(e)}")
+        logger.exception(f"Concurrent section generation failed: {str(e)}")
         return JSONResponse(
             content={
-                "error": f"Section generation failed: {str(e)}",
+                "error": f"Concurrent section generation failed: {str(e)}",
                 "type": str(type(e).__name__),
                 "details": str(e)
             },
@@ -942,6 +1339,7 @@ async def compile_draft(
         blog_parts.append("\n")
 
         # Add sections
+        section_transitions = job_state.get("section_transitions", {})
         for i in range(num_outline_sections):
             section_data = generated_sections[i]
             title = section_data.get("title", f"Section {i+1}")
@@ -953,6 +1351,13 @@ async def compile_draft(
                 f"{content}\n\n"
             ])
 
+            # Add transition to the next section if one was generated
+            if i + 1 < num_outline_sections:
+                next_title = generated_sections[i + 1].get("title", f"Section {i+2}")
+                transition = section_transitions.get(f"{title}_to_{next_title}")
+                if transition:
+                    blog_parts.append(f"{transition}\n\n")
+
         # Add conclusion if available
         if 'conclusion' in outline_data and outline_data['conclusion']:
             blog_parts.extend([
@@ -1462,6 +1867,36 @@ async def health_check() -> JSONResponse:
     return JSONResponse(content={"status": "ok"})
 
 
+@app.get("/startup_metrics")
+async def startup_metrics() -> JSONResponse:
+    """Report shared resource initialization state and startup/warmup timings."""
+    return JSONResponse(content={
+        "vector_store": vector_store_registry.get_stats(),
+        "preloaded_modules": startup_preload_timings,
+        "http_pool": get_http_pool().get_stats(),
+    })
+
+
+@app.get("/cache_metrics")
+async def cache_metrics() -> JSONResponse:
+    """Report hit/miss statistics for the response, generation, retrieval and embedding caches."""
+    llm_cache = get_llm_response_cache()
+    retrieval_cache = get_retrieval_cache()
+    return JSONResponse(content={
+        "llm_responses": llm_cache.get_stats() if llm_cache else {"enabled": False},
+        "generation": get_generation_cache().get_stats(),
+        "retrieval": retrieval_cache.get_stats() if retrieval_cache else {"enabled": False},
+        "embeddings": EmbeddingFactory.get_cache_stats(),
+        "embedding_batches": EmbeddingFactory.get_batching_stats(),
+    })
+
+
+@app.get("/ingestion_metrics")
+async def ingestion_metrics() -> JSONResponse:
+    """Report the chunking mode and chunk token statistics (chars per token, chunk sizes in model tokens)."""
+    return JSONResponse(content=get_ingestion_metrics())
+
+
 # ==================== PROJECT MANAGEMENT ENDPOINTS ====================
 
 @app.get("/projects")
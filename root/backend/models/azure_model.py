@@ -2,6 +2,7 @@ import logging
 # from langchain_community.chat_models import AzureChatOpenAI
 from langchain_openai import AzureOpenAI, AzureChatOpenAI
 from ..config.settings import AzureSettings
+from ..services.http_client_pool import get_http_pool
 
 class AzureModel:
     def __init__(self, settings: AzureSettings):
@@ -18,7 +19,10 @@ class AzureModel:
                 openai_api_key=settings.api_key,
                 openai_api_version=settings.api_version,
                 temperature=0.5,
-                max_tokens=4096
+                max_tokens=4096,
+                # Reuse the process-wide keep-alive connections
+                http_client=get_http_pool().client("azure"),
+                http_async_client=get_http_pool().async_client("azure")
             )
             
             # deployment_name=deployment_name,
@@ -49,3 +53,9 @@ class AzureModel:
 
     async def ainvoke(self, prompt: str):
         return await self.llm.ainvoke(prompt)
+
+    async def astream(self, prompt: str):
+        """Yield response text chunks as the model produces them."""
+        async for chunk in self.llm.astream(prompt):
+            if chunk.content:
+                yield chunk.content
@@ -1,6 +1,8 @@
 import os
 import logging
+import anthropic
 from langchain_anthropic import ChatAnthropic
+from ..services.http_client_pool import get_http_pool
 
 class ClaudeModel:
     def __init__(self, model_settings):
@@ -11,10 +13,30 @@ class ClaudeModel:
                 temperature=0.2,
                 max_tokens=4096
             )
+            self._use_pooled_clients()
         except Exception as e:
             logging.error(f"Failed to initialize Claude LLM chain: {str(e)}")
             raise
 
+    def _use_pooled_clients(self):
+        """
+        Seed ChatAnthropic's SDK clients with ones on the process-wide keep-alive connections.
+
+        ChatAnthropic has no http client option, so this relies on its private
+        ``_client_params`` and cached client attributes. If those change, the
+        model keeps its default clients and only loses connection pooling.
+        """
+        try:
+            client_params = self.llm._client_params
+            client = anthropic.Client(**client_params, http_client=get_http_pool().client("anthropic"))
+            async_client = anthropic.AsyncClient(
+                **client_params, http_client=get_http_pool().async_client("anthropic")
+            )
+            self.llm.__dict__["_client"] = client
+            self.llm.__dict__["_async_client"] = async_client
+        except Exception as e:
+            logging.warning(f"Claude model is not using pooled HTTP clients: {str(e)}")
+
     def generate(self, messages):
         # Format messages into a single string
         formatted_messages = "\n".join([f"{message['role']}: {message['content']}" for message in messages])
@@ -27,3 +49,11 @@ class ClaudeModel:
     async def ainvoke(self, prompt: str):
         response = await self.llm.ainvoke(prompt)
         return response
+
+    async def astream(self, prompt: str):
+        """Yield response text chunks as the model produces them."""
+        async for chunk in self.llm.astream(prompt):
+            if chunk.content:
+                yield chunk.content if isinstance(chunk.content, str) else "".join(
+                    part.get("text", "") for part in chunk.content if isinstance(part, dict)
+                )
@@ -0,0 +1,59 @@
+# ABOUTME: Per-provider concurrency limits for LLM calls
+# ABOUTME: Bounds how many requests run at once against each provider when graph nodes fan out
+
+"""
+Per-provider LLM concurrency limits.
+
+The limit for a provider comes from ``LLM_MAX_CONCURRENCY_<PROVIDER>`` (e.g.
+``LLM_MAX_CONCURRENCY_CLAUDE=2``), falling back to ``LLM_MAX_CONCURRENCY``.
+Semaphores are created per event loop so the same process can safely run
+several loops (e.g. ``asyncio.run`` in sync helpers).
+"""
+
+import os
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Model wrapper class name -> provider key used by ModelFactory
+_PROVIDER_BY_CLASS = {
+    "ClaudeModel": "claude",
+    "OpenAIModel": "openai",
+    "AzureModel": "azure",
+    "DeepseekModel": "deepseek",
+    "GeminiModel": "gemini",
+    "OpenRouterModel": "openrouter",
+}
+
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def provider_for_model(model: Any) -> str:
+    """Return the provider key for a model instance (unwrapping CostTrackingModel)."""
+    base = getattr(model, "base_model", model)
+    return _PROVIDER_BY_CLASS.get(type(base).__name__, "default")
+
+
+def get_provider_limit(provider: str) -> int:
+    """Max concurrent calls for a provider, read from the environment."""
+    value = os.getenv(f"LLM_MAX_CONCURRENCY_{provider.upper()}") or os.getenv("LLM_MAX_CONCURRENCY")
+    try:
+        return max(1, int(value)) if value else DEFAULT_MAX_CONCURRENCY
+    except ValueError:
+        return DEFAULT_MAX_CONCURRENCY
+
+
+def get_provider_semaphore(provider: str) -> asyncio.Semaphore:
+    """Semaphore bounding concurrent calls to ``provider`` on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _semaphores.setdefault(loop, {})
+        semaphore = per_loop.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(get_provider_limit(provider))
+            per_loop[provider] = semaphore
+        return semaphore
@@ -1,12 +1,16 @@
 # ABOUTME: Wrapper for LLM models that automatically tracks token usage and costs
 # ABOUTME: Works with all model providers, integrates with LangGraph state and SQL tracking
 
-from typing import Any, Dict, Optional, Callable
+from typing import Any, AsyncIterator, Dict, Optional, Callable, Tuple
 from datetime import datetime
 import logging
 import asyncio
+import time
 from langchain.schema import AIMessage, BaseMessage
 from backend.utils.token_counter import TokenCounter
+from backend.services.cost_sink import get_cost_sink
+from backend.services.llm_response_cache import get_llm_response_cache
+from backend.models.concurrency import provider_for_model, get_provider_semaphore
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +25,9 @@ class CostTrackingModel:
                  context_supplier: Optional[Callable[[], Dict[str, Any]]] = None,
                  sql_project_manager: Optional = None,
                  project_id: Optional[str] = None,
-                 agent_name: Optional[str] = None):
+                 agent_name: Optional[str] = None,
+                 cost_sink: Optional = None,
+                 response_cache: Optional = None):
         """
         Initialize cost-tracking wrapper
 
@@ -33,9 +39,14 @@ class CostTrackingModel:
             sql_project_manager: Optional SQL project manager for persistent tracking
             project_id: Project ID for SQL tracking
             agent_name: Agent name for SQL tracking
+            cost_sink: Optional write-behind sink for SQL records (defaults to the
+                       shared sink of sql_project_manager)
+            response_cache: Optional LLMResponseCache (defaults to the shared
+                            cache configured by LLM_CACHE_* env vars)
         """
         self.base_model = base_model
         self.model_name = self._normalize_model_name(model_name)
+        self.provider = provider_for_model(base_model)
         self.token_counter = TokenCounter()
         self.cost_aggregator = cost_aggregator
         self.context_supplier = context_supplier
@@ -44,6 +55,8 @@ class CostTrackingModel:
         self.sql_project_manager = sql_project_manager
         self.project_id = project_id
         self.agent_name = agent_name
+        self.cost_sink = cost_sink
+        self.response_cache = response_cache
 
         # Track costs for this model instance
         self.session_costs = {
@@ -58,7 +71,8 @@ class CostTrackingModel:
                             context_supplier: Optional[Callable[[], Dict[str, Any]]] = None,
                             sql_project_manager: Optional = None,
                             project_id: Optional[str] = None,
-                            agent_name: Optional[str] = None) -> None:
+                            agent_name: Optional[str] = None,
+                            cost_sink: Optional = None) -> None:
         """Update cost aggregator, context supplier, and SQL tracking at runtime."""
         if cost_aggregator is not None:
             self.cost_aggregator = cost_aggregator
@@ -70,6 +84,8 @@ class CostTrackingModel:
             self.project_id = project_id
         if agent_name is not None:
             self.agent_name = agent_name
+        if cost_sink is not None:
+            self.cost_sink = cost_sink
 
     def _normalize_model_name(self, model_name: str) -> str:
         """Normalize model name for pricing lookup"""
@@ -78,13 +94,8 @@ class CostTrackingModel:
         except Exception:
             return model_name
 
-    async def ainvoke(self, prompt: str, **kwargs) -> AIMessage:
-        """
-        Async invoke with automatic cost tracking
-
-        Extracts tracking context from kwargs if available (for LangGraph integration)
-        """
-        start_time = datetime.utcnow()
+    def _resolve_context(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Pop explicit tracking context from kwargs or ask the context supplier."""
         call_context = kwargs.pop('_tracking_context', None)
         if call_context is None and self.context_supplier:
             try:
@@ -92,14 +103,217 @@ class CostTrackingModel:
             except Exception as err:
                 logger.debug(f"Failed to resolve tracking context: {err}")
                 call_context = {}
-        call_context = call_context or {}
+        return call_context or {}
+
+    def _generation_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Sampling settings that change the output, used in the response cache key."""
+        llm = getattr(self.base_model, 'llm', self.base_model)
+        params = {
+            name: getattr(llm, name)
+            for name in ("temperature", "max_tokens", "top_p")
+            if isinstance(getattr(llm, name, None), (int, float))
+        }
+        params.update(kwargs)
+        return params
+
+    def _cache_lookup(self, prompt: str, kwargs: Dict[str, Any],
+                      call_context: Dict[str, Any]) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Resolve the response cache and key for this call.
+
+        A ``_cache`` kwarg overrides the per-node policy for a single call
+        (``False`` bypasses the cache, ``True`` forces it).
+        """
+        override = kwargs.pop('_cache', None)
+        if override is False:
+            return None, None
+
+        cache = self.response_cache or get_llm_response_cache()
+        if cache is None:
+            return None, None
+        if override is None and not cache.is_enabled_for(call_context.get('node_name')):
+            return None, None
+
+        key = cache.make_key(
+            f"{self.provider}:{self.model_name}", prompt, self._generation_params(kwargs)
+        )
+        return cache, key
+
+    async def _cache_store(self, cache: Any, key: str, response_text: str, response_kind: str,
+                           breakdown: Dict[str, Any]) -> None:
+        # SQLite I/O runs in a worker thread so it doesn't block the event loop
+        await asyncio.to_thread(
+            cache.set, key, self.model_name, response_text, response_kind,
+            input_tokens=breakdown.get("input_tokens", 0),
+            output_tokens=breakdown.get("output_tokens", 0),
+            cost=breakdown.get("total_cost", 0.0),
+        )
+
+    def _record_cache_hit(self, entry: Dict[str, Any], call_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a cache hit as a zero-cost call carrying the cost it saved."""
+        breakdown = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+            "input_cost": 0.0,
+            "output_cost": 0.0,
+            "total_cost": 0.0,
+            "model": self.model_name,
+            "cache_hit": True,
+            "saved_cost": entry["cost"],
+            "saved_tokens": entry["input_tokens"] + entry["output_tokens"],
+        }
+        call_record = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "latency_ms": 0.0,
+            "duration_seconds": 0.0,
+            **breakdown,
+            **call_context
+        }
+
+        self.session_costs["total_calls"] += 1
+        self.session_costs["calls"].append(call_record)
+
+        if self.cost_aggregator:
+            self.cost_aggregator.record_cost(call_record)
+
+        if self.sql_project_manager and self.project_id:
+            try:
+                sink = self.cost_sink or get_cost_sink(self.sql_project_manager)
+                sink.enqueue({
+                    "project_id": self.project_id,
+                    "agent_name": self.agent_name or "unknown_agent",
+                    "operation": call_context.get('node_name', 'llm_call'),
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cost": 0.0,
+                    "model_used": self.model_name,
+                    "duration_seconds": 0.0,
+                    "metadata": {
+                        "cache_hit": True,
+                        "saved_cost": entry["cost"],
+                        "context": call_context
+                    }
+                })
+            except Exception as sql_error:
+                logger.warning(f"SQL cost tracking failed: {sql_error}")
+
+        logger.info(
+            f"LLM Cache Hit: {self.model_name} | "
+            f"Saved: ${entry['cost']:.6f} | "
+            f"Context: {call_context.get('node_name', 'unknown')}"
+        )
+        return breakdown
+
+    def _record_success(self, input_tokens: int, response_text: str,
+                        duration_seconds: float, call_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Count output tokens, price the call and record it everywhere. Returns the cost breakdown."""
+        # Count output tokens
+        output_tokens = self.token_counter.count_tokens(response_text, self.model_name)
+
+        # Calculate cost
+        total_cost, breakdown = self.token_counter.calculate_cost(
+            input_tokens, output_tokens, self.model_name
+        )
+
+        # Record the call
+        call_record = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "model": self.model_name,
+            "latency_ms": duration_seconds * 1000,
+            "duration_seconds": duration_seconds,
+            **breakdown,
+            **call_context  # Include LangGraph context
+        }
+
+        # Update session totals
+        self.session_costs["total_calls"] += 1
+        self.session_costs["total_tokens"] += breakdown["total_tokens"]
+        self.session_costs["total_cost"] += total_cost
+        self.session_costs["calls"].append(call_record)
+
+        # Send to aggregator if available
+        if self.cost_aggregator:
+            self.cost_aggregator.record_cost(call_record)
+
+        # Queue for SQL persistence (write-behind, off the critical path)
+        if self.sql_project_manager and self.project_id:
+            try:
+                sink = self.cost_sink or get_cost_sink(self.sql_project_manager)
+                sink.enqueue({
+                    "project_id": self.project_id,
+                    "agent_name": self.agent_name or "unknown_agent",
+                    "operation": call_context.get('node_name', 'llm_call'),
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "cost": total_cost,
+                    "model_used": self.model_name,
+                    "duration_seconds": duration_seconds,
+                    "metadata": {
+                        "latency_ms": call_record["latency_ms"],
+                        "context": call_context
+                    }
+                })
+            except Exception as sql_error:
+                # Log warning but don't fail the call
+                logger.warning(f"SQL cost tracking failed: {sql_error}")
+
+        # Log the cost
+        logger.info(
+            f"LLM Call: {self.model_name} | "
+            f"Tokens: {input_tokens}/{output_tokens} | "
+            f"Cost: ${total_cost:.6f} | "
+            f"Context: {call_context.get('node_name', 'unknown')}"
+        )
+        return breakdown
+
+    def _record_failure(self, input_tokens: int, error: Exception, call_context: Dict[str, Any]) -> None:
+        """Still track the failed call"""
+        call_record = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "model": self.model_name,
+            "input_tokens": input_tokens,
+            "output_tokens": 0,
+            "total_cost": (input_tokens / 1000) *
+                        self.token_counter.PRICING.get(self.model_name, {"input": 0.001})["input"],
+            "error": str(error),
+            **call_context
+        }
+
+        self.session_costs["total_calls"] += 1
+        self.session_costs["calls"].append(call_record)
+
+        logger.error(f"LLM call failed: {error}")
+
+    async def ainvoke(self, prompt: str, **kwargs) -> AIMessage:
+        """
+        Async invoke with automatic cost tracking
+
+        Extracts tracking context from kwargs if available (for LangGraph integration)
+        """
+        call_context = self._resolve_context(kwargs)
+
+        # Serve identical calls from the response cache
+        cache, cache_key = self._cache_lookup(prompt, kwargs, call_context)
+        if cache is not None:
+            entry = await asyncio.to_thread(cache.get, cache_key)
+            if entry is not None:
+                breakdown = self._record_cache_hit(entry, call_context)
+                if entry["response_kind"] == "text":
+                    return entry["response"]
+                response = AIMessage(content=entry["response"])
+                response.usage_metadata = breakdown
+                return response
 
         # Count input tokens
         input_tokens = self.token_counter.count_tokens(prompt, self.model_name)
 
         try:
-            # Call the underlying model
-            response = await self.base_model.ainvoke(prompt, **kwargs)
+            # Call the underlying model, bounded per provider (latency covers only the model call)
+            async with get_provider_semaphore(self.provider):
+                start_time = time.perf_counter()
+                response = await self.base_model.ainvoke(prompt, **kwargs)
+                duration_seconds = time.perf_counter() - start_time
 
             # Extract response text
             if isinstance(response, BaseMessage):
@@ -109,65 +323,10 @@ class CostTrackingModel:
             else:
                 response_text = str(response)
 
-            # Count output tokens
-            output_tokens = self.token_counter.count_tokens(response_text, self.model_name)
-
-            # Calculate cost
-            total_cost, breakdown = self.token_counter.calculate_cost(
-                input_tokens, output_tokens, self.model_name
-            )
-
-            # Calculate duration
-            duration_seconds = (datetime.utcnow() - start_time).total_seconds()
-
-            # Record the call
-            call_record = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "model": self.model_name,
-                "latency_ms": duration_seconds * 1000,
-                "duration_seconds": duration_seconds,
-                **breakdown,
-                **call_context  # Include LangGraph context
-            }
-
-            # Update session totals
-            self.session_costs["total_calls"] += 1
-            self.session_costs["total_tokens"] += breakdown["total_tokens"]
-            self.session_costs["total_cost"] += total_cost
-            self.session_costs["calls"].append(call_record)
-
-            # Send to aggregator if available
-            if self.cost_aggregator:
-                self.cost_aggregator.record_cost(call_record)
-
-            # Track in SQL database if available
-            if self.sql_project_manager and self.project_id:
-                try:
-                    await self.sql_project_manager.track_cost(
-                        project_id=self.project_id,
-                        agent_name=self.agent_name or "unknown_agent",
-                        operation=call_context.get('node_name', 'llm_call'),
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        cost=total_cost,
-                        model_used=self.model_name,
-                        duration_seconds=duration_seconds,
-                        metadata={
-                            "latency_ms": call_record["latency_ms"],
-                            "context": call_context
-                        }
-                    )
-                except Exception as sql_error:
-                    # Log warning but don't fail the call
-                    logger.warning(f"SQL cost tracking failed: {sql_error}")
-
-            # Log the cost
-            logger.info(
-                f"LLM Call: {self.model_name} | "
-                f"Tokens: {input_tokens}/{output_tokens} | "
-                f"Cost: ${total_cost:.6f} | "
-                f"Context: {call_context.get('node_name', 'unknown')}"
-            )
+            breakdown = self._record_success(input_tokens, response_text, duration_seconds, call_context)
+            if cache is not None and isinstance(response_text, str):
+                response_kind = "text" if isinstance(response, str) else "message"
+                await self._cache_store(cache, cache_key, response_text, response_kind, breakdown)
 
             # Attach usage metadata to response if possible
             if hasattr(response, '__dict__') and isinstance(response, BaseMessage):
@@ -176,24 +335,50 @@ class CostTrackingModel:
             return response
 
         except Exception as e:
-            # Still track the failed call
-            call_record = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "model": self.model_name,
-                "input_tokens": input_tokens,
-                "output_tokens": 0,
-                "total_cost": (input_tokens / 1000) *
-                            self.token_counter.PRICING.get(self.model_name, {"input": 0.001})["input"],
-                "error": str(e),
-                **call_context
-            }
-
-            self.session_costs["total_calls"] += 1
-            self.session_costs["calls"].append(call_record)
-
-            logger.error(f"LLM call failed: {e}")
+            self._record_failure(input_tokens, e, call_context)
+            raise
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream response text chunks with automatic cost tracking.
+
+        The call is recorded once the stream completes. Models without
+        ``astream`` fall back to a single chunk from ``ainvoke``.
+        """
+        if not hasattr(self.base_model, 'astream'):
+            response = await self.ainvoke(prompt, **kwargs)
+            yield response.content if isinstance(response, BaseMessage) else str(response)
+            return
+
+        call_context = self._resolve_context(kwargs)
+
+        cache, cache_key = self._cache_lookup(prompt, kwargs, call_context)
+        if cache is not None:
+            entry = await asyncio.to_thread(cache.get, cache_key)
+            if entry is not None:
+                self._record_cache_hit(entry, call_context)
+                yield entry["response"]
+                return
+
+        input_tokens = self.token_counter.count_tokens(prompt, self.model_name)
+        chunks = []
+
+        try:
+            async with get_provider_semaphore(self.provider):
+                start_time = time.perf_counter()
+                async for chunk in self.base_model.astream(prompt, **kwargs):
+                    chunks.append(chunk)
+                    yield chunk
+                duration_seconds = time.perf_counter() - start_time
+        except Exception as e:
+            self._record_failure(input_tokens, e, call_context)
             raise
 
+        response_text = "".join(chunks)
+        breakdown = self._record_success(input_tokens, response_text, duration_seconds, call_context)
+        if cache is not None:
+            await self._cache_store(cache, cache_key, response_text, "message", breakdown)
+
     def invoke(self, prompt: str, **kwargs):
         """Sync version of invoke"""
         return asyncio.run(self.ainvoke(prompt, **kwargs))
@@ -2,6 +2,7 @@ import os
 import logging
 from langchain_deepseek import ChatDeepSeek
 from ..config.settings import DeepseekSettings
+from ..services.http_client_pool import get_http_pool
 
 class DeepseekModel:
     def __init__(self, settings: DeepseekSettings):
@@ -16,7 +17,10 @@ class DeepseekModel:
                 model_name=model_name,
                 api_key=self.api_key,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                # Reuse the process-wide keep-alive connections
+                http_client=get_http_pool().client("deepseek"),
+                http_async_client=get_http_pool().async_client("deepseek")
             )
         except Exception as e:
             logging.error(f"Failed to initialize Deepseek LLM chain: {str(e)}")
@@ -34,6 +38,12 @@ class DeepseekModel:
     async def ainvoke(self, prompt: str):
         return await self.llm.ainvoke(prompt)
     
+    async def astream(self, prompt: str):
+        """Yield response text chunks as the model produces them."""
+        async for chunk in self.llm.astream(prompt):
+            if chunk.content:
+                yield chunk.content
+
     async def generate_message(self, prompt):
         # Generate a message using the LLM
         response = await self.llm.ainvoke(prompt)
@@ -6,6 +6,7 @@ import logging
 from langchain_openai import AzureOpenAIEmbeddings
 from chromadb import Documents, EmbeddingFunction, Embeddings
 from backend.config.settings import Settings
+from backend.services.http_client_pool import get_http_pool
 
 class AzureEmbeddingFunction(EmbeddingFunction):
     """Custom embedding function using Azure OpenAI for ChromaDB."""
@@ -19,7 +20,9 @@ class AzureEmbeddingFunction(EmbeddingFunction):
                 azure_endpoint=settings.api_base,
                 openai_api_key=settings.api_key,
                 openai_api_version=settings.api_version,
-                chunk_size=1000  # Process in chunks to handle rate limits
+                chunk_size=1000,  # Process in chunks to handle rate limits
+                http_client=get_http_pool().client("azure"),
+                http_async_client=get_http_pool().async_client("azure")
             )
             logging.info("Azure OpenAI embeddings initialized successfully")
         except Exception as e:
@@ -0,0 +1,164 @@
+# ABOUTME: Micro-batching embedding function that coalesces concurrent calls into one model call
+# ABOUTME: A single worker thread collects requests over a short window and fans the vectors back out
+
+"""
+Micro-batching embedding function shared by concurrent callers.
+
+Requests from every thread (Chroma queries, ingestion syncs, section searches)
+and coroutine are put on one queue. A single worker thread takes the first
+request, waits a short window for more to arrive and encodes them all in one
+call to the wrapped model, then hands each caller its slice of the vectors.
+Many tiny concurrent batches become a few large ones, which is where CPU
+inference gets its throughput.
+
+Coroutines should use ``aembed`` or run synchronous searches through
+``asyncio.to_thread``; a blocking call made on the event-loop thread is encoded
+directly rather than waiting out the window with the loop stalled.
+"""
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW_MS = 10.0
+DEFAULT_MAX_BATCH_SIZE = 256
+
+_Request = Tuple[List[str], Future]
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class BatchingEmbeddingFunction(EmbeddingFunction):
+    """Embedding function wrapper that coalesces concurrent calls into shared batches."""
+
+    def __init__(self, inner: EmbeddingFunction, window_ms: Optional[float] = None,
+                 max_batch_size: Optional[int] = None):
+        """
+        Args:
+            inner: The embedding function that encodes the coalesced batches
+            window_ms: How long the worker waits for more requests after the first one
+            max_batch_size: Texts per batch; a batch is dispatched as soon as it is full
+        """
+        self.inner = inner
+        self.window = (DEFAULT_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch_size = max_batch_size or DEFAULT_MAX_BATCH_SIZE
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "coalesced_batches": 0, "fallbacks": 0,
+                      "direct_calls": 0}
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose attributes of the wrapped function (model, model_name, count_tokens, ...)
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        if not input:
+            return []
+        if _on_event_loop():
+            # Blocking on the worker here would stall every coroutine for the batch window
+            with self._lock:
+                self.stats["direct_calls"] += 1
+            return list(self.inner(list(input)))
+        return self.submit(list(input)).result()
+
+    async def aembed(self, texts: List[str]) -> Embeddings:
+        """Embed from a coroutine without tying up a thread while the batch runs."""
+        if not texts:
+            return []
+        return await asyncio.wrap_future(self.submit(list(texts)))
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for the next batch; the future resolves to their vectors."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((texts, future))
+        return future
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first[0])
+            deadline = time.monotonic() + self.window
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    # Finish what was collected, then stop
+                    self._encode(batch)
+                    return
+                batch.append(request)
+                size += len(request[0])
+            self._encode(batch)
+
+    def _encode(self, batch: List[_Request]) -> None:
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            vectors = list(self.inner(texts))
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Don't let one caller's bad input fail everyone it was batched with
+            logger.warning(f"Batched embedding of {len(batch)} requests failed ({e}); retrying them one by one")
+            with self._lock:
+                self.stats["fallbacks"] += 1
+            for request in batch:
+                self._encode([request])
+            return
+
+        with self._lock:
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += len(texts)
+            self.stats["batches"] += 1
+            self.stats["coalesced_batches"] += 1 if len(batch) > 1 else 0
+
+        start = 0
+        for request_texts, future in batch:
+            future.set_result(vectors[start:start + len(request_texts)])
+            start += len(request_texts)
+
+    def close(self) -> None:
+        """Stop the worker after the requests already queued are encoded."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["avg_batch_size"] = round(stats["texts"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["window_ms"] = self.window * 1000
+        stats["max_batch_size"] = self.max_batch_size
+        return stats
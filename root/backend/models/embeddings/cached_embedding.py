@@ -0,0 +1,233 @@
+# ABOUTME: Content-hash keyed embedding cache around any ChromaDB embedding function
+# ABOUTME: In-memory LRU plus optional memory-mapped disk store; each call embeds only the misses
+
+"""
+Content-hash keyed embedding cache wrapped around any ChromaDB embedding function.
+
+Identical strings (section headers, HyDE queries, repeated searches) are embedded
+once: vectors are kept in an in-memory LRU and, optionally, in an append-only
+memory-mapped NumPy store on disk. Each call embeds only the cache misses, in a
+single batch.
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 20000
+
+
+def text_key(text: str) -> str:
+    """Content hash used as the cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingDiskStore:
+    """
+    Append-only vector store: ``vectors.f32`` holds rows of float32 values that are
+    read through ``np.memmap``; ``index.txt`` lists the content hash of each row.
+
+    The index is the source of truth: vector rows beyond it are left over from an
+    interrupted write and are truncated before the next append. Writes are serialised
+    with a thread lock only, so a directory must be used by a single process.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._index_path = os.path.join(directory, "index.txt")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._mmap: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+        self._load()
+
+    def _load(self) -> None:
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.dim = json.load(f).get("dim")
+        if not self.dim or not os.path.exists(self._index_path):
+            return
+
+        with open(self._index_path) as f:
+            keys = [line.strip() for line in f if line.strip()]
+        stored_rows = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+        if stored_rows < len(keys):
+            # Interrupted write: only trust rows that have a complete vector
+            logger.warning(f"Embedding store index ahead of vectors; truncating to {stored_rows} rows")
+            keys = keys[:stored_rows]
+            with open(self._index_path, "w") as f:
+                f.writelines(f"{key}\n" for key in keys)
+        elif stored_rows and os.path.getsize(self._vectors_path) > len(keys) * self.dim * 4:
+            # Vectors were appended but their keys never reached the index
+            logger.warning("Embedding store has unindexed vector rows; truncating to the index")
+            self._truncate_vectors(len(keys))
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    def _truncate_vectors(self, rows: int) -> None:
+        with open(self._vectors_path, "r+b") as f:
+            f.truncate(rows * self.dim * 4)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _vectors(self) -> Optional[np.memmap]:
+        if self._mmap is None and self._rows:
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                   shape=(len(self._rows), self.dim))
+        return self._mmap
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            rows = {key: self._rows[key] for key in keys if key in self._rows}
+            if not rows:
+                return {}
+            vectors = self._vectors()
+            return {key: np.array(vectors[row]) for key, row in rows.items()}
+
+    def put_many(self, keys: List[str], vectors: List[np.ndarray]) -> None:
+        with self._lock:
+            new = [(k, v) for k, v in zip(keys, vectors) if k not in self._rows]
+            if not new:
+                return
+            block = np.asarray([v for _, v in new], dtype=np.float32)
+            if self.dim is None:
+                self.dim = int(block.shape[1])
+                with open(self._meta_path, "w") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif block.shape[1] != self.dim:
+                logger.warning(f"Skipping embeddings with dimension {block.shape[1]} (store uses {self.dim})")
+                return
+
+            # Drop orphan rows from a failed earlier append so rows stay aligned with the index
+            indexed_bytes = len(self._rows) * self.dim * 4
+            if os.path.exists(self._vectors_path) and os.path.getsize(self._vectors_path) > indexed_bytes:
+                self._truncate_vectors(len(self._rows))
+            with open(self._vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            with open(self._index_path, "a") as f:
+                f.writelines(f"{key}\n" for key, _ in new)
+
+            start = len(self._rows)
+            for offset, (key, _) in enumerate(new):
+                self._rows[key] = start + offset
+            # Re-map lazily so readers see the appended rows
+            self._mmap = None
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """Embedding function wrapper that serves repeated texts from a content-hash cache."""
+
+    def __init__(self, inner: EmbeddingFunction, max_entries: Optional[int] = None,
+                 disk_dir: Optional[str] = None):
+        """
+        Args:
+            inner: The embedding function that computes cache misses
+            max_entries: Vectors kept in the in-memory LRU
+            disk_dir: Optional directory for the persistent memory-mapped store
+        """
+        self.inner = inner
+        self.max_entries = max_entries or DEFAULT_MEMORY_ENTRIES
+        self.disk_store = EmbeddingDiskStore(disk_dir) if disk_dir else None
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "requested": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "batches": 0,
+            "embedded_tokens": 0,
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose attributes of the wrapped function (model, model_name, ...)
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        if not input:
+            return []
+
+        keys = [text_key(text) for text in input]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            self.stats["requested"] += len(keys)
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.stats["memory_hits"] += sum(1 for key in keys if key in found)
+
+        if self.disk_store is not None and len(found) < len(keys):
+            from_disk = self.disk_store.get_many([key for key in keys if key not in found])
+            found.update(from_disk)
+            self._remember(from_disk)
+            with self._lock:
+                self.stats["disk_hits"] += sum(1 for key in keys if key in from_disk)
+
+        # Embed each distinct missing text once, in a single batch
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, input):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            texts = list(missing.values())
+            vectors = [np.asarray(v, dtype=np.float32) for v in self.inner(texts)]
+            computed = dict(zip(missing.keys(), vectors))
+            found.update(computed)
+            self._remember(computed)
+            if self.disk_store is not None:
+                self.disk_store.put_many(list(computed.keys()), vectors)
+            tokens = self._count_tokens(texts)
+            with self._lock:
+                self.stats["misses"] += sum(1 for key in keys if key in computed)
+                self.stats["batches"] += 1
+                self.stats["embedded_tokens"] += tokens
+
+        return [found[key] for key in keys]
+
+    def _remember(self, vectors: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in vectors.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _count_tokens(self, texts: List[str]) -> int:
+        counter = getattr(self.inner, "count_tokens", None)
+        if counter is not None:
+            try:
+                return int(counter(texts))
+            except Exception as e:
+                logger.debug(f"Embedding token count failed, estimating: {e}")
+        # Rough estimate (~4 characters per token) when the model exposes no tokenizer
+        return sum(max(1, len(text) // 4) for text in texts)
+
+    def clear(self) -> None:
+        """Drop the in-memory cache (the disk store is left untouched)."""
+        with self._lock:
+            self._memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        stats["disk_entries"] = len(self.disk_store) if self.disk_store is not None else None
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["hit_ratio"] = round(hits / stats["requested"], 4) if stats["requested"] else 0.0
+        return stats
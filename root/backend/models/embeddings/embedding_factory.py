@@ -1,26 +1,53 @@
 """
 Factory for creating embedding function instances based on configuration.
 """
+import os
+import re
 import logging
+import importlib
+import threading
+from typing import Any, Dict, Tuple
 from chromadb import EmbeddingFunction
 from backend.config.settings import Settings
-from backend.models.embeddings.azure_embedding import AzureEmbeddingFunction
-from backend.models.embeddings.sentence_transformer_embedding import SentenceTransformerEmbeddingFunction
+from backend.models.embeddings.cached_embedding import CachedEmbeddingFunction, DEFAULT_MEMORY_ENTRIES
+from backend.models.embeddings.batching_embedding import BatchingEmbeddingFunction, DEFAULT_BATCH_WINDOW_MS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Provider -> (module, class). Backends are imported on first use: torch/transformers
+# and the OpenAI SDK take seconds to import.
+EMBEDDING_BACKENDS = {
+    'azure': ('backend.models.embeddings.azure_embedding', 'AzureEmbeddingFunction'),
+    'sentence_transformer': ('backend.models.embeddings.sentence_transformer_embedding',
+                             'SentenceTransformerEmbeddingFunction'),
+    'sentence_transformer_onnx': ('backend.models.embeddings.onnx_embedding',
+                                  'OnnxSentenceTransformerEmbeddingFunction'),
+}
+
 class EmbeddingFactory:
     """
     Factory class to create and return the configured embedding function.
+
+    Instances are cached per (provider, model) so the underlying model weights
+    are loaded once per process and shared by every caller. Concurrent calls
+    that miss the vector cache are coalesced into micro-batches.
     """
 
+    _instances: Dict[Tuple[str, str], EmbeddingFunction] = {}
+    _lock = threading.Lock()
+
     @staticmethod
-    def get_embedding_function() -> EmbeddingFunction:
+    def get_embedding_function(use_cache: bool = True) -> EmbeddingFunction:
         """
         Reads the configuration and returns an instance of the
-        selected embedding function (Azure or Sentence Transformer).
+        selected embedding function (Azure, Sentence Transformer or its
+        quantized ONNX variant).
+
+        Args:
+            use_cache: Return the process-wide shared instance for the configured
+                       provider/model (default). Pass False to force a fresh instance.
 
         Returns:
             EmbeddingFunction: An instance of the configured embedding function.
@@ -31,21 +58,147 @@ class EmbeddingFactory:
         settings = Settings()
         provider = settings.embedding_provider
 
+        if not use_cache:
+            return EmbeddingFactory._create_embedding_function(settings)
+
+        cache_key = (provider, EmbeddingFactory._model_identifier(settings))
+        instance = EmbeddingFactory._instances.get(cache_key)
+        if instance is not None:
+            return instance
+
+        with EmbeddingFactory._lock:
+            # Re-check under the lock so concurrent callers load the model only once
+            instance = EmbeddingFactory._instances.get(cache_key)
+            if instance is None:
+                instance = EmbeddingFactory._with_vector_cache(
+                    EmbeddingFactory._with_micro_batching(EmbeddingFactory._create_embedding_function(settings)),
+                    cache_key
+                )
+                EmbeddingFactory._instances[cache_key] = instance
+            return instance
+
+    @staticmethod
+    def _with_micro_batching(embedding_fn: EmbeddingFunction) -> EmbeddingFunction:
+        """
+        Route calls through a shared batching worker.
+
+        EMBEDDING_BATCH_WINDOW_MS is how long the worker waits to collect concurrent
+        requests (0 disables batching); EMBEDDING_MAX_BATCH_SIZE caps texts per batch.
+        """
+        window_ms = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", DEFAULT_BATCH_WINDOW_MS))
+        if window_ms <= 0:
+            return embedding_fn
+        return BatchingEmbeddingFunction(
+            embedding_fn,
+            window_ms=window_ms,
+            max_batch_size=int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "0")) or None,
+        )
+
+    @staticmethod
+    def _with_vector_cache(embedding_fn: EmbeddingFunction, cache_key: Tuple[str, str]) -> EmbeddingFunction:
+        """
+        Wrap the shared instance in a content-hash keyed embedding cache.
+
+        Controlled by EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_SIZE (in-memory LRU
+        entries) and EMBEDDING_CACHE_DIR (optional memory-mapped store on disk).
+        """
+        if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+            return embedding_fn
+
+        disk_dir = os.getenv("EMBEDDING_CACHE_DIR")
+        if disk_dir:
+            # Vectors from different models must never mix
+            disk_dir = os.path.join(disk_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", "_".join(cache_key)))
+        return CachedEmbeddingFunction(
+            embedding_fn,
+            max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", DEFAULT_MEMORY_ENTRIES)),
+            disk_dir=disk_dir,
+        )
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+        """Hit ratio and embedded-token counts for every cached embedding function."""
+        with EmbeddingFactory._lock:
+            instances = dict(EmbeddingFactory._instances)
+        return {
+            ":".join(key): instance.get_stats()
+            for key, instance in instances.items()
+            if isinstance(instance, CachedEmbeddingFunction)
+        }
+
+    @staticmethod
+    def get_batching_stats() -> Dict[str, Dict[str, Any]]:
+        """Request/batch counts for every micro-batching embedding function."""
+        with EmbeddingFactory._lock:
+            instances = dict(EmbeddingFactory._instances)
+        stats = {}
+        for key, instance in instances.items():
+            batcher = instance.inner if isinstance(instance, CachedEmbeddingFunction) else instance
+            if isinstance(batcher, BatchingEmbeddingFunction):
+                stats[":".join(key)] = batcher.get_stats()
+        return stats
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop all cached embedding function instances (useful for tests or config changes)."""
+        with EmbeddingFactory._lock:
+            instances = list(EmbeddingFactory._instances.values())
+            EmbeddingFactory._instances.clear()
+        for instance in instances:
+            batcher = instance.inner if isinstance(instance, CachedEmbeddingFunction) else instance
+            if isinstance(batcher, BatchingEmbeddingFunction):
+                batcher.close()
+        logger.info("Embedding function cache cleared")
+
+    @staticmethod
+    def _model_identifier(settings: Settings) -> str:
+        """Return the model name that distinguishes instances of the configured provider."""
+        if settings.embedding_provider == 'azure':
+            return settings.azure.embeddings_deployment_name or ""
+        if settings.embedding_provider == 'sentence_transformer':
+            return settings.sentence_transformer.model_name
+        if settings.embedding_provider == 'sentence_transformer_onnx':
+            return f"{settings.sentence_transformer.model_name}:{settings.sentence_transformer.onnx_file}"
+        return ""
+
+    @staticmethod
+    def load_backend(provider: str) -> type:
+        """Import and return the embedding function class for a provider."""
+        module_name, class_name = EMBEDDING_BACKENDS[provider]
+        return getattr(importlib.import_module(module_name), class_name)
+
+    @staticmethod
+    def _create_embedding_function(settings: Settings) -> EmbeddingFunction:
+        """Instantiate the embedding function for the configured provider."""
+        provider = settings.embedding_provider
+
         logger.info(f"Selected embedding provider: {provider}")
 
         if provider == 'azure':
             logger.info("Initializing Azure OpenAI Embedding Function...")
             # AzureEmbeddingFunction reads its own settings internally
-            return AzureEmbeddingFunction()
+            return EmbeddingFactory.load_backend(provider)()
         elif provider == 'sentence_transformer':
             logger.info("Initializing Sentence Transformer Embedding Function...")
             # Pass the model name from settings
             model_name = settings.sentence_transformer.model_name
             logger.info(f"Using Sentence Transformer model: {model_name}")
-            return SentenceTransformerEmbeddingFunction(model_name=model_name)
+            return EmbeddingFactory.load_backend(provider)(model_name=model_name)
+        elif provider == 'sentence_transformer_onnx':
+            logger.info("Initializing ONNX Runtime Sentence Transformer Embedding Function...")
+            st_settings = settings.sentence_transformer
+            logger.info(f"Using ONNX model: {st_settings.model_name} ({st_settings.onnx_file})")
+            return EmbeddingFactory.load_backend(provider)(
+                model_name=st_settings.model_name,
+                onnx_file=st_settings.onnx_file,
+                num_threads=st_settings.onnx_threads
+            )
         else:
             logger.error(f"Unknown embedding provider configured: {provider}")
-            raise ValueError(f"Unknown embedding provider: {provider}. Please choose 'azure' or 'sentence_transformer'.")
+            raise ValueError(
+                f"Unknown embedding provider: {provider}. "
+                "Please choose 'azure', 'sentence_transformer' or 'sentence_transformer_onnx'."
+            )
 
 # Example usage (optional, for testing)
 if __name__ == '__main__':
@@ -0,0 +1,128 @@
+# ABOUTME: Tokenizers of the configured embedding model (Hugging Face fast tokenizer or tiktoken)
+# ABOUTME: Batched token counting and token-boundary splitting for token-budgeted chunking
+
+"""
+Tokenizers matching the configured embedding model, for token-budgeted chunking.
+
+Sentence Transformer models use the Hugging Face fast (Rust) tokenizer from the
+model repository, with the model's ``max_seq_length`` as the budget; Azure
+OpenAI embeddings use tiktoken's ``cl100k_base`` with an 8191 token input limit.
+Only the tokenizer files are loaded, never the model weights, so this is cheap
+enough for ingestion worker processes.
+"""
+import os
+import json
+import logging
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional
+
+from backend.config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+AZURE_EMBEDDING_MAX_TOKENS = 8191
+
+
+class EmbeddingTokenizer(ABC):
+    """Batched token counting and token-boundary splitting for one embedding model."""
+
+    def __init__(self, name: str, max_tokens: int):
+        """
+        Args:
+            name: Model identifier (for logs and metrics)
+            max_tokens: Content tokens the model embeds before truncating (special tokens excluded)
+        """
+        self.name = name
+        self.max_tokens = max_tokens
+
+    @abstractmethod
+    def count(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts in one batched call."""
+        pass
+
+    @abstractmethod
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Cut text into consecutive pieces of at most ``max_tokens`` tokens."""
+        pass
+
+
+class HuggingFaceTokenizer(EmbeddingTokenizer):
+    """Fast tokenizer loaded from a Hugging Face model repository."""
+
+    def __init__(self, repo_id: str, max_seq_length: Optional[int] = None):
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_pretrained(repo_id)
+        # Count everything; the repo's tokenizer.json may ship with truncation/padding enabled
+        self.tokenizer.no_truncation()
+        self.tokenizer.no_padding()
+        special_tokens = len(self.tokenizer.encode("", add_special_tokens=True).ids)
+        max_seq_length = max_seq_length or sentence_transformer_max_seq_length(repo_id) or 512
+        super().__init__(repo_id, max_seq_length - special_tokens)
+
+    def count(self, texts: List[str]) -> List[int]:
+        return [len(encoding.ids) for encoding in self.tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        offsets = self.tokenizer.encode(text, add_special_tokens=False).offsets
+        return [
+            text[offsets[start][0]:offsets[min(start + max_tokens, len(offsets)) - 1][1]]
+            for start in range(0, len(offsets), max_tokens)
+        ]
+
+
+class TiktokenTokenizer(EmbeddingTokenizer):
+    """tiktoken encoding used by OpenAI/Azure embedding models."""
+
+    def __init__(self, encoding_name: str = "cl100k_base", max_tokens: int = AZURE_EMBEDDING_MAX_TOKENS):
+        import tiktoken
+
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        super().__init__(encoding_name, max_tokens)
+
+    def count(self, texts: List[str]) -> List[int]:
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        tokens = self.encoding.encode_ordinary(text)
+        return [self.encoding.decode(tokens[start:start + max_tokens]) for start in range(0, len(tokens), max_tokens)]
+
+
+def sentence_transformer_repo_id(model_name: str) -> str:
+    # SentenceTransformer resolves bare names like "all-MiniLM-L6-v2" to the sentence-transformers org
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def sentence_transformer_max_seq_length(repo_id: str) -> Optional[int]:
+    """max_seq_length from the model's sentence_bert_config.json (e.g. 256 for all-MiniLM-L6-v2)."""
+    try:
+        from huggingface_hub import hf_hub_download
+
+        with open(hf_hub_download(repo_id, "sentence_bert_config.json")) as f:
+            return json.load(f).get("max_seq_length")
+    except Exception as e:
+        logger.warning(f"Could not read max_seq_length for {repo_id}: {e}")
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_embedding_tokenizer() -> Optional[EmbeddingTokenizer]:
+    """
+    Tokenizer of the configured embedding model, loaded once per process.
+
+    EMBEDDING_MAX_TOKENS overrides the model's limit. Returns None (and logs) when
+    the tokenizer cannot be loaded, so callers can fall back to character sizing.
+    """
+    settings = Settings()
+    override = int(os.getenv("EMBEDDING_MAX_TOKENS", "0")) or None
+    try:
+        if settings.embedding_provider == "azure":
+            return TiktokenTokenizer(max_tokens=override or AZURE_EMBEDDING_MAX_TOKENS)
+        if settings.embedding_provider in ("sentence_transformer", "sentence_transformer_onnx"):
+            repo_id = sentence_transformer_repo_id(settings.sentence_transformer.model_name)
+            return HuggingFaceTokenizer(repo_id, max_seq_length=override)
+        logger.error(f"No tokenizer for embedding provider: {settings.embedding_provider}")
+    except Exception as e:
+        logger.error(f"Failed to load the embedding model's tokenizer: {e}")
+    return None
@@ -0,0 +1,165 @@
+# ABOUTME: Sentence Transformer embeddings on ONNX Runtime from the model's int8-quantized export
+# ABOUTME: Uses the model's fast tokenizer, pooling and normalization so vectors match the PyTorch model
+
+"""
+Sentence Transformer embeddings served by ONNX Runtime from an int8-quantized export.
+
+Sentence Transformers model repositories publish ONNX exports next to the
+PyTorch weights, including dynamically quantized int8 variants
+(``onnx/model_qint8_avx512.onnx``, ``onnx/model_quint8_avx2.onnx``,
+``onnx/model_qint8_arm64.onnx``). This function runs one of them on CPU with the
+model's own fast tokenizer, pooling and normalization, so vectors are
+interchangeable with SentenceTransformerEmbeddingFunction's up to quantization
+error. No PyTorch is needed at inference time.
+"""
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+from backend.config.settings import Settings
+from backend.models.embeddings.embedding_tokenizer import (
+    sentence_transformer_max_seq_length,
+    sentence_transformer_repo_id,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ONNX_BATCH_SIZE = 32
+
+
+def _repo_file(repo_id: str, filename: str) -> str:
+    """Local path of a file in the model repository (downloaded on first use)."""
+    from huggingface_hub import hf_hub_download
+
+    return hf_hub_download(repo_id, filename)
+
+
+def _repo_json(repo_id: str, filename: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_repo_file(repo_id, filename)) as f:
+            return json.load(f)
+    except Exception as e:
+        logger.debug(f"{filename} not available for {repo_id}: {e}")
+        return None
+
+
+class OnnxSentenceTransformerEmbeddingFunction(EmbeddingFunction):
+    """Quantized ONNX Runtime inference for Sentence Transformer models on CPU."""
+
+    def __init__(self, model_name: Optional[str] = None, onnx_file: Optional[str] = None,
+                 num_threads: Optional[int] = None, batch_size: int = DEFAULT_ONNX_BATCH_SIZE):
+        """
+        Args:
+            model_name: Sentence Transformer model (defaults to settings)
+            onnx_file: ONNX file inside the model repository, or a local .onnx path
+            num_threads: ONNX Runtime intra-op threads (0 or None = runtime default)
+            batch_size: Texts per inference call
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        settings = Settings().sentence_transformer
+        self.model_name = model_name or settings.model_name
+        self.onnx_file = onnx_file or settings.onnx_file
+        num_threads = settings.onnx_threads if num_threads is None else num_threads
+        self.batch_size = batch_size
+        repo_id = sentence_transformer_repo_id(self.model_name)
+
+        try:
+            model_path = self.onnx_file if os.path.isfile(self.onnx_file) else _repo_file(repo_id, self.onnx_file)
+            options = ort.SessionOptions()
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+                options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+            self.input_names = {i.name for i in self.session.get_inputs()}
+            self.output_names = [o.name for o in self.session.get_outputs()]
+
+            max_seq_length = sentence_transformer_max_seq_length(repo_id) or 512
+            self.tokenizer = Tokenizer.from_pretrained(repo_id)
+            self.tokenizer.enable_truncation(max_length=max_seq_length)
+            # Pad to the longest text in each batch with the model's own pad token
+            pad_token = (self.tokenizer.padding or {}).get("pad_token") or (
+                "[PAD]" if self.tokenizer.token_to_id("[PAD]") is not None else "<pad>"
+            )
+            self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+            self.pooling = self._pooling_mode(_repo_json(repo_id, "1_Pooling/config.json"))
+            modules = _repo_json(repo_id, "modules.json") or []
+            self.normalize = any(m.get("type", "").endswith("Normalize") for m in modules)
+            logger.info(
+                f"ONNX embedding model '{self.model_name}' ({self.onnx_file}) initialized: "
+                f"{self.pooling} pooling, normalize={self.normalize}, threads={num_threads or 'default'}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize ONNX embedding model '{self.model_name}': {str(e)}")
+            raise
+
+    @staticmethod
+    def _pooling_mode(config: Optional[Dict[str, Any]]) -> str:
+        if not config:
+            return "mean"
+        for mode in ("cls_token", "max_tokens", "mean_tokens"):
+            if config.get(f"pooling_mode_{mode}"):
+                return mode.split("_")[0]
+        return "mean"
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            return token_embeddings[:, 0]
+        mask = attention_mask[..., None].astype(np.float32)
+        if self.pooling == "max":
+            return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+        return (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        outputs = self.session.run(None, {name: value for name, value in feeds.items() if name in self.input_names})
+        named = dict(zip(self.output_names, outputs))
+        if "sentence_embedding" in named:
+            embeddings = named["sentence_embedding"]
+        else:
+            embeddings = self._pool(named.get("last_hidden_state", outputs[0]), feeds["attention_mask"])
+        if self.normalize:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        """
+        Generate embeddings for documents following ChromaDB's EmbeddingFunction protocol.
+
+        Args:
+            input: List of text documents to embed.
+
+        Returns:
+            Array of embeddings, one row per document.
+        """
+        if not input:
+            logger.warning("Received empty input list for embedding.")
+            return []
+        try:
+            # Length-sorted batches keep padding (and wasted compute) low
+            order = sorted(range(len(input)), key=lambda i: len(input[i]))
+            embeddings: List[Optional[np.ndarray]] = [None] * len(input)
+            for start in range(0, len(order), self.batch_size):
+                indices = order[start:start + self.batch_size]
+                for index, vector in zip(indices, self._encode_batch([input[i] for i in indices])):
+                    embeddings[index] = vector
+            return np.stack(embeddings)
+        except Exception as e:
+            logger.error(f"Error generating ONNX embeddings with {self.model_name}: {str(e)}")
+            raise
+
+    def count_tokens(self, input: Documents) -> int:
+        """Number of tokens the model's tokenizer produces for the documents."""
+        return sum(sum(e.attention_mask) for e in self.tokenizer.encode_batch(list(input), add_special_tokens=False))
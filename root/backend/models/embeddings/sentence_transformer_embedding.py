@@ -77,3 +77,8 @@ class SentenceTransformerEmbeddingFunction(EmbeddingFunction):
             # Depending on the desired behavior, you might want to return empty list
             # or partial results if applicable, but raising is often safer.
             raise
+
+    def count_tokens(self, input: Documents) -> int:
+        """Number of tokens the model's tokenizer produces for the documents."""
+        encoded = self.model.tokenizer(list(input), add_special_tokens=False)
+        return sum(len(ids) for ids in encoded["input_ids"])
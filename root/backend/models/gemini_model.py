@@ -94,6 +94,27 @@ class GeminiModel:
             logger.exception(f"Error during asynchronous Gemini invoke: {str(e)}")
             raise Exception(f"Gemini API call failed (async): {str(e)}")
 
+    async def astream(self, prompt: str):
+        """
+        Asynchronously streams the Gemini response using LangChain.
+
+        Args:
+            prompt: The input prompt string.
+
+        Yields:
+            Text chunks as they are generated.
+
+        Raises:
+            Exception: If the API call fails.
+        """
+        try:
+            async for chunk in self.llm.astream([HumanMessage(content=prompt)]):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            logger.exception(f"Error during streaming Gemini invoke: {str(e)}")
+            raise Exception(f"Gemini API call failed (stream): {str(e)}")
+
     def configure_tracking(self, **kwargs):
         """
         Stub method for compatibility with cost tracking decorator.
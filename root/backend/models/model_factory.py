@@ -1,18 +1,39 @@
 import logging
-from typing import Optional, Union, Any
-from .claude_model import ClaudeModel
-from .deepseek_model import DeepseekModel
-from .openai_model import OpenAIModel
-from .azure_model import AzureModel
-from .openrouter_model import OpenRouterModel
-from .gemini_model import GeminiModel  # Import the new GeminiModel
+import importlib
+from typing import Optional, Union, Any, TYPE_CHECKING
 from ..config.settings import Settings
 
+if TYPE_CHECKING:
+    from .claude_model import ClaudeModel
+    from .deepseek_model import DeepseekModel
+    from .openai_model import OpenAIModel
+    from .azure_model import AzureModel
+    from .openrouter_model import OpenRouterModel
+    from .gemini_model import GeminiModel
+
+# Provider -> (module, class). Provider SDKs are heavy to import, so each model
+# module is only imported when that provider is first requested.
+PROVIDER_MODELS = {
+    'deepseek': ('.deepseek_model', 'DeepseekModel'),
+    'claude': ('.claude_model', 'ClaudeModel'),
+    'openai': ('.openai_model', 'OpenAIModel'),
+    'azure': ('.azure_model', 'AzureModel'),
+    'openrouter': ('.openrouter_model', 'OpenRouterModel'),
+    'gemini': ('.gemini_model', 'GeminiModel'),
+}
+
+
+def load_model_class(provider: str) -> Any:
+    """Import and return the model class for a provider."""
+    module_name, class_name = PROVIDER_MODELS[provider]
+    return getattr(importlib.import_module(module_name, __package__), class_name)
+
+
 class ModelFactory:
     def __init__(self):
         self.settings = Settings()
         
-    def create_model(self, provider: str, specific_model: Optional[str] = None) -> Optional[Union[ClaudeModel, DeepseekModel, OpenAIModel, AzureModel, OpenRouterModel, GeminiModel]]: # Add GeminiModel to type hint
+    def create_model(self, provider: str, specific_model: Optional[str] = None) -> Optional[Union["ClaudeModel", "DeepseekModel", "OpenAIModel", "AzureModel", "OpenRouterModel", "GeminiModel"]]:
         """
         Create and return an instance of the specified LLM model.
 
@@ -29,25 +50,14 @@ class ModelFactory:
         try:
             provider = provider.lower()
 
-            if provider in ['deepseek', 'claude', 'openai', 'azure', 'openrouter', 'gemini']:
+            if provider in PROVIDER_MODELS:
                 model_settings = self.settings.get_model_settings(provider)
 
                 # Override the default model name if specific model is provided
                 if specific_model:
                     model_settings.model_name = specific_model
 
-                if provider == 'deepseek':
-                    return DeepseekModel(model_settings)
-                elif provider == 'claude':
-                    return ClaudeModel(model_settings)
-                elif provider == 'openai':
-                    return OpenAIModel(model_settings)
-                elif provider == 'azure':
-                    return AzureModel(model_settings)
-                elif provider == 'openrouter':
-                    return OpenRouterModel(model_settings)
-                elif provider == 'gemini': # Add case for Gemini
-                    return GeminiModel(model_settings)
+                return load_model_class(provider)(model_settings)
 
             return None
 
@@ -1,6 +1,7 @@
 import logging
 from langchain_openai import ChatOpenAI
 from ..config.settings import OpenAISettings
+from ..services.http_client_pool import get_http_pool
 
 class OpenAIModel:
     def __init__(self, settings: OpenAISettings):
@@ -15,7 +16,10 @@ class OpenAIModel:
                 model=settings.model_name,
                 openai_api_key=settings.api_key,
                 temperature=settings.temperature,
-                max_tokens=settings.max_tokens
+                max_tokens=settings.max_tokens,
+                # Reuse the process-wide keep-alive connections
+                http_client=get_http_pool().client("openai"),
+                http_async_client=get_http_pool().async_client("openai")
             )
         except Exception as e:
             logging.error(f"Failed to initialize OpenAI LLM chain: {str(e)}")
@@ -32,3 +36,9 @@ class OpenAIModel:
 
     async def ainvoke(self, prompt: str):
         return await self.llm.ainvoke(prompt)
+
+    async def astream(self, prompt: str):
+        """Yield response text chunks as the model produces them."""
+        async for chunk in self.llm.astream(prompt):
+            if chunk.content:
+                yield chunk.content
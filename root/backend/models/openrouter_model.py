@@ -1,9 +1,8 @@
 import logging
 import json
-import requests
-import aiohttp
 import re
 from ..config.settings import OpenRouterSettings
+from ..services.http_client_pool import get_http_pool
 
 class OpenRouterModel:
     def __init__(self, settings: OpenRouterSettings):
@@ -13,12 +12,13 @@ class OpenRouterModel:
             self.temperature = 0.7
             self.max_tokens = settings.max_tokens
             
-            # Set up headers
+            # Set up headers (optional attribution headers are omitted when unset)
             self.headers = {
                 "Authorization": f"Bearer {settings.api_key}",
                 "Content-Type": "application/json",
-                **settings.headers
+                **{name: value for name, value in settings.headers.items() if value is not None}
             }
+            self.base_url = settings.base_url.strip()
         except Exception as e:
             logging.error(f"OpenRouter initialization failed: {str(e)}")
             raise
@@ -55,11 +55,11 @@ class OpenRouterModel:
                 "max_tokens": self.max_tokens
             }
 
-            # Make the API request
-            response = requests.post(
-                self.settings.base_url,
+            # Make the API request on a pooled keep-alive connection
+            response = get_http_pool().client("openrouter").post(
+                self.base_url,
                 headers=self.headers,
-                data=json.dumps(data)
+                content=json.dumps(data)
             )
 
             # Check for successful response
@@ -106,22 +106,72 @@ class OpenRouterModel:
                 "max_tokens": self.max_tokens
             }
 
-            # Make the async API request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.settings.base_url,
-                    headers=self.headers,
-                    json=data
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        extracted_response = self.extract_response(result["choices"][0]["message"]["content"])
-                        return extracted_response
-                    else:
-                        error_msg = f"OpenRouter Async API error: {response.status}, {await response.text()}"
-                        logging.error(error_msg)
-                        raise Exception(error_msg)
+            # Make the async API request on a pooled keep-alive connection
+            response = await get_http_pool().async_client("openrouter").post(
+                self.base_url,
+                headers=self.headers,
+                json=data
+            )
+            if response.status_code == 200:
+                result = response.json()
+                extracted_response = self.extract_response(result["choices"][0]["message"]["content"])
+                return extracted_response
+            else:
+                error_msg = f"OpenRouter Async API error: {response.status_code}, {response.text}"
+                logging.error(error_msg)
+                raise Exception(error_msg)
 
         except Exception as e:
             logging.error(f"OpenRouter async invoke error: {str(e)}")
             raise
+
+    async def astream(self, prompt):
+        """
+        Asynchronously stream the model response as text chunks.
+        
+        Args:
+            prompt: Either a string or a list of message dictionaries
+        """
+        if isinstance(prompt, str):
+            messages = [{"role": "user", "content": prompt}]
+        else:
+            messages = prompt
+
+        data = {
+            "model": self.settings.model_name,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": True
+        }
+
+        try:
+            async with get_http_pool().async_client("openrouter").stream(
+                "POST",
+                self.base_url,
+                headers=self.headers,
+                json=data
+            ) as response:
+                if response.status_code != 200:
+                    error_msg = f"OpenRouter Stream API error: {response.status_code}, {(await response.aread()).decode('utf-8', 'replace')}"
+                    logging.error(error_msg)
+                    raise Exception(error_msg)
+
+                # Server-sent events: "data: {...}" lines, terminated by "data: [DONE]"
+                async for raw_line in response.aiter_lines():
+                    line = raw_line.strip()
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(payload)["choices"][0].get("delta", {})
+                    except (json.JSONDecodeError, KeyError, IndexError):
+                        continue
+                    if delta.get("content"):
+                        yield delta["content"]
+
+        except Exception as e:
+            logging.error(f"OpenRouter async stream error: {str(e)}")
+            raise
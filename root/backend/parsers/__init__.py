@@ -3,11 +3,22 @@ File parsing module for handling different file types using LangChain loaders.
 """
 
 from .base import BaseParser, ContentStructure
-from .markdown_parser import MarkdownParser
-from .python_parser import PythonParser
-from .notebook_parser import NotebookParser
 from .factory import ParserFactory
 
+_LAZY_PARSERS = {
+    'MarkdownParser': '.markdown_parser',
+    'PythonParser': '.python_parser',
+    'NotebookParser': '.notebook_parser',
+}
+
+
+def __getattr__(name):
+    # Parser modules are imported on first use
+    if name in _LAZY_PARSERS:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_PARSERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     'BaseParser',
     'ContentStructure',
@@ -3,7 +3,7 @@ Simplified base parser interface for file content extraction.
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 from pathlib import Path
 
 @dataclass
@@ -13,6 +13,19 @@ class ContentStructure:
     code_segments: List[str]  # List of code segments extracted from the file
     content_type: str  # Type of content (markdown, python, notebook)
     metadata: Optional[Dict[str, str]] = field(default_factory=dict)  # Optional metadata about the content
+    # Optional factory for a lazy stream of content sections (e.g. notebook cells) used instead of main_content
+    sections: Optional[Callable[[], Iterator[str]]] = field(default=None, repr=False, compare=False)
+
+    def has_content(self) -> bool:
+        """True if there is main content or a section stream to read."""
+        return bool(self.main_content) or self.sections is not None
+
+    def iter_sections(self) -> Iterator[str]:
+        """Content sections in order: the streamed sections if present, else the main content."""
+        if self.sections is not None:
+            yield from self.sections()
+        elif self.main_content:
+            yield self.main_content
 
 class BaseParser(ABC):
     """Base parser for extracting content from files."""
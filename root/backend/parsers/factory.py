@@ -1,23 +1,35 @@
 """
 Factory class for creating appropriate parsers based on file type.
 """
+import importlib
 from pathlib import Path
-from typing import Type
+from typing import Dict, Tuple, Type, Union
 
 from .base import BaseParser
-from .markdown_parser import MarkdownParser
-from .python_parser import PythonParser
-from .notebook_parser import NotebookParser
 
 class ParserFactory:
-    """Factory class for creating file parsers."""
+    """Factory class for creating file parsers.
+
+    Built-in parsers are registered by module and class name and imported the
+    first time a file of their type is parsed.
+    """
     
-    _FILE_EXTENSIONS = {
-        '.md': MarkdownParser,
-        '.markdown': MarkdownParser,
-        '.py': PythonParser,
-        '.ipynb': NotebookParser
+    _FILE_EXTENSIONS: Dict[str, Union[Type[BaseParser], Tuple[str, str]]] = {
+        '.md': ('.markdown_parser', 'MarkdownParser'),
+        '.markdown': ('.markdown_parser', 'MarkdownParser'),
+        '.py': ('.python_parser', 'PythonParser'),
+        '.ipynb': ('.notebook_parser', 'NotebookParser')
     }
+
+    @classmethod
+    def get_parser_class(cls, extension: str) -> Type[BaseParser]:
+        """Parser class registered for an extension, importing it on first use."""
+        parser_class = cls._FILE_EXTENSIONS[extension]
+        if isinstance(parser_class, tuple):
+            module_name, class_name = parser_class
+            parser_class = getattr(importlib.import_module(module_name, __package__), class_name)
+            cls._FILE_EXTENSIONS[extension] = parser_class
+        return parser_class
     
     @classmethod
     def get_parser(cls, file_path: str) -> BaseParser:
@@ -41,8 +53,7 @@ class ParserFactory:
                 f"Supported types are: {supported}"
             )
         
-        parser_class = cls._FILE_EXTENSIONS[file_ext]
-        return parser_class(file_path)
+        return cls.get_parser_class(file_ext)(file_path)
     
     @classmethod
     def register_parser(
@@ -1,51 +1,181 @@
 """
-Simplified Jupyter Notebook parser using LangChain.
+Streaming Jupyter Notebook parser.
+
+Cells are read one at a time from the notebook's top-level ``cells`` array with
+an incremental scanner, so memory is bounded by the largest cell rather than the
+file. Binary outputs (images, PDFs, ...) are replaced by a short placeholder and
+long text outputs are truncated before the cell text reaches the splitters.
 """
-from typing import Dict, List
-from langchain_community.document_loaders import NotebookLoader
+import json
 import logging
+import re
+from typing import Any, Dict, Iterator, Optional
 
 from .base import BaseParser, ContentStructure
 
+# Structural characters outside strings
+_STRUCTURE = re.compile(r'["{}\[\]]')
+
+# Output mimetypes rendered as text, in order of preference
+TEXT_MIMETYPES = ("text/plain", "text/markdown")
+
+
+def iter_notebook_cells(file_path: str, read_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the raw cell dicts of a notebook one at a time.
+
+    Only the text of the cell currently being read (plus one read block) is kept
+    in memory; everything before it is discarded as the scan advances.
+
+    Args:
+        file_path: Path to the .ipynb file
+        read_size: Characters read from the file per step
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0                 # scan position in buf
+        depth = 0               # nesting depth at pos
+        in_string = False
+        string_start = 0
+        last_top_level_string: Optional[str] = None
+        cells_depth: Optional[int] = None   # depth inside the "cells" array
+        cell_start: Optional[int] = None
+        eof = False
+
+        while True:
+            if in_string:
+                # str.find is much faster than a regex over long strings (e.g. base64 outputs)
+                quote = buf.find('"', pos)
+                backslash = buf.find("\\", pos, quote if quote != -1 else len(buf))
+                if backslash != -1 and backslash + 1 < len(buf):
+                    pos = backslash + 2  # skip the escaped character
+                    continue
+                if backslash == -1 and quote != -1:
+                    in_string = False
+                    pos = quote + 1
+                    if depth == 1 and cell_start is None:
+                        last_top_level_string = buf[string_start:pos]
+                    continue
+                # No closing quote yet (or a backslash at the very end): rescan only the new data
+                pos = backslash if backslash != -1 else len(buf)
+            else:
+                match = _STRUCTURE.search(buf, pos)
+                if match:
+                    char, index = match.group(), match.start()
+                    pos = match.end()
+                    if char == '"':
+                        in_string, string_start = True, index
+                    elif char in "{[":
+                        if char == "{" and cells_depth is not None and depth == cells_depth:
+                            cell_start = index
+                        if char == "[" and depth == 1 and cells_depth is None and last_top_level_string == '"cells"':
+                            cells_depth = 2
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if cells_depth is not None and depth == cells_depth and char == "}" and cell_start is not None:
+                            yield json.loads(buf[cell_start:pos])
+                            cell_start = None
+                        elif cells_depth is not None and depth == cells_depth - 1:
+                            return  # end of the cells array
+                    continue
+                pos = len(buf)
+
+            # Need more input; drop what the scan no longer needs
+            if eof:
+                return
+            keep_from = cell_start if cell_start is not None else (string_start if in_string else pos)
+            buf, pos = buf[keep_from:], pos - keep_from
+            string_start -= keep_from
+            if cell_start is not None:
+                cell_start = 0
+            # Grow reads with the buffer so a huge cell isn't re-copied once per block
+            block = f.read(max(read_size, len(buf)))
+            eof = not block
+            buf += block
+
+
+def _as_text(value: Any) -> str:
+    return "".join(value) if isinstance(value, list) else (value or "")
+
+
+def format_cell(cell: Dict[str, Any], max_output_length: int, language: str = "python") -> str:
+    """
+    Render a notebook cell as text for chunking.
+
+    Code cells become fenced code blocks followed by their text outputs; binary
+    outputs are replaced by a placeholder naming their mimetypes.
+    """
+    source = _as_text(cell.get("source")).strip()
+    if cell.get("cell_type") != "code":
+        return source
+
+    parts = [f"```{language}\n{source}\n```"] if source else []
+    for output in cell.get("outputs", []):
+        output_type = output.get("output_type")
+        if output_type == "stream":
+            text = _as_text(output.get("text"))
+        elif output_type == "error":
+            text = f"{output.get('ename', 'Error')}: {output.get('evalue', '')}"
+        else:
+            data = output.get("data", {})
+            text = next((_as_text(data[mime]) for mime in TEXT_MIMETYPES if mime in data), None)
+            if text is None:
+                text = f"[{', '.join(sorted(data)) or 'binary'} output omitted]"
+        text = text.strip()
+        if len(text) > max_output_length:
+            text = text[:max_output_length] + " ..."
+        if text:
+            parts.append(f"Output:\n{text}")
+    return "\n\n".join(parts)
+
+
 class NotebookParser(BaseParser):
     """
-    Parser for Jupyter Notebook files using LangChain's NotebookLoader.
-    Extracts the combined content of all cells. Relies on downstream nodes
-    for structural splitting and chunking.
+    Parser for Jupyter Notebook files.
+    Exposes cells as a lazy stream of text sections; the chunking step feeds
+    them straight into the splitters.
     """
-    # Default max output length for NotebookLoader
+    # Default max output length per cell output
     MAX_OUTPUT_LENGTH = 1000
 
+    def iter_sections(self, metadata: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Yield the text of each non-empty cell in order.
+
+        Args:
+            metadata: Optional dict updated with cell counts once the stream is exhausted
+        """
+        num_cells = 0
+        omitted_outputs = 0
+        for cell in iter_notebook_cells(str(self.file_path)):
+            num_cells += 1
+            omitted_outputs += sum(
+                1 for output in cell.get("outputs", [])
+                if output.get("data") and not any(mime in output["data"] for mime in TEXT_MIMETYPES)
+            )
+            text = format_cell(cell, self.MAX_OUTPUT_LENGTH)
+            if text:
+                yield text
+        if metadata is not None:
+            metadata["num_cells_loaded"] = num_cells
+            metadata["binary_outputs_omitted"] = omitted_outputs
+
     def parse(self) -> ContentStructure:
-        """Parse notebook file using LangChain's NotebookLoader."""
+        """Return a content structure whose sections are streamed from the notebook on demand."""
         try:
-            # Use LangChain's NotebookLoader to parse the notebook
-            loader = NotebookLoader(
-                str(self.file_path),
-                include_outputs=True, # Include cell outputs
-                max_output_length=self.MAX_OUTPUT_LENGTH, # Limit output length
-                remove_newline=True # Removes excessive newlines
-            )
-            
-            # Load documents (each document usually represents a cell)
-            documents = loader.load()
-            
-            # Concatenate the page_content of all loaded documents
-            # Add a simple separator to hint at cell boundaries for splitters
-            combined_content = "\n\n---\n\n".join([doc.page_content for doc in documents if doc.page_content.strip()])
-            
-            # Basic metadata (more can be added in prepare_metadata node)
-            metadata = {
-                "num_cells_loaded": len(documents)
-            }
-
-            # Return the combined content as main_content.
-            # The chunk_content node will handle splitting based on content type (code vs markdown).
+            # Fail fast on files that aren't notebooks; the cells themselves are read lazily
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                if f.read(4096).lstrip()[:1] != "{":
+                    raise ValueError("not a JSON notebook")
+
+            metadata: Dict[str, Any] = {}
             return ContentStructure(
-                main_content=combined_content,
-                code_segments=[], # Let chunk_content handle code identification/splitting
+                main_content="",
+                code_segments=[],
                 content_type="jupyter_notebook",
-                metadata=metadata
+                metadata=metadata,
+                sections=lambda: self.iter_sections(metadata)
             )
         except Exception as e:
             logging.exception(f"Error parsing notebook file {self.file_path}: {e}")
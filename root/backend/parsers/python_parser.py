@@ -17,6 +17,8 @@ class PythonParser(BaseParser):
         sections = []
         try:
             tree = ast.parse(content)
+            # Split once; slicing per node keeps parsing linear in the file size
+            source_lines = content.split('\n')
             
             # Add module docstring if present
             if (docstring := ast.get_docstring(tree)):
@@ -31,7 +33,7 @@ class PythonParser(BaseParser):
                     # Get the source code for this node
                     start = node.lineno - 1
                     end = node.end_lineno
-                    lines = content.split('\n')[start:end]
+                    lines = source_lines[start:end]
                     
                     sections.append({
                         "content": '\n'.join(lines),
@@ -41,7 +43,7 @@ class PythonParser(BaseParser):
                     # Include top-level assignments
                     start = node.lineno - 1
                     end = node.end_lineno
-                    lines = content.split('\n')[start:end]
+                    lines = source_lines[start:end]
                     
                     sections.append({
                         "content": '\n'.join(lines),
@@ -30,6 +30,10 @@ class CostAggregator:
         self.total_calls = 0
         self.total_duration = 0.0
 
+        # LLM response cache hits (recorded as zero-cost calls)
+        self.cache_hits = 0
+        self.cost_saved = 0.0
+
         # Detailed call history
         self.call_history = []
 
@@ -82,6 +86,10 @@ class CostAggregator:
         duration = call_record.get("duration_seconds", 0.0)
         self.total_duration += duration
 
+        if call_record.get("cache_hit"):
+            self.cache_hits += 1
+            self.cost_saved += call_record.get("saved_cost", 0.0)
+
         # Update by agent
         self.costs_by_agent[agent_name]["total_cost"] += cost
         self.costs_by_agent[agent_name]["total_tokens"] += tokens
@@ -135,6 +143,8 @@ class CostAggregator:
             "total_duration": round(self.total_duration, 2),
             "average_cost_per_call": round(self.total_cost / max(self.total_calls, 1), 6),
             "average_duration_per_call": round(self.total_duration / max(self.total_calls, 1), 2),
+            "cache_hits": self.cache_hits,
+            "cost_saved": round(self.cost_saved, 6),
 
             # By agent breakdown
             "by_agent": {
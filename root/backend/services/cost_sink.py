@@ -0,0 +1,228 @@
+# ABOUTME: Write-behind sink that buffers LLM cost records and bulk-inserts them into cost_tracking
+# ABOUTME: Flushes on a size or time threshold and on application shutdown so no records are lost
+
+"""
+Write-behind cost tracking.
+
+CostTrackingModel used to await ``track_cost`` (a project lookup plus an insert)
+after every LLM call. The sink keeps those round trips off the critical path:
+records are appended to an in-memory buffer and written in batches by a
+background task, or immediately once ``max_batch_size`` records are pending.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = int(os.getenv("COST_SINK_BATCH_SIZE", "50"))
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("COST_SINK_FLUSH_INTERVAL", "2.0"))
+# Failed batches are re-queued only while the buffer stays below this many batches
+MAX_BUFFERED_BATCHES = 20
+# A record that still fails after this many writes (e.g. a constraint violation) is dropped
+MAX_WRITE_ATTEMPTS = int(os.getenv("COST_SINK_MAX_ATTEMPTS", "5"))
+
+# Keys accepted by SupabaseProjectManager.track_cost (used for the per-record fallback)
+_TRACK_COST_KEYS = (
+    "project_id", "agent_name", "operation", "input_tokens", "output_tokens",
+    "cost", "model_used", "metadata", "duration_seconds"
+)
+
+
+class CostTrackingSink:
+    """Buffers cost records and persists them in bulk through a project manager."""
+
+    def __init__(self, sql_project_manager: Any,
+                 max_batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None):
+        """
+        Args:
+            sql_project_manager: Manager exposing ``track_costs_bulk`` (preferred) or ``track_cost``
+            max_batch_size: Pending record count that triggers an immediate flush
+            flush_interval: Seconds between background flushes
+        """
+        self.sql_project_manager = sql_project_manager
+        self.max_batch_size = max_batch_size or DEFAULT_BATCH_SIZE
+        self.flush_interval = flush_interval or DEFAULT_FLUSH_INTERVAL
+
+        # (record, failed write attempts so far)
+        self._buffer: List[Tuple[Dict[str, Any], int]] = []
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending_flushes: Set[asyncio.Task] = set()
+        self._closed = False
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "dropped": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Number of records waiting to be written."""
+        with self._lock:
+            return len(self._buffer)
+
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """
+        Buffer a cost record (``track_cost`` keyword arguments).
+
+        Never blocks on I/O; a flush is scheduled on the running loop when the
+        batch size threshold is reached.
+        """
+        record = dict(record)
+        record.setdefault("created_at", datetime.utcnow().isoformat())
+
+        with self._lock:
+            self._buffer.append((record, 0))
+            size = len(self._buffer)
+        self.stats["enqueued"] += 1
+
+        if self._closed:
+            # Late records after shutdown: written by the next explicit flush()
+            return
+
+        self._ensure_flusher()
+        if size >= self.max_batch_size:
+            self._schedule_flush()
+
+    def _ensure_flusher(self) -> None:
+        """Start the periodic flusher on the current event loop if it isn't running there."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._flush_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._flush_task = loop.create_task(self._periodic_flush())
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.flush())
+        self._pending_flushes.add(task)
+        task.add_done_callback(self._pending_flushes.discard)
+
+    async def _periodic_flush(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write all buffered records.
+
+        Returns:
+            Number of records successfully written
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+
+        records = [record for record, _ in batch]
+        try:
+            failed = await self._write(records)
+        except Exception as e:
+            logger.error(f"Cost sink flush failed for {len(batch)} records: {e}")
+            failed = list(range(len(batch)))
+
+        written = len(batch) - len(failed)
+        self.stats["batches"] += 1
+        if written:
+            self.stats["written"] += written
+        if failed:
+            self.stats["failed_batches"] += 1
+            self._requeue([(batch[i][0], batch[i][1] + 1) for i in failed])
+        return written
+
+    async def _write(self, records: List[Dict[str, Any]]) -> List[int]:
+        """Persist records; returns the indices of the ones that were not written."""
+        bulk = getattr(self.sql_project_manager, "track_costs_bulk", None)
+        if bulk is not None:
+            return list(await bulk(records))
+
+        failed = []
+        for index, record in enumerate(records):
+            kwargs = {k: record[k] for k in _TRACK_COST_KEYS if k in record}
+            if not await self.sql_project_manager.track_cost(**kwargs):
+                failed.append(index)
+        return failed
+
+    def _requeue(self, entries: List[Tuple[Dict[str, Any], int]]) -> None:
+        """Put unwritten records back for the next flush, bounded to avoid unbounded growth."""
+        retry = [entry for entry in entries if entry[1] < MAX_WRITE_ATTEMPTS]
+        for record, attempts in entries:
+            if attempts >= MAX_WRITE_ATTEMPTS:
+                logger.error(
+                    f"Dropping cost record after {attempts} failed writes: "
+                    f"{record.get('agent_name')}/{record.get('operation')} in project {record.get('project_id')}"
+                )
+        self.stats["dropped"] += len(entries) - len(retry)
+        if not retry:
+            return
+
+        with self._lock:
+            if len(self._buffer) + len(retry) <= self.max_batch_size * MAX_BUFFERED_BATCHES:
+                self._buffer[:0] = retry
+                return
+        self.stats["dropped"] += len(retry)
+        logger.error(f"Cost sink buffer full; dropped {len(retry)} cost records")
+
+    async def shutdown(self) -> int:
+        """Stop background flushing and write everything still buffered."""
+        self._closed = True
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except (asyncio.CancelledError, RuntimeError):
+                # RuntimeError: task belonged to a loop that is no longer running
+                pass
+        self._flush_task = None
+
+        if self._pending_flushes:
+            await asyncio.gather(*self._pending_flushes, return_exceptions=True)
+
+        # Final flush gets no requeue loop: anything it can't write is reported
+        written = await self.flush()
+        remaining = self.pending
+        if remaining:
+            logger.error(f"Cost sink shut down with {remaining} unwritten records")
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": self.pending}
+
+
+# One sink per project manager instance
+_sinks: "weakref.WeakKeyDictionary[Any, CostTrackingSink]" = weakref.WeakKeyDictionary()
+_sinks_lock = threading.Lock()
+
+
+def get_cost_sink(sql_project_manager: Any) -> CostTrackingSink:
+    """Return the shared sink for a project manager, creating it on first use."""
+    with _sinks_lock:
+        sink = _sinks.get(sql_project_manager)
+        if sink is None:
+            sink = CostTrackingSink(sql_project_manager)
+            _sinks[sql_project_manager] = sink
+        return sink
+
+
+async def shutdown_cost_sinks() -> None:
+    """Flush and stop every sink; call from the application shutdown hook."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        await sink.shutdown()
@@ -0,0 +1,189 @@
+# ABOUTME: SQLite key-value store for generated outline and section caches
+# ABOUTME: Primary-key lookups with no embedding cost, invalidation by project/outline_hash and hit/miss metrics
+
+"""
+Generated outline/section cache.
+
+Outlines and sections used to be cached as documents in the Chroma ``content``
+collection, so every write ran the embedding model over the whole JSON blob
+and every lookup was a metadata-filtered ``collection.get``. This store keeps
+them in a single SQLite table (WAL mode) keyed by the existing cache keys.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+DEFAULT_CACHE_PATH = os.path.join(ROOT_DIR, "data/cache/generation_cache.sqlite3")
+
+NAMESPACES = ("outline", "section")
+
+
+class GenerationCache:
+    """Key-value cache for generated outlines and sections."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite file path (``:memory:`` for a process-local cache)
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self.stats = {ns: {"hits": 0, "misses": 0, "writes": 0, "invalidated": 0} for ns in NAMESPACES}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS generation_cache (
+                namespace TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                project_name TEXT NOT NULL,
+                outline_hash TEXT,
+                section_index INTEGER,
+                value TEXT NOT NULL,
+                metadata TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, cache_key)
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_generation_cache_project "
+            "ON generation_cache(project_name, outline_hash)"
+        )
+        # One-off maintenance steps that already ran against this store
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_markers (name TEXT PRIMARY KEY, created_at REAL NOT NULL)"
+        )
+        return conn
+
+    def get(self, namespace: str, cache_key: str, project_name: Optional[str] = None) -> Optional[str]:
+        """Return the cached value for ``cache_key`` (optionally scoped to a project) or None."""
+        query = "SELECT value FROM generation_cache WHERE namespace = ? AND cache_key = ?"
+        params = [namespace, cache_key]
+        if project_name:
+            query += " AND project_name = ?"
+            params.append(project_name)
+
+        try:
+            with self._lock:
+                row = self._conn.execute(query, params).fetchone()
+                self.stats[namespace]["hits" if row else "misses"] += 1
+        except sqlite3.Error as e:
+            logger.error(f"Error reading {namespace} cache: {e}")
+            return None
+        return row[0] if row else None
+
+    def set(self, namespace: str, cache_key: str, value: str, project_name: str,
+            outline_hash: Optional[str] = None, section_index: Optional[int] = None,
+            metadata: Optional[str] = None) -> bool:
+        """Insert or replace a cached value."""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO generation_cache "
+                    "(namespace, cache_key, project_name, outline_hash, section_index, value, metadata, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (namespace, cache_key, project_name, outline_hash, section_index, value, metadata, time.time())
+                )
+                self.stats[namespace]["writes"] += 1
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error writing {namespace} cache: {e}")
+            return False
+
+    def invalidate(self, namespace: Optional[str] = None, project_name: Optional[str] = None,
+                   outline_hash: Optional[str] = None) -> int:
+        """
+        Delete cached entries matching the given filters (all entries if none are given).
+
+        Returns:
+            Number of rows removed
+        """
+        clauses, params = ["namespace = ?"], []
+        for column, value in (("project_name", project_name), ("outline_hash", outline_hash)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        query = "DELETE FROM generation_cache WHERE " + " AND ".join(clauses)
+
+        removed = 0
+        try:
+            with self._lock:
+                for ns in ([namespace] if namespace else NAMESPACES):
+                    count = self._conn.execute(query, [ns, *params]).rowcount
+                    self.stats[ns]["invalidated"] += count
+                    removed += count
+        except sqlite3.Error as e:
+            logger.error(f"Error invalidating generation cache: {e}")
+            return removed
+
+        logger.info(
+            f"Invalidated {removed} cached entries "
+            f"(namespace={namespace}, project={project_name}, outline_hash={outline_hash})"
+        )
+        return removed
+
+    def has_marker(self, name: str) -> bool:
+        """True if the one-off step ``name`` was recorded as done."""
+        try:
+            with self._lock:
+                return self._conn.execute("SELECT 1 FROM cache_markers WHERE name = ?", (name,)).fetchone() is not None
+        except sqlite3.Error as e:
+            logger.error(f"Error reading cache marker {name}: {e}")
+            return False
+
+    def set_marker(self, name: str) -> None:
+        """Record the one-off step ``name`` as done."""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_markers (name, created_at) VALUES (?, ?)", (name, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing cache marker {name}: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT namespace, COUNT(*) FROM generation_cache GROUP BY namespace"
+            ).fetchall())
+        result = {}
+        for ns, ns_stats in self.stats.items():
+            lookups = ns_stats["hits"] + ns_stats["misses"]
+            result[ns] = {
+                **ns_stats,
+                "entries": counts.get(ns, 0),
+                "hit_rate": round(ns_stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+        return result
+
+
+_cache: Optional[GenerationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> GenerationCache:
+    """Return the process-wide generation cache (path from GENERATION_CACHE_PATH)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GenerationCache(os.getenv("GENERATION_CACHE_PATH") or None)
+    return _cache
@@ -0,0 +1,294 @@
+# ABOUTME: Process-wide pooled HTTP clients for LLM and embedding providers (keep-alive, HTTP/2, DNS cache)
+# ABOUTME: Created and closed by the FastAPI lifespan; model classes pass these clients to their SDKs
+
+"""
+Shared HTTP client pool.
+
+Every provider client (OpenAI, Azure, DeepSeek and Anthropic SDKs, and the
+OpenRouter REST client) previously opened its own connections: per call for
+OpenRouter, per model instance for the SDKs. The pool keeps one sync and one
+async ``httpx`` client per provider for the life of the process, so calls
+reuse warm keep-alive connections instead of paying TCP and TLS setup.
+
+- Per-host limits: each provider talks to one host and gets its own client,
+  so ``HTTP_POOL_MAX_CONNECTIONS`` / ``HTTP_POOL_MAX_KEEPALIVE`` apply per host.
+- HTTP/2 is negotiated via ALPN when the ``h2`` package is installed and the
+  server supports it; otherwise HTTP/1.1 keep-alive is used.
+- New connections resolve host names through a small TTL cache
+  (``HTTP_POOL_DNS_TTL`` seconds). TLS still verifies the original host name.
+
+Async clients are bound to an event loop. Code that runs a coroutine on its
+own loop (``asyncio.run`` in sync wrappers) gets a separate connection pool
+for that loop, so connections never cross loops.
+"""
+
+import os
+import time
+import socket
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "120"))
+DNS_TTL = float(os.getenv("HTTP_POOL_DNS_TTL", "300"))
+HTTP2 = os.getenv("HTTP_POOL_HTTP2", "true").lower() == "true"
+# LLM responses can take minutes; connecting should not
+DEFAULT_TIMEOUT = httpx.Timeout(float(os.getenv("HTTP_POOL_TIMEOUT", "600")), connect=10.0)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class DNSCache:
+    """Thread-safe TTL cache of resolved addresses, shared by sync and async clients."""
+
+    def __init__(self, ttl: float = DNS_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, host: str, port: int) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry and entry[1] > time.monotonic():
+                self.stats["hits"] += 1
+                return entry[0]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, host: str, port: int, infos: list) -> str:
+        address = infos[0][4][0]
+        with self._lock:
+            self._entries[(host, port)] = (address, time.monotonic() + self.ttl)
+        return address
+
+    def evict(self, host: str, port: int) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def resolve(self, host: str, port: int) -> str:
+        return self.get(host, port) or self.put(host, port, socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+
+    async def aresolve(self, host: str, port: int) -> str:
+        cached = self.get(host, port)
+        if cached:
+            return cached
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return self.put(host, port, infos)
+
+
+def _caching_backend(backend: Any, dns: DNSCache, is_async: bool) -> Any:
+    """Wrap an httpcore network backend so connect_tcp goes through the DNS cache."""
+    import httpcore
+
+    if is_async:
+        class CachingAsyncBackend(httpcore.AsyncNetworkBackend):
+            async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+                address = await dns.aresolve(host, port)
+                try:
+                    return await backend.connect_tcp(address, port, timeout, local_address, socket_options)
+                except Exception:
+                    dns.evict(host, port)
+                    raise
+
+            async def connect_unix_socket(self, *args, **kwargs):
+                return await backend.connect_unix_socket(*args, **kwargs)
+
+            async def sleep(self, seconds):
+                await backend.sleep(seconds)
+
+        return CachingAsyncBackend()
+
+    class CachingBackend(httpcore.NetworkBackend):
+        def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+            address = dns.resolve(host, port)
+            try:
+                return backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except Exception:
+                dns.evict(host, port)
+                raise
+
+        def connect_unix_socket(self, *args, **kwargs):
+            return backend.connect_unix_socket(*args, **kwargs)
+
+        def sleep(self, seconds):
+            backend.sleep(seconds)
+
+    return CachingBackend()
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient that keeps a separate connection pool per event loop.
+
+    The loop that first uses the client (the server's loop) uses this client's
+    own pool; other loops get a sibling client created on demand. Siblings whose
+    loop has closed are dropped, and ``aclose`` closes the rest.
+    """
+
+    def __init__(self, factory, **kwargs):
+        super().__init__(**kwargs)
+        self._factory = factory
+        self._home_loop: Optional[weakref.ref] = None
+        self._siblings: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._siblings_lock = threading.Lock()
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        if self._home_loop is None:
+            self._home_loop = weakref.ref(loop)
+        if self._home_loop() is loop:
+            return await super().send(request, **kwargs)
+        with self._siblings_lock:
+            sibling = self._siblings.get(loop)
+            if sibling is None:
+                self._drop_closed_siblings()
+                sibling = self._siblings[loop] = self._factory()
+        return await sibling.send(request, **kwargs)
+
+    def _drop_closed_siblings(self) -> None:
+        """Forget siblings whose loop has closed; their connections cannot be used again."""
+        for loop in [loop for loop in self._siblings.keys() if loop.is_closed()]:
+            del self._siblings[loop]
+
+    async def aclose(self) -> None:
+        """Close this client's pool and every sibling pool whose loop is still alive."""
+        with self._siblings_lock:
+            siblings = list(self._siblings.items())
+            self._siblings.clear()
+        current = asyncio.get_running_loop()
+        for loop, sibling in siblings:
+            try:
+                if loop is current:
+                    await sibling.aclose()
+                elif loop.is_running():
+                    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(sibling.aclose(), loop))
+                # A closed or stopped loop cannot run the close; its pool is dropped with it
+            except Exception as e:
+                logger.debug(f"Error closing loop-local HTTP client: {e}")
+        await super().aclose()
+
+
+class HTTPClientPool:
+    """Long-lived sync and async HTTP clients, one of each per provider."""
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, max_keepalive: int = MAX_KEEPALIVE,
+                 keepalive_expiry: float = KEEPALIVE_EXPIRY, http2: bool = HTTP2,
+                 dns_ttl: float = DNS_TTL, timeout: httpx.Timeout = DEFAULT_TIMEOUT, verify: Any = True):
+        """
+        Args:
+            max_connections: Connection limit per provider host
+            max_keepalive: Idle keep-alive connections kept per provider host
+            keepalive_expiry: Seconds an idle connection is kept
+            http2: Negotiate HTTP/2 when the h2 package is available
+            dns_ttl: Seconds a resolved address is reused (0 disables the DNS cache)
+            timeout: Default request timeout (SDKs pass their own per request)
+            verify: TLS verification setting passed to httpx (True, CA path or SSLContext)
+        """
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self.http2 = http2 and _http2_available()
+        self.timeout = timeout
+        self.verify = verify
+        self.dns = DNSCache(dns_ttl) if dns_ttl > 0 else None
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def _transport(self, is_async: bool):
+        transport_cls = httpx.AsyncHTTPTransport if is_async else httpx.HTTPTransport
+        transport = transport_cls(limits=self.limits, http2=self.http2, verify=self.verify)
+        if self.dns is not None:
+            pool = getattr(transport, "_pool", None)
+            if pool is not None and hasattr(pool, "_network_backend"):
+                pool._network_backend = _caching_backend(pool._network_backend, self.dns, is_async)
+        return transport
+
+    def _new_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self._transport(True), timeout=self.timeout)
+
+    def client(self, provider: str) -> httpx.Client:
+        """Shared sync client for a provider (thread-safe)."""
+        with self._lock:
+            client = self._clients.get(provider)
+            if client is None:
+                client = self._clients[provider] = httpx.Client(transport=self._transport(False), timeout=self.timeout)
+            return client
+
+    def async_client(self, provider: str) -> httpx.AsyncClient:
+        """Shared async client for a provider."""
+        with self._lock:
+            client = self._async_clients.get(provider)
+            if client is None:
+                client = self._async_clients[provider] = LoopLocalAsyncClient(
+                    self._new_async_client, transport=self._transport(True), timeout=self.timeout
+                )
+            return client
+
+    async def aclose(self) -> None:
+        """Close every client and its pooled connections."""
+        with self._lock:
+            clients, async_clients = list(self._clients.values()), list(self._async_clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+            self.closed = True
+        for client in clients:
+            client.close()
+        for async_client in async_clients:
+            try:
+                await async_client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing async HTTP client: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = sorted(set(self._clients) | set(self._async_clients))
+        return {
+            "providers": providers,
+            "http2": self.http2,
+            "max_connections_per_host": self.limits.max_connections,
+            "max_keepalive_per_host": self.limits.max_keepalive_connections,
+            "dns_cache": dict(self.dns.stats) if self.dns else None,
+        }
+
+
+_pool: Optional[HTTPClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def init_http_pool(**kwargs: Any) -> HTTPClientPool:
+    """Create the process-wide pool (called from the application lifespan)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = HTTPClientPool(**kwargs)
+        return _pool
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Return the process-wide pool, creating it on first use outside the server (scripts, tests)."""
+    return _pool if _pool is not None and not _pool.closed else init_http_pool()
+
+
+async def close_http_pool() -> None:
+    """Close the process-wide pool (called on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        await pool.aclose()
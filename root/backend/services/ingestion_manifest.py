@@ -0,0 +1,209 @@
+# ABOUTME: Per-file ingestion manifest (SQLite) and chunk-level diffing for incremental re-ingestion
+# ABOUTME: Stable chunk hashes/ids let re-uploads embed only new chunks and delete removed ones
+
+"""
+Ingestion manifest.
+
+Every ingested file gets a row keyed by (project_name, file_path) holding the
+hash of the raw file, the file-level content hash used by the rest of the app
+and the ordered list of ``[chunk_id, chunk_hash]`` pairs stored in Chroma.
+
+Chunk ids are derived from the project, the file path, the chunk's own hash
+and its occurrence index within the file, so an unchanged chunk keeps its id
+(and embedding) across re-uploads regardless of where it moved in the file.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+DEFAULT_MANIFEST_PATH = os.path.join(ROOT_DIR, "data/cache/ingestion_manifest.sqlite3")
+
+ManifestChunks = List[Tuple[str, Optional[str]]]
+
+
+def chunk_hash(text: str) -> str:
+    """Stable hash of a single chunk's text."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def file_source_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the raw file bytes, used to skip re-parsing unchanged uploads."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id_prefix(project_name: Optional[str], file_path: str) -> str:
+    """Id prefix shared by all chunks of one file within one project."""
+    return "chunk_" + hashlib.sha256(f"{project_name or ''}\x00{file_path}".encode()).hexdigest()[:16]
+
+
+class ChunkDiff(NamedTuple):
+    """Result of diffing a file's new chunks against its manifest."""
+    ids: List[str]            # id for every new chunk, in order
+    added: List[int]          # indices of chunks that need embedding
+    removed: List[str]        # previously stored ids that no longer exist
+
+
+def plan_chunk_diff(previous: Sequence[Tuple[str, Optional[str]]], chunk_hashes: Sequence[str],
+                    id_prefix: str) -> ChunkDiff:
+    """
+    Match new chunks to previously stored ones by (chunk_hash, occurrence).
+
+    Args:
+        previous: Stored ``(chunk_id, chunk_hash)`` pairs in order; a None hash never matches
+        chunk_hashes: Hashes of the new chunks in order
+        id_prefix: Prefix for ids of newly added chunks
+
+    Returns:
+        ChunkDiff with the ids to use, the chunks to embed and the ids to delete
+    """
+    stored: Dict[Tuple[str, int], str] = {}
+    seen: Counter = Counter()
+    for chunk_id, hash_ in previous:
+        if hash_ is None:
+            continue
+        stored[(hash_, seen[hash_])] = chunk_id
+        seen[hash_] += 1
+
+    ids, added = [], []
+    occurrences: Counter = Counter()
+    for index, hash_ in enumerate(chunk_hashes):
+        key = (hash_, occurrences[hash_])
+        occurrences[hash_] += 1
+        if key in stored:
+            ids.append(stored.pop(key))
+        else:
+            ids.append(f"{id_prefix}_{hash_[:24]}_{key[1]:04d}")
+            added.append(index)
+
+    kept = set(ids)
+    removed = [chunk_id for chunk_id, _ in previous if chunk_id not in kept]
+    return ChunkDiff(ids=ids, added=added, removed=removed)
+
+
+class IngestionManifest:
+    """Per-file record of the chunks stored for each ingested file."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite file path (``:memory:`` for a process-local manifest)
+        """
+        self.path = path or DEFAULT_MANIFEST_PATH
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_manifests (
+                project_name TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                source_hash TEXT,
+                content_hash TEXT NOT NULL,
+                chunks TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (project_name, file_path)
+            )
+            """
+        )
+        return conn
+
+    def get(self, project_name: Optional[str], file_path: str) -> Optional[Dict[str, Any]]:
+        """Manifest entry for a file, with ``chunks`` as ``(chunk_id, chunk_hash)`` pairs, or None."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT source_hash, content_hash, chunks, updated_at FROM file_manifests "
+                    "WHERE project_name = ? AND file_path = ?",
+                    (project_name or "", file_path)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading ingestion manifest: {e}")
+            return None
+        if not row:
+            return None
+        return {
+            "source_hash": row[0],
+            "content_hash": row[1],
+            "chunks": [tuple(pair) for pair in json.loads(row[2])],
+            "updated_at": row[3],
+        }
+
+    def set(self, project_name: Optional[str], file_path: str, content_hash: str,
+            chunks: ManifestChunks, source_hash: Optional[str] = None) -> bool:
+        """Insert or replace a file's manifest entry."""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO file_manifests "
+                    "(project_name, file_path, source_hash, content_hash, chunks, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (project_name or "", file_path, source_hash, content_hash, json.dumps(chunks), time.time())
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error writing ingestion manifest: {e}")
+            return False
+
+    def project_version(self, project_name: Optional[str]) -> Optional[Tuple[int, float]]:
+        """Changes whenever a file of the project is set or deleted: (file count, latest update time)."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(MAX(updated_at), 0) FROM file_manifests WHERE project_name = ?",
+                    (project_name or "",)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading ingestion manifest: {e}")
+            return None
+        return (row[0], row[1])
+
+    def delete(self, project_name: Optional[str], file_path: Optional[str] = None) -> int:
+        """Remove a file's entry, or every entry of the project when no file is given."""
+        query, params = "DELETE FROM file_manifests WHERE project_name = ?", [project_name or ""]
+        if file_path is not None:
+            query += " AND file_path = ?"
+            params.append(file_path)
+        try:
+            with self._lock:
+                return self._conn.execute(query, params).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting ingestion manifest entries: {e}")
+            return 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_manifest: Optional[IngestionManifest] = None
+_manifest_lock = threading.Lock()
+
+
+def get_ingestion_manifest() -> IngestionManifest:
+    """Return the process-wide ingestion manifest (path from INGEST_MANIFEST_PATH)."""
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = IngestionManifest(os.getenv("INGEST_MANIFEST_PATH") or None)
+    return _manifest
@@ -0,0 +1,188 @@
+# ABOUTME: In-process BM25 inverted index (SQLite) kept alongside each Chroma collection
+# ABOUTME: Code-aware tokenization so exact identifiers (function names, library calls) are matchable
+
+"""
+Lexical index.
+
+Dense retrieval matches meaning but often misses chunks that share an exact
+identifier with the query (``read_csv``, ``VectorStoreService``). Each Chroma
+collection gets a BM25 index over the same chunk ids, updated whenever chunks
+are added or deleted, so VectorStoreService can fuse lexical and dense rankings.
+
+Identifiers are indexed whole and split into their snake_case/camelCase parts,
+so ``read_csv`` matches queries for ``read_csv`` and for "read csv".
+"""
+
+import os
+import re
+import math
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_WORD_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "how what when where which who why do does can into not no if then else than".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms: whole identifiers plus their snake_case/camelCase parts, minus stopwords."""
+    terms = []
+    for word in _WORD.findall(text):
+        lowered = word.lower()
+        if len(lowered) > 1 and lowered not in STOPWORDS:
+            terms.append(lowered)
+        parts = [part.lower() for piece in word.split("_") for part in _WORD_PART.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(part for part in parts if len(part) > 1 and part not in STOPWORDS and part != lowered)
+    return terms
+
+
+class LexicalIndex:
+    """BM25 index over one collection's chunks."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite file path (``:memory:`` or None for a process-local index)
+        """
+        self.path = path or ":memory:"
+        self._lock = threading.Lock()
+        self._stats: Optional[Tuple[int, float]] = None   # (document count, average length)
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS lexical_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS lexical_docs (chunk_id TEXT PRIMARY KEY, length INTEGER NOT NULL)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lexical_postings (
+                term TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, chunk_id)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lexical_postings_chunk ON lexical_postings(chunk_id)")
+        return conn
+
+    @property
+    def is_built(self) -> bool:
+        """Whether the index has been populated for its collection (possibly with nothing)."""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM lexical_meta WHERE key = 'built'").fetchone() is not None
+
+    def mark_built(self) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO lexical_meta (key, value) VALUES ('built', '1')")
+
+    def _delete_locked(self, chunk_ids: Sequence[str]) -> None:
+        for start in range(0, len(chunk_ids), 500):
+            batch = list(chunk_ids[start:start + 500])
+            placeholders = ",".join("?" * len(batch))
+            self._conn.execute(f"DELETE FROM lexical_postings WHERE chunk_id IN ({placeholders})", batch)
+            self._conn.execute(f"DELETE FROM lexical_docs WHERE chunk_id IN ({placeholders})", batch)
+
+    def add(self, chunk_ids: Sequence[str], documents: Sequence[str]) -> None:
+        """Index (or re-index) chunks."""
+        if not chunk_ids:
+            return
+        docs, postings = [], []
+        for chunk_id, document in zip(chunk_ids, documents):
+            terms = tokenize(document or "")
+            docs.append((chunk_id, len(terms)))
+            postings.extend((term, chunk_id, tf) for term, tf in Counter(terms).items())
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._delete_locked(chunk_ids)
+                self._conn.executemany("INSERT INTO lexical_docs (chunk_id, length) VALUES (?, ?)", docs)
+                self._conn.executemany("INSERT INTO lexical_postings (term, chunk_id, tf) VALUES (?, ?, ?)", postings)
+                self._conn.execute("COMMIT")
+                self._stats = None
+        except sqlite3.Error as e:
+            logger.error(f"Error updating lexical index: {e}")
+            with self._lock:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+
+    def delete(self, chunk_ids: Iterable[str]) -> None:
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._delete_locked(chunk_ids)
+                self._conn.execute("COMMIT")
+                self._stats = None
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting from lexical index: {e}")
+            with self._lock:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM lexical_docs").fetchone()[0]
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[str, float]]:
+        """Top ``limit`` (chunk_id, BM25 score) pairs for the query, best first."""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        try:
+            with self._lock:
+                if self._stats is None:
+                    count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM lexical_docs").fetchone()
+                    self._stats = (count, total / count if count else 0.0)
+                doc_count, avg_length = self._stats
+                if not doc_count:
+                    return []
+                rows = self._conn.execute(
+                    "SELECT p.term, p.chunk_id, p.tf, d.length FROM lexical_postings p "
+                    "JOIN lexical_docs d ON d.chunk_id = p.chunk_id "
+                    f"WHERE p.term IN ({','.join('?' * len(terms))})",
+                    terms
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error searching lexical index: {e}")
+            return []
+
+        document_frequency = Counter(term for term, _, _, _ in rows)
+        scores: Counter = Counter()
+        for term, chunk_id, tf, length in rows:
+            df = document_frequency[term]
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1))
+            scores[chunk_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores.most_common(limit)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank). Best first."""
+    scores: Counter = Counter()
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1.0 / (k + rank)
+    return [item for item, _ in scores.most_common()]
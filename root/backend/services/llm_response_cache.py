@@ -0,0 +1,220 @@
+# ABOUTME: Persistent, content-addressed cache for LLM responses backed by SQLite
+# ABOUTME: Keyed by (model, prompt hash, generation params) with TTL expiry and size-bounded LRU eviction
+
+"""
+LLM response cache.
+
+Regenerating outlines, titles and sections after transient errors or parameter
+tweaks re-sends identical prompts. CostTrackingModel looks responses up here
+before calling the provider. Entries live in a single SQLite file (WAL mode, so
+concurrent readers don't block the writer), expire after ``ttl_seconds`` and the
+least recently used rows are evicted once ``max_entries`` is exceeded.
+
+The cache is opt-in (``LLM_CACHE_ENABLED``). Which nodes may use it is
+controlled by ``LLM_CACHE_NODES`` (comma separated allow-list, ``*`` for all;
+defaults to the deterministic nodes in ``DEFAULT_CACHE_NODES``) and
+``LLM_CACHE_EXCLUDE_NODES``.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+DEFAULT_CACHE_PATH = os.path.join(ROOT_DIR, "data/cache/llm_responses.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+# Nodes whose output is a pure function of their prompt; creative drafting nodes are left out
+DEFAULT_CACHE_NODES = "generate_titles,difficulty_assessor,prerequisite_identifier"
+
+
+def _parse_node_list(value: Optional[str]) -> Set[str]:
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+class LLMResponseCache:
+    """SQLite-backed response cache shared by all CostTrackingModel instances."""
+
+    def __init__(self, path: Optional[str] = None,
+                 ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None,
+                 include_nodes: Optional[Set[str]] = None,
+                 exclude_nodes: Optional[Set[str]] = None):
+        """
+        Args:
+            path: SQLite file path (``:memory:`` for a process-local cache)
+            ttl_seconds: Entry lifetime; 0 disables expiry
+            max_entries: Maximum rows kept before LRU eviction
+            include_nodes: Node names allowed to use the cache (``*`` = all)
+            exclude_nodes: Node names that never use the cache
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        self.ttl_seconds = DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries or DEFAULT_MAX_ENTRIES
+        self.include_nodes = include_nodes if include_nodes is not None else {"*"}
+        self.exclude_nodes = exclude_nodes or set()
+
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "evicted": 0, "saved_cost": 0.0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                response_kind TEXT NOT NULL,
+                input_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                cost REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_lru ON llm_responses(last_accessed)")
+        return conn
+
+    @staticmethod
+    def make_key(model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Content address for a call: hash of the normalized model, prompt and generation params."""
+        payload = json.dumps(
+            {"model": model, "prompt": prompt, "params": params or {}},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_enabled_for(self, node_name: Optional[str]) -> bool:
+        """Apply the per-node opt-in/opt-out lists."""
+        node = node_name or "unknown"
+        if node in self.exclude_nodes:
+            return False
+        return "*" in self.include_nodes or node in self.include_nodes
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for ``key`` (refreshing its LRU position) or None."""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response, response_kind, input_tokens, output_tokens, cost, created_at "
+                    "FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                if self.ttl_seconds and now - row[5] > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self.stats["expired"] += 1
+                    self.stats["misses"] += 1
+                    return None
+                self._conn.execute("UPDATE llm_responses SET last_accessed = ? WHERE key = ?", (now, key))
+                self.stats["hits"] += 1
+                self.stats["saved_cost"] += row[4]
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache read failed: {e}")
+            return None
+
+        return {
+            "response": row[0],
+            "response_kind": row[1],
+            "input_tokens": row[2],
+            "output_tokens": row[3],
+            "cost": row[4],
+        }
+
+    def set(self, key: str, model: str, response: str, response_kind: str = "message",
+            input_tokens: int = 0, output_tokens: int = 0, cost: float = 0.0) -> bool:
+        """Store a response and evict least recently used rows beyond ``max_entries``."""
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, model, response, response_kind, input_tokens, output_tokens, cost, created_at, last_accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, response, response_kind, input_tokens, output_tokens, cost, now, now)
+                )
+                self.stats["writes"] += 1
+                self._evict()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache write failed: {e}")
+            return False
+
+    def _evict(self) -> None:
+        """Drop expired rows, then the oldest-accessed rows over the size bound. Caller holds the lock."""
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self.stats["expired"] += max(cursor.rowcount, 0)
+
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY last_accessed ASC LIMIT ?)", (overflow,)
+            )
+            self.stats["evicted"] += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": entries,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide cache configured from the environment, or None if disabled."""
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return None
+    if _cache is not None:
+        return _cache
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMResponseCache(
+                    path=os.getenv("LLM_CACHE_PATH") or None,
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                    include_nodes=_parse_node_list(os.getenv("LLM_CACHE_NODES", DEFAULT_CACHE_NODES)),
+                    exclude_nodes=_parse_node_list(os.getenv("LLM_CACHE_EXCLUDE_NODES")),
+                )
+            except Exception as e:
+                logger.error(f"Failed to open LLM response cache, continuing without it: {e}")
+                return None
+        return _cache
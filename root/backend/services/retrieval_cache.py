@@ -0,0 +1,145 @@
+# ABOUTME: In-process, per-project cache of similarity search results keyed by query embedding, filter and n_results
+# ABOUTME: Entries are dropped when the project's ingestion manifest version changes or its chunks are rewritten
+
+"""
+Retrieval result cache.
+
+Within a draft run many sections issue the same queries, and HyDE retrieval
+re-runs its search on every regeneration even when the hypothetical document
+is unchanged. VectorStoreService looks project-scoped searches up here before
+querying Chroma.
+
+Each project's entries are tagged with the project's ingestion manifest version
+(see ``IngestionManifest.project_version``); a lookup with a different version
+drops the project's entries, so re-ingesting a file invalidates them without
+any explicit call. Writes that bypass the manifest call ``invalidate``, which
+also bumps the project's generation (part of the version), so a search that
+was already running stores its results under a version no later lookup uses.
+Each project keeps at most ``max_entries`` results, least recently used first out.
+"""
+
+import os
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+class RetrievalCache:
+    """LRU search result cache per project, invalidated by manifest version."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: Maximum cached searches per project
+        """
+        self.max_entries = max_entries or DEFAULT_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._projects: Dict[str, Dict[str, Any]] = {}   # project -> {"version", "entries", "hits", "misses"}
+        self._generations: Dict[str, int] = {}
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "invalidated": 0, "evicted": 0}
+
+    def version(self, project_name: str, manifest_version: Hashable) -> Hashable:
+        """Cache version of a project: its manifest version plus the invalidation generation."""
+        with self._lock:
+            return (manifest_version, self._generation, self._generations.get(project_name, 0))
+
+    def _project_locked(self, project_name: str, version: Hashable) -> Dict[str, Any]:
+        project = self._projects.get(project_name)
+        if project is None:
+            project = self._projects[project_name] = {"version": version, "entries": OrderedDict(),
+                                                      "hits": 0, "misses": 0}
+        elif project["version"] != version:
+            self.stats["invalidated"] += len(project["entries"])
+            project["entries"].clear()
+            project["version"] = version
+        return project
+
+    def get(self, project_name: str, version: Hashable, key: Hashable) -> Optional[List[Dict]]:
+        """Cached results (a copy) for the key at this version, or None."""
+        with self._lock:
+            project = self._project_locked(project_name, version)
+            results = project["entries"].get(key)
+            if results is None:
+                project["misses"] += 1
+                self.stats["misses"] += 1
+                return None
+            project["entries"].move_to_end(key)
+            project["hits"] += 1
+            self.stats["hits"] += 1
+        # Callers may annotate result dicts
+        return copy.deepcopy(results)
+
+    def set(self, project_name: str, version: Hashable, key: Hashable, results: List[Dict]) -> None:
+        """Cache results computed at ``version`` (ignored if a lookup has since seen another version)."""
+        results = copy.deepcopy(results)
+        with self._lock:
+            project = self._projects.get(project_name)
+            if project is not None and project["version"] != version:
+                return
+            entries = self._project_locked(project_name, version)["entries"]
+            entries[key] = results
+            entries.move_to_end(key)
+            self.stats["writes"] += 1
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.stats["evicted"] += 1
+
+    def invalidate(self, project_name: Optional[str] = None) -> int:
+        """Drop a project's cached results (every project's if none is given)."""
+        with self._lock:
+            if project_name:
+                self._generations[project_name] = self._generations.get(project_name, 0) + 1
+            else:
+                self._generation += 1
+            projects = [self._projects.get(project_name)] if project_name else list(self._projects.values())
+            removed = 0
+            for project in filter(None, projects):
+                removed += len(project["entries"])
+                project["entries"].clear()
+            self.stats["invalidated"] += removed
+        if removed:
+            logger.debug(f"Invalidated {removed} cached retrieval results (project={project_name})")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            projects = {
+                name: {
+                    "hits": project["hits"],
+                    "misses": project["misses"],
+                    "entries": len(project["entries"]),
+                    "hit_rate": round(project["hits"] / (project["hits"] + project["misses"]), 4)
+                    if project["hits"] + project["misses"] else 0.0,
+                }
+                for name, project in self._projects.items()
+            }
+            return {
+                **self.stats,
+                "entries": sum(project["entries"] for project in projects.values()),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "projects": projects,
+            }
+
+
+_cache: Optional[RetrievalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    """Return the process-wide retrieval cache, or None if RETRIEVAL_CACHE_ENABLED is off."""
+    global _cache
+    if os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RetrievalCache(int(os.getenv("RETRIEVAL_CACHE_SIZE", DEFAULT_MAX_ENTRIES)))
+    return _cache
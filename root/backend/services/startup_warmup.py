@@ -0,0 +1,67 @@
+# ABOUTME: Background preloading of the modules the API imports lazily (LLM provider SDKs, embedding backend, parsers)
+# ABOUTME: Runs after the server starts accepting requests so heavy imports leave the cold-start path
+
+"""
+Startup warmup.
+
+LLM provider classes, embedding backends and file parsers are imported on
+first use so ``import backend.main`` stays fast. ``preload_modules`` imports
+the ones this deployment is likely to need - providers with an API key
+configured (or STARTUP_PRELOAD_PROVIDERS), the configured embedding backend
+and every registered parser - so the first request does not pay for them
+either. Failures are logged and skipped; the lazy path still works.
+"""
+
+import os
+import time
+import logging
+from typing import Dict, List, Optional
+
+from backend.config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+def configured_providers(settings: Settings) -> List[str]:
+    """LLM providers to preload: STARTUP_PRELOAD_PROVIDERS, or those with an API key set."""
+    from backend.models.model_factory import PROVIDER_MODELS
+
+    explicit = os.getenv("STARTUP_PRELOAD_PROVIDERS")
+    if explicit:
+        return [p.strip().lower() for p in explicit.split(",") if p.strip().lower() in PROVIDER_MODELS]
+    return [p for p in PROVIDER_MODELS if getattr(settings.get_model_settings(p), "api_key", None)]
+
+
+def preload_modules(providers: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Import lazily loaded modules ahead of first use.
+
+    Args:
+        providers: LLM providers whose model classes to import (defaults to configured_providers)
+
+    Returns:
+        Seconds spent per preloaded item
+    """
+    from backend.models.model_factory import load_model_class
+    from backend.models.embeddings.embedding_factory import EmbeddingFactory
+    from backend.parsers import ParserFactory
+
+    settings = Settings()
+    loaders = [(f"llm:{p}", lambda p=p: load_model_class(p)) for p in (providers or configured_providers(settings))]
+    loaders.append((f"embedding:{settings.embedding_provider}",
+                    lambda: EmbeddingFactory.load_backend(settings.embedding_provider)))
+    loaders.extend(
+        (f"parser:{ext}", lambda ext=ext: ParserFactory.get_parser_class(ext))
+        for ext in ParserFactory.supported_extensions()
+    )
+
+    timings: Dict[str, float] = {}
+    for name, load in loaders:
+        start = time.perf_counter()
+        try:
+            load()
+            timings[name] = round(time.perf_counter() - start, 4)
+        except Exception as e:
+            logger.warning(f"Preloading {name} failed (it will load on first use): {e}")
+    logger.info(f"Preloaded {len(timings)} modules in {sum(timings.values()):.2f}s")
+    return timings
@@ -5,9 +5,11 @@
 Supabase-based ProjectManager service for persistent project tracking.
 """
 
+import os
 import uuid
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from enum import Enum
@@ -17,6 +19,9 @@ from backend.config.supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Bounded pool for blocking Supabase/PostgREST calls (see SupabaseProjectManager._execute)
+DEFAULT_MAX_WORKERS = int(os.getenv("SUPABASE_MAX_WORKERS", "8"))
+
 
 class ProjectStatus(Enum):
     """Project status enumeration."""
@@ -52,15 +57,49 @@ class SupabaseProjectManager:
     - Atomic operations with per-project locking
     - Full state hydration for project resume
     - Cloud-based PostgreSQL storage via Supabase
+    - Non-blocking I/O: queries run on a bounded thread pool that shares the
+      client's pooled keep-alive HTTP connections, so the event loop never waits
+      on the network
     """
 
-    def __init__(self):
+    def __init__(self, supabase_client=None, max_workers: Optional[int] = None):
         """
         Initialize SupabaseProjectManager with Supabase client.
+
+        Args:
+            supabase_client: Optional client exposing ``table()`` (defaults to the
+                             shared Supabase client; any PostgREST client works)
+            max_workers: Size of the query thread pool (defaults to SUPABASE_MAX_WORKERS)
         """
-        self.supabase = get_supabase_client()
+        self.supabase = supabase_client or get_supabase_client()
         self.project_locks = {}  # Per-project async locks
-        logger.info("SupabaseProjectManager initialized")
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="supabase-io"
+        )
+        logger.info(f"SupabaseProjectManager initialized (max_workers={self.max_workers})")
+
+    async def _execute(self, query):
+        """
+        Execute a prepared query builder without blocking the event loop.
+
+        Builders are cheap to construct, so only the network round-trip
+        (``execute()``) is offloaded to the bounded executor.
+
+        Args:
+            query: Supabase/PostgREST request builder
+
+        Returns:
+            The API response from ``query.execute()``
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, query.execute)
+
+    def close(self, wait: bool = True) -> None:
+        """Shut down the query thread pool."""
+        self._executor.shutdown(wait=wait)
+        logger.info("SupabaseProjectManager executor shut down")
 
     async def _get_lock(self, project_id: str) -> asyncio.Lock:
         """Get or create a lock for a specific project."""
@@ -123,14 +162,14 @@ class SupabaseProjectManager:
             project_id = str(uuid.uuid4())
             now = datetime.utcnow().isoformat()
 
-            result = self.supabase.table("projects").insert({
+            result = await self._execute(self.supabase.table("projects").insert({
                 "id": project_id,
                 "name": project_name,
                 "status": ProjectStatus.ACTIVE.value,
                 "metadata": metadata or {},
                 "created_at": now,
                 "updated_at": now
-            }).execute()
+            }))
 
             if not result.data:
                 raise Exception("Failed to create project: no data returned")
@@ -153,7 +192,7 @@ class SupabaseProjectManager:
             Project data dict or None if not found
         """
         try:
-            result = self.supabase.table("projects").select("*").eq("id", project_id).execute()
+            result = await self._execute(self.supabase.table("projects").select("*").eq("id", project_id))
 
             if not result.data:
                 logger.warning(f"Project {project_id} not found")
@@ -189,9 +228,9 @@ class SupabaseProjectManager:
             Project data dict or None if not found
         """
         try:
-            result = self.supabase.table("projects").select("*").eq(
+            result = await self._execute(self.supabase.table("projects").select("*").eq(
                 "name", project_name
-            ).eq("status", ProjectStatus.ACTIVE.value).execute()
+            ).eq("status", ProjectStatus.ACTIVE.value))
 
             if not result.data:
                 return None
@@ -232,7 +271,7 @@ class SupabaseProjectManager:
                 status_value = status if isinstance(status, str) else status.value
                 query = query.eq("status", status_value)
 
-            result = query.order("updated_at", desc=True).execute()
+            result = await self._execute(query.order("updated_at", desc=True))
 
             projects = []
             for p in result.data:
@@ -260,10 +299,10 @@ class SupabaseProjectManager:
             async with await self._get_lock(project_id):
                 now = datetime.utcnow().isoformat()
 
-                result = self.supabase.table("projects").update({
+                result = await self._execute(self.supabase.table("projects").update({
                     "status": ProjectStatus.ARCHIVED.value,
                     "archived_at": now
-                }).eq("id", project_id).execute()
+                }).eq("id", project_id))
 
                 if not result.data:
                     return False
@@ -280,12 +319,12 @@ class SupabaseProjectManager:
         try:
             async with await self._get_lock(project_id):
                 if permanent:
-                    result = self.supabase.table("projects").delete().eq("id", project_id).execute()
+                    result = await self._execute(self.supabase.table("projects").delete().eq("id", project_id))
                     logger.info(f"Permanently deleted project {project_id}")
                 else:
-                    result = self.supabase.table("projects").update({
+                    result = await self._execute(self.supabase.table("projects").update({
                         "status": ProjectStatus.DELETED.value
-                    }).eq("id", project_id).execute()
+                    }).eq("id", project_id))
                     logger.info(f"Soft deleted project {project_id}")
 
                 if not result.data:
@@ -316,39 +355,39 @@ class SupabaseProjectManager:
         try:
             async with await self._get_lock(project_id):
                 # Check if project exists
-                project_result = self.supabase.table("projects").select("id").eq("id", project_id).execute()
+                project_result = await self._execute(self.supabase.table("projects").select("id").eq("id", project_id))
                 if not project_result.data:
                     logger.error(f"Project {project_id} not found")
                     return False
 
                 # Check if milestone already exists
-                existing_result = self.supabase.table("milestones").select("*").eq(
+                existing_result = await self._execute(self.supabase.table("milestones").select("*").eq(
                     "project_id", project_id
-                ).eq("type", milestone_type.value).execute()
+                ).eq("type", milestone_type.value))
 
                 now = datetime.utcnow().isoformat()
 
                 if existing_result.data:
                     # Update existing milestone
-                    self.supabase.table("milestones").update({
+                    await self._execute(self.supabase.table("milestones").update({
                         "data": data,
                         "metadata": metadata or {},
                         "created_at": now
-                    }).eq("project_id", project_id).eq("type", milestone_type.value).execute()
+                    }).eq("project_id", project_id).eq("type", milestone_type.value))
                 else:
                     # Create new milestone
-                    self.supabase.table("milestones").insert({
+                    await self._execute(self.supabase.table("milestones").insert({
                         "project_id": project_id,
                         "type": milestone_type.value,
                         "data": data,
                         "metadata": metadata or {},
                         "created_at": now
-                    }).execute()
+                    }))
 
                 # Update project's updated_at
-                self.supabase.table("projects").update({
+                await self._execute(self.supabase.table("projects").update({
                     "updated_at": now
-                }).eq("id", project_id).execute()
+                }).eq("id", project_id))
 
             logger.info(f"Saved milestone {milestone_type.value} for project {project_id}")
             return True
@@ -360,9 +399,9 @@ class SupabaseProjectManager:
     async def load_milestone(self, project_id: str, milestone_type: MilestoneType) -> Optional[Dict[str, Any]]:
         """Load a specific milestone for a project."""
         try:
-            result = self.supabase.table("milestones").select("*").eq(
+            result = await self._execute(self.supabase.table("milestones").select("*").eq(
                 "project_id", project_id
-            ).eq("type", milestone_type.value).execute()
+            ).eq("type", milestone_type.value))
 
             if not result.data:
                 logger.warning(f"Milestone {milestone_type.value} not found for project {project_id}")
@@ -387,9 +426,9 @@ class SupabaseProjectManager:
     async def get_latest_milestone(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get the latest milestone for a project."""
         try:
-            result = self.supabase.table("milestones").select("*").eq(
+            result = await self._execute(self.supabase.table("milestones").select("*").eq(
                 "project_id", project_id
-            ).order("created_at", desc=True).limit(1).execute()
+            ).order("created_at", desc=True).limit(1))
 
             if not result.data:
                 return None
@@ -413,9 +452,9 @@ class SupabaseProjectManager:
     async def get_milestones(self, project_id: str) -> List[Dict[str, Any]]:
         """Get all milestones for a project."""
         try:
-            result = self.supabase.table("milestones").select("*").eq(
+            result = await self._execute(self.supabase.table("milestones").select("*").eq(
                 "project_id", project_id
-            ).order("created_at").execute()
+            ).order("created_at"))
 
             milestones = []
             for m in result.data:
@@ -479,10 +518,10 @@ class SupabaseProjectManager:
                     # This is safer than delete-then-insert as it won't lose data on partial failure
                     # Note: Supabase Python client uses REST API with JSON payloads (PostgREST),
                     # not raw SQL - all parameters are properly escaped/parameterized by the client
-                    self.supabase.table("sections").upsert(
+                    await self._execute(self.supabase.table("sections").upsert(
                         section_records,
                         on_conflict="project_id,section_index"
-                    ).execute()
+                    ))
 
                 # Only delete missing sections when explicitly requested
                 # This prevents accidental deletion during incremental single-section saves
@@ -490,9 +529,9 @@ class SupabaseProjectManager:
                     current_indices = [s.get('section_index') for s in sections if s.get('section_index') is not None]
                     if current_indices:
                         # Get existing sections
-                        existing = self.supabase.table("sections").select("section_index").eq(
+                        existing = await self._execute(self.supabase.table("sections").select("section_index").eq(
                             "project_id", project_id
-                        ).execute()
+                        ))
                         existing_indices = [s.get('section_index') for s in existing.data]
 
                         # Delete sections not in current list using batch operation
@@ -500,16 +539,16 @@ class SupabaseProjectManager:
                         # not raw SQL - all parameters are properly escaped by the client
                         indices_to_delete = [i for i in existing_indices if i not in current_indices]
                         if indices_to_delete:
-                            self.supabase.table("sections").delete().eq(
+                            await self._execute(self.supabase.table("sections").delete().eq(
                                 "project_id", project_id
-                            ).in_("section_index", indices_to_delete).execute()
+                            ).in_("section_index", indices_to_delete))
                             logger.info(f"Deleted orphaned sections {indices_to_delete} for project {project_id}")
 
                 # Update project's updated_at
                 now = datetime.utcnow().isoformat()
-                self.supabase.table("projects").update({
+                await self._execute(self.supabase.table("projects").update({
                     "updated_at": now
-                }).eq("id", project_id).execute()
+                }).eq("id", project_id))
 
             logger.info(f"Saved {len(sections)} sections for project {project_id}")
             return True
@@ -521,9 +560,9 @@ class SupabaseProjectManager:
     async def load_sections(self, project_id: str) -> List[Dict[str, Any]]:
         """Load all sections for a project."""
         try:
-            result = self.supabase.table("sections").select("*").eq(
+            result = await self._execute(self.supabase.table("sections").select("*").eq(
                 "project_id", project_id
-            ).order("section_index").execute()
+            ).order("section_index"))
 
             sections = []
             for s in result.data:
@@ -567,9 +606,9 @@ class SupabaseProjectManager:
                 if cost_delta is not None:
                     update_data["cost_delta"] = cost_delta
 
-                result = self.supabase.table("sections").update(update_data).eq(
+                result = await self._execute(self.supabase.table("sections").update(update_data).eq(
                     "project_id", project_id
-                ).eq("section_index", section_index).execute()
+                ).eq("section_index", section_index))
 
                 if not result.data:
                     logger.error(f"Section {section_index} not found for project {project_id}")
@@ -617,7 +656,7 @@ class SupabaseProjectManager:
             if duration_seconds is not None:
                 final_metadata["duration_seconds"] = duration_seconds
 
-            self.supabase.table("cost_tracking").insert({
+            await self._execute(self.supabase.table("cost_tracking").insert({
                 "project_id": project_id,
                 "agent_name": agent_name,
                 "operation": operation,
@@ -627,7 +666,7 @@ class SupabaseProjectManager:
                 "cost": cost,
                 "metadata": final_metadata,
                 "created_at": datetime.utcnow().isoformat()
-            }).execute()
+            }))
 
             logger.info(f"Tracked cost ${cost:.6f} for {agent_name}/{operation} in project {project_id}")
             return True
@@ -636,13 +675,64 @@ class SupabaseProjectManager:
             logger.error(f"Failed to track cost: {e}")
             return False
 
+    def _cost_row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a buffered cost record (track_cost kwargs) into a cost_tracking row."""
+        metadata = dict(record.get("metadata") or {})
+        if record.get("duration_seconds") is not None:
+            metadata["duration_seconds"] = record["duration_seconds"]
+        return {
+            "project_id": record["project_id"],
+            "agent_name": record.get("agent_name"),
+            "operation": record.get("operation"),
+            "model_used": record.get("model_used"),
+            "input_tokens": record.get("input_tokens", 0),
+            "output_tokens": record.get("output_tokens", 0),
+            "cost": record.get("cost", 0.0),
+            "metadata": metadata,
+            "created_at": record.get("created_at") or datetime.utcnow().isoformat()
+        }
+
+    async def track_costs_bulk(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert many cost records in a single request.
+
+        Unlike track_cost, projects are not looked up first; the foreign key on
+        cost_tracking rejects unknown projects. If the bulk insert fails, rows are
+        retried one at a time so valid records are still written.
+
+        Args:
+            records: Records with track_cost keyword arguments (plus optional created_at)
+
+        Returns:
+            Indices (into records) of the records that could not be written
+        """
+        if not records:
+            return []
+
+        rows = [self._cost_row(record) for record in records]
+        try:
+            await self._execute(self.supabase.table("cost_tracking").insert(rows))
+            logger.info(f"Bulk tracked {len(rows)} cost records")
+            return []
+        except Exception as e:
+            logger.warning(f"Bulk cost insert failed, retrying per record: {e}")
+
+        failed = []
+        for index, row in enumerate(rows):
+            try:
+                await self._execute(self.supabase.table("cost_tracking").insert(row))
+            except Exception as e:
+                logger.error(f"Failed to track cost for project {row['project_id']}: {e}")
+                failed.append(index)
+        return failed
+
     async def get_cost_summary(self, project_id: str) -> Dict[str, Any]:
         """Get cost summary for a project."""
         try:
             # Get all cost records for the project
-            result = self.supabase.table("cost_tracking").select("*").eq(
+            result = await self._execute(self.supabase.table("cost_tracking").select("*").eq(
                 "project_id", project_id
-            ).execute()
+            ))
 
             if not result.data:
                 return {
@@ -698,9 +788,9 @@ class SupabaseProjectManager:
         """Get detailed cost analysis for a project."""
         try:
             # Get all cost records
-            result = self.supabase.table("cost_tracking").select("*").eq(
+            result = await self._execute(self.supabase.table("cost_tracking").select("*").eq(
                 "project_id", project_id
-            ).order("created_at").execute()
+            ).order("created_at"))
 
             # Get summary
             summary = await self.get_cost_summary(project_id)
@@ -861,16 +951,16 @@ class SupabaseProjectManager:
         """Save a completed blog."""
         try:
             # Check if already exists
-            existing_result = self.supabase.table("completed_blogs").select("*").eq(
+            existing_result = await self._execute(self.supabase.table("completed_blogs").select("*").eq(
                 "project_id", project_id
-            ).execute()
+            ))
 
             now = datetime.utcnow().isoformat()
 
             if existing_result.data:
                 # Update existing
                 existing = existing_result.data[0]
-                self.supabase.table("completed_blogs").update({
+                await self._execute(self.supabase.table("completed_blogs").update({
                     "title": title,
                     "final_content": content,
                     "word_count": word_count,
@@ -878,10 +968,10 @@ class SupabaseProjectManager:
                     "generation_time_seconds": generation_time,
                     "version": existing.get("version", 1) + 1,
                     "metadata": metadata or {}
-                }).eq("project_id", project_id).execute()
+                }).eq("project_id", project_id))
             else:
                 # Create new
-                self.supabase.table("completed_blogs").insert({
+                await self._execute(self.supabase.table("completed_blogs").insert({
                     "project_id": project_id,
                     "title": title,
                     "final_content": content,
@@ -890,12 +980,12 @@ class SupabaseProjectManager:
                     "generation_time_seconds": generation_time,
                     "metadata": metadata or {},
                     "created_at": now
-                }).execute()
+                }))
 
             # Update project completed_at
-            self.supabase.table("projects").update({
+            await self._execute(self.supabase.table("projects").update({
                 "completed_at": now
-            }).eq("id", project_id).execute()
+            }).eq("id", project_id))
 
             logger.info(f"Saved completed blog for project {project_id}")
             return True
@@ -1003,10 +1093,10 @@ class SupabaseProjectManager:
                 current_metadata.update(metadata)
 
                 # Update project
-                self.supabase.table("projects").update({
+                await self._execute(self.supabase.table("projects").update({
                     "metadata": current_metadata,
                     "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", project_id).execute()
+                }).eq("id", project_id))
 
             return True
 
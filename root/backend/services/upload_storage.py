@@ -0,0 +1,87 @@
+# ABOUTME: Streams uploaded files to disk in chunks while hashing them, with an early size limit
+# ABOUTME: Writes run off the event loop; byte-identical re-uploads of an ingested file are detected by hash
+
+"""
+Upload storage.
+
+``save_upload`` copies an ``UploadFile`` to its destination chunk by chunk:
+the SHA-256 is computed as bytes arrive (it is the same raw-file hash the
+ingestion manifest records), the size limit is checked before and during the
+copy, and the file is written to a ``.part`` file that is atomically moved into
+place only when the upload completes.
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    unchanged: bool     # identical bytes were already at ``path``; nothing was written
+
+
+async def save_upload(upload: UploadFile, destination: Path, max_bytes: Optional[int] = None,
+                      chunk_size: Optional[int] = None, known_sha256: Optional[str] = None) -> StoredUpload:
+    """
+    Stream an upload to ``destination``, hashing it on the fly.
+
+    Args:
+        upload: The uploaded file
+        destination: Final path of the file
+        max_bytes: Size limit (defaults to MAX_UPLOAD_BYTES)
+        chunk_size: Bytes read per step (defaults to UPLOAD_CHUNK_SIZE)
+        known_sha256: Hash of the file already stored at ``destination``; when the
+                      upload matches it the existing file is left untouched
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than ``max_bytes``
+    """
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+
+    # Reject before copying anything when the size is already known
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(f"{upload.filename} is {upload.size} bytes; the limit is {max_bytes}")
+
+    part_path = destination.with_name(destination.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, part_path, "wb")
+    try:
+        while chunk := await upload.read(chunk_size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"{upload.filename} exceeds the {max_bytes} byte limit")
+            digest.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(part_path.unlink, True)
+        raise
+    await asyncio.to_thread(f.close)
+
+    sha256 = digest.hexdigest()
+    if known_sha256 == sha256 and destination.exists():
+        await asyncio.to_thread(part_path.unlink, True)
+        logger.info(f"Upload identical to the already ingested {destination}; keeping existing file")
+        return StoredUpload(str(destination), sha256, size, True)
+
+    await asyncio.to_thread(os.replace, part_path, destination)
+    return StoredUpload(str(destination), sha256, size, False)
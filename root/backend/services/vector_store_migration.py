@@ -0,0 +1,49 @@
+# ABOUTME: One-off migration of the single shared Chroma "content" collection into per-project collections
+# ABOUTME: Copies stored embeddings (no re-embedding) and removes moved chunks from the shared collection
+
+"""
+Vector store migration.
+
+Before project routing every chunk lived in the ``content`` collection and
+searches filtered it by ``project_name``. This tool moves each chunk that has
+a project into that project's collection (see ``project_collection_name``).
+Chunks without a project stay where they are.
+
+The application also runs the migration at startup (``VECTOR_STORE_AUTO_MIGRATE``),
+so the tool is mainly for migrating ahead of a deploy or inspecting what would move.
+
+Usage (from the ``root`` directory):
+    python -m backend.services.vector_store_migration --dry-run
+    python -m backend.services.vector_store_migration --batch-size 500
+"""
+
+import argparse
+import logging
+
+from backend.services.vector_store_service import SHARED_COLLECTION, VectorStoreService, project_collection_name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks moved per step")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would move")
+    args = parser.parse_args()
+
+    service = VectorStoreService()
+    if service.routing != "project":
+        raise SystemExit("VECTOR_STORE_ROUTING is 'shared'; set it to 'project' to migrate")
+
+    before = service.collection.count()
+    moved = service.migrate_to_project_collections(batch_size=args.batch_size, dry_run=args.dry_run)
+
+    print(f"{'project':<40} {'collection':<60} {'chunks':>8}")
+    for project_name, count in sorted(moved.items()):
+        print(f"{project_name:<40} {project_collection_name(project_name):<60} {count:>8}")
+    action = "would move" if args.dry_run else "moved"
+    print(f"\n{sum(moved.values())} of {before} chunks in '{SHARED_COLLECTION}' {action} "
+          f"to {len(moved)} project collections")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
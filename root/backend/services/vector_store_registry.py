@@ -0,0 +1,109 @@
+# ABOUTME: Process-wide registry for the shared VectorStoreService and its embedding model
+# ABOUTME: Created once at application startup and injected into agents, graphs and node states
+
+"""
+Shared vector store registry.
+
+Loading the embedding model and opening the ChromaDB client are the most expensive
+parts of a request when done per node. The registry creates a single
+VectorStoreService per process (thread-safe, lazily if startup was skipped) and
+records how long initialization and warmup took.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from backend.services.vector_store_service import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+AUTO_MIGRATE = os.getenv("VECTOR_STORE_AUTO_MIGRATE", "true").lower() == "true"
+
+
+class VectorStoreRegistry:
+    """Holds the single VectorStoreService instance for the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._service: Optional[VectorStoreService] = None
+        self.timings: Dict[str, Optional[float]] = {
+            "init_seconds": None,
+            "warmup_seconds": None,
+        }
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._service is not None
+
+    def startup(self, warmup: bool = True) -> VectorStoreService:
+        """
+        Create the shared service (if needed) and optionally warm up the embedding model.
+
+        Args:
+            warmup: Run a single dummy embedding so the first real request
+                    doesn't pay for lazy model/kernel initialization.
+
+        Returns:
+            The shared VectorStoreService instance
+        """
+        service = self.get()
+        # Generated outlines/sections now live in the GenerationCache; drop old copies so
+        # they no longer show up alongside real chunks (a no-op once it has succeeded)
+        service.purge_legacy_cache_documents()
+        if AUTO_MIGRATE and service.routing == "project":
+            # Chunks written before per-project collections move out of the shared collection once
+            service.migrate_to_project_collections()
+        if warmup and self.timings["warmup_seconds"] is None:
+            self._warmup(service)
+        return service
+
+    def get(self) -> VectorStoreService:
+        """Return the shared service, creating it on first use."""
+        if self._service is not None:
+            return self._service
+
+        with self._lock:
+            if self._service is None:
+                start = time.perf_counter()
+                self._service = VectorStoreService()
+                self.timings["init_seconds"] = time.perf_counter() - start
+                logger.info(
+                    f"Shared VectorStoreService initialized in {self.timings['init_seconds']:.3f}s"
+                )
+            return self._service
+
+    def _warmup(self, service: VectorStoreService) -> None:
+        """Embed a short string to load weights and allocate inference buffers."""
+        start = time.perf_counter()
+        try:
+            service.embedding_fn(["warmup"])
+            self.timings["warmup_seconds"] = time.perf_counter() - start
+            logger.info(f"Embedding model warmed up in {self.timings['warmup_seconds']:.3f}s")
+        except Exception as e:
+            logger.warning(f"Embedding warmup failed (continuing without warmup): {e}")
+
+    def shutdown(self) -> None:
+        """Release the shared service so the next get() creates a fresh one."""
+        with self._lock:
+            self._service = None
+            self.timings = {"init_seconds": None, "warmup_seconds": None}
+        logger.info("Shared VectorStoreService released")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return initialization state and startup timings."""
+        return {
+            "initialized": self.is_initialized,
+            **self.timings,
+        }
+
+
+# Process-wide registry instance
+vector_store_registry = VectorStoreRegistry()
+
+
+def get_vector_store() -> VectorStoreService:
+    """Return the process-wide shared VectorStoreService."""
+    return vector_store_registry.get()
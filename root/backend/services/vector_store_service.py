@@ -1,33 +1,103 @@
 """
 Simplified vector store service using ChromaDB for content storage and retrieval.
-Supports caching of generated outlines for efficient retrieval.
+Outline and section caches are delegated to the SQLite GenerationCache.
+
+Chunks are routed to one Chroma collection per project (VECTOR_STORE_ROUTING=project,
+the default), each persisted in its own store under <persist dir>/projects, so a
+project's searches only touch that project's index and metadata. Chunks without a
+project stay in the shared "content" collection, and searches that name no project
+fan out over every collection. VECTOR_STORE_ROUTING=shared keeps everything in
+"content" filtered by project_name metadata, as before.
+
+Each collection also has a BM25 lexical index over the same chunk ids, kept in step
+on every write. Similarity searches fuse the dense and lexical rankings with
+reciprocal rank fusion (RETRIEVAL_MODE=hybrid, the default) so chunks sharing exact
+identifiers with the query are found; RETRIEVAL_MODE=dense disables fusion.
+
+Project-scoped similarity searches are cached in the in-process RetrievalCache,
+keyed by query embedding, filter and n_results and invalidated when the
+project's ingestion manifest changes or its chunks are rewritten.
 """
 from chromadb import Client, Settings as ChromaSettings # Renamed to avoid conflict
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from backend.models.embeddings.embedding_factory import EmbeddingFactory # Import the factory
+from backend.services.generation_cache import GenerationCache, get_generation_cache
+from backend.services.ingestion_manifest import (
+    IngestionManifest, get_ingestion_manifest, chunk_hash, chunk_id_prefix, plan_chunk_diff
+)
+from backend.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from backend.services.retrieval_cache import RetrievalCache, get_retrieval_cache
+import numpy as np
 import hashlib
 import logging
 import os
+import re
+import shutil
+import threading
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 
+SHARED_COLLECTION = "content"
+PROJECT_COLLECTION_PREFIX = "project_"
+PROJECT_SHARD_DIR = "projects"
+VECTOR_STORE_ROUTING = os.getenv("VECTOR_STORE_ROUTING", "project").lower()
+LEXICAL_INDEX_FILE = "lexical_index.sqlite3"
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+HYBRID_LEXICAL_CANDIDATES = int(os.getenv("HYBRID_LEXICAL_CANDIDATES", "50"))
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+CHUNK_PAGE_SIZE = 2000
+LEGACY_CACHE_PURGE_MARKER = "legacy_cache_documents_purged"
+
+
+def project_collection_name(project_name: str) -> str:
+    """Chroma collection name for a project: readable slug plus a hash of the exact name.
+
+    Chroma names must be 3-63 characters of [a-zA-Z0-9._-] starting and ending with an
+    alphanumeric; the hash keeps names unique when different projects slugify alike.
+    """
+    slug = re.sub(r"[^a-zA-Z0-9_-]+", "-", project_name).strip("-_")[:40]
+    digest = hashlib.sha256(project_name.encode()).hexdigest()[:8]
+    return f"{PROJECT_COLLECTION_PREFIX}{slug}_{digest}" if slug else f"{PROJECT_COLLECTION_PREFIX}{digest}"
+
+
 class VectorStoreService:
-    def __init__(self):
+    routing: str = VECTOR_STORE_ROUTING
+    retrieval_mode: str = RETRIEVAL_MODE
+    persist_dir: Optional[str] = None
+    _project_collections: Optional[Dict[str, object]] = None  # by collection name
+    _lexical_indexes: Optional[Dict[str, LexicalIndex]] = None  # by collection name
+    _collections_lock = threading.Lock()
+
+    def __init__(self, embedding_fn=None, client=None, persist_dir: Optional[str] = None,
+                 routing: Optional[str] = None):
+        """
+        Args:
+            embedding_fn: Embedding function (default: the configured one from EmbeddingFactory)
+            client: Chroma client to use instead of a persistent one at persist_dir; with no
+                    persist_dir, project collections then live in this client too
+            persist_dir: Storage directory (default: CHROMA_PERSIST_DIR or root/data/vector_store)
+            routing: "project" or "shared" (default: VECTOR_STORE_ROUTING)
+        """
         logging.info("Initializing VectorStoreService...")
         try:
-            # Setup storage - use environment variable for Cloud Run compatibility
-            # Falls back to local path for development
-            persist_dir = os.getenv("CHROMA_PERSIST_DIR", "root/data/vector_store")
-            os.makedirs(persist_dir, exist_ok=True)
-            logging.info(f"Using ChromaDB persist directory: {persist_dir}")
+            if client is None:
+                # Setup storage - use environment variable for Cloud Run compatibility
+                # Falls back to local path for development
+                persist_dir = persist_dir or os.getenv("CHROMA_PERSIST_DIR", "root/data/vector_store")
+            if persist_dir:
+                os.makedirs(persist_dir, exist_ok=True)
+                logging.info(f"Using ChromaDB persist directory: {persist_dir}")
+            self.persist_dir = persist_dir
+            if routing:
+                self.routing = routing
 
             # Get the configured embedding function from the factory
-            self.embedding_fn = EmbeddingFactory.get_embedding_function()
+            self.embedding_fn = embedding_fn if embedding_fn is not None else EmbeddingFactory.get_embedding_function()
             logging.info(f"Using embedding function: {type(self.embedding_fn).__name__}")
 
             # Initialize ChromaDB Client
-            self.client = Client(ChromaSettings( # Use renamed Settings
+            self.client = client or Client(ChromaSettings( # Use renamed Settings
                 persist_directory=persist_dir,
                 anonymized_telemetry=False,
                 is_persistent=True
@@ -35,11 +105,13 @@ class VectorStoreService:
 
             # Get or create the collection, passing the embedding function instance
             self.collection = self.client.get_or_create_collection(
-                name="content",
+                name=SHARED_COLLECTION,
                 embedding_function=self.embedding_fn
             )
+            self._project_collections = {}
+            self._lexical_indexes = {}
             
-            logging.info("VectorStoreService initialized successfully")
+            logging.info(f"VectorStoreService initialized successfully (routing: {self.routing})")
         except Exception as e:
             logging.error(f"Error initializing VectorStoreService: {e}")
             raise
@@ -47,6 +119,231 @@ class VectorStoreService:
     def compute_content_hash(self, content: str, _: str = "") -> str:
         """Generate a unique hash for content."""
         return hashlib.sha256(content.encode()).hexdigest()
+
+    # --- Collection routing ---
+
+    def _shard_client(self, collection_name: str):
+        """Chroma client storing a project collection: a separate store under the persist directory.
+
+        Chroma keeps the metadata of all collections in one store in a single SQLite table,
+        so filtered searches would still scan every project's rows. In-memory clients (no
+        persist directory) keep project collections next to the shared one.
+        """
+        if not self.persist_dir:
+            return self.client
+        return Client(ChromaSettings(
+            persist_directory=os.path.join(self.persist_dir, PROJECT_SHARD_DIR, collection_name),
+            anonymized_telemetry=False,
+            is_persistent=True
+        ))
+
+    @staticmethod
+    def _close_shard_client(client) -> None:
+        """Stop a shard client's store and evict it from Chroma's per-path system cache.
+
+        Chroma reuses one system per persist directory for the life of the process, so
+        without this a deleted shard directory would stay open (and be reused stale).
+        """
+        try:
+            system = client._identifier_to_system.pop(client._identifier, None)
+            if system is not None:
+                system.stop()
+        except Exception as e:
+            logging.warning(f"Could not close vector store shard client: {e}")
+
+    def _project_collection(self, name: str, create: bool = True):
+        """Open (and cache) a project collection by name; None if it doesn't exist and create is False."""
+        with self._collections_lock:
+            if self._project_collections is None:
+                self._project_collections = {}
+            collection = self._project_collections.get(name)
+            if collection is None:
+                client = self._shard_client(name)
+                if not create and name not in self.collection_names(client):
+                    return None
+                collection = self._project_collections[name] = client.get_or_create_collection(
+                    name=name,
+                    embedding_function=self.embedding_fn
+                )
+            return collection
+
+    def collection_for(self, project_name: Optional[str]):
+        """Collection holding a project's chunks (the shared collection for no project or shared routing)."""
+        if not project_name or self.routing != "project":
+            return self.collection
+        return self._project_collection(project_collection_name(project_name))
+
+    def collection_names(self, client=None) -> List[str]:
+        # Chroma >= 0.6 lists names; older versions list Collection objects
+        return [c if isinstance(c, str) else c.name for c in (client or self.client).list_collections()]
+
+    def project_collection_names(self) -> List[str]:
+        if self.persist_dir:
+            shard_root = os.path.join(self.persist_dir, PROJECT_SHARD_DIR)
+            names = os.listdir(shard_root) if os.path.isdir(shard_root) else []
+        else:
+            names = self.collection_names()
+        return sorted(name for name in names if name.startswith(PROJECT_COLLECTION_PREFIX))
+
+    def all_collections(self) -> List:
+        """Every collection that can hold chunks: the shared one first, then each project's."""
+        if self.routing != "project":
+            return [self.collection]
+        collections = [self._project_collection(name, create=False) for name in self.project_collection_names()]
+        return [self.collection] + [collection for collection in collections if collection is not None]
+
+    # --- Lexical (BM25) indexes ---
+
+    def _lexical_index_path(self, collection_name: str) -> str:
+        if not self.persist_dir:
+            return ":memory:"
+        if collection_name == SHARED_COLLECTION:
+            return os.path.join(self.persist_dir, LEXICAL_INDEX_FILE)
+        return os.path.join(self.persist_dir, PROJECT_SHARD_DIR, collection_name, LEXICAL_INDEX_FILE)
+
+    def lexical_index_for(self, collection, build: bool = True) -> LexicalIndex:
+        """BM25 index of a collection.
+
+        Args:
+            collection: Chroma collection the index mirrors
+            build: Populate the index from the collection if that never happened (needed to
+                   search; writes skip it since a later build re-reads every chunk anyway)
+        """
+        with self._collections_lock:
+            if self._lexical_indexes is None:
+                self._lexical_indexes = {}
+            index = self._lexical_indexes.get(collection.name)
+            if index is None:
+                index = self._lexical_indexes[collection.name] = LexicalIndex(self._lexical_index_path(collection.name))
+        if build and not index.is_built:
+            # Chunks stored before the index existed (or by another process without one)
+            page_size, offset = self.client.get_max_batch_size(), 0
+            while True:
+                page = collection.get(include=["documents"], limit=page_size, offset=offset)
+                if not page["ids"]:
+                    break
+                index.add(page["ids"], page["documents"])
+                offset += len(page["ids"])
+            index.mark_built()
+            if offset:
+                logging.info(f"Built lexical index for collection {collection.name} ({offset} chunks)")
+        return index
+
+    def _drop_lexical_index(self, collection_name: str) -> None:
+        with self._collections_lock:
+            index = (self._lexical_indexes or {}).pop(collection_name, None)
+        if index is not None:
+            index.close()
+        path = self._lexical_index_path(collection_name)
+        if path != ":memory:":
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def _delete_where(self, collection, where: Dict) -> int:
+        """Delete matching chunks from a collection and its lexical index."""
+        ids = collection.get(where=where, include=[])["ids"]
+        max_batch = self.client.get_max_batch_size()
+        for start in range(0, len(ids), max_batch):
+            collection.delete(ids=ids[start:start + max_batch])
+        if ids:
+            self.lexical_index_for(collection, build=False).delete(ids)
+        return len(ids)
+
+    def _route(self, metadata_filter: Optional[Dict]) -> Tuple[List, Optional[Dict]]:
+        """Collections a filtered search must visit, and the filter left to apply inside them.
+
+        A project_name condition selects that project's collection and is dropped from the
+        filter, since every chunk there belongs to the project. Without one, the search
+        visits every collection.
+        """
+        if self.routing != "project":
+            return [self.collection], metadata_filter
+        metadata_filter = dict(metadata_filter or {})
+        project_name = metadata_filter.pop("project_name", None)
+        if project_name:
+            return [self.collection_for(project_name)], metadata_filter
+        return self.all_collections(), metadata_filter
+
+    def delete_project(self, project_name: str) -> None:
+        """Drop every chunk of a project (its whole collection under project routing)."""
+        try:
+            if self.routing == "project":
+                name = project_collection_name(project_name)
+                with self._collections_lock:
+                    if self._project_collections:
+                        self._project_collections.pop(name, None)
+                client = self._shard_client(name)
+                if name in self.collection_names(client):
+                    client.delete_collection(name)
+                self._drop_lexical_index(name)
+                if self.persist_dir:
+                    # Remove the dead shard so fan-out searches stop opening it
+                    self._close_shard_client(client)
+                    shutil.rmtree(os.path.join(self.persist_dir, PROJECT_SHARD_DIR, name), ignore_errors=True)
+            # Chunks stored before project routing (or under shared routing) live in the shared collection
+            self._delete_where(self.collection, {"project_name": project_name})
+            self.ingestion_manifest.delete(project_name)
+            self._invalidate_retrieval(project_name)
+            logging.info(f"Deleted vector store content for project {project_name}")
+        except Exception as e:
+            logging.error(f"Error deleting project content: {e}")
+
+    def migrate_to_project_collections(self, batch_size: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+        """Move chunks that have a project_name out of the shared collection into per-project collections.
+
+        Stored embeddings are copied as-is, so nothing is re-embedded. Chunks without a
+        project stay in the shared collection. Safe to re-run: an interrupted migration
+        leaves each chunk in one collection or both, and a re-run finishes the move.
+
+        Args:
+            batch_size: Chunks read, written and deleted per step
+            dry_run: Only count what would move
+
+        Returns:
+            Number of chunks moved (or to move) per project
+        """
+        moved: Dict[str, int] = {}
+        if self.routing != "project":
+            logging.info("Vector store routing is 'shared'; nothing to migrate")
+            return moved
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=["metadatas", "documents", "embeddings"], limit=batch_size, offset=offset
+            )
+            if not page["ids"]:
+                break
+            by_project: Dict[str, List[int]] = {}
+            for i, meta in enumerate(page["metadatas"]):
+                project_name = (meta or {}).get("project_name")
+                if project_name:
+                    by_project.setdefault(project_name, []).append(i)
+            for project_name, indices in by_project.items():
+                moved[project_name] = moved.get(project_name, 0) + len(indices)
+                if dry_run:
+                    continue
+                target = self.collection_for(project_name)
+                ids, documents = [page["ids"][i] for i in indices], [page["documents"][i] for i in indices]
+                target.upsert(
+                    ids=ids,
+                    documents=documents,
+                    embeddings=[page["embeddings"][i] for i in indices],
+                    metadatas=[page["metadatas"][i] for i in indices]
+                )
+                self.lexical_index_for(target, build=False).add(ids, documents)
+                self._invalidate_retrieval(project_name)
+            moved_ids = [page["ids"][i] for indices in by_project.values() for i in indices]
+            if moved_ids and not dry_run:
+                self.collection.delete(ids=moved_ids)
+                self.lexical_index_for(self.collection, build=False).delete(moved_ids)
+                offset += len(page["ids"]) - len(moved_ids)
+            else:
+                offset += len(page["ids"])
+        if moved:
+            logging.info(f"{'Would move' if dry_run else 'Moved'} {sum(moved.values())} chunks "
+                         f"into {len(moved)} project collections")
+        return moved
     
     def store_content_chunks(
         self,
@@ -64,12 +361,16 @@ class VectorStoreService:
                 meta["content_hash"] = content_hash
                 meta["chunk_order"] = i  # Add chunk order to metadata
                                         
-            # Store chunks with ordered IDs
-            self.collection.add(
+            # Store chunks with ordered IDs in the project's collection
+            collection = self.collection_for(metadata[0].get("project_name"))
+            ids = [f"chunk_{content_hash}_{i:04d}" for i in range(len(chunks))]  # Zero-padded ordering
+            collection.add(
                 documents=chunks,
                 metadatas=metadata,
-                ids=[f"chunk_{content_hash}_{i:04d}" for i in range(len(chunks))]  # Zero-padded ordering
+                ids=ids
             )
+            self.lexical_index_for(collection, build=False).add(ids, chunks)
+            self._invalidate_retrieval(metadata[0].get("project_name"))
             logging.info(f"Stored {len(chunks)} ordered chunks for hash {content_hash}")
         except ValueError as e:
             logging.error(f"Validation error: {e}")
@@ -77,84 +378,486 @@ class VectorStoreService:
         except Exception as e:
             logging.error(f"Error storing content: {e}")
             raise
-    
+
+    @property
+    def ingestion_manifest(self) -> IngestionManifest:
+        return get_ingestion_manifest()
+
+    def find_unchanged_content_hash(self, project_name: Optional[str], file_path: str,
+                                    source_hash: str) -> Optional[str]:
+        """Content hash of a file whose raw bytes match its manifest entry, else None."""
+        entry = self.ingestion_manifest.get(project_name, file_path)
+        if entry and entry["source_hash"] == source_hash:
+            return entry["content_hash"]
+        return None
+
+    def _previous_chunks(self, project_name: Optional[str], file_path: str, content_hash: str,
+                         chunk_hashes: List[str]) -> List[Tuple[str, Optional[str]]]:
+        """Stored (chunk_id, chunk_hash) pairs for a file, from the manifest or, failing that, the collection."""
+        entry = self.ingestion_manifest.get(project_name, file_path)
+        if entry:
+            return entry["chunks"]
+
+        # No manifest yet (content stored by an older version): recover what the collection holds
+        collection = self.collection_for(project_name)
+        where = {"$and": [{"file_path": file_path}, {"project_name": project_name}]} \
+            if project_name and collection is self.collection else {"file_path": file_path}
+        results = collection.get(where=where, include=["metadatas"])
+        stored = sorted(zip(results["ids"], results["metadatas"]), key=lambda item: item[1].get("chunk_order", 0))
+        if all(meta.get("chunk_hash") for _, meta in stored):
+            return [(chunk_id, meta["chunk_hash"]) for chunk_id, meta in stored]
+        if len(stored) == len(chunk_hashes) and all(meta.get("content_hash") == content_hash for _, meta in stored):
+            # Legacy chunks of identical content map one-to-one onto the new chunks
+            return [(chunk_id, chunk_hashes[i]) for i, (chunk_id, _) in enumerate(stored)]
+        return [(chunk_id, None) for chunk_id, _ in stored]
+
+    def sync_file_chunks(self, files: List[Dict]) -> Dict[str, Dict[str, int]]:
+        """Store files' chunks incrementally: embed only new chunks and delete removed ones.
+
+        Chunks are diffed against each file's manifest entry. New chunks of all files
+        are embedded in one pass, unchanged chunks only get their metadata (content
+        hash, order) updated and chunks that disappeared are deleted.
+
+        Args:
+            files: Dicts with file_path, project_name, chunks, metadata, content_hash
+                   and optionally source_hash (hash of the raw file)
+
+        Returns:
+            Per file path: counts of added, unchanged and deleted chunks
+        """
+        # Pending writes per target collection, keyed by project
+        writes: Dict[Optional[str], Dict[str, list]] = {}
+        manifests, stats = [], {}
+
+        for file in files:
+            chunks, metadata, content_hash = file["chunks"], file["metadata"], file["content_hash"]
+            if not chunks or not metadata or len(chunks) != len(metadata):
+                raise ValueError(f"Invalid chunks or metadata for {file['file_path']}")
+            project_name, file_path = file.get("project_name"), file["file_path"]
+            pending = writes.setdefault(project_name, {
+                "add_ids": [], "add_documents": [], "add_metadatas": [],
+                "keep_ids": [], "keep_metadatas": [], "delete_ids": [],
+            })
+
+            chunk_hashes = [chunk_hash(chunk) for chunk in chunks]
+            diff = plan_chunk_diff(
+                self._previous_chunks(project_name, file_path, content_hash, chunk_hashes),
+                chunk_hashes,
+                chunk_id_prefix(project_name, file_path)
+            )
+            added = set(diff.added)
+            for i, (chunk_id, chunk, meta) in enumerate(zip(diff.ids, chunks, metadata)):
+                meta["content_hash"] = content_hash
+                meta["chunk_order"] = i
+                meta["chunk_hash"] = chunk_hashes[i]
+                if i in added:
+                    pending["add_ids"].append(chunk_id)
+                    pending["add_documents"].append(chunk)
+                    pending["add_metadatas"].append(meta)
+                else:
+                    pending["keep_ids"].append(chunk_id)
+                    pending["keep_metadatas"].append(meta)
+            pending["delete_ids"].extend(diff.removed)
+
+            manifests.append((project_name, file_path, content_hash,
+                              list(zip(diff.ids, chunk_hashes)), file.get("source_hash")))
+            stats[file_path] = {
+                "added": len(diff.added),
+                "unchanged": len(chunks) - len(diff.added),
+                "deleted": len(diff.removed),
+            }
+
+        # One embedding call across all files and projects
+        all_documents = [doc for pending in writes.values() for doc in pending["add_documents"]]
+        embeddings = self.embedding_fn(all_documents) if all_documents else []
+        max_batch = self.client.get_max_batch_size()
+        offset = 0
+        for project_name, pending in writes.items():
+            collection = self.collection_for(project_name)
+            lexical_index = self.lexical_index_for(collection, build=False)
+            delete_ids = pending["delete_ids"]
+            for start in range(0, len(delete_ids), max_batch):
+                collection.delete(ids=delete_ids[start:start + max_batch])
+            lexical_index.delete(delete_ids)
+            add_ids, add_documents = pending["add_ids"], pending["add_documents"]
+            add_embeddings = embeddings[offset:offset + len(add_documents)]
+            offset += len(add_documents)
+            # Writes sized to Chroma's batch limit
+            for start in range(0, len(add_documents), max_batch):
+                end = start + max_batch
+                collection.add(
+                    documents=add_documents[start:end],
+                    embeddings=add_embeddings[start:end],
+                    metadatas=pending["add_metadatas"][start:end],
+                    ids=add_ids[start:end]
+                )
+            lexical_index.add(add_ids, add_documents)
+            # Metadata-only updates never re-embed
+            keep_ids = pending["keep_ids"]
+            for start in range(0, len(keep_ids), max_batch):
+                end = start + max_batch
+                collection.update(ids=keep_ids[start:end], metadatas=pending["keep_metadatas"][start:end])
+
+        for project_name, file_path, content_hash, chunks, source_hash in manifests:
+            self.ingestion_manifest.set(project_name, file_path, content_hash, chunks, source_hash=source_hash)
+        # The manifest versions changed already; this also covers a failed manifest write
+        for project_name in writes:
+            self._invalidate_retrieval(project_name)
+
+        logging.info(
+            f"Synced {len(files)} files: {len(all_documents)} chunks embedded, "
+            f"{sum(len(p['keep_ids']) for p in writes.values())} unchanged, "
+            f"{sum(len(p['delete_ids']) for p in writes.values())} deleted"
+        )
+        return stats
+
+    @staticmethod
+    def _where_clause(metadata_filter: Optional[Dict]) -> Dict:
+        """Convert a flat metadata filter to ChromaDB's where format ($and for multiple conditions)."""
+        if not metadata_filter:
+            return {}
+        if len(metadata_filter) > 1:
+            return {"$and": [{key: value} for key, value in metadata_filter.items()]}
+        return metadata_filter
+
+    @staticmethod
+    def _results_list(documents: List[str], metadatas: List[Dict], distances: List[float]) -> List[Dict]:
+        return [
+            {
+                "content": doc,
+                "metadata": meta,
+                "relevance": 1 - (dist / 2),
+                "order": meta.get("chunk_order", 0)  # Get chunk order from metadata
+            }
+            for doc, meta, dist in zip(documents, metadatas, distances)
+        ]
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        embeddings = self.embedding_fn(texts)
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Embedding function returned {len(embeddings)} embeddings for {len(texts)} queries")
+        return [list(map(float, embedding)) for embedding in embeddings]
+
+    @staticmethod
+    def _query_collections(collections: List, query_embeddings: List[List[float]], where: Dict,
+                           n_results: int) -> List[List[Tuple[str, str, Dict, float]]]:
+        """Nearest (id, document, metadata, distance) hits per query embedding, merged across collections."""
+        merged: List[List[Tuple[str, str, Dict, float]]] = [[] for _ in query_embeddings]
+        for collection in collections:
+            results = collection.query(query_embeddings=query_embeddings, where=where or None, n_results=n_results)
+            for row, hits in enumerate(merged):
+                hits.extend(zip(results["ids"][row], results["documents"][row],
+                                results["metadatas"][row], results["distances"][row]))
+        if len(collections) > 1:
+            for hits in merged:
+                hits.sort(key=lambda hit: hit[3])
+                del hits[n_results:]
+        return merged
+
+    def _fuse_lexical(self, collections: List, queries: List[str], query_embeddings: List[List[float]],
+                      where: Dict, n_results: List[int],
+                      dense_hits: List[List[Tuple[str, str, Dict, float]]]) -> List[List[Tuple[str, str, Dict, float]]]:
+        """Fuse each query's top n_results dense hits with BM25 hits from the same collections (reciprocal rank fusion).
+
+        Only the top n lexical hits that pass the metadata filter can reach the fused top n
+        (any lower one is outranked by n dense hits), so candidates the dense search didn't
+        return are fetched in small windows until n pass the filter. Fetched chunks get their
+        actual embedding distance, so "relevance" keeps its meaning.
+        """
+        fetched: Dict[str, Tuple[str, Dict, np.ndarray]] = {}
+        rejected: set = set()
+        fused_rows = []
+        for row, query in enumerate(queries):
+            n = n_results[row]
+            dense = dense_hits[row][:n]
+            by_id = {hit[0]: hit for hit in dense}
+            ranked = [
+                (score, chunk_id, collection)
+                for collection in collections
+                for chunk_id, score in self.lexical_index_for(collection).search(query, HYBRID_LEXICAL_CANDIDATES)
+            ]
+            ranked.sort(key=lambda item: -item[0])
+
+            lexical_ids, position = [], 0
+            while len(lexical_ids) < n and position < len(ranked):
+                window = ranked[position:position + 2 * n]
+                position += len(window)
+                wanted: Dict[str, Tuple[object, List[str]]] = {}
+                for _, chunk_id, collection in window:
+                    if chunk_id not in by_id and chunk_id not in fetched and chunk_id not in rejected:
+                        wanted.setdefault(collection.name, (collection, []))[1].append(chunk_id)
+                for collection, ids in wanted.values():
+                    page = collection.get(ids=ids, where=where or None, include=["documents", "metadatas", "embeddings"])
+                    for chunk_id, document, metadata, embedding in zip(page["ids"], page["documents"],
+                                                                       page["metadatas"], page["embeddings"]):
+                        fetched[chunk_id] = (document, metadata, np.asarray(embedding, dtype=np.float64))
+                    rejected.update(set(ids) - set(page["ids"]))
+                for _, chunk_id, _ in window:
+                    if chunk_id in by_id or chunk_id in fetched:
+                        lexical_ids.append(chunk_id)
+
+            query_vector = np.asarray(query_embeddings[row], dtype=np.float64)
+            for chunk_id in lexical_ids[:n]:
+                if chunk_id not in by_id:
+                    document, metadata, embedding = fetched[chunk_id]
+                    # Chroma's default space: squared L2
+                    by_id[chunk_id] = (chunk_id, document, metadata, float(np.sum((embedding - query_vector) ** 2)))
+            fused = reciprocal_rank_fusion([[hit[0] for hit in dense], lexical_ids[:n]], HYBRID_RRF_K)
+            fused_rows.append([by_id[chunk_id] for chunk_id in fused[:n]])
+        return fused_rows
+
+    def _search_hits(self, collections: List, queries: List[str], query_embeddings: List[List[float]],
+                     where: Dict, n_results: List[int]) -> List[List[Tuple[str, str, Dict, float]]]:
+        """Top n_results[i] dense hits for queries[i], fused with lexical hits in hybrid retrieval mode."""
+        hits = self._query_collections(collections, query_embeddings, where, max(n_results))
+        if self.retrieval_mode == "hybrid":
+            hits = self._fuse_lexical(collections, queries, query_embeddings, where, n_results, hits)
+        return hits
+
+    # --- Retrieval result cache ---
+
+    @property
+    def retrieval_cache(self) -> Optional[RetrievalCache]:
+        return get_retrieval_cache()
+
+    def _invalidate_retrieval(self, project_name: Optional[str] = None) -> None:
+        """Drop cached search results of a project (of every project if none is given)."""
+        cache = self.retrieval_cache
+        if cache is not None:
+            cache.invalidate(project_name)
+
+    def _cached_search(self, query: str, query_embedding: List[float], metadata_filter: Optional[Dict],
+                       n_results: int) -> Tuple[Optional[Tuple], Optional[List[Dict]]]:
+        """Cache slot of a project-scoped search (None if it can't be cached) and its cached results, if any."""
+        cache = self.retrieval_cache
+        project_name = (metadata_filter or {}).get("project_name")
+        if cache is None or not project_name:
+            return None, None
+        manifest_version = self.ingestion_manifest.project_version(project_name)
+        if manifest_version is None:
+            return None, None
+        digest = hashlib.sha256(np.asarray(query_embedding, dtype=np.float32).tobytes())
+        if self.retrieval_mode == "hybrid":
+            digest.update(query.encode())  # the lexical ranking depends on the text itself
+        key = (digest.hexdigest(), repr(sorted(metadata_filter.items())), n_results, self.retrieval_mode)
+        slot = (project_name, cache.version(project_name, manifest_version), key)
+        return slot, cache.get(*slot)
+
+    def _cache_search(self, slot: Optional[Tuple], results: List[Dict]) -> None:
+        cache = self.retrieval_cache
+        if slot is not None and cache is not None:
+            cache.set(*slot, results)
+
     def search_content(
         self,
         query: Optional[str] = None,
         metadata_filter: Optional[Dict] = None,
         n_results: int = 10
     ) -> List[Dict]:
-        """Search content with optional filtering."""
+        """Search content with optional filtering (a project_name filter selects the project's collection)."""
         try:
-            where = {}
-            if metadata_filter:
-                # Convert multiple conditions to ChromaDB's $and operator format
-                if len(metadata_filter) > 1:
-                    where = {
-                        "$and": [
-                            {key: value} for key, value in metadata_filter.items()
-                        ]
-                    }
-                else:
-                    where = metadata_filter
+            if query:
+                query_embeddings = self._embed_queries([query])
+                cache_slot, cached = self._cached_search(query, query_embeddings[0], metadata_filter, n_results)
+                if cached is not None:
+                    return cached
+
+            collections, metadata_filter = self._route(metadata_filter)
+            where = self._where_clause(metadata_filter)
+            if where:
                 logging.debug(f"Using metadata filter: {where}")
 
             if query:
-                results = self.collection.query(
-                    query_texts=[query],
-                    where=where,
-                    n_results=n_results
-                )
-                documents = results["documents"][0]
-                metadatas = results["metadatas"][0]
-                distances = results["distances"][0]
+                hits = self._search_hits(collections, [query], query_embeddings, where, [n_results])[0]
+                documents = [doc for _, doc, _, _ in hits]
+                metadatas = [meta for _, _, meta, _ in hits]
+                distances = [dist for _, _, _, dist in hits]
             else:
-                results = self.collection.get(
-                    where=where if where else None
-                    # Removed limit=n_results when fetching by metadata only to ensure all chunks are retrieved
-                )
-                if results and results["documents"]:
-                    documents = results["documents"]
-                    metadatas = results["metadatas"]
-                    distances = [0.0] * len(documents)
-                else:
-                    documents = []
-                    metadatas = []
-                    distances = []
+                documents, metadatas = [], []
+                for collection in collections:
+                    results = collection.get(
+                        where=where if where else None
+                        # Removed limit=n_results when fetching by metadata only to ensure all chunks are retrieved
+                    )
+                    if results and results["documents"]:
+                        documents.extend(results["documents"])
+                        metadatas.extend(results["metadatas"])
+                distances = [0.0] * len(documents)
 
             # Create result list with order information
-            results_list = [
-                {
-                    "content": doc,
-                    "metadata": meta,
-                    "relevance": 1 - (dist / 2),
-                    "order": meta.get("chunk_order", 0)  # Get chunk order from metadata
-                }
-                for doc, meta, dist in zip(documents, metadatas, distances)
-            ]
+            results_list = self._results_list(documents, metadatas, distances)
 
             # Sort results by chunk order if not using query-based search
             if not query:
                 results_list.sort(key=lambda x: x["order"])
+            else:
+                self._cache_search(cache_slot, results_list)
 
             return results_list
 
         except Exception as e:
             logging.error(f"Error searching content: {e}")
             return []
-    
-    def clear_content(self, content_hash: str):
-        """Remove content by hash."""
+
+    def search_content_batch(self, searches: List[Dict]) -> List[List[Dict]]:
+        """Run many similarity searches in one pass.
+
+        Each search is a dict with the search_content arguments: "query" (required),
+        optional "metadata_filter" and "n_results" (default 10). All distinct query
+        texts are embedded in a single embedding call, and searches sharing a filter
+        go to ChromaDB as one multi-query call per collection (a where clause applies
+        to a whole call). Project-scoped searches found in the retrieval cache are not
+        sent at all.
+
+        Returns:
+            One result list per search, in input order, shaped like search_content's.
+        """
+        batched: List[List[Dict]] = [[] for _ in searches]
+        if not searches:
+            return batched
         try:
-            self.collection.delete(
-                where={"content_hash": content_hash}
-            )
+            texts = list(dict.fromkeys(search["query"] for search in searches))
+            embedding_for = dict(zip(texts, self._embed_queries(texts)))
+        except Exception as e:
+            logging.error(f"Error embedding batched search queries: {e}")
+            return batched
+
+        # Cached project-scoped results need no search
+        cache_slots: Dict[int, Tuple] = {}
+        pending = []
+        for index, search in enumerate(searches):
+            slot, cached = self._cached_search(search["query"], embedding_for[search["query"]],
+                                               search.get("metadata_filter"), search.get("n_results", 10))
+            if cached is not None:
+                batched[index] = cached
+                continue
+            if slot is not None:
+                cache_slots[index] = slot
+            pending.append(index)
+
+        # Group searches by filter (which includes the project); each group is one query per collection
+        groups: Dict[str, Tuple[Optional[Dict], List[int]]] = {}
+        for index in pending:
+            metadata_filter = searches[index].get("metadata_filter") or {}
+            groups.setdefault(repr(sorted(metadata_filter.items())), (metadata_filter, []))[1].append(index)
+
+        for metadata_filter, indices in groups.values():
+            group_n_results: Dict[str, int] = {}
+            for i in indices:
+                text = searches[i]["query"]
+                group_n_results[text] = max(group_n_results.get(text, 0), searches[i].get("n_results", 10))
+            group_texts = list(group_n_results)
+            try:
+                collections, metadata_filter = self._route(metadata_filter)
+                hits = self._search_hits(
+                    collections,
+                    group_texts,
+                    [embedding_for[text] for text in group_texts],
+                    self._where_clause(metadata_filter),
+                    list(group_n_results.values())
+                )
+            except Exception as e:
+                logging.error(f"Error in batched content search (filter {metadata_filter}): {e}")
+                continue
+            row_for = {text: row for row, text in enumerate(group_texts)}
+            for i in indices:
+                row_hits = hits[row_for[searches[i]["query"]]][:searches[i].get("n_results", 10)]
+                batched[i] = self._results_list(
+                    [doc for _, doc, _, _ in row_hits],
+                    [meta for _, _, meta, _ in row_hits],
+                    [dist for _, _, _, dist in row_hits]
+                )
+                if i in cache_slots:
+                    self._cache_search(cache_slots[i], batched[i])
+        return batched
+
+    def iter_chunks(
+        self,
+        metadata_filter: Optional[Dict] = None,
+        fields: Optional[Sequence[str]] = None,
+        page_size: int = CHUNK_PAGE_SIZE
+    ) -> Iterator[Tuple[str, Dict]]:
+        """Stream matching chunks as (text, metadata) pairs in chunk_order.
+
+        Ids and metadata are read first, a page at a time, to establish the order, keeping
+        only the requested metadata fields. Chunk texts are then fetched by id one page at
+        a time, so a large project's documents are never all in memory and no result dicts
+        are built. The first page is read with its texts, so results that fit in one page
+        take a single ChromaDB call.
+
+        Args:
+            metadata_filter: Flat metadata filter (a project_name selects the project's collection)
+            fields: Metadata fields to keep (all fields if None)
+            page_size: Chunks read per ChromaDB call
+
+        Raises:
+            Exception: If listing or a text page fails, possibly after some chunks were
+                       yielded; a failed read never ends the stream as if it were complete
+        """
+        ordered: List[Tuple[int, int, str, Dict]] = []   # (chunk_order, collection, id, metadata)
+        documents: Dict[str, str] = {}   # texts read with the first page
+        try:
+            collections, metadata_filter = self._route(metadata_filter)
+            where = self._where_clause(metadata_filter) or None
+            for position, collection in enumerate(collections):
+                offset = 0
+                while True:
+                    include = ["metadatas", "documents"] if offset == 0 else ["metadatas"]
+                    page = collection.get(where=where, include=include, limit=page_size, offset=offset)
+                    if offset == 0:
+                        documents.update(zip(page["ids"], page["documents"]))
+                    for chunk_id, meta in zip(page["ids"], page["metadatas"]):
+                        meta = meta or {}
+                        order = meta.get("chunk_order", 0)
+                        if fields is not None:
+                            meta = {field: meta[field] for field in fields if field in meta}
+                        ordered.append((order, position, chunk_id, meta))
+                    if len(page["ids"]) < page_size:
+                        break
+                    offset += len(page["ids"])
+        except Exception as e:
+            logging.error(f"Error listing chunks: {e}")
+            raise
+        ordered.sort(key=lambda item: item[0])
+
+        for start in range(0, len(ordered), page_size):
+            window = ordered[start:start + page_size]
+            ids_by_collection: Dict[int, List[str]] = {}
+            for _, position, chunk_id, _ in window:
+                if chunk_id not in documents:
+                    ids_by_collection.setdefault(position, []).append(chunk_id)
+            try:
+                for position, ids in ids_by_collection.items():
+                    page = collections[position].get(ids=ids, include=["documents"])
+                    documents.update(zip(page["ids"], page["documents"]))
+            except Exception as e:
+                logging.error(f"Error reading chunk texts after {start} of {len(ordered)} chunks: {e}")
+                raise
+            for _, _, chunk_id, meta in window:
+                document = documents.pop(chunk_id, None)
+                if document is not None:   # None: deleted since it was listed
+                    yield document, meta
+
+    def clear_content(self, content_hash: str, project_name: Optional[str] = None):
+        """Remove content by hash (from every collection unless the project is given)."""
+        try:
+            collections = [self.collection_for(project_name)] if project_name else self.all_collections()
+            for collection in collections:
+                self._delete_where(collection, {"content_hash": content_hash})
+            self._invalidate_retrieval(project_name)
             logging.info(f"Cleared content for hash {content_hash}")
         except Exception as e:
             logging.error(f"Error clearing content: {e}")
             
+    # --- Outline/Section Cache Methods ---
+    # Backed by the SQLite GenerationCache: no embedding work on write, primary-key lookups on read.
+
+    @property
+    def generation_cache(self) -> GenerationCache:
+        return get_generation_cache()
+
     def store_outline_cache(self, outline_json: str, cache_key: str, project_name: str, source_hashes: List[str]):
-        """Store a generated outline with metadata for caching.
+        """Store a generated outline for caching.
         
         Args:
             outline_json: The JSON string representation of the outline
@@ -162,32 +865,13 @@ class VectorStoreService:
             project_name: The project name for organization
             source_hashes: List of content hashes used to generate the outline
         """
-        try:
-            # Create metadata for the outline cache
-            metadata = {
-                "content_type": "outline_cache",
-                "project_name": project_name,
-                "cache_key": cache_key,
-                "source_hashes": ",".join(filter(None, source_hashes)),  # Join non-None hashes
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            # embeddings = [self.embedding_fn(chunk) for chunk in [outline_json]]
-            
-            # Store the outline as a single document - ChromaDB expects a list of documents
-            # but the embedding function expects a single string
-            self.collection.add(
-                documents=[outline_json],  # Keep as a list with a single string
-                metadatas=[metadata],
-                ids=[f"outline_{cache_key}"],
-                # embeddings=embeddings  # Skip embedding generation, let ChromaDB handle it
-            )
-            
+        stored = self.generation_cache.set(
+            "outline", cache_key, outline_json, project_name,
+            metadata=",".join(filter(None, source_hashes))  # Join non-None hashes
+        )
+        if stored:
             logging.info(f"Cached outline with key {cache_key} for project {project_name}")
-            return True
-        except Exception as e:
-            logging.error(f"Error caching outline: {e}")
-            return False
+        return stored
     
     def retrieve_outline_cache(self, cache_key: str, project_name: Optional[str] = None) -> Optional[str]:
         """Retrieve a cached outline based on cache key and optional project name.
@@ -199,41 +883,12 @@ class VectorStoreService:
         Returns:
             The cached outline JSON string or None if not found
         """
-        try:
-            # Build the query filter
-            if project_name:
-                # Use $and operator for multiple conditions
-                where = {
-                    "$and": [
-                        {"content_type": "outline_cache"},
-                        {"cache_key": cache_key},
-                        {"project_name": project_name}
-                    ]
-                }
-            else:
-                # Use $and operator for multiple conditions
-                where = {
-                    "$and": [
-                        {"content_type": "outline_cache"},
-                        {"cache_key": cache_key}
-                    ]
-                }
-                
-            # Query for the cached outline
-            results = self.collection.get(
-                where=where,
-                limit=1
-            )
-            
-            if results and results["documents"] and len(results["documents"]) > 0:
-                logging.info(f"Found cached outline with key {cache_key}")
-                return results["documents"][0]
-            else:
-                logging.info(f"No cached outline found with key {cache_key}")
-                return None
-        except Exception as e:
-            logging.error(f"Error retrieving cached outline: {e}")
-            return None
+        outline_json = self.generation_cache.get("outline", cache_key, project_name)
+        if outline_json is not None:
+            logging.info(f"Found cached outline with key {cache_key}")
+        else:
+            logging.info(f"No cached outline found with key {cache_key}")
+        return outline_json
             
     def clear_outline_cache(self, project_name: Optional[str] = None):
         """Clear cached outlines, optionally filtered by project name.
@@ -241,32 +896,10 @@ class VectorStoreService:
         Args:
             project_name: Optional project name to clear caches for
         """
-        try:
-            if project_name:
-                # Use $and operator for multiple conditions
-                where = {
-                    "$and": [
-                        {"content_type": "outline_cache"},
-                        {"project_name": project_name}
-                    ]
-                }
-            else:
-                where = {"content_type": "outline_cache"}
-                
-            self.collection.delete(where=where)
-            
-            if project_name:
-                logging.info(f"Cleared outline cache for project {project_name}")
-            else:
-                logging.info("Cleared all outline caches")
-        except Exception as e:
-            logging.error(f"Error clearing outline cache: {e}")
-
-
-    # --- Section Cache Methods ---
+        self.generation_cache.invalidate("outline", project_name=project_name)
 
     def store_section_cache(self, section_json: str, cache_key: str, project_name: str, outline_hash: str, section_index: int):
-        """Store a generated section with metadata for caching.
+        """Store a generated section for caching.
 
         Args:
             section_json: The JSON string representation of the section (e.g., {"title": "...", "content": "..."})
@@ -275,33 +908,19 @@ class VectorStoreService:
             outline_hash: The hash of the outline the section belongs to
             section_index: The index of the section within the outline
         """
-        try:
-            metadata = {
-                "content_type": "section_cache",
-                "project_name": project_name,
-                "outline_hash": outline_hash, # Store outline_hash instead of job_id
-                "section_index": section_index,
-                "cache_key": cache_key, # Store the key itself for potential lookup/debugging
-                "timestamp": datetime.now().isoformat()
-            }
-
-            # Store the section JSON as a single document
-            self.collection.add(
-                documents=[section_json],
-                metadatas=[metadata],
-                ids=[f"section_{cache_key}"] # Unique ID based on the cache key
-            )
+        stored = self.generation_cache.set(
+            "section", cache_key, section_json, project_name,
+            outline_hash=outline_hash, section_index=section_index
+        )
+        if stored:
             logging.info(f"Cached section {section_index} for outline {outline_hash} with key {cache_key}")
-            return True
-        except Exception as e:
-            logging.error(f"Error caching section {section_index} for outline {outline_hash}: {e}")
-            return False
+        return stored
 
     def retrieve_section_cache(self, cache_key: str, project_name: str, outline_hash: str, section_index: int) -> Optional[str]:
         """Retrieve a cached section based on its identifiers.
 
         Args:
-            cache_key: The cache key to look up
+            cache_key: The cache key to look up (derived from project, outline_hash and index)
             project_name: The project name
             outline_hash: The hash of the outline
             section_index: The section index
@@ -309,58 +928,33 @@ class VectorStoreService:
         Returns:
             The cached section JSON string or None if not found
         """
-        try:
-            # Build the query filter using $and for precise matching
-            where = {
-                "$and": [
-                    {"content_type": "section_cache"},
-                    {"project_name": project_name},
-                    {"outline_hash": outline_hash}, # Filter by outline_hash
-                    {"section_index": section_index},
-                    {"cache_key": cache_key} # Match the specific key
-                ]
-            }
+        section_json = self.generation_cache.get("section", cache_key, project_name)
+        if section_json is not None:
+            logging.info(f"Found cached section {section_index} for outline {outline_hash} with key {cache_key}")
+        else:
+            logging.info(f"No cached section found for outline {outline_hash}, section {section_index} with key {cache_key}")
+        return section_json
 
-            results = self.collection.get(
-                where=where,
-                limit=1
-            )
-
-            if results and results["documents"] and len(results["documents"]) > 0:
-                logging.info(f"Found cached section {section_index} for outline {outline_hash} with key {cache_key}")
-                return results["documents"][0]
-            else:
-                logging.info(f"No cached section found for outline {outline_hash}, section {section_index} with key {cache_key}")
-                return None
-        except Exception as e:
-            logging.error(f"Error retrieving cached section {section_index} for outline {outline_hash}: {e}")
-            return None
-
-    def clear_section_cache(self, project_name: Optional[str] = None, outline_hash: Optional[str] = None): # Changed job_id to outline_hash
+    def clear_section_cache(self, project_name: Optional[str] = None, outline_hash: Optional[str] = None):
         """Clear cached sections, optionally filtered by project and/or outline_hash.
 
         Args:
             project_name: Optional project name to clear caches for
             outline_hash: Optional outline_hash to clear caches for
         """
-        try:
-            filters = [{"content_type": "section_cache"}]
-            if project_name:
-                filters.append({"project_name": project_name})
-            if outline_hash: # Changed from job_id
-                filters.append({"outline_hash": outline_hash})
-
-            if len(filters) == 1: # Only content_type filter
-                 where = filters[0]
-            else:
-                 where = {"$and": filters}
-
-            self.collection.delete(where=where)
+        self.generation_cache.invalidate("section", project_name=project_name, outline_hash=outline_hash)
 
-            log_msg = "Cleared section cache"
-            if project_name: log_msg += f" for project {project_name}"
-            if outline_hash: log_msg += f" for outline_hash {outline_hash}" # Changed from job_id
-            logging.info(log_msg)
+    def purge_legacy_cache_documents(self) -> None:
+        """Remove outline/section cache documents left in the content collection by older versions.
 
+        Runs once: a marker in the generation cache records a successful purge, so later
+        startups skip the filtered delete.
+        """
+        if self.generation_cache.has_marker(LEGACY_CACHE_PURGE_MARKER):
+            return
+        try:
+            if self._delete_where(self.collection, {"content_type": {"$in": ["outline_cache", "section_cache"]}}):
+                self._invalidate_retrieval()
+            self.generation_cache.set_marker(LEGACY_CACHE_PURGE_MARKER)
         except Exception as e:
-            logging.error(f"Error clearing section cache: {e}")
+            logging.error(f"Error purging legacy cache documents: {e}")
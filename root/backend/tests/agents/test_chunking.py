@@ -0,0 +1,141 @@
+# ABOUTME: Tests for the shared chunking engine used by ingestion and the parsing graph
+# ABOUTME: Covers markdown sectioning, chunk size limits, splitter reuse, per-type settings and token budgets
+
+from backend.agents.content_parsing import chunking
+from backend.agents.content_parsing.chunking import (
+    TokenBudgetSplitter,
+    chunk_settings,
+    chunk_token_stats,
+    get_splitter,
+    split_markdown_sections,
+    split_parsed_content,
+    split_section_stream,
+    splitter_for,
+)
+from backend.models.embeddings.embedding_tokenizer import EmbeddingTokenizer
+from backend.parsers import ContentStructure
+
+
+class WordTokenizer(EmbeddingTokenizer):
+    """One token per whitespace-separated word; records batch sizes."""
+
+    def __init__(self, max_tokens=50):
+        super().__init__("words", max_tokens)
+        self.batches = []
+
+    def count(self, texts):
+        self.batches.append(len(texts))
+        self.counted_words = getattr(self, "counted_words", 0) + sum(len(text.split()) for text in texts)
+        return [len(text.split()) for text in texts]
+
+    def split(self, text, max_tokens):
+        words = text.split()
+        return [" ".join(words[i:i + max_tokens]) for i in range(0, len(words), max_tokens)]
+
+
+def test_markdown_sections_follow_headings_outside_code_fences():
+    text = (
+        "Preamble\n\n# Title\n\nIntro\n\n## Setup\n\n```bash\n# not a heading\n```\n\n"
+        "### Details\n\n    indented code\n\n## Usage\n\nText"
+    )
+
+    sections = list(split_markdown_sections(text))
+
+    assert [meta for _, meta in sections] == [
+        {},
+        {"Header 1": "Title"},
+        {"Header 1": "Title", "Header 2": "Setup"},
+        {"Header 1": "Title", "Header 2": "Setup", "Header 3": "Details"},
+        {"Header 1": "Title", "Header 2": "Usage"},
+    ]
+    assert "# not a heading" in sections[2][0]
+    assert "    indented code" in sections[3][0]
+
+
+def test_long_markdown_sections_respect_chunk_size():
+    text = "# Big\n\n" + "\n\n".join(f"paragraph {i} " * 20 for i in range(200))
+    parsed = ContentStructure(main_content=text, code_segments=["def f():\n    return 1\n"], content_type="markdown")
+
+    chunks, metadata = split_parsed_content(parsed)
+
+    size = chunk_settings("markdown").chunk_size
+    assert len(chunks) > 10
+    assert all(len(chunk) <= size for chunk in chunks)
+    assert metadata[0] == {"Header 1": "Big"}
+    assert metadata[-1] == {"content_part": "code"} and chunks[-1] == "def f():\n    return 1"
+
+
+def test_splitters_are_cached_and_configurable_per_type(monkeypatch):
+    assert splitter_for("markdown") is splitter_for("markdown")
+    assert get_splitter("python", 1000, 200) is not get_splitter("text", 1000, 200)
+
+    monkeypatch.setenv("CHUNK_SIZE_JUPYTER_NOTEBOOK", "400")
+    monkeypatch.setenv("CHUNK_OVERLAP_JUPYTER_NOTEBOOK", "40")
+    chunking.chunk_settings.cache_clear()
+    try:
+        assert chunk_settings("jupyter_notebook") == (400, 40)
+        assert chunk_settings("markdown") == (chunking.CHUNK_SIZE, chunking.CHUNK_OVERLAP)
+        assert splitter_for("jupyter_notebook")._chunk_size == 400
+    finally:
+        chunking.chunk_settings.cache_clear()
+
+
+def test_token_splitter_packs_to_budget_with_batched_counts():
+    tokenizer = WordTokenizer()
+    splitter = TokenBudgetSplitter(tokenizer, chunk_size=50, chunk_overlap=10)
+    text = "\n\n".join(f"para{i} " + "word " * (i % 7 + 2) for i in range(300))
+    text += "\n\n" + "huge " * 400 + "\n\nline one\n" + "long " * 120
+
+    tokenizer.batches.clear()
+    chunks = splitter.split_text(text)
+
+    counts = [len(chunk.split()) for chunk in chunks]
+    assert max(counts) <= 50
+    # Chunks are packed close to the budget rather than one per paragraph
+    assert sum(counts) / len(counts) > 35
+    assert "para0" in chunks[0] and chunks[-1].endswith("long")
+    # Paragraphs are counted in a few batched calls, not one call per paragraph
+    assert len(tokenizer.batches) < 10 and max(tokenizer.batches) > 100
+
+
+def test_token_stream_buffer_is_sized_in_tokens():
+    tokenizer = WordTokenizer()
+    splitter = TokenBudgetSplitter(tokenizer, chunk_size=50, chunk_overlap=0)
+    sections = [f"cell{i} " + "word " * 4 for i in range(400)]
+    tokenizer.counted_words = 0
+
+    # The character chunk size is ignored; the 50-token budget drives the buffer
+    chunks = list(split_section_stream(iter(sections), splitter, chunk_size=20))
+
+    counts = [len(chunk.split()) for chunk in chunks]
+    assert max(counts) <= 50 and sum(counts) / len(counts) > 35
+    assert sum(counts) == 5 * len(sections)
+    # Sections are counted once as they arrive, not re-counted with the whole buffer each time
+    assert tokenizer.counted_words < 6 * sum(counts)
+
+
+def test_token_mode_routes_splitting_and_reports_stats(monkeypatch):
+    tokenizer = WordTokenizer(max_tokens=40)
+    monkeypatch.setattr(chunking, "CHUNKING_MODE", "tokens")
+    monkeypatch.setattr(chunking, "get_embedding_tokenizer", lambda: tokenizer)
+    chunking.get_token_splitter.cache_clear()
+    try:
+        parsed = ContentStructure(
+            main_content="# Notes\n\n" + "\n\n".join("alpha beta gamma " * 5 for _ in range(20)),
+            code_segments=["def f():\n    return 1\n" * 30],
+            content_type="markdown",
+        )
+        chunks, metadata = split_parsed_content(parsed)
+        stats = chunk_token_stats(chunks)
+    finally:
+        chunking.get_token_splitter.cache_clear()
+
+    assert all(len(chunk.split()) <= 40 for chunk in chunks)
+    assert metadata[0] == {"Header 1": "Notes"} and metadata[-1] == {"content_part": "code"}
+    assert stats["chunks"] == len(chunks) and stats["over_limit"] == 0 and stats["token_limit"] == 40
+    assert stats["chars_per_token"] == round(stats["chars"] / stats["tokens"], 3)
+
+
+def test_character_mode_skips_token_stats():
+    assert chunking.CHUNKING_MODE == "characters"
+    assert chunk_token_stats(["some text"]) is None
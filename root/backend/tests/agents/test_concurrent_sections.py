@@ -0,0 +1,120 @@
+# ABOUTME: Tests for concurrent multi-section draft generation
+# ABOUTME: Covers the concurrency cap, completion callbacks, task-local state and outline-based narrative context
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.agents.blog_draft_generator_agent import BlogDraftGeneratorAgent, _in_section_batch
+from backend.utils.blog_context import extract_blog_narrative_context
+
+OUTLINE = {
+    "title": "Blog",
+    "sections": [
+        {"title": f"Section {i}", "subsections": [], "learning_goals": [f"goal {i}"]}
+        for i in range(6)
+    ],
+}
+
+
+def _agent():
+    return BlogDraftGeneratorAgent(MagicMock(), MagicMock(), MagicMock(), MagicMock(), None)
+
+
+@pytest.mark.asyncio
+async def test_generate_all_sections_respects_concurrency_cap():
+    agent = _agent()
+    active = 0
+    peak = 0
+
+    async def fake_generate_section(**kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        index = kwargs["current_section_index"]
+        return {"content": f"content {index}"}, False
+
+    agent.generate_section = fake_generate_section
+    completed = []
+
+    async def on_complete(index, result, was_cached):
+        completed.append(index)
+
+    results = await agent.generate_all_sections(
+        project_name="p", outline=OUTLINE, notebook_content=None, markdown_content=None,
+        max_concurrency=2, on_section_complete=on_complete
+    )
+
+    assert peak == 2
+    assert sorted(results) == list(range(6))
+    assert results[3][0]["content"] == "content 3"
+    assert sorted(completed) == list(range(6))
+
+
+@pytest.mark.asyncio
+async def test_generate_all_sections_isolates_failures():
+    agent = _agent()
+
+    async def fake_generate_section(**kwargs):
+        if kwargs["current_section_index"] == 1:
+            return None, False
+        return {"content": "ok"}, True
+
+    agent.generate_section = fake_generate_section
+
+    results = await agent.generate_all_sections(
+        project_name="p", outline=OUTLINE, notebook_content=None, markdown_content=None,
+        section_indices=[0, 1, 2], max_concurrency=3
+    )
+
+    assert results[1] == (None, False)
+    assert results[0] == ({"content": "ok"}, True)
+
+
+@pytest.mark.asyncio
+async def test_generate_all_sections_keeps_section_state_task_local():
+    agent = _agent()
+    seen = []
+
+    async def fake_generate_section(**kwargs):
+        seen.append(_in_section_batch.get())
+        return {"content": "ok"}, False
+
+    agent.generate_section = fake_generate_section
+
+    await agent.generate_all_sections(
+        project_name="p", outline=OUTLINE, notebook_content=None, markdown_content=None,
+        section_indices=[0, 1, 2], max_concurrency=3
+    )
+
+    assert seen == [True, True, True]
+    assert _in_section_batch.get() is False
+
+
+def test_clear_section_cache_targets_outline_hash():
+    agent = _agent()
+
+    agent.clear_section_cache("p", OUTLINE)
+
+    agent.vector_store.clear_section_cache.assert_called_once_with(
+        project_name="p", outline_hash=agent._hash_outline_for_cache(OUTLINE)
+    )
+
+
+def test_narrative_context_uses_outline_not_finished_sections():
+    outline = SimpleNamespace(
+        title="Blog",
+        introduction="",
+        sections=[SimpleNamespace(title=s["title"], learning_goals=s["learning_goals"]) for s in OUTLINE["sections"]],
+    )
+    state = SimpleNamespace(outline=outline, current_section_index=3, sections=[])
+
+    context = extract_blog_narrative_context(state)
+
+    assert "Earlier Sections: Section 0 (covers: goal 0)" in context
+    assert "Section 2 (covers: goal 2)" in context
+    assert "Section 3 (covers" not in context
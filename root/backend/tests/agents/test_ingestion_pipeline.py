@@ -0,0 +1,76 @@
+# ABOUTME: Tests for the concurrent ingestion pipeline used by /process_files
+# ABOUTME: Checks coalesced writes, per-file statuses, worker crashes and skipping of unchanged files
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.agents.content_parsing import ingestion
+from backend.agents.content_parsing.ingestion import IngestionPipeline
+
+
+class FakeVectorStore:
+    def __init__(self, unchanged=None):
+        self.unchanged = unchanged or {}
+        self.batches = []
+
+    def find_unchanged_content_hash(self, project_name, file_path, source_hash):
+        return self.unchanged.get(file_path.rsplit("/", 1)[-1])
+
+    def sync_file_chunks(self, files):
+        self.batches.append(files)
+        return {f["file_path"]: {"added": len(f["chunks"]), "unchanged": 0, "deleted": 0} for f in files}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_all_files_in_one_batch(tmp_path):
+    (tmp_path / "a.md").write_text("# Alpha\n\nSome alpha content.\n")
+    (tmp_path / "b.py").write_text('"""Beta module."""\n\n\ndef beta():\n    """Return one."""\n    return 1\n')
+    (tmp_path / "c.md").write_text("# Alpha\n\nSome alpha content.\n")  # identical to a.md
+    (tmp_path / "old.md").write_text("# Old\n")
+    (tmp_path / "bad.xyz").write_text("unsupported")
+    paths = [str(tmp_path / name) for name in ("a.md", "b.py", "c.md", "old.md", "bad.xyz")]
+
+    store = FakeVectorStore(unchanged={"old.md": "oldhash"})
+    statuses = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pipeline = IngestionPipeline(store, executor=executor)
+        result = await pipeline.run(paths, "proj", on_status=lambda path, s: statuses.append((path, s["status"])))
+
+    assert len(store.batches) == 1
+    assert sorted(f["source_path"] for f in store.batches[0]) == sorted(paths[:3])
+    assert all(f["source_hash"] for f in store.batches[0])
+    assert result[paths[0]] == result[paths[2]]  # identical content, same content hash
+    assert result[paths[3]] == "oldhash"
+    assert result[paths[4]] is None
+
+    assert (paths[3], "skipped") in statuses
+    assert (paths[4], "error") in statuses
+    for path in paths[:3]:
+        assert (path, "parsed") in statuses and (path, "stored") in statuses
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_reports_error_for_its_file(tmp_path, monkeypatch):
+    paths = []
+    for name in ("good.md", "crash.md"):
+        (tmp_path / name).write_text(f"# {name}\n\nSome content.\n")
+        paths.append(str(tmp_path / name))
+    parse = ingestion.parse_file_for_ingestion
+
+    def crashing_parse(file_path, project_name):
+        if file_path.endswith("crash.md"):
+            raise MemoryError("worker died")
+        return parse(file_path, project_name)
+
+    monkeypatch.setattr(ingestion, "parse_file_for_ingestion", crashing_parse)
+    store = FakeVectorStore()
+    statuses = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = await IngestionPipeline(store, executor=executor).run(
+            paths, "proj", on_status=lambda path, s: statuses.append((path, s))
+        )
+
+    assert result[paths[0]] and result[paths[1]] is None
+    errors = [s for path, s in statuses if path == paths[1]]
+    assert errors == [{"status": "error", "error": "Ingestion worker failed: worker died"}]
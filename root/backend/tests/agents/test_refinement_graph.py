@@ -0,0 +1,78 @@
+# ABOUTME: Tests for the blog refinement graph's parallel fan-out of independent nodes
+# ABOUTME: Verifies concurrent execution, merged outputs and per-branch error reporting
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.agents.blog_refinement.graph import create_refinement_graph
+from backend.agents.blog_refinement.state import BlogRefinementState
+
+CALL_DELAY = 0.2
+
+
+class FakeModel:
+    """Slow fake LLM that answers each refinement prompt with canned text."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.active = 0
+        self.max_active = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(CALL_DELAY)
+            if self.fail_on and self.fail_on in prompt.lower():
+                raise RuntimeError(f"{self.fail_on} failed")
+            return "Generated text."
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def stub_token_counter():
+    """Avoid tokenizer downloads; token accounting isn't under test here."""
+    counter = MagicMock()
+    counter.count_tokens.return_value = 10
+    counter.calculate_cost.return_value = (0.0, {"input_tokens": 10, "output_tokens": 10, "total_tokens": 20, "total_cost": 0.0})
+    counter._normalize_model_name.side_effect = lambda name: name
+    with patch("backend.models.cost_tracking_wrapper.TokenCounter", return_value=counter):
+        yield
+
+
+async def _run(model):
+    graph = await create_refinement_graph()
+    state = BlogRefinementState(original_draft="## Body\n\nSome draft content.", model=model)
+    return await graph.ainvoke(state)
+
+
+@pytest.mark.asyncio
+async def test_independent_nodes_run_concurrently():
+    model = FakeModel()
+
+    start = time.perf_counter()
+    result = await _run(model)
+    elapsed = time.perf_counter() - start
+
+    assert result.get("error") is None
+    assert result["introduction"] and result["conclusion"] and result["summary"]
+    assert result["title_options"]
+    assert result["refined_draft"]
+    assert model.max_active == 4
+    # 4 parallel calls + redundancy + clarity, vs 6 sequential calls
+    assert elapsed < CALL_DELAY * 5
+
+
+@pytest.mark.asyncio
+async def test_branch_errors_are_merged():
+    model = FakeModel(fail_on="summary")
+
+    result = await _run(model)
+
+    assert "summary" in result["branch_errors"]
+    assert result["error"].startswith("summary:")
+    assert result.get("refined_draft") is None
@@ -0,0 +1,72 @@
+# ABOUTME: Tests for vectorized header matching in the blog draft semantic_content_mapper
+# ABOUTME: Checks the similarity helpers against sklearn and that the mapper embeds everything in one batch
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.agents.blog_draft_generator.nodes import semantic_content_mapper
+from backend.agents.blog_draft_generator.utils import header_similarity_matrix, select_relevant_headers
+
+
+def test_similarity_matrix_matches_sklearn_and_selection_is_sorted():
+    rng = np.random.default_rng(0)
+    targets = rng.standard_normal((4, 8))
+    headers = rng.standard_normal((10, 8))
+
+    matrix = header_similarity_matrix(targets, headers)
+    assert np.allclose(matrix, cosine_similarity(targets, headers), atol=1e-5)
+
+    selected = select_relevant_headers(matrix, threshold=0.1)
+    for row, indices in enumerate(selected):
+        scores = matrix[row, indices]
+        assert all(scores >= 0.1)
+        assert list(scores) == sorted(scores, reverse=True)
+        assert len(indices) == int((matrix[row] >= 0.1).sum())
+
+    assert all(len(indices) <= 2 for indices in select_relevant_headers(matrix, threshold=-1, top_k=2))
+
+
+@pytest.mark.asyncio
+async def test_mapper_embeds_headers_and_sections_in_one_sync_call():
+    calls = []
+
+    def embedding_fn(texts):
+        calls.append(list(texts))
+        # Headers/sections about "alpha" point one way, everything else another
+        return [np.array([1.0, 0.0]) if "alpha" in t.lower() else np.array([0.0, 1.0]) for t in texts]
+
+    vector_store = MagicMock()
+    vector_store.embedding_fn = embedding_fn
+    vector_store.search_content_batch.side_effect = lambda searches: [[] for _ in searches]
+
+    headers = [{"text": "Alpha basics", "level": 2}, {"text": "Beta details", "level": 2}]
+    outline = SimpleNamespace(sections=[
+        SimpleNamespace(title="Alpha", learning_goals=["learn alpha"]),
+        SimpleNamespace(title="Beta", learning_goals=["learn beta"]),
+    ])
+    state = SimpleNamespace(
+        vector_store=vector_store,
+        model=None,
+        outline=outline,
+        markdown_content=SimpleNamespace(metadata={"section_headers": json.dumps(headers)}),
+        current_agent_name="test",
+        generation_stage="",
+        content_mapping={},
+    )
+
+    await semantic_content_mapper(state)
+
+    assert len(calls) == 1
+    assert len(calls[0]) == 4
+    # One retrieval round for the whole outline; no code hits, so no context round
+    assert vector_store.search_content_batch.call_count == 1
+    assert not vector_store.search_content.called
+    searches = vector_store.search_content_batch.call_args.args[0]
+    assert len(searches) == 4
+    assert any("Alpha basics" in s["query"] for s in searches)
+    assert state.content_mapping == {"Alpha": [], "Beta": []}
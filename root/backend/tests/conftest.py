@@ -15,6 +15,11 @@ root_dir = str(Path(__file__).resolve().parents[2])
 if root_dir not in sys.path:
     sys.path.append(root_dir)
 
+# Tests use mock models; keep the on-disk LLM response cache out of the way
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+# Vector store tests build fresh stores per test; tests of the retrieval cache patch in their own
+os.environ.setdefault("RETRIEVAL_CACHE_ENABLED", "false")
+
 from backend.services.project_manager import ProjectManager
 
 
@@ -161,4 +166,40 @@ def mock_env_vars():
         "SUPABASE_KEY": "test-key",
         "QUIBO_API_KEY": "test-api-key"
     }):
-        yield
\ No newline at end of file
+        yield
+
+@pytest.fixture
+def ingestion_manifest(monkeypatch):
+    """In-memory ingestion manifest used by every VectorStoreService in the test."""
+    from backend.services.ingestion_manifest import IngestionManifest
+
+    manifest = IngestionManifest(":memory:")
+    monkeypatch.setattr("backend.services.vector_store_service.get_ingestion_manifest", lambda: manifest)
+    return manifest
+
+
+@pytest.fixture
+def make_vector_store(ingestion_manifest):
+    """
+    Factory for VectorStoreService instances built through the real constructor.
+
+    Call with the test's embedding function; stores are in-memory unless a
+    persist_dir (e.g. tmp_path) is given. In-memory collections are dropped on teardown.
+    """
+    import chromadb
+    from backend.services.vector_store_service import VectorStoreService
+
+    services = []
+
+    def make(embedding_fn, persist_dir=None, routing=None):
+        persist_dir = str(persist_dir) if persist_dir else None
+        client = chromadb.PersistentClient(path=persist_dir) if persist_dir else chromadb.EphemeralClient()
+        service = VectorStoreService(embedding_fn=embedding_fn, client=client, persist_dir=persist_dir, routing=routing)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        if not service.persist_dir:
+            for name in service.collection_names():
+                service.client.delete_collection(name)
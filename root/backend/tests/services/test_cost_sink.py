@@ -0,0 +1,112 @@
+# ABOUTME: Unit tests for the write-behind CostTrackingSink
+# ABOUTME: Covers size/time-triggered bulk flushes, shutdown flush, failed-row requeue and retry cap
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.services.cost_sink import CostTrackingSink, MAX_WRITE_ATTEMPTS
+
+
+def _record(i: int) -> dict:
+    return {
+        "project_id": "p1", "agent_name": "Agent", "operation": f"op_{i}",
+        "input_tokens": 10, "output_tokens": 5, "cost": 0.01,
+        "model_used": "gpt-4o", "duration_seconds": 0.5,
+    }
+
+
+def _manager(written=None):
+    manager = AsyncMock()
+    manager.track_costs_bulk.side_effect = written or (lambda records: [])
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_enqueue_does_not_write_until_threshold():
+    manager = _manager()
+    sink = CostTrackingSink(manager, max_batch_size=3, flush_interval=60)
+
+    sink.enqueue(_record(0))
+    sink.enqueue(_record(1))
+    await asyncio.sleep(0)
+    assert not manager.track_costs_bulk.called
+
+    sink.enqueue(_record(2))
+    await asyncio.sleep(0.01)
+    manager.track_costs_bulk.assert_called_once()
+    assert len(manager.track_costs_bulk.call_args[0][0]) == 3
+    assert sink.pending == 0
+    await sink.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_periodic_flush_writes_partial_batch():
+    manager = _manager()
+    sink = CostTrackingSink(manager, max_batch_size=100, flush_interval=0.01)
+
+    sink.enqueue(_record(0))
+    await asyncio.sleep(0.05)
+
+    assert manager.track_costs_bulk.called
+    assert sink.get_stats()["written"] == 1
+    await sink.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_flushes_remaining_records():
+    manager = _manager()
+    sink = CostTrackingSink(manager, max_batch_size=100, flush_interval=60)
+    for i in range(5):
+        sink.enqueue(_record(i))
+
+    written = await sink.shutdown()
+
+    assert written == 5
+    assert sink.pending == 0
+    assert all("created_at" in r for r in manager.track_costs_bulk.call_args[0][0])
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_records():
+    manager = _manager(written=[RuntimeError("db down"), []])
+    sink = CostTrackingSink(manager, max_batch_size=100, flush_interval=60)
+    sink.enqueue(_record(0))
+    sink.enqueue(_record(1))
+
+    assert await sink.flush() == 0
+    assert sink.pending == 2
+    assert await sink.flush() == 2
+    assert sink.pending == 0
+    await sink.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_partial_failure_requeues_only_failed_rows():
+    manager = _manager(written=[[1, 3], []])
+    sink = CostTrackingSink(manager, max_batch_size=100, flush_interval=60)
+    for i in range(4):
+        sink.enqueue(_record(i))
+
+    assert await sink.flush() == 2
+    assert sink.pending == 2
+    assert await sink.flush() == 2
+    retried = manager.track_costs_bulk.call_args[0][0]
+    assert [r["operation"] for r in retried] == ["op_1", "op_3"]
+    await sink.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_record_dropped_after_max_attempts():
+    manager = _manager(written=lambda records: [0])
+    sink = CostTrackingSink(manager, max_batch_size=100, flush_interval=60)
+    sink.enqueue(_record(0))
+
+    for _ in range(MAX_WRITE_ATTEMPTS):
+        await sink.flush()
+
+    assert sink.pending == 0
+    assert sink.get_stats()["dropped"] == 1
+    assert manager.track_costs_bulk.call_count == MAX_WRITE_ATTEMPTS
+    await sink.shutdown()
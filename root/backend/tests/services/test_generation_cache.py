@@ -0,0 +1,75 @@
+# ABOUTME: Tests for the SQLite generation cache behind outline and section caching
+# ABOUTME: Covers lookups and metrics, invalidation filters, no-embedding cache writes and the one-off legacy purge
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from backend.services.generation_cache import GenerationCache
+from backend.services.vector_store_service import VectorStoreService
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = GenerationCache(str(tmp_path / "generation.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_get_set_and_metrics(cache):
+    assert cache.get("outline", "k1", "proj") is None
+    assert cache.set("outline", "k1", '{"title": "A"}', "proj")
+    assert cache.get("outline", "k1", "proj") == '{"title": "A"}'
+    assert cache.get("outline", "k1", "other") is None
+
+    # Re-storing the same key replaces instead of failing on a duplicate id
+    assert cache.set("outline", "k1", '{"title": "B"}', "proj")
+    assert cache.get("outline", "k1") == '{"title": "B"}'
+
+    stats = cache.get_stats()["outline"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+
+
+def test_invalidate_by_project_and_outline_hash(cache):
+    cache.set("section", "s0", "a", "proj", outline_hash="h1", section_index=0)
+    cache.set("section", "s1", "b", "proj", outline_hash="h2", section_index=0)
+    cache.set("section", "s2", "c", "other", outline_hash="h1", section_index=0)
+    cache.set("outline", "o1", "d", "proj")
+
+    assert cache.invalidate("section", project_name="proj", outline_hash="h1") == 1
+    assert cache.get("section", "s0") is None
+    assert cache.get("section", "s1") == "b"
+
+    assert cache.invalidate(project_name="proj") == 2
+    assert cache.get("outline", "o1") is None
+    assert cache.get("section", "s2") == "c"
+
+
+def test_vector_store_cache_methods_skip_embedding(cache):
+    service = VectorStoreService.__new__(VectorStoreService)
+    service.collection = MagicMock()
+
+    with patch("backend.services.vector_store_service.get_generation_cache", return_value=cache):
+        service.store_section_cache('{"content": "x"}', "key", "proj", "hash", 2)
+        assert service.retrieve_section_cache("key", "proj", "hash", 2) == '{"content": "x"}'
+        service.clear_section_cache(project_name="proj", outline_hash="hash")
+        assert service.retrieve_section_cache("key", "proj", "hash", 2) is None
+
+    service.collection.add.assert_not_called()
+    service.collection.get.assert_not_called()
+
+
+def test_legacy_cache_purge_runs_once(cache):
+    service = VectorStoreService.__new__(VectorStoreService)
+    service.collection = MagicMock()
+    service._delete_where = MagicMock(return_value=2)
+    service._invalidate_retrieval = MagicMock()
+
+    with patch("backend.services.vector_store_service.get_generation_cache", return_value=cache):
+        service.purge_legacy_cache_documents()
+        service.purge_legacy_cache_documents()
+
+    service._delete_where.assert_called_once()
+    service._invalidate_retrieval.assert_called_once()
+    assert cache.has_marker("legacy_cache_documents_purged")
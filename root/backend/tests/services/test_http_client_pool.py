@@ -0,0 +1,105 @@
+# ABOUTME: Tests for the shared provider HTTP client pool against a local keep-alive server
+# ABOUTME: Covers connection reuse, per-provider clients, the DNS cache, separate event loops and sibling cleanup
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.config.settings import OpenRouterSettings
+from backend.models.openrouter_model import OpenRouterModel
+from backend.services import http_client_pool
+from backend.services.http_client_pool import HTTPClientPool
+
+
+class ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({"choices": [{"message": {"content": "pong"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ChatHandler)
+    httpd.connections = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sync_calls_reuse_one_connection_and_cache_dns(server):
+    pool = HTTPClientPool()
+    url = f"http://localhost:{server.server_port}/chat"
+
+    for _ in range(5):
+        assert pool.client("openrouter").post(url, json={}).status_code == 200
+
+    assert pool.client("openrouter") is pool.client("openrouter")
+    assert pool.client("openrouter") is not pool.client("openai")
+    assert len(server.connections) == 1
+    # A second provider's client opens its own connection but reuses the resolved address
+    pool.client("openai").post(url, json={})
+    assert pool.get_stats()["dns_cache"]["hits"] >= 1
+    asyncio.run(pool.aclose())
+
+
+def test_async_client_works_across_event_loops(server, monkeypatch):
+    pool = HTTPClientPool()
+    monkeypatch.setattr(http_client_pool, "_pool", pool)
+    model = OpenRouterModel(OpenRouterSettings(
+        api_key="key", model_name="test-model", base_url=f"http://127.0.0.1:{server.server_port}/chat"
+    ))
+
+    async def calls():
+        return [await model.ainvoke("ping") for _ in range(3)]
+
+    # Sync wrappers call asyncio.run, so the shared client must survive new loops
+    assert asyncio.run(calls()) == ["pong"] * 3
+    assert asyncio.run(calls()) == ["pong"] * 3
+    assert model.invoke("ping") == "pong"
+    # One connection per loop plus one for the sync client, not one per call
+    assert len(server.connections) == 3
+    asyncio.run(pool.aclose())
+
+
+def test_aclose_closes_sibling_clients_of_live_loops(server):
+    pool = HTTPClientPool()
+    client = pool.async_client("openrouter")
+    url = f"http://127.0.0.1:{server.server_port}/chat"
+
+    async def call():
+        return (await client.post(url, json={})).status_code
+
+    assert asyncio.run(call()) == 200            # home loop
+    assert asyncio.run(call()) == 200            # sibling whose loop closes right away
+
+    worker_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=worker_loop.run_forever, daemon=True)
+    thread.start()
+    assert asyncio.run_coroutine_threadsafe(call(), worker_loop).result() == 200
+    worker_sibling = client._siblings[worker_loop]
+    # The sibling of the closed loop was dropped when the worker's sibling was created
+    assert list(client._siblings.keys()) == [worker_loop]
+
+    asyncio.run(pool.aclose())
+
+    assert worker_sibling.is_closed
+    assert len(client._siblings) == 0
+    worker_loop.call_soon_threadsafe(worker_loop.stop)
+    thread.join()
+    worker_loop.close()
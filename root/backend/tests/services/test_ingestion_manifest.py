@@ -0,0 +1,81 @@
+# ABOUTME: Tests for chunk-level diffing and the ingestion manifest behind incremental re-ingestion
+# ABOUTME: Re-syncing a lightly edited 500-chunk file must embed only the changed chunks
+
+import pytest
+
+from backend.services.ingestion_manifest import chunk_hash, plan_chunk_diff
+
+
+class CountingEmbedding:
+    def __init__(self):
+        self.texts = 0
+
+    def __call__(self, input):
+        self.texts += len(input)
+        return [[float(len(text) % 7), 1.0, float(i % 3)] for i, text in enumerate(input)]
+
+
+@pytest.fixture
+def service(make_vector_store):
+    return make_vector_store(CountingEmbedding())
+
+
+def make_file(chunks, content_hash):
+    return {
+        "file_path": "/uploads/nb.ipynb",
+        "project_name": "proj",
+        "chunks": chunks,
+        "metadata": [{"file_path": "/uploads/nb.ipynb", "project_name": "proj"} for _ in chunks],
+        "content_hash": content_hash,
+        "source_hash": content_hash,
+    }
+
+
+def test_plan_chunk_diff_handles_moves_and_duplicates():
+    previous = [("id_a", chunk_hash("a")), ("id_b", chunk_hash("b")), ("id_b2", chunk_hash("b")), ("id_c", chunk_hash("c"))]
+    new = [chunk_hash(text) for text in ("b", "a", "d", "b")]
+
+    diff = plan_chunk_diff(previous, new, "chunk_x")
+
+    assert diff.ids[:2] == ["id_b", "id_a"] and diff.ids[3] == "id_b2"
+    assert diff.added == [2]
+    assert diff.removed == ["id_c"]
+    assert plan_chunk_diff([("legacy", None)], new[:1], "p").removed == ["legacy"]
+
+
+def test_light_edit_of_large_file_embeds_only_changed_chunks(service):
+    chunks = [f"cell {i}: some notebook content" for i in range(500)]
+    service.sync_file_chunks([make_file(chunks, "v1")])
+    assert service.embedding_fn.texts == 500
+
+    edited = list(chunks)
+    edited[10] = "cell 10: edited content"
+    edited.insert(250, "a brand new cell")
+    del edited[400]
+    stats = service.sync_file_chunks([make_file(edited, "v2")])
+
+    assert service.embedding_fn.texts == 502
+    assert stats["/uploads/nb.ipynb"] == {"added": 2, "unchanged": 498, "deleted": 2}
+    stored = service.collection_for("proj").get(include=["metadatas", "documents"])
+    assert len(stored["ids"]) == 500
+    assert {meta["content_hash"] for meta in stored["metadatas"]} == {"v2"}
+    by_order = sorted(zip(stored["metadatas"], stored["documents"]), key=lambda item: item[0]["chunk_order"])
+    assert [doc for _, doc in by_order] == edited
+    assert service.find_unchanged_content_hash("proj", "/uploads/nb.ipynb", "v2") == "v2"
+
+
+def test_legacy_chunks_without_manifest_are_adopted(service):
+    chunks = ["first chunk", "second chunk"]
+    # Stored in the shared collection by a version without manifests or project collections
+    service.collection.add(
+        ids=[f"chunk_v1_{i:04d}" for i in range(2)],
+        documents=chunks,
+        embeddings=[[1.0, 0.0, 0.0]] * 2,
+        metadatas=[{"file_path": "/uploads/nb.ipynb", "project_name": "proj", "content_hash": "v1", "chunk_order": i} for i in range(2)],
+    )
+    assert service.migrate_to_project_collections() == {"proj": 2}
+
+    stats = service.sync_file_chunks([make_file(chunks, "v1")])
+
+    assert service.embedding_fn.texts == 0
+    assert stats["/uploads/nb.ipynb"] == {"added": 0, "unchanged": 2, "deleted": 0}
@@ -0,0 +1,80 @@
+# ABOUTME: Tests for the BM25 lexical index and hybrid (dense + lexical) retrieval in VectorStoreService
+# ABOUTME: Exact identifiers missed by dense search must be recovered by reciprocal rank fusion
+
+import pytest
+
+from backend.services.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("df = pd.read_csv(path)") == ["df", "pd", "read_csv", "read", "csv", "path"]
+    assert tokenize("The VectorStoreService is fast") == ["vectorstoreservice", "vector", "store", "service", "fast"]
+
+
+def test_bm25_ranks_exact_identifier_and_persists(tmp_path):
+    path = str(tmp_path / "lexical.sqlite3")
+    index = LexicalIndex(path)
+    index.add(["a", "b", "c"], [
+        "def load_frame(path): return pd.read_csv(path)",
+        "Loading data from files is a common first step",
+        "def plot(frame): frame.plot()",
+    ])
+
+    assert [chunk_id for chunk_id, _ in index.search("where is read_csv called")] == ["a"]
+    index.add(["a"], ["def load_frame(path): return pd.read_parquet(path)"])
+    assert index.search("csv") == []
+    index.delete(["c"])
+    index.close()
+
+    reopened = LexicalIndex(path)
+    assert reopened.count() == 2
+    assert [chunk_id for chunk_id, _ in reopened.search("read parquet frame")] == ["a"]
+    assert reciprocal_rank_fusion([["x", "y"], ["y", "z"]]) == ["y", "x", "z"]
+
+
+class LengthEmbedding:
+    """Deliberately poor dense model: texts of similar length look alike."""
+
+    def __call__(self, input):
+        return [[len(text) / 100, 1.0] for text in input]
+
+
+@pytest.fixture
+def service(make_vector_store):
+    return make_vector_store(LengthEmbedding())
+
+
+def test_hybrid_search_recovers_identifier_matches(service):
+    chunks = [f"Some general discussion of the model, part {i}." for i in range(30)]
+    chunks[7] = "def compute_advantage(rewards, values): return rewards - values"
+    service.store_content_chunks(
+        chunks=chunks,
+        metadata=[{"project_name": "rl", "source_type": "code" if i == 7 else "markdown"} for i in range(30)],
+        content_hash="h1",
+    )
+    query = "How does compute_advantage use the rewards?"
+
+    service.retrieval_mode = "dense"
+    dense = service.search_content(query, {"project_name": "rl"}, n_results=3)
+    service.retrieval_mode = "hybrid"
+    hybrid = service.search_content(query, {"project_name": "rl"}, n_results=3)
+
+    assert chunks[7] not in [r["content"] for r in dense]
+    assert chunks[7] in [r["content"] for r in hybrid]
+    # Lexical candidates still respect the metadata filter
+    filtered = service.search_content(query, {"project_name": "rl", "source_type": "markdown"}, n_results=3)
+    assert chunks[7] not in [r["content"] for r in filtered]
+
+    service.clear_content("h1")
+    assert service.lexical_index_for(service.collection_for("rl")).count() == 0
+
+
+def test_lexical_index_is_built_from_existing_chunks(service):
+    # Chunks written straight to Chroma, e.g. by a version without lexical indexes
+    service.collection.add(ids=["old1", "old2"], documents=["import numpy as np", "plain prose"],
+                           metadatas=[{"source_type": "code"}, {"source_type": "markdown"}])
+
+    assert len(service.search_content("numpy", n_results=2)) == 2
+    index = service.lexical_index_for(service.collection)
+    assert index.count() == 2
+    assert [chunk_id for chunk_id, _ in index.search("numpy")] == ["old1"]
@@ -0,0 +1,106 @@
+# ABOUTME: Tests for the persistent LLM response cache and its use by CostTrackingModel
+# ABOUTME: Covers zero-cost cache hits, per-node and per-call bypass, LRU eviction, TTL expiry and opt-in defaults
+
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from backend.models.cost_tracking_wrapper import CostTrackingModel
+from backend.services.cost_aggregator import CostAggregator
+from backend.services import llm_response_cache
+from backend.services.llm_response_cache import LLMResponseCache
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return f"answer to {prompt}"
+
+
+@pytest.fixture
+def token_counter():
+    counter = MagicMock()
+    counter.count_tokens.side_effect = lambda text, model: len(text)
+    counter.calculate_cost.side_effect = lambda i, o, m: (0.25, {"input_tokens": i, "output_tokens": o, "total_tokens": i + o, "total_cost": 0.25})
+    counter._normalize_model_name.side_effect = lambda name: name
+    with patch("backend.models.cost_tracking_wrapper.TokenCounter", return_value=counter):
+        yield counter
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite3"), max_entries=3)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_model_and_records_zero_cost(token_counter, cache):
+    base = CountingModel()
+    aggregator = CostAggregator()
+    model = CostTrackingModel(base_model=base, model_name="gpt-4",
+                              cost_aggregator=aggregator, response_cache=cache)
+
+    first = await model.ainvoke("prompt")
+    second = await model.ainvoke("prompt")
+
+    assert first == second == "answer to prompt"
+    assert base.calls == 1
+    summary = aggregator.get_workflow_summary()
+    assert summary["total_calls"] == 2
+    assert summary["total_cost"] == 0.25
+    assert summary["cache_hits"] == 1
+    assert summary["cost_saved"] == 0.25
+
+
+@pytest.mark.asyncio
+async def test_node_opt_out_and_per_call_bypass(token_counter, cache):
+    cache.exclude_nodes = {"generator"}
+    base = CountingModel()
+    model = CostTrackingModel(base_model=base, model_name="gpt-4", response_cache=cache,
+                              context_supplier=lambda: {"node_name": "generator"})
+
+    await model.ainvoke("prompt")
+    await model.ainvoke("prompt")
+    assert base.calls == 2
+
+    model.context_supplier = lambda: {"node_name": "difficulty_assessor"}
+    await model.ainvoke("prompt")
+    await model.ainvoke("prompt", _cache=False)
+    assert base.calls == 4
+    await model.ainvoke("prompt")
+    assert base.calls == 4
+
+
+def test_lru_eviction_and_ttl(cache):
+    for i in range(3):
+        cache.set(f"k{i}", "gpt-4", f"v{i}")
+        time.sleep(0.01)
+    assert cache.get("k0") is not None  # k0 becomes most recently used
+
+    cache.set("k3", "gpt-4", "v3")
+    assert cache.get("k1") is None
+    assert cache.get("k0")["response"] == "v0"
+
+    cache.ttl_seconds = 0.01
+    time.sleep(0.02)
+    assert cache.get("k3") is None
+    assert cache.get_stats()["expired"] >= 1
+
+
+def test_cache_is_opt_in_with_allow_listed_nodes(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_response_cache, "_cache", None)
+    monkeypatch.delenv("LLM_CACHE_ENABLED", raising=False)
+    monkeypatch.delenv("LLM_CACHE_NODES", raising=False)
+    assert llm_response_cache.get_llm_response_cache() is None
+
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "true")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+    cache = llm_response_cache.get_llm_response_cache()
+
+    assert cache.include_nodes == {"generate_titles", "difficulty_assessor", "prerequisite_identifier"}
+    assert not cache.is_enabled_for("section_generator")
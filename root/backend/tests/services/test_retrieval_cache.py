@@ -0,0 +1,110 @@
+# ABOUTME: Tests for the per-project retrieval result cache and its use by VectorStoreService searches
+# ABOUTME: Covers hits without Chroma queries, manifest-driven and write-driven invalidation and hit rates
+
+import pytest
+
+from backend.services.retrieval_cache import RetrievalCache
+
+
+class WordEmbedding:
+    def __call__(self, input):
+        return [[float(text.count("alpha")), float(text.count("beta")), len(text) / 10,
+                 sum(map(ord, text)) % 97 / 97] for text in input]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = RetrievalCache(max_entries=8)
+    monkeypatch.setattr("backend.services.vector_store_service.get_retrieval_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def service(make_vector_store, cache):
+    service = make_vector_store(WordEmbedding())
+    service.searches = 0
+    search_hits = service._search_hits
+
+    def counting_search_hits(*args, **kwargs):
+        service.searches += 1
+        return search_hits(*args, **kwargs)
+
+    service._search_hits = counting_search_hits
+    for project in ("one", "two"):
+        service.sync_file_chunks([{
+            "file_path": "notes.md", "project_name": project, "content_hash": f"{project}-v1",
+            "chunks": [f"{project} alpha chunk {i}" for i in range(4)],
+            "metadata": [{"project_name": project, "source_type": "markdown"} for _ in range(4)],
+        }])
+    return service
+
+
+def test_repeated_searches_are_served_from_the_cache(service, cache):
+    first = service.search_content("alpha", {"project_name": "one"}, n_results=3)
+    first[0]["content"] = "edited by the caller"
+    second = service.search_content("alpha", {"project_name": "one"}, n_results=3)
+
+    assert service.searches == 1
+    assert second[0]["content"].startswith("one alpha")
+    # A different n_results, filter or query text is a different search
+    service.search_content("alpha", {"project_name": "one"}, n_results=2)
+    service.search_content("alpha", {"project_name": "one", "source_type": "markdown"}, n_results=3)
+    service.search_content("beta", {"project_name": "one"}, n_results=3)
+    assert service.searches == 4
+    # Batched searches share the cache: only the unseen search runs
+    batched = service.search_content_batch([
+        {"query": "alpha", "metadata_filter": {"project_name": "one"}, "n_results": 3},
+        {"query": "alpha", "metadata_filter": {"project_name": "two"}, "n_results": 3},
+    ])
+    assert batched[0] == second and service.searches == 5
+    # Searches without a project are not cached
+    service.search_content("alpha", n_results=3)
+    service.search_content("alpha", n_results=3)
+    assert service.searches == 7
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 5)
+    assert stats["projects"]["one"]["hit_rate"] == 0.3333
+
+
+def test_manifest_change_invalidates_only_that_project(service, ingestion_manifest):
+    for project in ("one", "two"):
+        service.search_content("alpha", {"project_name": project}, n_results=10)
+    assert service.searches == 2
+
+    # Another process re-ingests a file of project one
+    ingestion_manifest.set("one", "other.md", "one-v2", [])
+    service.search_content("alpha", {"project_name": "one"}, n_results=10)
+    service.search_content("alpha", {"project_name": "two"}, n_results=10)
+    assert service.searches == 3
+
+
+def test_writes_invalidate_cached_results(service):
+    assert len(service.search_content("alpha", {"project_name": "one"}, n_results=10)) == 4
+
+    service.sync_file_chunks([{
+        "file_path": "notes.md", "project_name": "one", "content_hash": "one-v2",
+        "chunks": [f"one alpha chunk {i}" for i in range(5)],
+        "metadata": [{"project_name": "one", "source_type": "markdown"} for _ in range(5)],
+    }])
+    assert len(service.search_content("alpha", {"project_name": "one"}, n_results=10)) == 5
+
+    service.clear_content("one-v2", project_name="one")
+    assert service.search_content("alpha", {"project_name": "one"}, n_results=10) == []
+
+
+def test_results_from_before_an_invalidation_are_not_stored():
+    cache = RetrievalCache(max_entries=2)
+    stale_version = cache.version("one", (1, 1.0))
+    cache.invalidate("one")
+    version = cache.version("one", (1, 1.0))
+    assert cache.get("one", version, "a") is None
+
+    cache.set("one", stale_version, "a", [{"content": "stale"}])
+    assert cache.get("one", version, "a") is None
+
+    for key in ("a", "b", "c"):
+        cache.set("one", version, key, [{"content": key}])
+    assert cache.get("one", version, "a") is None
+    assert cache.get("one", version, "c") == [{"content": "c"}]
+    assert cache.get_stats()["evicted"] == 1
@@ -0,0 +1,53 @@
+# ABOUTME: Unit tests for SupabaseProjectManager's non-blocking query execution
+# ABOUTME: Verifies queries run on the bounded executor and keep the public API intact
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.services.supabase_project_manager import SupabaseProjectManager
+
+
+def _make_client(rows):
+    """Build a mock client whose query builders record the executing thread."""
+    client = MagicMock()
+    threads = []
+
+    def execute():
+        threads.append(threading.current_thread().name)
+        return MagicMock(data=rows)
+
+    builder = client.table.return_value
+    for method in ("select", "insert", "update", "upsert", "delete", "eq", "in_", "order", "limit"):
+        getattr(builder, method).return_value = builder
+    builder.execute.side_effect = execute
+    return client, threads
+
+
+@pytest.mark.asyncio
+async def test_queries_run_off_event_loop_thread():
+    client, threads = _make_client([{"id": "p1", "name": "demo", "metadata": {}}])
+    manager = SupabaseProjectManager(supabase_client=client, max_workers=2)
+
+    project = await manager.get_project("p1")
+
+    assert project["id"] == "p1"
+    assert threads and all(name.startswith("supabase-io") for name in threads)
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_track_cost_is_bounded_and_succeeds():
+    client, threads = _make_client([{"id": "p1", "name": "demo", "metadata": {}}])
+    manager = SupabaseProjectManager(supabase_client=client, max_workers=3)
+
+    results = await asyncio.gather(*[
+        manager.track_cost("p1", "Agent", f"op_{i}", 10, 5, 0.01)
+        for i in range(20)
+    ])
+
+    assert all(results)
+    assert len(set(threads)) <= 3
+    manager.close()
@@ -0,0 +1,53 @@
+# ABOUTME: Tests for streaming uploads to disk with on-the-fly hashing and size limits
+# ABOUTME: Covers hash correctness, early and mid-stream rejection, and identical re-uploads
+
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from backend.services.upload_storage import UploadTooLargeError, save_upload
+
+
+def make_upload(data: bytes, size=None) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename="nb.ipynb", size=size)
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_and_hashes(tmp_path):
+    data = b"x" * 10_000 + b"tail"
+    destination = tmp_path / "nb.ipynb"
+
+    stored = await save_upload(make_upload(data), destination, chunk_size=1024)
+
+    assert destination.read_bytes() == data
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert stored.size == len(data) and not stored.unchanged
+    assert not (tmp_path / "nb.ipynb.part").exists()
+
+
+@pytest.mark.asyncio
+async def test_save_upload_enforces_size_limit(tmp_path):
+    destination = tmp_path / "nb.ipynb"
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(make_upload(b"x" * 100, size=100), destination, max_bytes=50)
+    # Size unknown up front: rejected mid-stream and the partial file removed
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(make_upload(b"x" * 100), destination, max_bytes=50, chunk_size=16)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_identical_reupload_keeps_existing_file(tmp_path):
+    data = b"same bytes"
+    destination = tmp_path / "nb.ipynb"
+    first = await save_upload(make_upload(data), destination)
+
+    again = await save_upload(make_upload(data), destination, known_sha256=first.sha256)
+    changed = await save_upload(make_upload(b"new bytes"), destination, known_sha256=first.sha256)
+
+    assert again.unchanged and again.sha256 == first.sha256
+    assert not changed.unchanged and destination.read_bytes() == b"new bytes"
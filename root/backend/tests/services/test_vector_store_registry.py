@@ -0,0 +1,74 @@
+# ABOUTME: Unit tests for the process-wide VectorStoreRegistry singleton
+# ABOUTME: Covers lazy creation, thread safety, warmup timings and shutdown
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from backend.services.vector_store_registry import VectorStoreRegistry
+
+
+@patch("backend.services.vector_store_registry.VectorStoreService")
+def test_get_returns_same_instance(mock_service_cls):
+    registry = VectorStoreRegistry()
+
+    first = registry.get()
+    second = registry.get()
+
+    assert first is second
+    assert mock_service_cls.call_count == 1
+    assert registry.get_stats()["initialized"] is True
+    assert registry.get_stats()["init_seconds"] is not None
+
+
+@patch("backend.services.vector_store_registry.VectorStoreService")
+def test_concurrent_get_creates_single_instance(mock_service_cls):
+    registry = VectorStoreRegistry()
+    results = []
+
+    def worker():
+        results.append(registry.get())
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert mock_service_cls.call_count == 1
+    assert all(r is results[0] for r in results)
+
+
+@patch("backend.services.vector_store_registry.VectorStoreService")
+def test_startup_warms_up_embedding_model(mock_service_cls):
+    service = MagicMock()
+    mock_service_cls.return_value = service
+    registry = VectorStoreRegistry()
+
+    registry.startup(warmup=True)
+    registry.startup(warmup=True)
+
+    service.embedding_fn.assert_called_once_with(["warmup"])
+    assert registry.get_stats()["warmup_seconds"] is not None
+
+
+@patch("backend.services.vector_store_registry.VectorStoreService")
+def test_startup_tolerates_warmup_failure(mock_service_cls):
+    service = MagicMock()
+    service.embedding_fn.side_effect = RuntimeError("boom")
+    mock_service_cls.return_value = service
+    registry = VectorStoreRegistry()
+
+    assert registry.startup(warmup=True) is service
+    assert registry.get_stats()["warmup_seconds"] is None
+
+
+@patch("backend.services.vector_store_registry.VectorStoreService")
+def test_shutdown_releases_instance(mock_service_cls):
+    mock_service_cls.side_effect = [MagicMock(), MagicMock()]
+    registry = VectorStoreRegistry()
+
+    first = registry.get()
+    registry.shutdown()
+    assert registry.get_stats() == {"initialized": False, "init_seconds": None, "warmup_seconds": None}
+
+    assert registry.get() is not first
@@ -0,0 +1,166 @@
+# ABOUTME: Tests for VectorStoreService search paths against an in-memory Chroma collection
+# ABOUTME: Covers batched multi-query search, routing chunks to per-project collections and paged chunk streaming
+
+import pytest
+
+from backend.services.vector_store_service import project_collection_name
+
+
+class CountingEmbedding:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, input):
+        self.calls += 1
+        return [[float(text.count("alpha")), float(text.count("beta")), len(text) / 10,
+                 sum(map(ord, text)) % 97 / 97] for text in input]
+
+
+@pytest.fixture
+def service(make_vector_store):
+    service = make_vector_store(CountingEmbedding())
+    documents = [f"{'alpha ' * (i % 4)}{'beta ' * (i % 3)}chunk {i}" for i in range(40)]
+    service.collection.add(
+        ids=[f"c{i}" for i in range(40)],
+        documents=documents,
+        metadatas=[{"source_type": "code" if i % 2 else "markdown", "chunk_order": i} for i in range(40)],
+    )
+    return service
+
+
+@pytest.mark.parametrize("retrieval_mode", ["dense", "hybrid"])
+def test_batch_search_matches_individual_searches_with_one_embedding_call(service, retrieval_mode):
+    service.retrieval_mode = retrieval_mode
+    searches = [
+        {"query": "alpha alpha", "metadata_filter": {"source_type": "markdown"}, "n_results": 5},
+        {"query": "alpha alpha", "metadata_filter": {"source_type": "code"}, "n_results": 3},
+        {"query": "beta", "metadata_filter": {"source_type": "markdown"}, "n_results": 2},
+        {"query": "beta alpha"},
+    ]
+    expected = [service.search_content(**search) for search in searches]
+    service.embedding_fn.calls = 0
+
+    batched = service.search_content_batch(searches)
+
+    assert service.embedding_fn.calls == 1
+    assert [[r["content"] for r in results] for results in batched] == \
+        [[r["content"] for r in results] for results in expected]
+    assert [len(results) for results in batched] == [5, 3, 2, 10]
+    assert batched[1][0]["metadata"]["source_type"] == "code"
+    assert service.search_content_batch([]) == []
+
+
+def test_project_chunks_are_routed_to_their_own_collections(service):
+    for project in ("alpha-project", "beta project"):
+        service.store_content_chunks(
+            chunks=[f"{project} alpha chunk {i}" for i in range(3)],
+            metadata=[{"project_name": project, "source_type": "markdown"} for _ in range(3)],
+            content_hash=f"hash-{project}",
+        )
+
+    alpha = service.collection_for("alpha-project")
+    assert alpha.name == project_collection_name("alpha-project") != service.collection.name
+    assert alpha.count() == 3 and service.collection.count() == 40
+
+    scoped = service.search_content("alpha", {"project_name": "beta project", "source_type": "markdown"}, n_results=5)
+    assert [r["metadata"]["project_name"] for r in scoped] == ["beta project"] * 3
+    # No project in the filter: every collection is searched and dense hits are merged by distance
+    service.retrieval_mode = "dense"
+    unscoped = service.search_content("alpha", {"source_type": "markdown"}, n_results=50)
+    assert len(unscoped) == 26
+    assert [r["relevance"] for r in unscoped] == sorted((r["relevance"] for r in unscoped), reverse=True)
+    assert service.search_content_batch([{"query": "alpha", "metadata_filter": {"project_name": "alpha-project"}}])[0] \
+        == service.search_content("alpha", {"project_name": "alpha-project"})
+
+    service.delete_project("alpha-project")
+    assert service.search_content(metadata_filter={"project_name": "alpha-project"}) == []
+    assert len(service.search_content(metadata_filter={"project_name": "beta project"})) == 3
+
+
+def test_migration_moves_project_chunks_without_reembedding(service):
+    service.collection.add(
+        ids=[f"legacy{i}" for i in range(5)],
+        documents=[f"legacy alpha {i}" for i in range(5)],
+        metadatas=[{"project_name": "old" if i < 4 else "", "chunk_order": i} for i in range(5)],
+    )
+    service.embedding_fn.calls = 0
+
+    assert service.migrate_to_project_collections(batch_size=3, dry_run=True) == {"old": 4}
+    assert service.migrate_to_project_collections(batch_size=3) == {"old": 4}
+
+    assert service.embedding_fn.calls == 0
+    assert service.collection_for("old").count() == 4
+    assert service.collection.count() == 41
+    assert [r["order"] for r in service.search_content(metadata_filter={"project_name": "old"})] == [0, 1, 2, 3]
+    assert service.migrate_to_project_collections() == {}
+
+
+def test_persistent_projects_get_their_own_stores(make_vector_store, tmp_path):
+    service = make_vector_store(CountingEmbedding(), persist_dir=tmp_path)
+
+    for project in ("one", "two"):
+        service.store_content_chunks([f"{project} alpha"], [{"project_name": project}], content_hash=project)
+
+    assert service.project_collection_names() == sorted(project_collection_name(p) for p in ("one", "two"))
+    assert (tmp_path / "projects" / project_collection_name("one")).is_dir()
+    assert service.collection_names() == ["content"]
+    assert {r["content"] for r in service.search_content("alpha", n_results=5)} == {"one alpha", "two alpha"}
+
+    service.delete_project("one")
+    assert [r["content"] for r in service.search_content("alpha", n_results=5)] == ["two alpha"]
+    assert not (tmp_path / "projects" / project_collection_name("one")).exists()
+    assert service.project_collection_names() == [project_collection_name("two")]
+
+
+def test_iter_chunks_streams_texts_in_chunk_order_with_projected_metadata(service):
+    chunks = [f"notes alpha part {i}" for i in range(11)]
+    service.sync_file_chunks([{
+        "file_path": "notes.md", "project_name": "paged", "content_hash": "notes-v1", "chunks": chunks,
+        "metadata": [{"project_name": "paged", "content_type": "code" if i % 4 else "markdown",
+                      "section_headers": "[\"A\", \"B\"]"} for i in range(11)],
+    }])
+
+    streamed = list(service.iter_chunks({"project_name": "paged", "content_hash": "notes-v1"},
+                                        fields=("content_type",), page_size=3))
+
+    assert [text for text, _ in streamed] == chunks
+    assert streamed[1][1] == {"content_type": "code"} and streamed[4][1] == {"content_type": "markdown"}
+    full = list(service.iter_chunks({"project_name": "paged"}))
+    assert [meta for _, meta in full] == \
+        [r["metadata"] for r in service.search_content(metadata_filter={"project_name": "paged"})]
+    assert list(service.iter_chunks({"project_name": "paged", "content_hash": "missing"})) == []
+    # Chunks without a project (shared collection), ordered across pages
+    assert [text for text, _ in service.iter_chunks({"source_type": "code"}, page_size=7)] == \
+        [f"{'alpha ' * (i % 4)}{'beta ' * (i % 3)}chunk {i}" for i in range(1, 40, 2)]
+
+
+def test_iter_chunks_raises_when_a_text_page_fails(service, monkeypatch):
+    chunks = [f"notes part {i}" for i in range(11)]
+    service.sync_file_chunks([{
+        "file_path": "notes.md", "project_name": "paged", "content_hash": "notes-v1", "chunks": chunks,
+        "metadata": [{"project_name": "paged"} for _ in range(11)],
+    }])
+
+    class FailingTextReads:
+        def __init__(self, collection):
+            self.collection = collection
+
+        def get(self, ids=None, **kwargs):
+            if ids is not None:
+                raise RuntimeError("chroma unavailable")
+            return self.collection.get(**kwargs)
+
+    route = service._route
+
+    def failing_route(metadata_filter):
+        collections, remaining = route(metadata_filter)
+        return [FailingTextReads(collection) for collection in collections], remaining
+
+    monkeypatch.setattr(service, "_route", failing_route)
+
+    streamed = []
+    with pytest.raises(RuntimeError):
+        for text, _ in service.iter_chunks({"project_name": "paged"}, page_size=3):
+            streamed.append(text)
+    # Texts read with the first page were yielded; the stream then fails instead of ending early
+    assert streamed == chunks[:3]
@@ -0,0 +1,92 @@
+# ABOUTME: Tests for the micro-batching embedding function shared by concurrent callers
+# ABOUTME: Covers coalescing across threads, early dispatch, isolated async failures and loop-thread calls
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from chromadb import EmbeddingFunction
+
+from backend.models.embeddings.batching_embedding import BatchingEmbeddingFunction
+
+
+class SlowRecordingEmbedding(EmbeddingFunction):
+    def __init__(self, delay=0.02):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, input):
+        self.batches.append(list(input))
+        if any(text == "bad" for text in input):
+            raise ValueError("cannot embed 'bad'")
+        time.sleep(self.delay)
+        return np.array([[len(text), 1.0] for text in input], dtype=np.float32)
+
+
+def test_concurrent_calls_are_coalesced_and_fanned_out():
+    inner = SlowRecordingEmbedding()
+    batcher = BatchingEmbeddingFunction(inner, window_ms=20)
+    results = {}
+
+    def call(i):
+        results[i] = batcher([f"text-{i}", "x" * i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert len(inner.batches) < 8
+    for i, vectors in results.items():
+        assert [v[0] for v in vectors] == [len(f"text-{i}"), i]
+    stats = batcher.get_stats()
+    assert stats["requests"] == 16 and stats["texts"] == 32 and stats["coalesced_batches"] >= 1
+
+
+def test_full_batches_are_dispatched_without_waiting_for_the_window():
+    inner = SlowRecordingEmbedding(delay=0)
+    batcher = BatchingEmbeddingFunction(inner, window_ms=5000, max_batch_size=4)
+
+    start = time.monotonic()
+    vectors = batcher(["a", "bb", "ccc", "dddd"])
+    batcher.close()
+
+    assert time.monotonic() - start < 1
+    assert [v[0] for v in vectors] == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_async_callers_share_batches_and_failures_stay_isolated():
+    inner = SlowRecordingEmbedding()
+    batcher = BatchingEmbeddingFunction(inner, window_ms=20)
+
+    results = await asyncio.gather(
+        batcher.aembed(["one"]), batcher.aembed(["bad"]), batcher.aembed(["three"]),
+        return_exceptions=True,
+    )
+    batcher.close()
+
+    assert [v[0] for v in results[0]] == [3]
+    assert isinstance(results[1], ValueError)
+    assert [v[0] for v in results[2]] == [5]
+    assert inner.batches[0] == ["one", "bad", "three"]
+    assert batcher.get_stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_on_event_loop_skips_the_window():
+    inner = SlowRecordingEmbedding(delay=0)
+    batcher = BatchingEmbeddingFunction(inner, window_ms=500)
+
+    started = time.monotonic()
+    vectors = batcher(["direct"])
+    elapsed = time.monotonic() - started
+    batcher.close()
+
+    assert [v[0] for v in vectors] == [6]
+    assert elapsed < 0.25
+    assert batcher.get_stats()["direct_calls"] == 1
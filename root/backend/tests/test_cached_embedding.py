@@ -0,0 +1,64 @@
+# ABOUTME: Tests for the content-hash keyed embedding cache wrapped around ChromaDB embedding functions
+# ABOUTME: Only distinct cache misses are embedded; the LRU bound and on-disk store survive restarts and torn writes
+
+import numpy as np
+from chromadb import EmbeddingFunction
+
+from backend.models.embeddings.cached_embedding import CachedEmbeddingFunction, EmbeddingDiskStore
+
+
+class RecordingEmbedding(EmbeddingFunction):
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, input):
+        self.batches.append(list(input))
+        return [np.array([len(text), 1.0, 0.5], dtype=np.float32) for text in input]
+
+
+def test_only_distinct_misses_are_embedded():
+    inner = RecordingEmbedding()
+    cached = CachedEmbeddingFunction(inner)
+
+    first = cached(["alpha", "beta", "alpha"])
+    second = cached(["beta", "gamma"])
+
+    assert inner.batches == [["alpha", "beta"], ["gamma"]]
+    assert np.allclose(first[0], first[2])
+    assert np.allclose(second[0], first[1])
+
+    stats = cached.get_stats()
+    assert stats["requested"] == 5
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["embedded_tokens"] > 0
+    assert stats["hit_ratio"] == 0.2
+
+
+def test_lru_bound_and_disk_store_survive_restart(tmp_path):
+    inner = RecordingEmbedding()
+    cached = CachedEmbeddingFunction(inner, max_entries=1, disk_dir=str(tmp_path))
+    cached(["one", "three"])
+    assert cached.get_stats()["memory_entries"] == 1
+
+    reopened = CachedEmbeddingFunction(RecordingEmbedding(), disk_dir=str(tmp_path))
+    vectors = reopened(["three", "one"])
+
+    assert reopened.inner.batches == []
+    assert reopened.get_stats()["disk_hits"] == 2
+    assert np.allclose(vectors[1], [3, 1.0, 0.5])
+
+
+def test_disk_store_drops_unindexed_vector_rows(tmp_path):
+    store = EmbeddingDiskStore(str(tmp_path))
+    store.put_many(["a"], [np.array([1.0, 2.0], dtype=np.float32)])
+    # Simulate a crash after the vectors were appended but before the index was written
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.array([9.0, 9.0], dtype=np.float32).tobytes())
+
+    reopened = EmbeddingDiskStore(str(tmp_path))
+    reopened.put_many(["b"], [np.array([3.0, 4.0], dtype=np.float32)])
+
+    assert (tmp_path / "vectors.f32").stat().st_size == 2 * 2 * 4
+    assert np.allclose(reopened.get_many(["b"])["b"], [3.0, 4.0])
+    assert np.allclose(reopened.get_many(["a"])["a"], [1.0, 2.0])
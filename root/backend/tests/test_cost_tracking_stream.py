@@ -0,0 +1,54 @@
+# ABOUTME: Tests for CostTrackingModel.astream used by the section streaming endpoint
+# ABOUTME: Chunks are yielded as produced and the call is costed once; non-streaming models fall back to ainvoke
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from backend.models.cost_tracking_wrapper import CostTrackingModel
+
+
+class StreamingModel:
+    async def ainvoke(self, prompt):
+        return "full response"
+
+    async def astream(self, prompt):
+        for chunk in ["Hello", ", ", "world"]:
+            yield chunk
+
+
+@pytest.fixture
+def token_counter():
+    counter = MagicMock()
+    counter.count_tokens.side_effect = lambda text, model: len(text)
+    counter.calculate_cost.side_effect = lambda i, o, m: (0.5, {"input_tokens": i, "output_tokens": o, "total_tokens": i + o, "total_cost": 0.5})
+    counter._normalize_model_name.side_effect = lambda name: name
+    with patch("backend.models.cost_tracking_wrapper.TokenCounter", return_value=counter):
+        yield counter
+
+
+@pytest.mark.asyncio
+async def test_astream_yields_chunks_and_records_cost(token_counter):
+    aggregator = MagicMock()
+    model = CostTrackingModel(base_model=StreamingModel(), model_name="gpt-4", cost_aggregator=aggregator)
+
+    chunks = [chunk async for chunk in model.astream("prompt")]
+
+    assert chunks == ["Hello", ", ", "world"]
+    aggregator.record_cost.assert_called_once()
+    record = aggregator.record_cost.call_args[0][0]
+    assert record["output_tokens"] == len("Hello, world")
+    assert model.session_costs["total_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_astream_falls_back_to_ainvoke(token_counter):
+    class NonStreamingModel:
+        async def ainvoke(self, prompt):
+            return "whole answer"
+
+    model = CostTrackingModel(base_model=NonStreamingModel(), model_name="gpt-4")
+
+    chunks = [chunk async for chunk in model.astream("prompt")]
+
+    assert chunks == ["whole answer"]
+    assert model.session_costs["total_calls"] == 1
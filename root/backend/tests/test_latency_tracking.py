@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime
 from backend.models.cost_tracking_wrapper import CostTrackingModel
+from backend.services.cost_sink import CostTrackingSink
 
 @pytest.mark.asyncio
 async def test_cost_tracking_duration():
@@ -10,6 +11,7 @@ async def test_cost_tracking_duration():
     mock_base_model.ainvoke.return_value = "Response"
     
     mock_sql_manager = AsyncMock()
+    mock_sql_manager.track_costs_bulk.return_value = []
     mock_aggregator = MagicMock()
     
     # Initialize model
@@ -19,15 +21,20 @@ async def test_cost_tracking_duration():
         cost_aggregator=mock_aggregator,
         sql_project_manager=mock_sql_manager,
         project_id="test-project",
-        agent_name="test-agent"
+        agent_name="test-agent",
+        cost_sink=CostTrackingSink(mock_sql_manager)
     )
     
     # Invoke
     await model.ainvoke("Test prompt")
     
-    # Verify track_cost called with duration_seconds
-    assert mock_sql_manager.track_cost.called
-    call_args = mock_sql_manager.track_cost.call_args[1]
+    # SQL write is deferred to the write-behind sink
+    assert not mock_sql_manager.track_costs_bulk.called
+    await model.cost_sink.flush()
+    
+    # Verify the bulk insert received duration_seconds
+    assert mock_sql_manager.track_costs_bulk.called
+    call_args = mock_sql_manager.track_costs_bulk.call_args[0][0][0]
     assert "duration_seconds" in call_args
     assert isinstance(call_args["duration_seconds"], float)
     assert call_args["duration_seconds"] >= 0
@@ -0,0 +1,60 @@
+# ABOUTME: Tests for the streaming notebook parser and section-stream chunking
+# ABOUTME: Binary outputs are omitted and peak memory stays near the largest cell, not the file size
+
+import base64
+import json
+import tracemalloc
+
+import nbformat
+from nbformat.v4 import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+from backend.agents.content_parsing.chunking import split_parsed_content
+from backend.parsers import NotebookParser
+from backend.parsers.notebook_parser import iter_notebook_cells
+
+
+def write_notebook(path, num_plots=20, image_bytes=500_000):
+    image = base64.b64encode(b"\x89PNG" + b"\x00" * image_bytes).decode()
+    cells = [new_markdown_cell('# Title\n\nIntro with "quotes", {braces} and [brackets] \\ backslash')]
+    for i in range(num_plots):
+        cells.append(new_code_cell(
+            f"plot({i})",
+            outputs=[
+                new_output("stream", name="stdout", text=f"step {i}\n"),
+                new_output("display_data", data={"image/png": image}),
+            ],
+        ))
+        cells.append(new_markdown_cell(f"## Result {i}\n\nDiscussion of plot {i}."))
+    nbformat.write(new_notebook(cells=cells), str(path))
+
+
+def test_cells_match_json_load(tmp_path):
+    path = tmp_path / "nb.ipynb"
+    write_notebook(path, num_plots=3, image_bytes=1000)
+
+    streamed = list(iter_notebook_cells(str(path), read_size=97))  # tiny blocks exercise buffer edges
+
+    assert streamed == json.loads(path.read_text())["cells"]
+
+
+def test_parser_streams_cells_without_binary_outputs(tmp_path):
+    path = tmp_path / "nb.ipynb"
+    write_notebook(path)
+
+    parsed = NotebookParser(str(path)).parse()
+    assert parsed.has_content()
+
+    tracemalloc.start()
+    chunks, _ = split_parsed_content(parsed)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    text = "\n".join(chunks)
+    assert "[image/png output omitted]" in text
+    assert "iVBOR" not in text and "AAAA" not in text
+    assert "Discussion of plot 19." in text
+    assert parsed.metadata["num_cells_loaded"] == 41
+    assert parsed.metadata["binary_outputs_omitted"] == 20
+    # The file is ~13 MB of base64; the scan holds roughly one cell at a time
+    assert path.stat().st_size > 10_000_000
+    assert peak < 5_000_000
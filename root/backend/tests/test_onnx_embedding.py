@@ -0,0 +1,60 @@
+# ABOUTME: Tests for the ONNX Runtime sentence-transformer embedding function with a stand-in session
+# ABOUTME: Covers padding-aware pooling, input order with length-sorted batches, pooling modes and normalization
+
+import numpy as np
+from tokenizers import Tokenizer, models, pre_tokenizers
+
+from backend.models.embeddings.onnx_embedding import OnnxSentenceTransformerEmbeddingFunction
+
+
+class TokenIdSession:
+    """Stands in for an ONNX session: each token's hidden state is [token_id, 1]."""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def run(self, _, feeds):
+        ids = feeds["input_ids"]
+        self.batch_shapes.append(ids.shape)
+        return [np.stack([ids, np.ones_like(ids)], axis=-1).astype(np.float32)]
+
+
+def make_embedding(pooling="mean", normalize=False, batch_size=2):
+    vocab = {"[PAD]": 0, "[UNK]": 1, "a": 2, "b": 4, "c": 6}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+    embedding = OnnxSentenceTransformerEmbeddingFunction.__new__(OnnxSentenceTransformerEmbeddingFunction)
+    embedding.model_name = "test"
+    embedding.tokenizer = tokenizer
+    embedding.session = TokenIdSession()
+    embedding.input_names = {"input_ids", "attention_mask"}
+    embedding.output_names = ["last_hidden_state"]
+    embedding.pooling = pooling
+    embedding.normalize = normalize
+    embedding.batch_size = batch_size
+    return embedding
+
+
+def test_mean_pooling_ignores_padding_and_keeps_input_order():
+    embedding = make_embedding()
+
+    vectors = np.asarray(embedding(["a b c", "b", "c c", "a"]))
+
+    assert np.allclose(vectors[:, 0], [4.0, 4.0, 6.0, 2.0])
+    assert np.allclose(vectors[:, 1], 1.0)
+    # Length-sorted batches: short texts are padded together
+    assert embedding.session.batch_shapes == [(2, 1), (2, 3)]
+
+
+def test_pooling_modes_and_normalization_follow_the_model_config():
+    assert OnnxSentenceTransformerEmbeddingFunction._pooling_mode({"pooling_mode_cls_token": True}) == "cls"
+    assert OnnxSentenceTransformerEmbeddingFunction._pooling_mode({"pooling_mode_mean_tokens": True}) == "mean"
+    assert OnnxSentenceTransformerEmbeddingFunction._pooling_mode(None) == "mean"
+
+    vectors = np.asarray(make_embedding(pooling="max", normalize=True)(["a c", "b"]))
+
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert np.allclose(vectors[0], np.array([6.0, 1.0]) / np.hypot(6.0, 1.0))
+    assert make_embedding().count_tokens(["a b", "c"]) == 3
@@ -22,10 +22,30 @@ def calculate_content_length(text: str) -> int:
     words = text.strip().split()
     return len(words)
 
+def summarize_outline_section(section) -> str:
+    """
+    Build a one-line summary of an outline section from its title and learning goals.
+    
+    Args:
+        section: OutlineSection object
+        
+    Returns:
+        Summary string such as "Title (covers: goal one; goal two)"
+    """
+    title = getattr(section, 'title', 'Untitled Section')
+    goals = getattr(section, 'learning_goals', None) or []
+    if not goals:
+        return title
+    return f"{title} (covers: {'; '.join(goals[:3])})"
+
 def extract_blog_narrative_context(state) -> str:
     """
     Extract rich narrative context from the current blog state.
     
+    Earlier sections are described from the outline rather than from finished
+    drafts, so the context is identical whether sections are generated in order
+    or concurrently.
+    
     Args:
         state: BlogDraftState object
         
@@ -38,8 +58,11 @@ def extract_blog_narrative_context(state) -> str:
         total_sections = len(getattr(state.outline, 'sections', []))
         current_position = state.current_section_index + 1
         
-        # Get completed sections info
-        completed_titles = [section.title for section in state.sections]
+        # Summaries of the sections that precede this one in the outline
+        completed_titles = [
+            summarize_outline_section(section)
+            for section in getattr(state.outline, 'sections', [])[:state.current_section_index]
+        ]
         
         # Get upcoming sections
         upcoming_sections = []
@@ -58,7 +81,7 @@ def extract_blog_narrative_context(state) -> str:
         ]
         
         if completed_titles:
-            context_parts.append(f"Completed Sections: {', '.join(completed_titles)}")
+            context_parts.append(f"Earlier Sections: {', '.join(completed_titles)}")
         
         if upcoming_sections:
             context_parts.append(f"Upcoming Sections: {', '.join(upcoming_sections)}")
@@ -1,7 +1,5 @@
 from typing import Dict, List, Optional, Union
 from pydantic import BaseModel
-import nbformat
-import markdown2
 import ast
 from pathlib import Path
 import re
@@ -68,6 +66,7 @@ class FileParser:
     def _parse_notebook(self, file_path: str) -> ParsedContent:
         logging.info(f"Parsing notebook file: {file_path}")
         try:
+            import nbformat  # loaded on first use; only notebook parsing needs it
             notebook = nbformat.read(file_path, as_version=4)
         except Exception as e:
             msg = f"Error parsing notebook file: {file_path}. Details: {e}"
@@ -135,6 +134,7 @@ class FileParser:
             logging.exception(msg)
             raise ValueError(msg)
             
+        import markdown2  # loaded on first use; only markdown parsing needs it
         html = markdown2.markdown(content, extras=['fenced-code-blocks'])
         
         main_content = self._clean_markdown_content(content)
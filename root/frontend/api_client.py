@@ -327,6 +327,55 @@ async def generate_section(
             logger.error(f"HTTP request failed during section generation: {e}")
             raise ConnectionError(f"Failed to connect to API for section generation: {e}")
 
+async def stream_section_generation(
+    project_name: str,
+    section_index: int,
+    max_iterations: int = 3,
+    quality_threshold: float = 0.8,
+    base_url: str = DEFAULT_API_BASE_URL
+):
+    """
+    Streams section generation progress from the backend over Server-Sent Events.
+
+    Args:
+        project_name: The name of the project.
+        section_index: The index of the section to generate.
+        max_iterations: Max refinement iterations for the section.
+        quality_threshold: Min quality score for the section.
+        base_url: The base URL of the API.
+
+    Yields:
+        (event, data) tuples: "node" progress, "token" text chunks, then "result" or "error".
+    """
+    api_url = _get_api_url(f"/generate_section_stream/{project_name}", base_url)
+    headers = _get_headers(base_url)
+    data = {
+        "section_index": section_index,
+        "max_iterations": max_iterations,
+        "quality_threshold": quality_threshold
+    }
+
+    # No read timeout: events arrive continuously while the section is generated
+    timeout = httpx.Timeout(connect=30.0, read=None, write=30.0, pool=30.0)
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        try:
+            async with client.stream("POST", api_url, data=data, headers=headers) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    await _handle_response(response)
+                event = "message"
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        payload = json.loads(line[len("data:"):].strip())
+                        if event == "done":
+                            return
+                        yield event, payload
+        except httpx.RequestError as e:
+            logger.error(f"HTTP request failed during streaming section generation: {e}")
+            raise ConnectionError(f"Failed to connect to API for section generation: {e}")
+
 async def regenerate_section_with_feedback(
     project_name: str,
     project_id: str,